@@ -1,6 +1,37 @@
 #!/usr/bin/env python3
-import time
+"""成就系统
+
+成就定义从 data/achievements.json 加载，每个成就声明触发它的事件和进度方式：
+    - mode "count"：事件的数量累加到进度（feed、clean、sleep、train、play、pet、
+      pet_created、pet_adult 等）
+    - mode "value"：事件的值是当前达到的数值，进度取最大值（skill、relationship、level 等）
+事件 "all_unlocked" 在其他成就全部解锁时由系统自动触发。
+
+AchievementSystem 按事件建立成就索引，并增量维护已解锁数量，处理一个事件只访问受影响的成就。
+"""
+import json
+import os
 from enum import Enum
+from pet.clock import SYSTEM_CLOCK, get_clock
+from pet.journal import DirtyTracking
+from pet.events import EventType, SOURCE_USER
+
+ACHIEVEMENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "achievements.json")
+
+MODE_COUNT = "count"
+MODE_VALUE = "value"
+ALL_UNLOCKED_EVENT = "all_unlocked"
+RECENTLY_UNLOCKED_LIMIT = 5
+
+# 宠物动作事件 -> 更新的成就类别
+EVENT_ACHIEVEMENT_CATEGORIES = {
+    EventType.FEED: "care",
+    EventType.CLEAN: "care",
+    EventType.SLEEP: "care",
+    EventType.TRAIN: "training",
+    EventType.PLAY: "social",
+    EventType.PET: "social",
+}
 
 class AchievementCategory(Enum):
     """成就类别枚举"""
@@ -18,7 +49,8 @@ class AchievementStatus(Enum):
 
 class Achievement:
     """成就类"""
-    def __init__(self, achievement_id, name, description, category, requirement, reward, icon=None):
+    def __init__(self, achievement_id, name, description, category, requirement, reward, icon=None,
+                 event=None, mode=MODE_COUNT):
         self.achievement_id = achievement_id
         self.name = name
         self.description = description
@@ -26,21 +58,29 @@ class Achievement:
         self.requirement = requirement  # 解锁要求
         self.reward = reward  # 解锁奖励
         self.icon = icon  # 成就图标
+        self.event = event  # 触发事件
+        self.mode = mode  # 进度方式：MODE_COUNT 累加，MODE_VALUE 取最大值
         self.status = AchievementStatus.LOCKED
         self.progress = 0
         self.unlocked_at = None
     
-    def update_progress(self, progress):
-        """更新成就进度"""
+    def update_progress(self, progress, timestamp=None):
+        """更新成就进度
+        
+        Args:
+            progress: 新的进度值
+            timestamp (float, optional): 当前时间戳，用于记录解锁时间，默认为系统时间
+        """
         old_progress = self.progress
         self.progress = min(progress, self.requirement)
         
-        # 更新状态
-        if self.status == AchievementStatus.LOCKED and self.progress > 0:
+        # 更新状态（进度一次达到要求时直接解锁，已解锁的成就保持原解锁时间）
+        if self.progress >= self.requirement:
+            if self.status != AchievementStatus.UNLOCKED:
+                self.status = AchievementStatus.UNLOCKED
+                self.unlocked_at = timestamp or SYSTEM_CLOCK.time()
+        elif self.status == AchievementStatus.LOCKED and self.progress > 0:
             self.status = AchievementStatus.IN_PROGRESS
-        elif self.progress >= self.requirement:
-            self.status = AchievementStatus.UNLOCKED
-            self.unlocked_at = time.time()
         
         return self.progress > old_progress
     
@@ -58,6 +98,8 @@ class Achievement:
             "requirement": self.requirement,
             "reward": self.reward,
             "icon": self.icon,
+            "event": self.event,
+            "mode": self.mode,
             "status": self.status.value,
             "progress": self.progress,
             "unlocked_at": self.unlocked_at
@@ -73,240 +115,175 @@ class Achievement:
             category=AchievementCategory(data["category"]),
             requirement=data["requirement"],
             reward=data["reward"],
-            icon=data.get("icon")
+            icon=data.get("icon"),
+            event=data.get("event"),
+            mode=data.get("mode", MODE_COUNT)
         )
-        achievement.status = AchievementStatus(data["status"])
-        achievement.progress = data["progress"]
+        achievement.status = AchievementStatus(data.get("status", AchievementStatus.LOCKED.value))
+        achievement.progress = data.get("progress", 0)
         achievement.unlocked_at = data.get("unlocked_at")
         return achievement
 
-class AchievementSystem:
+_definitions_cache = {}
+
+def load_achievement_definitions(path=ACHIEVEMENTS_FILE):
+    """加载成就定义（每个文件只解析一次）
+    
+    Args:
+        path (str, optional): 成就定义文件路径
+    
+    Returns:
+        list: 成就定义字典列表，格式与 Achievement.to_dict 相同（不含进度）
+    """
+    if path not in _definitions_cache:
+        with open(path, "r", encoding="utf-8") as f:
+            _definitions_cache[path] = json.load(f)["achievements"]
+    return _definitions_cache[path]
+
+class AchievementSystem(DirtyTracking):
     """成就系统"""
-    def __init__(self, pet):
+    JOURNAL_SECTIONS = {"state": None}
+    
+    def __init__(self, pet, definitions=None):
+        """初始化成就系统
+        
+        Args:
+            pet (Pet): 宠物
+            definitions (list, optional): 成就定义列表，默认从 ACHIEVEMENTS_FILE 加载
+        """
+        self._init_dirty_tracking()
         self.pet = pet
+        self.clock = get_clock(pet)
+        self.definitions = load_achievement_definitions() if definitions is None else definitions
         self.achievements = self._initialize_achievements()
         self.recently_unlocked = []
+        self._build_index()
     
     def _initialize_achievements(self):
-        """初始化成就列表"""
-        achievements = []
-        
-        # 照顾类别成就
-        achievements.extend([
-            Achievement(
-                achievement_id="care_1",
-                name="初级饲养员",
-                description="喂食你的宠物10次",
-                category=AchievementCategory.CARE,
-                requirement=10,
-                reward={"experience": 100, "points": 50}
-            ),
-            Achievement(
-                achievement_id="care_2",
-                name="中级饲养员",
-                description="喂食你的宠物50次",
-                category=AchievementCategory.CARE,
-                requirement=50,
-                reward={"experience": 300, "points": 150}
-            ),
-            Achievement(
-                achievement_id="care_3",
-                name="高级饲养员",
-                description="喂食你的宠物100次",
-                category=AchievementCategory.CARE,
-                requirement=100,
-                reward={"experience": 500, "points": 300}
-            ),
-            Achievement(
-                achievement_id="care_4",
-                name="清洁大师",
-                description="清洁你的宠物50次",
-                category=AchievementCategory.CARE,
-                requirement=50,
-                reward={"experience": 250, "points": 125}
-            ),
-            Achievement(
-                achievement_id="care_5",
-                name="睡眠专家",
-                description="让你的宠物睡觉20次",
-                category=AchievementCategory.CARE,
-                requirement=20,
-                reward={"experience": 150, "points": 75}
-            ),
-        ])
-        
-        # 训练类别成就
-        achievements.extend([
-            Achievement(
-                achievement_id="training_1",
-                name="初级训练师",
-                description="训练你的宠物10次",
-                category=AchievementCategory.TRAINING,
-                requirement=10,
-                reward={"experience": 120, "points": 60}
-            ),
-            Achievement(
-                achievement_id="training_2",
-                name="中级训练师",
-                description="训练你的宠物50次",
-                category=AchievementCategory.TRAINING,
-                requirement=50,
-                reward={"experience": 350, "points": 175}
-            ),
-            Achievement(
-                achievement_id="training_3",
-                name="高级训练师",
-                description="训练你的宠物100次",
-                category=AchievementCategory.TRAINING,
-                requirement=100,
-                reward={"experience": 600, "points": 300}
-            ),
-            Achievement(
-                achievement_id="training_4",
-                name="技能大师",
-                description="让你的宠物的所有技能达到10级",
-                category=AchievementCategory.TRAINING,
-                requirement=10,
-                reward={"experience": 800, "points": 400}
-            ),
-        ])
-        
-        # 社交类别成就
-        achievements.extend([
-            Achievement(
-                achievement_id="social_1",
-                name="友好伙伴",
-                description="和你的宠物玩耍20次",
-                category=AchievementCategory.SOCIAL,
-                requirement=20,
-                reward={"experience": 150, "points": 75}
-            ),
-            Achievement(
-                achievement_id="social_2",
-                name="亲密伙伴",
-                description="抚摸你的宠物50次",
-                category=AchievementCategory.SOCIAL,
-                requirement=50,
-                reward={"experience": 250, "points": 125}
-            ),
-            Achievement(
-                achievement_id="social_3",
-                name="最佳朋友",
-                description="和你的宠物的关系达到100",
-                category=AchievementCategory.SOCIAL,
-                requirement=100,
-                reward={"experience": 500, "points": 250}
-            ),
-        ])
-        
-        # 特殊类别成就
-        achievements.extend([
-            Achievement(
-                achievement_id="special_1",
-                name="宠物诞生",
-                description="创建你的第一个宠物",
-                category=AchievementCategory.SPECIAL,
-                requirement=1,
-                reward={"experience": 50, "points": 25}
-            ),
-            Achievement(
-                achievement_id="special_2",
-                name="成长里程碑",
-                description="你的宠物成长到成年",
-                category=AchievementCategory.SPECIAL,
-                requirement=1,
-                reward={"experience": 300, "points": 150}
-            ),
-            Achievement(
-                achievement_id="special_3",
-                name="全能冠军",
-                description="解锁所有成就",
-                category=AchievementCategory.SPECIAL,
-                requirement=1,
-                reward={"experience": 2000, "points": 1000}
-            ),
-        ])
-        
-        return achievements
+        """按成就定义创建成就列表"""
+        return [Achievement.from_dict(definition) for definition in self.definitions]
     
-    def update_achievement_progress(self, achievement_type, progress):
-        """更新成就进度"""
-        unlocked_achievements = []
-        rewards = []
-        
+    def _build_index(self):
+        """建立事件 -> 成就的索引和已解锁计数"""
+        self._by_id = {a.achievement_id: a for a in self.achievements}
+        self._by_event = {}
         for achievement in self.achievements:
-            if achievement_type in achievement.achievement_id:
-                was_updated = achievement.update_progress(progress)
-                if was_updated and achievement.is_unlocked():
-                    unlocked_achievements.append(achievement)
-                    rewards.append(achievement.reward)
+            if achievement.event is not None:
+                self._by_event.setdefault(achievement.event, []).append(achievement)
+        self._unlocked_count = sum(1 for a in self.achievements if a.is_unlocked())
+        # "全部解锁"成就之外的成就数量及其中已解锁的数量
+        regular = [a for a in self.achievements if a.event != ALL_UNLOCKED_EVENT]
+        self._regular_count = len(regular)
+        self._regular_unlocked = sum(1 for a in regular if a.is_unlocked())
+    
+    def achievements_for_event(self, event):
+        """受事件影响的成就"""
+        return list(self._by_event.get(event, ()))
+    
+    def get_achievement(self, achievement_id):
+        """按ID获取成就，不存在时返回 None"""
+        return self._by_id.get(achievement_id)
+    
+    def _advance(self, achievement, progress, unlocked):
+        """设置成就进度，新解锁的成就加入 unlocked"""
+        if achievement.is_unlocked() or not achievement.update_progress(progress, self.clock.time()):
+            return
+        self.mark_dirty()
+        if achievement.is_unlocked():
+            self._unlocked_count += 1
+            if achievement.event != ALL_UNLOCKED_EVENT:
+                self._regular_unlocked += 1
+            unlocked.append(achievement)
+    
+    def _finish(self, unlocked):
+        """处理新解锁的成就，返回奖励列表"""
+        if unlocked and self._regular_unlocked == self._regular_count:
+            for achievement in self._by_event.get(ALL_UNLOCKED_EVENT, ()):
+                self._advance(achievement, achievement.progress + 1, unlocked)
         
-        # 处理新解锁的成就
-        for achievement in unlocked_achievements:
+        for achievement in unlocked:
             self.recently_unlocked.append(achievement)
-            if len(self.recently_unlocked) > 5:
-                self.recently_unlocked.pop(0)
-        
-        return rewards
+        del self.recently_unlocked[:-RECENTLY_UNLOCKED_LIMIT]
+        return [achievement.reward for achievement in unlocked]
     
-    def update_care_achievements(self, action_type, count=1):
-        """更新照顾类成就"""
-        rewards = []
+    def record_event(self, event, amount=1):
+        """记录事件并更新受影响的成就
         
-        if action_type == "feed":
-            rewards.extend(self.update_achievement_progress("care_1", count))
-            rewards.extend(self.update_achievement_progress("care_2", count))
-            rewards.extend(self.update_achievement_progress("care_3", count))
-        elif action_type == "clean":
-            rewards.extend(self.update_achievement_progress("care_4", count))
-        elif action_type == "sleep":
-            rewards.extend(self.update_achievement_progress("care_5", count))
+        Args:
+            event (str): 事件类型，例如 "feed"、"train"、"relationship"
+            amount: 计数类成就累加的数量，或数值类成就当前达到的数值
         
-        return rewards
+        Returns:
+            list: 新解锁成就的奖励
+        """
+        unlocked = []
+        for achievement in self._by_event.get(event, ()):
+            if achievement.mode == MODE_VALUE:
+                self._advance(achievement, max(achievement.progress, amount), unlocked)
+            else:
+                self._advance(achievement, achievement.progress + amount, unlocked)
+        return self._finish(unlocked)
+    
+    def update_achievement_progress(self, achievement_id, progress):
+        """直接设置某个成就的进度
+        
+        Returns:
+            list: 新解锁成就的奖励
+        """
+        unlocked = []
+        achievement = self._by_id.get(achievement_id)
+        if achievement is not None:
+            self._advance(achievement, progress, unlocked)
+        return self._finish(unlocked)
+    
+    def update_care_achievements(self, action_type, count=1):
+        """更新照顾类成就（action_type 为 "feed"、"clean" 或 "sleep"）"""
+        return self.record_event(action_type, count)
     
     def update_training_achievements(self, count=1):
         """更新训练类成就"""
-        rewards = []
-        rewards.extend(self.update_achievement_progress("training_1", count))
-        rewards.extend(self.update_achievement_progress("training_2", count))
-        rewards.extend(self.update_achievement_progress("training_3", count))
-        
+        rewards = self.record_event("train", count)
         # 检查技能等级
-        max_skill_level = max(self.pet.skills.values())
-        self.update_achievement_progress("training_4", max_skill_level)
-        
+        rewards.extend(self.record_event("skill", max(self.pet.skills.values())))
         return rewards
     
     def update_social_achievements(self, action_type, count=1):
-        """更新社交类成就"""
-        rewards = []
-        
-        if action_type == "play":
-            rewards.extend(self.update_achievement_progress("social_1", count))
-        elif action_type == "pet":
-            rewards.extend(self.update_achievement_progress("social_2", count))
-        
+        """更新社交类成就（action_type 为 "play" 或 "pet"）"""
+        rewards = self.record_event(action_type, count)
         # 检查关系值
-        relationship = self.pet.relationship_with_owner
-        self.update_achievement_progress("social_3", relationship)
-        
+        rewards.extend(self.record_event("relationship", self.pet.relationship_with_owner))
         return rewards
     
     def update_special_achievements(self, event_type):
-        """更新特殊类成就"""
-        rewards = []
-        
-        if event_type == "pet_created":
-            rewards.extend(self.update_achievement_progress("special_1", 1))
-        elif event_type == "pet_adult":
-            rewards.extend(self.update_achievement_progress("special_2", 1))
+        """更新特殊类成就（event_type 为 "pet_created" 或 "pet_adult"）"""
+        return self.record_event(event_type, 1)
+    
+    def attach(self, event_bus):
+        """订阅宠物动作事件，用户发起的照顾、训练和互动动作自动更新成就
         
-        # 检查是否解锁了所有成就
-        unlocked_count = sum(1 for a in self.achievements if a.is_unlocked())
-        if unlocked_count == len(self.achievements):
-            rewards.extend(self.update_achievement_progress("special_3", 1))
+        Args:
+            event_bus (EventBus): 事件总线（通常为 pet.event_bus）
+        """
+        event_bus.subscribe(EVENT_ACHIEVEMENT_CATEGORIES, self.handle_event)
+    
+    def detach(self, event_bus):
+        """取消订阅宠物动作事件"""
+        event_bus.unsubscribe(self.handle_event)
+    
+    def handle_event(self, event):
+        """处理宠物动作事件
         
-        return rewards
+        Returns:
+            list: 新解锁成就的奖励
+        """
+        if event.source != SOURCE_USER:
+            return []
+        category = EVENT_ACHIEVEMENT_CATEGORIES[event.type]
+        if category == "care":
+            return self.update_care_achievements(event.type.value)
+        if category == "training":
+            return self.update_training_achievements()
+        return self.update_social_achievements(event.type.value)
     
     def get_achievements(self, category=None):
         """获取成就列表"""
@@ -320,7 +297,7 @@ class AchievementSystem:
     
     def get_unlocked_count(self):
         """获取已解锁成就数量"""
-        return sum(1 for a in self.achievements if a.is_unlocked())
+        return self._unlocked_count
     
     def get_total_count(self):
         """获取总成就数量"""
@@ -334,9 +311,29 @@ class AchievementSystem:
         }
     
     def from_dict(self, data):
-        """从字典加载"""
-        achievements_data = data.get("achievements", [])
-        self.achievements = [Achievement.from_dict(a) for a in achievements_data]
+        """从字典加载
+        
+        Notes:
+            - 名称、要求、奖励和事件等定义以成就定义文件为准（旧存档没有事件信息），
+              进度和状态从存档读取
+            - 成就定义中新增的成就以未解锁状态加入
+        """
+        definitions = {d["achievement_id"]: d for d in self.definitions}
+        saved = {}
+        for achievement_data in data.get("achievements", []):
+            definition = definitions.get(achievement_data["achievement_id"], {})
+            saved[achievement_data["achievement_id"]] = Achievement.from_dict({**achievement_data, **definition})
+        self.achievements = list(saved.values()) + [
+            Achievement.from_dict(d) for d in self.definitions if d["achievement_id"] not in saved
+        ]
+        self._build_index()
         
         recently_unlocked_data = data.get("recently_unlocked", [])
-        self.recently_unlocked = [Achievement.from_dict(a) for a in recently_unlocked_data]
+        self.recently_unlocked = [
+            self._by_id.get(a["achievement_id"]) or Achievement.from_dict(a) for a in recently_unlocked_data
+        ]
+        self.mark_dirty()
+    
+    def journal_section(self, section):
+        """增量存档的数据段"""
+        return self.to_dict()
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 import random
-import time
+from collections import namedtuple
 from enum import Enum
+from pet.clock import SYSTEM_CLOCK, get_clock
+from pet.enums import EmotionType
 
 class EnvironmentElementType(Enum):
     """环境元素类型枚举"""
@@ -16,9 +18,279 @@ class EnvironmentElementType(Enum):
     SOFA = "sofa"  # 沙发
     TABLE = "table"  # 桌子
 
+# 互动注册表：(环境元素类型, 互动类型) -> 处理函数 handler(element, pet) -> 结果字典
+INTERACTION_HANDLERS = {}
+# 环境元素类型 -> [(互动类型, 显示名称)]，按注册顺序排列
+INTERACTION_LABELS = {}
+# 环境元素类型的值 -> 类型，from_dict 按值查找（包括第三方注册的类型）
+ELEMENT_TYPES = {element_type.value: element_type for element_type in EnvironmentElementType}
+
+def register_element_type(element_type):
+    """注册第三方环境元素类型（带有 value 属性的枚举成员），使其可以从存档中恢复"""
+    ELEMENT_TYPES[element_type.value] = element_type
+    return element_type
+
+def register_interaction(element_type, interaction_type, handler=None, label=None):
+    """注册环境元素的互动处理函数
+    
+    Args:
+        element_type: 环境元素类型（EnvironmentElementType 或已注册的第三方类型）
+        interaction_type (str): 互动类型
+        handler (callable, optional): 处理函数 handler(element, pet)，返回结果字典；
+            不指定时返回装饰器
+        label (str, optional): 菜单中显示的互动名称
+    
+    Returns:
+        handler，或不指定 handler 时返回装饰器
+    """
+    def decorator(func):
+        key = (element_type, interaction_type)
+        labels = INTERACTION_LABELS.setdefault(element_type, [])
+        if key in INTERACTION_HANDLERS:
+            labels[:] = [entry for entry in labels if entry[0] != interaction_type]
+        labels.append((interaction_type, label or interaction_type))
+        INTERACTION_HANDLERS[key] = func
+        return func
+    
+    if handler is None:
+        return decorator
+    return decorator(handler)
+
+def available_interactions(element_type):
+    """环境元素类型可用的互动：[(互动类型, 显示名称)]"""
+    return list(INTERACTION_LABELS.get(element_type, ()))
+
+class ResourceModel(namedtuple("ResourceModel", ["key", "initial", "rate", "lower", "upper", "usage"])):
+    """随时间变化的资源
+    
+    key 为 status 中的键，initial 为初始值，rate 为每小时的变化量，lower/upper 为取值范围，
+    usage 为互动类型 -> 成功互动后的变化量。
+    """
+    __slots__ = ()
+    
+    def advance(self, value, hours):
+        """经过 hours 小时后的值（线性变化，一次计算任意时长，与中间读取多少次无关）"""
+        return max(self.lower, min(self.upper, value + self.rate * hours))
+
+# 环境元素类型 -> 资源模型元组；资源只在查询或互动时按经过的时间计算
+RESOURCE_MODELS = {}
+
+def register_resource(element_type, model):
+    """注册环境元素类型的资源模型"""
+    models = RESOURCE_MODELS.get(element_type, ())
+    RESOURCE_MODELS[element_type] = tuple(m for m in models if m.key != model.key) + (model,)
+    return model
+
+register_resource(EnvironmentElementType.FOOD_BOWL, ResourceModel("food_level", 100.0, -1.0, 0.0, 100.0, {}))  # 食物慢慢变质
+register_resource(EnvironmentElementType.WATER_BOWL, ResourceModel("water_level", 100.0, -2.0, 0.0, 100.0, {}))  # 水慢慢蒸发
+register_resource(EnvironmentElementType.PLANT, ResourceModel("growth", 10.0, 0.5, 0.0, 100.0, {}))
+register_resource(EnvironmentElementType.TOY, ResourceModel("wear", 0.0, 0.1, 0.0, 100.0, {"play": 5.0}))
+
+class InteractionEffect(namedtuple("InteractionEffect", ["changes", "emotion", "message", "effects"])):
+    """固定效果的互动
+    
+    changes 为 (属性, 变化量, 下限, 上限) 的元组，下限或上限为 None 时不限制，宠物没有的属性
+    （例如 curiosity）跳过；emotion 为 (EmotionType, 强度, 触发原因) 或 None；effects 为结果中的
+    效果字典或 None。
+    """
+    __slots__ = ()
+    
+    def compile(self):
+        """生成处理函数"""
+        changes = self.changes
+        emotion = self.emotion
+        message = self.message
+        effects = self.effects
+        
+        def handler(element, pet):
+            for attribute, delta, lower, upper in changes:
+                if not hasattr(pet, attribute):
+                    continue
+                value = getattr(pet, attribute) + delta
+                if upper is not None:
+                    value = min(upper, value)
+                if lower is not None:
+                    value = max(lower, value)
+                setattr(pet, attribute, value)
+            if emotion is not None and hasattr(pet, 'emotional_system'):
+                pet.emotional_system.trigger_emotion(*emotion)
+            result = {"success": True, "message": message}
+            if effects is not None:
+                result["effects"] = dict(effects)
+            return result
+        
+        return handler
+
+# 固定效果的互动表，导入时编译为处理函数
+EFFECT_TABLE = [
+    (EnvironmentElementType.BED, "rest", "休息", InteractionEffect(
+        (("energy", 10, None, 100), ("happiness", 2, None, None)),
+        (EmotionType.CALM, 0.3, "在床上休息"),
+        "宠物在床上休息了一会儿，精力恢复了一些。", {"energy": 10, "happiness": 2})),
+    (EnvironmentElementType.TOY, "play", "玩耍", InteractionEffect(
+        (("happiness", 15, None, 100), ("energy", -10, 0, None)),
+        (EmotionType.EXCITEMENT, 0.4, "玩玩具"),
+        "宠物玩得很开心，快乐度增加了！", {"happiness": 15, "energy": -10})),
+    (EnvironmentElementType.TOY, "explore", "探索", InteractionEffect(
+        (("curiosity", 5, None, 100),),
+        (EmotionType.CURIOSITY, 0.3, "探索玩具"),
+        "宠物对玩具产生了好奇心。", {"curiosity": 5})),
+    (EnvironmentElementType.SCRATCH_POST, "scratch", "抓挠", InteractionEffect(
+        (("happiness", 8, None, None), ("energy", -5, 0, None)),
+        (EmotionType.CALM, 0.2, "使用猫抓板"),
+        "宠物使用了猫抓板，感到很满足。", {"happiness": 8, "energy": -5})),
+    (EnvironmentElementType.PLANT, "explore", "探索", InteractionEffect(
+        (("curiosity", 8, None, 100),),
+        (EmotionType.CURIOSITY, 0.4, "探索植物"),
+        "宠物对植物产生了浓厚的兴趣，正在仔细观察。", {"curiosity": 8})),
+    (EnvironmentElementType.PLANT, "touch", "触摸", InteractionEffect(
+        (("happiness", 3, None, None),),
+        (EmotionType.CALM, 0.2, "触摸植物"),
+        "宠物轻轻触摸了植物，感到很有趣。", {"happiness": 3})),
+    (EnvironmentElementType.WINDOW, "look_out", "看窗外", InteractionEffect(
+        (("curiosity", 10, None, 100), ("happiness", 5, None, None)),
+        (EmotionType.CURIOSITY, 0.5, "看窗外"),
+        "宠物看着窗外的景色，感到很好奇。", {"curiosity": 10, "happiness": 5})),
+    (EnvironmentElementType.WINDOW, "sunbathe", "晒太阳", InteractionEffect(
+        (("energy", 15, None, 100), ("happiness", 8, None, None)),
+        (EmotionType.CALM, 0.4, "晒太阳"),
+        "宠物在窗户边晒太阳，感到很舒适，精力恢复了。", {"energy": 15, "happiness": 8})),
+    (EnvironmentElementType.DOOR, "check", "检查", InteractionEffect(
+        (("curiosity", 5, None, 100),),
+        (EmotionType.CURIOSITY, 0.3, "检查门"),
+        "宠物检查了门，想知道门后面有什么。", {"curiosity": 5})),
+    (EnvironmentElementType.DOOR, "scratch", "抓挠", InteractionEffect(
+        (("happiness", 3, None, None), ("energy", -3, 0, None)),
+        (EmotionType.EXCITEMENT, 0.2, "抓门"),
+        "宠物抓了抓门，似乎想出去。", {"happiness": 3, "energy": -3})),
+    (EnvironmentElementType.SOFA, "rest", "休息", InteractionEffect(
+        (("energy", 8, None, 100), ("happiness", 5, None, None)),
+        (EmotionType.CALM, 0.3, "在沙发上休息"),
+        "宠物在沙发上休息，感到很舒适。", {"energy": 8, "happiness": 5})),
+    (EnvironmentElementType.SOFA, "play", "玩耍", InteractionEffect(
+        (("happiness", 10, None, None), ("energy", -8, 0, None)),
+        (EmotionType.JOY, 0.3, "在沙发上玩耍"),
+        "宠物在沙发上玩耍，玩得很开心。", {"happiness": 10, "energy": -8})),
+    (EnvironmentElementType.TABLE, "explore", "探索", InteractionEffect(
+        (("curiosity", 7, None, 100),),
+        (EmotionType.CURIOSITY, 0.4, "探索桌子"),
+        "宠物在桌子上探索，发现了一些有趣的东西。", {"curiosity": 7})),
+    (EnvironmentElementType.TABLE, "jump", "跳上", InteractionEffect(
+        (("happiness", 5, None, None), ("energy", -5, 0, None)),
+        (EmotionType.EXCITEMENT, 0.3, "跳上桌子"),
+        "宠物跳上了桌子，感到很兴奋。", {"happiness": 5, "energy": -5})),
+]
+
+@register_interaction(EnvironmentElementType.FOOD_BOWL, "eat", label="进食")
+def _eat_from_food_bowl(element, pet):
+    """从食物碗进食（消耗碗里的食物）"""
+    food_level = element.status["food_level"]
+    if food_level <= 0:
+        return {
+            "success": False,
+            "message": "食物碗空了，需要加满食物。"
+        }
+    if pet.hunger > 0:
+        food_amount = min(pet.hunger, 30, food_level)
+        pet.hunger -= food_amount
+        pet.happiness += 5
+        element.status["food_level"] = food_level - food_amount
+        # 触发情感
+        if hasattr(pet, 'emotional_system'):
+            pet.emotional_system.trigger_emotion(EmotionType.JOY, 0.3, "从食物碗进食")
+        return {
+            "success": True,
+            "message": f"宠物从食物碗中进食，饥饿度减少了{food_amount}，变得更开心了！",
+            "effects": {"hunger": -food_amount, "happiness": 5}
+        }
+    return {
+        "success": False,
+        "message": "宠物不饿，不需要进食。"
+    }
+
+@register_interaction(EnvironmentElementType.FOOD_BOWL, "check", label="检查")
+def _check_food_bowl(element, pet):
+    """检查食物碗"""
+    food_level = element.status["food_level"]
+    if food_level <= 0:
+        return {"success": True, "message": "食物碗空了。"}
+    return {"success": True, "message": f"食物碗里有食物（{food_level:.0f}%）。"}
+
+@register_interaction(EnvironmentElementType.FOOD_BOWL, "refill", label="加满")
+def _refill_food_bowl(element, pet):
+    """加满食物碗"""
+    element.status["food_level"] = 100.0
+    return {"success": True, "message": "食物碗加满了。"}
+
+@register_interaction(EnvironmentElementType.WATER_BOWL, "drink", label="喝水")
+def _drink_from_water_bowl(element, pet):
+    """从水碗喝水（消耗碗里的水）"""
+    water_level = element.status["water_level"]
+    if water_level <= 0:
+        return {
+            "success": False,
+            "message": "水碗空了，需要加满水。"
+        }
+    # 检查宠物是否需要喝水，如果没有thirst属性，根据hunger判断
+    has_thirst = hasattr(pet, 'thirst')
+    needs_water = pet.thirst > 0 if has_thirst else pet.hunger > 30
+    if needs_water:
+        thirst_amount = min(pet.thirst, 25) if has_thirst else 25
+        if has_thirst:
+            pet.thirst -= thirst_amount
+        pet.happiness += 3
+        element.status["water_level"] = max(0.0, water_level - thirst_amount)
+        # 触发情感
+        if hasattr(pet, 'emotional_system'):
+            pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.2, "从水碗喝水")
+        return {
+            "success": True,
+            "message": "宠物从水碗中喝水，变得更舒适了！",
+            "effects": {"thirst": -thirst_amount, "happiness": 3}
+        }
+    return {
+        "success": False,
+        "message": "宠物不渴，不需要喝水。"
+    }
+
+@register_interaction(EnvironmentElementType.WATER_BOWL, "check", label="检查")
+def _check_water_bowl(element, pet):
+    """检查水碗"""
+    water_level = element.status["water_level"]
+    if water_level <= 0:
+        return {"success": True, "message": "水碗空了。"}
+    return {"success": True, "message": f"水碗里有水（{water_level:.0f}%）。"}
+
+@register_interaction(EnvironmentElementType.WATER_BOWL, "refill", label="加满")
+def _refill_water_bowl(element, pet):
+    """加满水碗"""
+    element.status["water_level"] = 100.0
+    return {"success": True, "message": "水碗加满了。"}
+
+@register_interaction(EnvironmentElementType.BED, "sleep", label="睡觉")
+def _sleep_in_bed(element, pet):
+    """在床上睡觉"""
+    if pet.energy < 70:
+        pet.sleep()
+        # 触发情感
+        if hasattr(pet, 'emotional_system'):
+            pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.4, "在床上睡觉")
+        return {
+            "success": True,
+            "message": "宠物在床上睡着了，会恢复能量。",
+            "effects": {"energy": "恢复中"}
+        }
+    return {
+        "success": False,
+        "message": "宠物精力充沛，不需要睡觉。"
+    }
+
+for _element_type, _interaction_type, _label, _effect in EFFECT_TABLE:
+    register_interaction(_element_type, _interaction_type, _effect.compile(), label=_label)
+
 class EnvironmentElement:
     """环境元素类"""
-    def __init__(self, element_id, element_type, name, description, status=None):
+    def __init__(self, element_id, element_type, name, description, status=None, clock=None):
         self.element_id = element_id
         self.element_type = element_type
         self.name = name
@@ -26,326 +298,57 @@ class EnvironmentElement:
         self.status = status or {}
         self.last_interaction = None
         self.interaction_count = 0
+        self.clock = clock or SYSTEM_CLOCK
+        self.last_update = self.clock.time()  # 资源计算到的时间
+        self._init_resources()
+    
+    def _init_resources(self):
+        """补齐缺少的资源（新元素或旧存档）"""
+        for model in RESOURCE_MODELS.get(self.element_type, ()):
+            self.status.setdefault(model.key, model.initial)
+    
+    def update_resources(self, now=None):
+        """把资源计算到当前时间
+        
+        Args:
+            now (float, optional): 当前时间戳，默认为元素时钟的当前时间
+        """
+        if now is None:
+            now = self.clock.time()
+        elapsed = now - self.last_update
+        if elapsed <= 0:
+            return
+        hours = elapsed / 3600
+        for model in RESOURCE_MODELS.get(self.element_type, ()):
+            self.status[model.key] = model.advance(self.status.get(model.key, model.initial), hours)
+        self.last_update = now
     
     def interact(self, pet, interaction_type):
-        """与环境元素互动"""
+        """与环境元素互动（按 (元素类型, 互动类型) 查找注册的处理函数）"""
         # 记录互动
-        self.last_interaction = time.time()
+        now = get_clock(pet).time()
+        self.last_interaction = now
         self.interaction_count += 1
         
-        # 根据环境元素类型和互动类型执行不同的互动
-        if self.element_type == EnvironmentElementType.FOOD_BOWL:
-            return self._interact_with_food_bowl(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.WATER_BOWL:
-            return self._interact_with_water_bowl(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.BED:
-            return self._interact_with_bed(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.TOY:
-            return self._interact_with_toy(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.SCRATCH_POST:
-            return self._interact_with_scratch_post(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.PLANT:
-            return self._interact_with_plant(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.WINDOW:
-            return self._interact_with_window(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.DOOR:
-            return self._interact_with_door(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.SOFA:
-            return self._interact_with_sofa(pet, interaction_type)
-        elif self.element_type == EnvironmentElementType.TABLE:
-            return self._interact_with_table(pet, interaction_type)
+        handler = INTERACTION_HANDLERS.get((self.element_type, interaction_type))
+        if handler is None:
+            if self.element_type not in INTERACTION_LABELS:
+                return {"success": False, "message": "未知的环境元素类型"}
+            return {"success": False, "message": "无效的互动类型"}
         
-        return {"success": False, "message": "未知的环境元素类型"}
-    
-    def _interact_with_food_bowl(self, pet, interaction_type):
-        """与食物碗互动"""
-        if interaction_type == "eat":
-            if pet.hunger > 0:
-                food_amount = min(pet.hunger, 30)
-                pet.hunger -= food_amount
-                pet.happiness += 5
-                # 触发情感
-                if hasattr(pet, 'emotional_system'):
-                    from pet.enums import EmotionType
-                    pet.emotional_system.trigger_emotion(EmotionType.JOY, 0.3, "从食物碗进食")
-                return {
-                    "success": True,
-                    "message": f"宠物从食物碗中进食，饥饿度减少了{food_amount}，变得更开心了！",
-                    "effects": {"hunger": -food_amount, "happiness": 5}
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": "宠物不饿，不需要进食。"
-                }
-        elif interaction_type == "check":
-            return {
-                "success": True,
-                "message": "食物碗里有食物。"
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_water_bowl(self, pet, interaction_type):
-        """与水碗互动"""
-        if interaction_type == "drink":
-            # 检查宠物是否需要喝水
-            needs_water = False
-            if hasattr(pet, 'thirst'):
-                needs_water = pet.thirst > 0
-            else:
-                # 如果没有thirst属性，根据hunger判断
-                needs_water = pet.hunger > 30
-            
-            if needs_water:
-                thirst_amount = min(pet.thirst, 25) if hasattr(pet, 'thirst') else 25
-                if hasattr(pet, 'thirst'):
-                    pet.thirst -= thirst_amount
-                pet.happiness += 3
-                # 触发情感
-                if hasattr(pet, 'emotional_system'):
-                    from pet.enums import EmotionType
-                    pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.2, "从水碗喝水")
-                return {
-                    "success": True,
-                    "message": f"宠物从水碗中喝水，变得更舒适了！",
-                    "effects": {"thirst": -thirst_amount, "happiness": 3}
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": "宠物不渴，不需要喝水。"
-                }
-        elif interaction_type == "check":
-            return {
-                "success": True,
-                "message": "水碗里有水。"
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_bed(self, pet, interaction_type):
-        """与床互动"""
-        if interaction_type == "sleep":
-            if pet.energy < 70:
-                pet.sleep()
-                # 触发情感
-                if hasattr(pet, 'emotional_system'):
-                    from pet.enums import EmotionType
-                    pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.4, "在床上睡觉")
-                return {
-                    "success": True,
-                    "message": "宠物在床上睡着了，会恢复能量。",
-                    "effects": {"energy": "恢复中"}
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": "宠物精力充沛，不需要睡觉。"
-                }
-        elif interaction_type == "rest":
-            pet.energy = min(100, pet.energy + 10)
-            pet.happiness += 2
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.3, "在床上休息")
-            return {
-                "success": True,
-                "message": "宠物在床上休息了一会儿，精力恢复了一些。",
-                "effects": {"energy": 10, "happiness": 2}
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_toy(self, pet, interaction_type):
-        """与玩具互动"""
-        if interaction_type == "play":
-            pet.happiness = min(100, pet.happiness + 15)
-            pet.energy = max(0, pet.energy - 10)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.EXCITEMENT, 0.4, "玩玩具")
-            return {
-                "success": True,
-                "message": "宠物玩得很开心，快乐度增加了！",
-                "effects": {"happiness": 15, "energy": -10}
-            }
-        elif interaction_type == "explore":
-            # 检查宠物是否有curiosity属性
-            if hasattr(pet, 'curiosity'):
-                pet.curiosity = min(100, pet.curiosity + 5)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CURIOSITY, 0.3, "探索玩具")
-            return {
-                "success": True,
-                "message": "宠物对玩具产生了好奇心。",
-                "effects": {"curiosity": 5}
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_scratch_post(self, pet, interaction_type):
-        """与猫抓板互动"""
-        if interaction_type == "scratch":
-            pet.happiness += 8
-            pet.energy = max(0, pet.energy - 5)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.2, "使用猫抓板")
-            return {
-                "success": True,
-                "message": "宠物使用了猫抓板，感到很满足。",
-                "effects": {"happiness": 8, "energy": -5}
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_plant(self, pet, interaction_type):
-        """与植物互动"""
-        if interaction_type == "explore":
-            # 检查宠物是否有curiosity属性
-            if hasattr(pet, 'curiosity'):
-                pet.curiosity = min(100, pet.curiosity + 8)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CURIOSITY, 0.4, "探索植物")
-            return {
-                "success": True,
-                "message": "宠物对植物产生了浓厚的兴趣，正在仔细观察。",
-                "effects": {"curiosity": 8}
-            }
-        elif interaction_type == "touch":
-            pet.happiness += 3
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.2, "触摸植物")
-            return {
-                "success": True,
-                "message": "宠物轻轻触摸了植物，感到很有趣。",
-                "effects": {"happiness": 3}
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_window(self, pet, interaction_type):
-        """与窗户互动"""
-        if interaction_type == "look_out":
-            # 检查宠物是否有curiosity属性
-            if hasattr(pet, 'curiosity'):
-                pet.curiosity = min(100, pet.curiosity + 10)
-            pet.happiness += 5
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CURIOSITY, 0.5, "看窗外")
-            return {
-                "success": True,
-                "message": "宠物看着窗外的景色，感到很好奇。",
-                "effects": {"curiosity": 10, "happiness": 5}
-            }
-        elif interaction_type == "sunbathe":
-            pet.energy = min(100, pet.energy + 15)
-            pet.happiness += 8
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.4, "晒太阳")
-            return {
-                "success": True,
-                "message": "宠物在窗户边晒太阳，感到很舒适，精力恢复了。",
-                "effects": {"energy": 15, "happiness": 8}
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_door(self, pet, interaction_type):
-        """与门互动"""
-        if interaction_type == "check":
-            # 检查宠物是否有curiosity属性
-            if hasattr(pet, 'curiosity'):
-                pet.curiosity = min(100, pet.curiosity + 5)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CURIOSITY, 0.3, "检查门")
-            return {
-                "success": True,
-                "message": "宠物检查了门，想知道门后面有什么。",
-                "effects": {"curiosity": 5}
-            }
-        elif interaction_type == "scratch":
-            pet.happiness += 3
-            pet.energy = max(0, pet.energy - 3)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.EXCITEMENT, 0.2, "抓门")
-            return {
-                "success": True,
-                "message": "宠物抓了抓门，似乎想出去。",
-                "effects": {"happiness": 3, "energy": -3}
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_sofa(self, pet, interaction_type):
-        """与沙发互动"""
-        if interaction_type == "rest":
-            pet.energy = min(100, pet.energy + 8)
-            pet.happiness += 5
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CALM, 0.3, "在沙发上休息")
-            return {
-                "success": True,
-                "message": "宠物在沙发上休息，感到很舒适。",
-                "effects": {"energy": 8, "happiness": 5}
-            }
-        elif interaction_type == "play":
-            pet.happiness += 10
-            pet.energy = max(0, pet.energy - 8)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.JOY, 0.3, "在沙发上玩耍")
-            return {
-                "success": True,
-                "message": "宠物在沙发上玩耍，玩得很开心。",
-                "effects": {"happiness": 10, "energy": -8}
-            }
-        return {"success": False, "message": "无效的互动类型"}
-    
-    def _interact_with_table(self, pet, interaction_type):
-        """与桌子互动"""
-        if interaction_type == "explore":
-            # 检查宠物是否有curiosity属性
-            if hasattr(pet, 'curiosity'):
-                pet.curiosity = min(100, pet.curiosity + 7)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.CURIOSITY, 0.4, "探索桌子")
-            return {
-                "success": True,
-                "message": "宠物在桌子上探索，发现了一些有趣的东西。",
-                "effects": {"curiosity": 7}
-            }
-        elif interaction_type == "jump":
-            pet.happiness += 5
-            pet.energy = max(0, pet.energy - 5)
-            # 触发情感
-            if hasattr(pet, 'emotional_system'):
-                from pet.enums import EmotionType
-                pet.emotional_system.trigger_emotion(EmotionType.EXCITEMENT, 0.3, "跳上桌子")
-            return {
-                "success": True,
-                "message": "宠物跳上了桌子，感到很兴奋。",
-                "effects": {"happiness": 5, "energy": -5}
-            }
-        return {"success": False, "message": "无效的互动类型"}
+        self._init_resources()
+        self.update_resources(now)
+        result = handler(self, pet)
+        if result.get("success"):
+            for model in RESOURCE_MODELS.get(self.element_type, ()):
+                usage = model.usage.get(interaction_type)
+                if usage:
+                    self.status[model.key] = max(model.lower, min(model.upper, self.status[model.key] + usage))
+        return result
     
     def get_status(self):
-        """获取环境元素状态"""
+        """获取环境元素状态（资源计算到当前时间）"""
+        self.update_resources()
         return {
             "element_id": self.element_id,
             "element_type": self.element_type.value,
@@ -365,25 +368,36 @@ class EnvironmentElement:
             "description": self.description,
             "status": self.status,
             "last_interaction": self.last_interaction,
-            "interaction_count": self.interaction_count
+            "interaction_count": self.interaction_count,
+            "last_update": self.last_update
         }
     
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, clock=None):
         """从字典创建环境元素"""
-        element_type = EnvironmentElementType(data["element_type"])
-        return cls(
+        element_type = ELEMENT_TYPES.get(data["element_type"])
+        if element_type is None:
+            element_type = EnvironmentElementType(data["element_type"])
+        element = cls(
             element_id=data["element_id"],
             element_type=element_type,
             name=data["name"],
             description=data["description"],
-            status=data.get("status", {})
+            status=data.get("status", {}),
+            clock=clock
         )
+        element.last_interaction = data.get("last_interaction")
+        element.interaction_count = data.get("interaction_count", 0)
+        # 旧存档没有 last_update，从加载时开始计算资源
+        if data.get("last_update") is not None:
+            element.last_update = data["last_update"]
+        return element
 
 class EnvironmentSystem:
     """环境系统"""
     def __init__(self, pet):
         self.pet = pet
+        self.clock = get_clock(pet)
         self.elements = {}  # 环境元素字典，键为元素ID，值为环境元素对象
         self._initialize_default_elements()
     
@@ -429,10 +443,13 @@ class EnvironmentSystem:
         ]
         
         for element in default_elements:
-            self.elements[element.element_id] = element
+            self.add_element(element)
     
     def add_element(self, element):
-        """添加环境元素"""
+        """添加环境元素（元素改用宠物的时钟计算资源）"""
+        if element.clock is not self.clock:
+            element.clock = self.clock
+            element.last_update = self.clock.time()
         self.elements[element.element_id] = element
     
     def remove_element(self, element_id):
@@ -468,17 +485,19 @@ class EnvironmentSystem:
                     "element_name": element.name,
                     "interaction_type": interaction_type,
                     "result": result,
-                    "timestamp": time.time()
+                    "timestamp": get_clock(self.pet).time()
                 })
             
             return result
         return {"success": False, "message": "环境元素不存在"}
     
     def update_environment(self, time_passed):
-        """更新环境状态"""
-        # 这里可以添加环境随时间变化的逻辑
-        # 例如，食物碗中的食物会减少，水碗中的水会蒸发等
-        pass
+        """更新环境状态
+        
+        Notes:
+            - 食物、水、植物生长和玩具磨损等资源在查询或互动时按经过的时间计算，
+              这里不需要逐个更新元素，空闲的环境没有开销
+        """
     
     def get_environment_summary(self):
         """获取环境摘要"""
@@ -499,5 +518,5 @@ class EnvironmentSystem:
         elements_data = data.get("elements", [])
         self.elements = {}
         for element_data in elements_data:
-            element = EnvironmentElement.from_dict(element_data)
+            element = EnvironmentElement.from_dict(element_data, clock=self.clock)
             self.elements[element.element_id] = element
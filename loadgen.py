@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""宠物服务器压测工具
+
+在本机启动（或连接已有的）server.py，创建一批宠物，然后用多个 HTTP/1.1 长连接
+并发发送动作和状态请求，统计吞吐量和延迟。
+
+用法：
+    python loadgen.py --spawn                       # 启动临时服务器并压测
+    python loadgen.py --port 8765 --pets 5000 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+# 请求组合：(权重, 方法, 动作, 参数)
+REQUEST_MIX = (
+    (30, "GET", None, None),
+    (20, "POST", "feed", {"food_type": "零食"}),
+    (15, "POST", "play", {"game_type": "智力游戏"}),
+    (15, "POST", "clean", {"clean_type": "刷牙"}),
+    (10, "POST", "pet", {"duration": 1}),
+    (5, "POST", "train", {"skill_type": "intelligence"}),
+    (5, "POST", "wake_up", {}),
+)
+
+
+class HttpConnection:
+    """最小的 HTTP/1.1 长连接客户端"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host, port, unix_path=None):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, method, path, payload=None):
+        """发送请求并读取响应
+
+        Returns:
+            tuple: (状态码, 响应体字节)
+        """
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        length = 0
+        for line in lines[1:]:
+            key, _, value = line.partition(":")
+            if key.lower() == "content-length":
+                length = int(value)
+        return status, await self.reader.readexactly(length)
+
+    def close(self):
+        self.writer.close()
+
+
+def percentile(sorted_values, fraction):
+    """已排序数值的分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def create_pets(connection, names, kind):
+    """创建宠物（已存在的宠物跳过）"""
+    for name in names:
+        status, body = await connection.request("POST", "/pets", {"name": name, "species": "压测", "kind": kind})
+        if status not in (201, 409):
+            raise RuntimeError(f"创建宠物失败：{status} {body.decode('utf-8')}")
+
+
+async def worker(connection, paths, deadline, latencies, counters, rng):
+    """在截止时间前不断发送请求"""
+    weights = [entry[0] for entry in REQUEST_MIX]
+    while time.perf_counter() < deadline:
+        _, method, action, params = rng.choices(REQUEST_MIX, weights)[0]
+        path = rng.choice(paths)
+        if action is not None:
+            path = f"{path}/{action}"
+        start = time.perf_counter()
+        status, _ = await connection.request(method, path, params)
+        latencies.append(time.perf_counter() - start)
+        counters["requests"] += 1
+        if status >= 400:
+            counters["errors"] += 1
+
+
+async def run_load(host, port, unix_path=None, pets=1000, connections=32, duration=10.0,
+                   kind="pet", seed=0):
+    """运行压测
+
+    Returns:
+        dict: 请求数、错误数、吞吐量和延迟分位数（毫秒）
+    """
+    rng = random.Random(seed)
+    names = [f"loadpet-{i}" for i in range(pets)]
+    paths = [f"/pets/{quote(name)}" for name in names]
+
+    setup = await HttpConnection.open(host, port, unix_path)
+    await create_pets(setup, names, kind)
+
+    pool = [await HttpConnection.open(host, port, unix_path) for _ in range(connections)]
+    latencies = []
+    counters = {"requests": 0, "errors": 0}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        worker(connection, paths, deadline, latencies, counters, random.Random(rng.random()))
+        for connection in pool
+    ))
+    elapsed = time.perf_counter() - started
+
+    _, body = await setup.request("GET", "/stats")
+    for connection in pool + [setup]:
+        connection.close()
+
+    latencies.sort()
+    return {
+        "requests": counters["requests"],
+        "errors": counters["errors"],
+        "seconds": elapsed,
+        "requests_per_second": counters["requests"] / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "server": json.loads(body),
+    }
+
+
+async def wait_for_server(host, port, unix_path=None, timeout=15.0):
+    """等待服务器开始监听"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = await HttpConnection.open(host, port, unix_path)
+            connection.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="宠物服务器压测工具")
+    parser.add_argument("--host", default="127.0.0.1", help="服务器地址")
+    parser.add_argument("--port", type=int, default=8765, help="服务器端口")
+    parser.add_argument("--unix", help="Unix 套接字路径")
+    parser.add_argument("--spawn", action="store_true", help="启动使用临时存储的服务器")
+    parser.add_argument("--hot", type=int, help="启动的服务器在内存中保留的宠物数量")
+    parser.add_argument("--pets", type=int, default=1000, help="宠物数量")
+    parser.add_argument("--connections", type=int, default=32, help="并发连接数")
+    parser.add_argument("--duration", type=float, default=10.0, help="压测时长（秒）")
+    parser.add_argument("--kind", choices=("pet", "intelligent"), default="pet", help="宠物类型")
+    args = parser.parse_args()
+
+    server = None
+    temp_dir = None
+    if args.spawn:
+        temp_dir = tempfile.TemporaryDirectory()
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"),
+                   "--db", os.path.join(temp_dir.name, "server.db")]
+        if args.unix:
+            command += ["--unix", args.unix]
+        else:
+            command += ["--host", args.host, "--port", str(args.port)]
+        if args.hot is not None:
+            command += ["--hot", str(args.hot)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+
+    try:
+        asyncio.run(wait_for_server(args.host, args.port, args.unix))
+        result = asyncio.run(run_load(args.host, args.port, args.unix, args.pets, args.connections,
+                                      args.duration, args.kind))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            temp_dir.cleanup()
+
+    print(f"请求数：{result['requests']}（错误 {result['errors']}），用时 {result['seconds']:.1f} 秒")
+    print(f"吞吐量：{result['requests_per_second']:.0f} 请求/秒")
+    print(f"延迟：p50 {result['p50_ms']:.2f} 毫秒，p99 {result['p99_ms']:.2f} 毫秒")
+    server_stats = result["server"]
+    print(f"服务器：内存中 {server_stats['hot']} 只宠物，加载 {server_stats['loads']} 次，"
+          f"换出 {server_stats['evictions']} 次，写入 {server_stats['writes']} 条记录")
+
+
+if __name__ == "__main__":
+    main()
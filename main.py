@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
-import time
+import asyncio
 import sys
 import os
 from pet import Pet as VirtualPet, IntelligentPet
+from pet.config import PetConfig
+from pet.scheduler import Scheduler
+from pet.runtime import GameRuntime, ainput
+from pet.store import SQLitePetStore
+from pet.autosave import AutosaveService
 from ui import UI
 from inventory import Inventory
 from minigames import MiniGames
-from environment import EnvironmentSystem, EnvironmentElementType
+from environment import EnvironmentSystem, available_interactions
 from social import SocialSystem, SocialInteractionType
 
 class VirtualPetSimulator:
@@ -19,63 +24,108 @@ class VirtualPetSimulator:
         self.environment_system = None
         self.social_system = None
         self.npc_manager = None
+        self.store = None
+        self.autosave = None
+        self.scheduler = Scheduler()
+        # 模拟、界面刷新和输入在同一个事件循环中并发运行
+        self.runtime = GameRuntime(self.scheduler)
+        self.menu_idle = False  # 是否正在等待主菜单输入（此时可以刷新界面）
     
     def start(self):
         """开始游戏"""
         self.ui.display_welcome() # 1. 显示欢迎界面
         self.initialize_pet()
+        # 自动保存写入 SQLite 宠物存储（PetConfig.PET_STORE_PATH），而不是 PetJournal：
+        # 修改在主线程收集（核心数值复制一份，记忆和情感历史只取新增的条目），
+        # 编码、与原有数据段合并和写入在后台线程完成，不阻塞输入
+        self.autosave = AutosaveService(self.store, self.pet, self.social_system)
+        self.autosave.start()
+        # 宠物动作发布的事件延迟到下一次 update 批量投递，一轮输入最多收集一次修改
+        self.autosave.attach(self.pet.event_bus)
+        self.schedule_jobs()
         
+        # 等待输入时模拟照常推进：需求、自发行为和情感由调度器按到期时间驱动
+        asyncio.run(self.runtime.run(self.input_loop(), render=self.refresh))
+    
+    async def input_loop(self):
+        """主菜单输入循环"""
         while self.running:
-            self.update()
             self.render()
-            self.handle_input()
-            time.sleep(0.1)
+            try:
+                self.menu_idle = True
+                choice = await self.prompt("请选择操作: ")
+                self.menu_idle = False
+                await self.handle_input(choice)
+            except EOFError:
+                # 输入结束时按退出处理
+                self.menu_idle = False
+                await self.handle_input("14")
+            # 立即投递本轮输入产生的事件
+            self.runtime.step()
+    
+    async def prompt(self, message):
+        """读取一行输入，等待期间事件循环继续运行"""
+        return await ainput(message)
+    
+    def schedule_jobs(self):
+        """注册宠物和世界的定时任务"""
+        if self.pet:
+            self.runtime.add_pet(self.pet)
+        
+        interval = PetConfig.WORLD_TICK_INTERVAL
+        
+        def world_tick(now):
+            # 更新环境系统和社交系统
+            if self.environment_system:
+                self.environment_system.update_environment(interval)
+            if self.social_system:
+                self.social_system.update_social_skills(interval)
+            return now + interval
+        
+        self.scheduler.schedule_after(interval, world_tick, key="world")
+        
+        if self.autosave:
+            def autosave_tick(now):
+                self.autosave.request_save()
+                return now + self.autosave.interval
+            
+            self.scheduler.schedule_after(self.autosave.interval, autosave_tick, key="autosave")
     
     def initialize_pet(self):
         """初始化宠物"""
+        # 打开宠物存储，并导入存档目录中尚未导入的 JSON/二进制存档
+        self.store = SQLitePetStore(PetConfig.PET_STORE_PATH)
+        imported = self.store.import_directory(PetConfig.SAVED_PETS_DIR)
+        if imported:
+            print(f"已导入 {len(imported)} 个旧存档")
+        
         while True:
-            # 检查是否有已保存的宠物
-            saved_pets_dir = "data/pets"
-            if not os.path.exists(saved_pets_dir):
-                os.makedirs(saved_pets_dir)
-            
-            saved_pets = [f for f in os.listdir(saved_pets_dir) if f.endswith('.json') and f != 'pets.json' and not f.endswith('_rl.json')]
+            # 检查是否有已保存的宠物（只查询索引列，不加载宠物）
+            saved_pets = [summary.name for summary in self.store.list_pets()]
             
             if saved_pets:
                 print("发现已保存的宠物：")
-                for i, pet_file in enumerate(saved_pets, 1):
-                    print(f"{i}. {pet_file[:-5]}")
+                for i, name in enumerate(saved_pets, 1):
+                    print(f"{i}. {name}")
                 print(f"{len(saved_pets) + 1}. 创建新宠物")
                 
                 choice = input("请选择： ")
                 try:
                     choice_idx = int(choice) - 1
                     if 0 <= choice_idx < len(saved_pets):
-                        # 加载已保存的宠物
-                        pet_file = os.path.join(saved_pets_dir, saved_pets[choice_idx])
+                        # 加载已保存的宠物（存储按保存时的类型创建普通宠物或智能宠物）
+                        loaded_pet = self.store.load(saved_pets[choice_idx])
+                        if loaded_pet is None:
+                            print("加载失败：宠物不存在")
+                            print("请重新选择或创建新宠物。")
+                            # 重新开始选择流程
+                            continue
                         
-                        # 检查是否存在强化学习数据文件，判断是否为智能宠物
-                        rl_file = pet_file.replace('.json', '_rl.json')
-                        is_intelligent = os.path.exists(rl_file)
-                        
-                        # 根据是否为智能宠物选择加载类
-                        if is_intelligent:
-                            loaded_pet = IntelligentPet.load_from_file(pet_file)
-                            if isinstance(loaded_pet, str):
-                                print(f"加载失败：{loaded_pet}")
-                                print("请重新选择或创建新宠物。")
-                                # 重新开始选择流程
-                                continue
+                        if isinstance(loaded_pet, IntelligentPet):
+                            # 强化学习数据（包括训练场生成的策略）已随宠物一起加载
                             self.pet = loaded_pet
                             print(f"✨ 智能宠物 {loaded_pet.name} 已加载！")
                         else:
-                            loaded_pet = VirtualPet.load_from_file(pet_file)
-                            if isinstance(loaded_pet, str):
-                                print(f"加载失败：{loaded_pet}")
-                                print("请重新选择或创建新宠物。")
-                                # 重新开始选择流程
-                                continue
-                            
                             # 询问是否升级为智能宠物
                             upgrade_choice = input("是否将此宠物升级为智能宠物？(y/n): ")
                             if upgrade_choice.lower() == 'y':
@@ -123,6 +173,9 @@ class VirtualPetSimulator:
                         self.environment_system = EnvironmentSystem(pet=self.pet)
                         # 初始化社交系统
                         self.social_system = SocialSystem(pet=self.pet)
+                        social_data = self.store.load_section(self.pet.name, "social")
+                        if social_data:
+                            self.social_system.from_dict(social_data)
                         # 初始化NPC管理器
                         from social import NPCManager
                         self.npc_manager = NPCManager()
@@ -158,48 +211,52 @@ class VirtualPetSimulator:
         from social import NPCManager
         self.npc_manager = NPCManager()
     
-    def update(self):
-        """更新游戏状态"""
-        if self.pet:
-            self.pet.update()
-            # 更新环境系统
-            if self.environment_system:
-                self.environment_system.update_environment(0.1)  # 假设每次更新间隔0.1秒
-            # 更新社交系统
-            if self.social_system:
-                self.social_system.update_social_skills(0.1)
-    
     def render(self):
         """渲染游戏界面"""
         self.ui.clear_screen()
         if self.pet:
             self.ui.display_pet_status(self.pet)
         self.ui.display_menu()
+        self.runtime.mark_rendered()
     
-    def handle_input(self):
-        """处理用户输入"""
-        choice = input("请选择操作: ")
+    def refresh(self):
+        """状态变化后刷新界面（只在等待主菜单输入时刷新，不打断子菜单）
         
+        Returns:
+            bool: 是否刷新了界面
+        """
+        if not self.menu_idle:
+            return False
+        self.render()
+        print("请选择操作: ", end="", flush=True)
+        return True
+    
+    async def handle_input(self, choice):
+        """处理用户输入
+        
+        Args:
+            choice (str): 主菜单选择
+        """
         if choice == "1":
             # 喂食
             if self.pet:
-                food_type = input("请选择食物类型（普通食物/美味大餐/健康食品/零食）: ")
+                food_type = await self.prompt("请选择食物类型（普通食物/美味大餐/健康食品/零食）: ")
                 if isinstance(self.pet, IntelligentPet):
                     result = self.pet.interact_with_user("feed", food_type=food_type)
                 else:
                     result = self.pet.feed(food_type)
                 print(result)
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "2":
             # 玩耍
             if self.pet:
-                game_type = input("请选择游戏类型（普通游戏/捡球游戏/智力游戏/社交游戏）: ")
+                game_type = await self.prompt("请选择游戏类型（普通游戏/捡球游戏/智力游戏/社交游戏）: ")
                 if isinstance(self.pet, IntelligentPet):
                     result = self.pet.interact_with_user("play", game_type=game_type)
                 else:
                     result = self.pet.play(game_type)
                 print(result)
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "3":
             # 睡觉
             if self.pet:
@@ -208,7 +265,7 @@ class VirtualPetSimulator:
                 else:
                     result = self.pet.sleep()
                 print(result)
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "4":
             # 叫醒宠物
             if self.pet:
@@ -217,27 +274,28 @@ class VirtualPetSimulator:
                 else:
                     result = self.pet.wake_up()
                 print(result)
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "5":
             # 查看物品栏
             self.inventory.view_inventory()
         elif choice == "6":
             # 玩小游戏
-            game_choice = input("请选择游戏（1. 猜数字 2. 石头剪刀布 3. 记忆力游戏）: ")
+            game_choice = await self.prompt("请选择游戏（1. 猜数字 2. 石头剪刀布 3. 记忆力游戏）: ")
+            # 小游戏在工作线程中读取输入
             if game_choice == "1":
-                self.minigames.play_guess_number()
+                await asyncio.to_thread(self.minigames.play_guess_number)
             elif game_choice == "2":
-                self.minigames.play_rock_paper_scissors()
+                await asyncio.to_thread(self.minigames.play_rock_paper_scissors)
             elif game_choice == "3":
-                self.minigames.play_memory_game()
-            input("按回车键继续...")
+                await asyncio.to_thread(self.minigames.play_memory_game)
+            await self.prompt("按回车键继续...")
         elif choice == "7":
             # 保存宠物
             if self.pet:
-                save_path = f"data/pets/{self.pet.name}.json"
-                self.pet.save_to_file(save_path)
-                print(f"宠物 {self.pet.name} 已保存！")
-                input("按回车键继续...")
+                # 保存到宠物存储，智能宠物的强化学习数据和社交系统一起保存；写入在后台完成
+                self.autosave.request_save(full=True)
+                print(f"宠物 {self.pet.name} 正在后台保存...")
+                await self.prompt("按回车键继续...")
         elif choice == "8":
             # 清洁宠物
             if self.pet:
@@ -247,7 +305,7 @@ class VirtualPetSimulator:
                 print("2. 刷牙")
                 print("3. 洗澡")
                 print("4. 修剪指甲")
-                clean_choice = input("请选择（1-4）: ")
+                clean_choice = await self.prompt("请选择（1-4）: ")
                 
                 # 映射选择到清洁类型
                 clean_types = {
@@ -264,21 +322,21 @@ class VirtualPetSimulator:
                 else:
                     result = self.pet.clean(clean_type)
                 print(result)
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "9":
             # 训练宠物
             if self.pet:
-                skill_type = input("请选择技能类型（intelligence/strength/speed/social）: ")
+                skill_type = await self.prompt("请选择技能类型（intelligence/strength/speed/social）: ")
                 if isinstance(self.pet, IntelligentPet):
                     result = self.pet.interact_with_user("train", skill_type=skill_type)
                 else:
                     result = self.pet.train(skill_type)
                 print(result)
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "10":
             # 抚摸宠物
             if self.pet:
-                duration = input("请选择抚摸时间（1-5秒）: ")
+                duration = await self.prompt("请选择抚摸时间（1-5秒）: ")
                 try:
                     duration = int(duration)
                     duration = max(1, min(5, duration))
@@ -289,19 +347,19 @@ class VirtualPetSimulator:
                     print(result)
                 except ValueError:
                     print("无效的输入！")
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "11":
             # 更改宠物颜色
             if self.pet:
                 available_colors = self.pet.get_available_colors()
                 print(f"可用颜色：{', '.join(available_colors)}")
-                new_color = input("请输入要更改的颜色： ")
+                new_color = await self.prompt("请输入要更改的颜色： ")
                 if isinstance(self.pet, IntelligentPet):
                     result = self.pet.interact_with_user("change_color", new_color=new_color)
                 else:
                     result = self.pet.change_color(new_color)
                 print(result)
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "12":
             # 环境互动
             if self.environment_system:
@@ -310,68 +368,22 @@ class VirtualPetSimulator:
                 for i, element in enumerate(elements, 1):
                     print(f"{i}. {element.name} ({element.description})")
                 
-                element_choice = input("请选择要互动的环境元素编号： ")
+                element_choice = await self.prompt("请选择要互动的环境元素编号： ")
                 try:
                     element_idx = int(element_choice) - 1
                     if 0 <= element_idx < len(elements):
                         selected_element = elements[element_idx]
                         print(f"\n可选互动：")
                         
-                        # 根据环境元素类型显示可用的互动类型
-                        if selected_element.element_type == EnvironmentElementType.FOOD_BOWL:
-                            print("1. 进食")
-                            print("2. 检查")
-                        elif selected_element.element_type == EnvironmentElementType.WATER_BOWL:
-                            print("1. 喝水")
-                            print("2. 检查")
-                        elif selected_element.element_type == EnvironmentElementType.BED:
-                            print("1. 睡觉")
-                            print("2. 休息")
-                        elif selected_element.element_type == EnvironmentElementType.TOY:
-                            print("1. 玩耍")
-                            print("2. 探索")
-                        elif selected_element.element_type == EnvironmentElementType.SCRATCH_POST:
-                            print("1. 抓挠")
-                        elif selected_element.element_type == EnvironmentElementType.PLANT:
-                            print("1. 探索")
-                            print("2. 触摸")
-                        elif selected_element.element_type == EnvironmentElementType.WINDOW:
-                            print("1. 看窗外")
-                            print("2. 晒太阳")
-                        elif selected_element.element_type == EnvironmentElementType.DOOR:
-                            print("1. 检查")
-                            print("2. 抓挠")
-                        elif selected_element.element_type == EnvironmentElementType.SOFA:
-                            print("1. 休息")
-                            print("2. 玩耍")
-                        elif selected_element.element_type == EnvironmentElementType.TABLE:
-                            print("1. 探索")
-                            print("2. 跳上")
-                        
-                        interaction_choice = input("请选择互动类型编号： ")
-                        interaction_map = {
-                            (EnvironmentElementType.FOOD_BOWL, "1"): "eat",
-                            (EnvironmentElementType.FOOD_BOWL, "2"): "check",
-                            (EnvironmentElementType.WATER_BOWL, "1"): "drink",
-                            (EnvironmentElementType.WATER_BOWL, "2"): "check",
-                            (EnvironmentElementType.BED, "1"): "sleep",
-                            (EnvironmentElementType.BED, "2"): "rest",
-                            (EnvironmentElementType.TOY, "1"): "play",
-                            (EnvironmentElementType.TOY, "2"): "explore",
-                            (EnvironmentElementType.SCRATCH_POST, "1"): "scratch",
-                            (EnvironmentElementType.PLANT, "1"): "explore",
-                            (EnvironmentElementType.PLANT, "2"): "touch",
-                            (EnvironmentElementType.WINDOW, "1"): "look_out",
-                            (EnvironmentElementType.WINDOW, "2"): "sunbathe",
-                            (EnvironmentElementType.DOOR, "1"): "check",
-                            (EnvironmentElementType.DOOR, "2"): "scratch",
-                            (EnvironmentElementType.SOFA, "1"): "rest",
-                            (EnvironmentElementType.SOFA, "2"): "play",
-                            (EnvironmentElementType.TABLE, "1"): "explore",
-                            (EnvironmentElementType.TABLE, "2"): "jump"
-                        }
+                        # 显示该类型环境元素注册的互动
+                        interactions = available_interactions(selected_element.element_type)
+                        for i, (_, label) in enumerate(interactions, 1):
+                            print(f"{i}. {label}")
                         
-                        interaction_type = interaction_map.get((selected_element.element_type, interaction_choice))
+                        interaction_choice = await self.prompt("请选择互动类型编号： ")
+                        interaction_type = None
+                        if interaction_choice.isdigit() and 1 <= int(interaction_choice) <= len(interactions):
+                            interaction_type = interactions[int(interaction_choice) - 1][0]
                         if interaction_type:
                             result = self.environment_system.interact_with_element(selected_element.element_id, interaction_type)
                             print(result["message"])
@@ -381,7 +393,7 @@ class VirtualPetSimulator:
                         print("无效的选择！")
                 except ValueError:
                     print("无效的输入！")
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "13":
             # 社交系统
             if self.social_system:
@@ -390,7 +402,7 @@ class VirtualPetSimulator:
                 print("2. 与NPC宠物互动")
                 print("3. 与已保存宠物互动")
                 print("4. 查看社交事件")
-                social_choice = input("请选择操作： ")
+                social_choice = await self.prompt("请选择操作： ")
                 
                 if social_choice == "1":
                     # 查看社交关系
@@ -410,7 +422,7 @@ class VirtualPetSimulator:
                             for i, npc in enumerate(npcs, 1):
                                 print(f"{i}. {npc.name} ({npc.species})")
                             
-                            npc_choice = input("请选择要互动的NPC编号： ")
+                            npc_choice = await self.prompt("请选择要互动的NPC编号： ")
                             try:
                                 npc_idx = int(npc_choice) - 1
                                 if 0 <= npc_idx < len(npcs):
@@ -425,7 +437,7 @@ class VirtualPetSimulator:
                                     print("6. 忽略")
                                     print("7. 冲突")
                                     
-                                    interaction_choice = input("请选择互动类型编号： ")
+                                    interaction_choice = await self.prompt("请选择互动类型编号： ")
                                     interaction_map = {
                                         "1": SocialInteractionType.GREET,
                                         "2": SocialInteractionType.PLAY,
@@ -452,104 +464,57 @@ class VirtualPetSimulator:
                         print("NPC管理器未初始化！")
                 elif social_choice == "3":
                     # 与已保存宠物互动
-                    # 检查是否有已保存的宠物
-                    saved_pets_dir = "data/pets"
-                    if os.path.exists(saved_pets_dir):
-                        saved_pets = [f for f in os.listdir(saved_pets_dir) if f.endswith('.json') and f != 'pets.json' and not f.endswith('_rl.json')]
-                        
-                        # 过滤掉当前宠物
-                        current_pet_name = self.pet.name if self.pet else ""
-                        other_pets = [pet_file for pet_file in saved_pets if pet_file[:-5] != current_pet_name]
+                    # 列出存储中的其他宠物（只查询索引列，不加载宠物）
+                    current_pet_name = self.pet.name if self.pet else ""
+                    other_pets = [summary.name for summary in self.store.list_pets() if summary.name != current_pet_name]
+                    
+                    if other_pets:
+                        print("\n可用的已保存宠物：")
+                        for i, name in enumerate(other_pets, 1):
+                            print(f"{i}. {name}")
                         
-                        if other_pets:
-                            print("\n可用的已保存宠物：")
-                            for i, pet_file in enumerate(other_pets, 1):
-                                print(f"{i}. {pet_file[:-5]}")
-                            
-                            pet_choice = input("请选择要互动的宠物编号： ")
-                            try:
-                                pet_idx = int(pet_choice) - 1
-                                if 0 <= pet_idx < len(other_pets):
-                                    # 加载已保存的宠物
-                                    pet_file = os.path.join(saved_pets_dir, other_pets[pet_idx])
+                        pet_choice = await self.prompt("请选择要互动的宠物编号： ")
+                        try:
+                            pet_idx = int(pet_choice) - 1
+                            if 0 <= pet_idx < len(other_pets):
+                                # 互动只需要核心数据和情感系统，不读取记忆和强化学习数据
+                                loaded_pet = self.store.load(other_pets[pet_idx], sections=("emotional_system",))
+                                if loaded_pet is not None:
+                                    # 与加载的宠物互动
+                                    print("\n可选互动：")
+                                    print("1. 问候")
+                                    print("2. 玩耍")
+                                    print("3. 分享")
+                                    print("4. 竞争")
+                                    print("5. 帮助")
+                                    print("6. 忽略")
+                                    print("7. 冲突")
                                     
-                                    # 检查是否存在强化学习数据文件，判断是否为智能宠物
-                                    rl_file = pet_file.replace('.json', '_rl.json')
-                                    is_intelligent = os.path.exists(rl_file)
+                                    interaction_choice = await self.prompt("请选择互动类型编号： ")
+                                    interaction_map = {
+                                        "1": SocialInteractionType.GREET,
+                                        "2": SocialInteractionType.PLAY,
+                                        "3": SocialInteractionType.SHARE,
+                                        "4": SocialInteractionType.COMPETE,
+                                        "5": SocialInteractionType.HELP,
+                                        "6": SocialInteractionType.IGNORE,
+                                        "7": SocialInteractionType.CONFLICT
+                                    }
                                     
-                                    # 根据是否为智能宠物选择加载类
-                                    if is_intelligent:
-                                        loaded_pet = IntelligentPet.load_from_file(pet_file)
-                                        if not isinstance(loaded_pet, str):
-                                            # 与加载的宠物互动
-                                            print("\n可选互动：")
-                                            print("1. 问候")
-                                            print("2. 玩耍")
-                                            print("3. 分享")
-                                            print("4. 竞争")
-                                            print("5. 帮助")
-                                            print("6. 忽略")
-                                            print("7. 冲突")
-                                            
-                                            interaction_choice = input("请选择互动类型编号： ")
-                                            interaction_map = {
-                                                "1": SocialInteractionType.GREET,
-                                                "2": SocialInteractionType.PLAY,
-                                                "3": SocialInteractionType.SHARE,
-                                                "4": SocialInteractionType.COMPETE,
-                                                "5": SocialInteractionType.HELP,
-                                                "6": SocialInteractionType.IGNORE,
-                                                "7": SocialInteractionType.CONFLICT
-                                            }
-                                            
-                                            interaction_type = interaction_map.get(interaction_choice)
-                                            if interaction_type:
-                                                result = self.social_system.interact_with_other(loaded_pet, interaction_type)
-                                                print(result["message"])
-                                            else:
-                                                print("无效的互动类型！")
-                                        else:
-                                            print(f"加载失败：{loaded_pet}")
+                                    interaction_type = interaction_map.get(interaction_choice)
+                                    if interaction_type:
+                                        result = self.social_system.interact_with_other(loaded_pet, interaction_type)
+                                        print(result["message"])
                                     else:
-                                        loaded_pet = VirtualPet.load_from_file(pet_file)
-                                        if not isinstance(loaded_pet, str):
-                                            # 与加载的宠物互动
-                                            print("\n可选互动：")
-                                            print("1. 问候")
-                                            print("2. 玩耍")
-                                            print("3. 分享")
-                                            print("4. 竞争")
-                                            print("5. 帮助")
-                                            print("6. 忽略")
-                                            print("7. 冲突")
-                                            
-                                            interaction_choice = input("请选择互动类型编号： ")
-                                            interaction_map = {
-                                                "1": SocialInteractionType.GREET,
-                                                "2": SocialInteractionType.PLAY,
-                                                "3": SocialInteractionType.SHARE,
-                                                "4": SocialInteractionType.COMPETE,
-                                                "5": SocialInteractionType.HELP,
-                                                "6": SocialInteractionType.IGNORE,
-                                                "7": SocialInteractionType.CONFLICT
-                                            }
-                                            
-                                            interaction_type = interaction_map.get(interaction_choice)
-                                            if interaction_type:
-                                                result = self.social_system.interact_with_other(loaded_pet, interaction_type)
-                                                print(result["message"])
-                                            else:
-                                                print("无效的互动类型！")
-                                        else:
-                                            print(f"加载失败：{loaded_pet}")
+                                        print("无效的互动类型！")
                                 else:
-                                    print("无效的选择！")
-                            except ValueError:
-                                print("无效的输入！")
-                        else:
-                            print("没有其他已保存的宠物！")
+                                    print("加载失败：宠物不存在")
+                            else:
+                                print("无效的选择！")
+                        except ValueError:
+                            print("无效的输入！")
                     else:
-                        print("没有已保存的宠物！")
+                        print("没有其他已保存的宠物！")
                 elif social_choice == "4":
                     # 查看社交事件
                     events = self.social_system.get_recent_events()
@@ -561,14 +526,16 @@ class VirtualPetSimulator:
                         print("还没有社交事件！")
                 else:
                     print("无效的选择！")
-                input("按回车键继续...")
+                await self.prompt("按回车键继续...")
         elif choice == "14":
             # 退出游戏
             self.running = False
+            if self.autosave and not self.autosave.stop():
+                print(f"警告：自动保存失败 - {self.autosave.last_error}")
             self.ui.display_goodbye()
         else:
             print("无效选择，请重新输入！")
-            input("按回车键继续...")
+            await self.prompt("按回车键继续...")
 
 if __name__ == "__main__":
     game = VirtualPetSimulator()
@@ -1,8 +1,12 @@
 # pet包初始化文件
 from .base import Pet
 from .intelligent import IntelligentPet
+from .vitals import PetVitals
 from .enums import PetState, PetMood, PetPersonality, EmotionType
 from .emotion import EmotionEvent, EmotionalSystem
+from .population import PetPopulation, PetView
+from .clock import SystemClock, SimulationClock
+from .simulation import fast_forward
 from .systems.decision import DecisionSystem
 from .systems.behavior import BehaviorSystem, BehaviorTree, BehaviorTreeBuilder
 from .systems.learning import LearningSystem
@@ -11,12 +15,18 @@ from .systems.reinforcement import ReinforcementLearningSystem
 __all__ = [
     "Pet",
     "IntelligentPet",
+    "PetVitals",
     "PetState",
     "PetMood",
     "PetPersonality",
     "EmotionType",
     "EmotionEvent",
     "EmotionalSystem",
+    "PetPopulation",
+    "PetView",
+    "SystemClock",
+    "SimulationClock",
+    "fast_forward",
     "DecisionSystem",
     "BehaviorSystem",
     "BehaviorTree",
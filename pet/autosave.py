@@ -0,0 +1,209 @@
+"""后台自动保存
+
+AutosaveService 在修改数据的线程上调用存储目标的 collect，只收集修改过的数据段
+（核心数值复制一份，记忆和情感历史只取新增的条目），再把记录交给后台写入线程；
+编码、写入和 fsync 都在写入线程完成，交互循环和无界面模拟不会等待磁盘。
+写入线程等待一小段时间再取出记录，期间以及写入进行中收到的新记录与尚未写入的记录合并，
+一连串修改只产生一次写入。
+
+存储目标需要实现（PetJournal 和 SQLitePetStore 均已实现）：
+    collect(pet, social_system, task_system, achievement_system, full=False) -> 记录或 None
+    merge(older, newer) -> 合并后的记录
+    commit(record)
+"""
+import threading
+import time
+from .config import PetConfig
+from .events import ACTION_EVENTS, DELIVERY_DEFERRED
+
+
+class AutosaveService:
+    """后台自动保存服务"""
+
+    def __init__(self, target, pet, social_system=None, task_system=None, achievement_system=None,
+                 interval=None, coalesce_delay=None):
+        """初始化自动保存
+
+        Args:
+            target: 存储目标（PetJournal 或 SQLitePetStore）
+            pet (Pet): 宠物
+            social_system (SocialSystem, optional): 社交系统
+            task_system (TaskSystem, optional): 任务系统
+            achievement_system (AchievementSystem, optional): 成就系统
+            interval (float, optional): tick 收集修改的最短间隔（秒），默认为 PetConfig.AUTOSAVE_INTERVAL
+            coalesce_delay (float, optional): 写入前等待合并的时间（秒），默认为 PetConfig.AUTOSAVE_COALESCE_DELAY
+        """
+        self.target = target
+        self.pet = pet
+        self.social_system = social_system
+        self.task_system = task_system
+        self.achievement_system = achievement_system
+        self.interval = PetConfig.AUTOSAVE_INTERVAL if interval is None else interval
+        self.coalesce_delay = PetConfig.AUTOSAVE_COALESCE_DELAY if coalesce_delay is None else coalesce_delay
+
+        self._condition = threading.Condition()
+        self._pending = None  # 尚未写入的记录
+        self._writing = False
+        self._flushing = False
+        self._stopping = False
+        self._thread = None
+        self._last_collect = time.monotonic()
+
+        # 统计
+        self.saves = 0  # 完成的写入次数
+        self.coalesced = 0  # 合并到尚未写入的记录中的次数
+        self.last_error = None  # 最近一次写入失败的异常，写入成功后清除
+
+    @property
+    def running(self):
+        """写入线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """启动后台写入线程"""
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def request_save(self, full=False):
+        """收集修改并交给写入线程（不等待写入）
+
+        Args:
+            full (bool, optional): 收集全部数据，而不只是修改过的段
+
+        Returns:
+            bool: 是否有需要写入的数据
+        """
+        record = self.target.collect(self.pet, self.social_system, self.task_system,
+                                     self.achievement_system, full=full)
+        self._last_collect = time.monotonic()
+        if record is None:
+            return False
+        with self._condition:
+            if self._pending is None:
+                self._pending = record
+            else:
+                self._pending = self.target.merge(self._pending, record)
+                self.coalesced += 1
+            self._condition.notify_all()
+        return True
+
+    def attach(self, event_bus, event_types=ACTION_EVENTS):
+        """订阅宠物动作事件（延迟投递），每次 event_bus.flush 最多收集一次修改
+        
+        Args:
+            event_bus (EventBus): 事件总线（通常为 pet.event_bus）
+            event_types (tuple, optional): 触发保存的事件类型，默认为全部动作事件
+        """
+        event_bus.subscribe(event_types, self._on_events, DELIVERY_DEFERRED)
+    
+    def detach(self, event_bus):
+        """取消订阅宠物动作事件"""
+        event_bus.unsubscribe(self._on_events)
+    
+    def _on_events(self, events):
+        self.request_save()
+    
+    def tick(self):
+        """距上次收集超过 interval 时收集修改，供主循环或模拟循环频繁调用
+
+        Returns:
+            bool: 是否提交了需要写入的数据
+        """
+        if time.monotonic() - self._last_collect < self.interval:
+            return False
+        return self.request_save()
+
+    def pending(self):
+        """是否有尚未写完的数据"""
+        with self._condition:
+            return self._pending is not None or self._writing
+
+    def flush(self, timeout=None):
+        """收集修改并等待全部写入完成
+
+        Args:
+            timeout (float, optional): 最长等待秒数
+
+        Returns:
+            bool: 是否已全部写入（写入失败或超时时返回 False）
+        """
+        self.request_save()
+        if not self.running:
+            # 写入线程没有运行时在当前线程写入
+            return self._write_pending()
+        with self._condition:
+            self._flushing = True
+            self._condition.notify_all()
+            try:
+                return self._condition.wait_for(
+                    lambda: (self._pending is None and not self._writing) or self.last_error is not None,
+                    timeout
+                ) and self.last_error is None
+            finally:
+                self._flushing = False
+
+    def stop(self, timeout=None):
+        """写入剩余的修改并停止写入线程
+
+        Returns:
+            bool: 是否已全部写入
+        """
+        self.request_save()
+        if not self.running:
+            return self._write_pending()
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return not self.pending() and self.last_error is None
+
+    def _take(self):
+        """等待并取出下一条记录，停止且没有剩余记录时返回 None"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending is not None or self._stopping)
+            # 等待一小段时间，把接下来的修改合并到同一次写入中
+            self._condition.wait_for(lambda: self._stopping or self._flushing, self.coalesce_delay)
+            record = self._pending
+            self._pending = None
+            self._writing = record is not None
+            return record
+
+    def _commit(self, record):
+        """写入记录，失败时放回队列等待下一次写入"""
+        try:
+            self.target.commit(record)
+        except Exception as e:
+            with self._condition:
+                self.last_error = e
+                self._pending = record if self._pending is None else self.target.merge(record, self._pending)
+                self._writing = False
+                self._condition.notify_all()
+            return False
+        with self._condition:
+            self.saves += 1
+            self.last_error = None
+            self._writing = False
+            self._condition.notify_all()
+        return True
+
+    def _write_pending(self):
+        with self._condition:
+            record = self._pending
+            self._pending = None
+            self._writing = record is not None
+        return record is None or self._commit(record)
+
+    def _run(self):
+        while True:
+            record = self._take()
+            if record is None:
+                return
+            if not self._commit(record) and not self._stopping:
+                # 写入失败（例如磁盘已满），等待一个间隔后重试
+                with self._condition:
+                    self._condition.wait_for(lambda: self._stopping, self.interval)
+            elif self._stopping and self.last_error is not None:
+                return
@@ -1,20 +1,45 @@
+import contextlib
 import random
 import json
-import time
 import os
 from datetime import datetime, timedelta
 from collections import defaultdict
 from .enums import PetState, PetMood, PetPersonality, EmotionType
 from .emotion import EmotionalSystem
 from .config import PetConfig
+from .vitals import PetVitals
+from .clock import SYSTEM_CLOCK
+from .events import EventBus, EventType, SOURCE_USER, SOURCE_PET
+from . import binfmt
+from .journal import DirtyTracking, atomic_write
 
-class Pet:
+# 核心数据段包含的属性（赋值时自动标记 core 段需要保存）
+CORE_FIELDS = (
+    "name", "species", "birth_time", "age_in_days", "health", "hunger", "energy", "hygiene",
+    "happiness", "weight", "size", "color", "state", "mood", "is_sleeping", "is_sick",
+    "sickness_type", "sleep_start_time", "sleep_duration", "skills", "experience", "level",
+    "personality_traits", "relationship_with_owner", "routine_preferences"
+)
+
+class Pet(DirtyTracking):
     """基础宠物类"""
-    def __init__(self, name="未命名", species="未知"):
-        """初始化宠物"""
+    JOURNAL_SECTIONS = {"core": None, "memories": "memories"}
+    # 属性 -> 赋值时标记的数据段
+    _FIELD_SECTIONS = {**dict.fromkeys(CORE_FIELDS, "core"), "memories": "memories"}
+    
+    def __init__(self, name="未命名", species="未知", clock=None):
+        """初始化宠物
+        
+        Args:
+            name (str, optional): 名称
+            species (str, optional): 物种
+            clock (optional): 时钟，默认为系统时钟；模拟时可传入 SimulationClock
+        """
+        self._init_dirty_tracking()
+        self.clock = clock or SYSTEM_CLOCK
         self.name = name
         self.species = species
-        self.birth_time = time.time()
+        self.birth_time = self.clock.time()
         self.age_in_days = 0
         
         # 基本属性
@@ -65,7 +90,17 @@ class Pet:
         
         # 状态更新标志
         self.needs_update = True
-        self.last_update_time = time.time()
+        self.last_update_time = self.clock.time()
+        
+        # 事件总线：动作成功后发布事件，任务、成就、学习和自动保存等系统订阅
+        self.event_bus = EventBus()
+        self._event_source = SOURCE_USER
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        section = self._FIELD_SECTIONS.get(name)
+        if section is not None:
+            self._dirty_sections.add(section)
     
     def _generate_personality(self):
         """生成宠物性格"""
@@ -77,7 +112,7 @@ class Pet:
         """更新宠物状态
         
         Args:
-            current_time (float, optional): 当前时间戳，默认为None，使用time.time()
+            current_time (float, optional): 当前时间戳，默认为None，使用宠物时钟的当前时间
         
         Returns:
             None
@@ -92,7 +127,7 @@ class Pet:
             return
         
         if current_time is None:
-            current_time = time.time()
+            current_time = self.clock.time()
         
         # 计算经过的时间
         hours_passed = (current_time - self.last_update_time) / 3600
@@ -109,6 +144,14 @@ class Pet:
             finally:
                 self._updating = False
     
+    def next_update_time(self):
+        """获取下一次需求更新的时间（距上次更新满1小时）
+        
+        Returns:
+            float: 时间戳，供调度器注册下一次需求更新
+        """
+        return self.last_update_time + 3600
+    
     def _update_needs(self, hours_passed):
         """随时间更新需求值
         
@@ -123,6 +166,9 @@ class Pet:
             - 根据宠物性格调整更新速率
             - 当宠物睡眠时，能量会恢复而不是消耗
             - 当能量达到100%时，宠物会自动醒来
+            - 按阈值穿越时间分段解析计算：每段内各项速率和快乐度影响不变，
+              直接跳到下一个事件（饥饿/清洁/疲劳阈值、数值触底或封顶、自动醒来），
+              因此离线很久后追赶的开销只与事件数有关，与经过的小时数无关
         """
         # 饥饿增长（根据性格调整）
         hunger_rate = PetConfig.HUNGER_RATE
@@ -131,49 +177,88 @@ class Pet:
         if PetPersonality.HUNGRY in self.personality_traits:
             hunger_rate *= PetConfig.PERSONALITY_FACTORS["HUNGRY"]["hunger_rate_multiplier"]
         
-        self.hunger = min(100, self.hunger + hunger_rate * hours_passed)
-        
-        # 能量恢复或消耗
-        if self.is_sleeping:
-            # 睡眠时恢复能量
-            energy_rate = PetConfig.ENERGY_RATE_SLEEP
-            old_energy = self.energy
-            self.energy = min(100, self.energy + energy_rate * hours_passed)
-            
-            # 当能量达到100%时自动醒来
-            if self.energy >= 100:
-                self.wake_up()
-        else:
-            # 活跃时消耗能量
-            energy_rate = PetConfig.ENERGY_RATE_ACTIVE
-            self.energy = max(0, self.energy - energy_rate * hours_passed)
-        
         # 清洁度下降（除非爱干净性格）
         hygiene_rate = PetConfig.HYGIENE_RATE
         if PetPersonality.CLEAN in self.personality_traits:
             hygiene_rate *= PetConfig.PERSONALITY_FACTORS["CLEAN"]["hygiene_rate_multiplier"]
         
-        self.hygiene = max(0, self.hygiene - hygiene_rate * hours_passed)
+        remaining = hours_passed
+        while remaining > 0:
+            remaining -= self._advance_needs_segment(remaining, hunger_rate, hygiene_rate)
+    
+    def _advance_needs_segment(self, max_hours, hunger_rate, hygiene_rate):
+        """推进一段速率不变的时间
+        
+        Args:
+            max_hours (float): 本段最多推进的小时数
+            hunger_rate (float): 每小时饥饿增长
+            hygiene_rate (float): 每小时清洁度下降
         
-        # 快乐度受其他因素影响
-        happiness_change = 0
+        Returns:
+            float: 实际推进的小时数（到下一个事件或 max_hours）
+        """
+        # 已经睡饱的宠物立即醒来
+        if self.is_sleeping and self.energy >= 100 - 1e-9:
+            self.energy = 100.0
+            self.wake_up()
+        
+        # 能量恢复或消耗
+        if self.is_sleeping:
+            energy_rate = PetConfig.ENERGY_RATE_SLEEP
+        else:
+            energy_rate = -PetConfig.ENERGY_RATE_ACTIVE
+        
+        # 计算各阈值的穿越时间，取最早的一个作为本段终点
+        wake_time = None
+        event_times = [max_hours]
+        for value, rate, thresholds in (
+            (self.hunger, hunger_rate, (PetConfig.HYGIENE_THRESHOLD, PetConfig.HUNGER_THRESHOLD, 100)),
+            (self.energy, energy_rate, (0, PetConfig.ENERGY_THRESHOLD, 100)),
+            (self.hygiene, -hygiene_rate, (0, PetConfig.HYGIENE_THRESHOLD))
+        ):
+            for threshold in thresholds:
+                if rate != 0:
+                    crossing = (threshold - value) / rate
+                    if crossing > 1e-9:
+                        event_times.append(crossing)
+        if self.is_sleeping and energy_rate > 0:
+            wake_time = (100 - self.energy) / energy_rate
+        hours = min(event_times)
+        
+        # 用本段中点的数值判断快乐度受哪些因素影响
+        half = hours / 2
+        hunger_mid = min(100, self.hunger + hunger_rate * half)
+        energy_mid = max(0, min(100, self.energy + energy_rate * half))
+        hygiene_mid = max(0, self.hygiene - hygiene_rate * half)
+        
+        happiness_rate = 0
         
         # 饥饿影响快乐
-        if self.hunger > PetConfig.HUNGER_THRESHOLD:
-            happiness_change -= PetConfig.HAPPINESS_HUNGER_PENALTY * hours_passed
-        elif self.hunger < PetConfig.HYGIENE_THRESHOLD:
-            happiness_change += PetConfig.HAPPINESS_HUNGER_BONUS * hours_passed
+        if hunger_mid > PetConfig.HUNGER_THRESHOLD:
+            happiness_rate -= PetConfig.HAPPINESS_HUNGER_PENALTY
+        elif hunger_mid < PetConfig.HYGIENE_THRESHOLD:
+            happiness_rate += PetConfig.HAPPINESS_HUNGER_BONUS
         
         # 清洁度影响快乐
-        if self.hygiene < PetConfig.HYGIENE_THRESHOLD:
-            happiness_change -= PetConfig.HAPPINESS_HYGIENE_PENALTY * hours_passed
+        if hygiene_mid < PetConfig.HYGIENE_THRESHOLD:
+            happiness_rate -= PetConfig.HAPPINESS_HYGIENE_PENALTY
         
         # 能量影响快乐
-        if self.energy < PetConfig.ENERGY_THRESHOLD:
-            happiness_change -= PetConfig.HAPPINESS_ENERGY_PENALTY * hours_passed
+        if energy_mid < PetConfig.ENERGY_THRESHOLD:
+            happiness_rate -= PetConfig.HAPPINESS_ENERGY_PENALTY
         
-        # 应用快乐度变化
-        self.happiness = max(0, min(100, self.happiness + happiness_change))
+        # 应用本段变化（段内单调，段末截断即为精确值）
+        self.hunger = min(100, self.hunger + hunger_rate * hours)
+        self.energy = max(0, min(100, self.energy + energy_rate * hours))
+        self.hygiene = max(0, self.hygiene - hygiene_rate * hours)
+        self.happiness = max(0, min(100, self.happiness + happiness_rate * hours))
+        
+        # 当能量达到100%时自动醒来
+        if wake_time is not None and wake_time <= hours:
+            self.energy = 100.0
+            self.wake_up()
+        
+        return hours
     
     def pet(self, duration=1):
         """抚摸宠物
@@ -215,12 +300,13 @@ class Pet:
         memory = {
             "type": "positive",
             "content": "被主人抚摸",
-            "timestamp": time.time(),
+            "timestamp": self.clock.time(),
             "intensity": 0.5 * duration
         }
         self.memories.append(memory)
         if len(self.memories) > self.max_memory_length:
             self.memories.pop(0)
+        self.mark_appended("memories")
         
         # 随机反应
         reactions = [
@@ -242,6 +328,7 @@ class Pet:
         
         # 标记需要更新
         self.needs_update = True
+        self._emit(EventType.PET, duration=duration)
         
         return reaction
     
@@ -331,9 +418,10 @@ class Pet:
             - 记忆会以 (时间戳, 内容) 的形式存储
             - 当记忆数量超过 max_memory_length 时，会删除最旧的记忆
         """
-        self.memories.append((time.time(), memory))
+        self.memories.append((self.clock.time(), memory))
         if len(self.memories) > self.max_memory_length:
             self.memories.pop(0)
+        self.mark_appended("memories")
     
     def feed(self, food_type="普通食物"):
         """喂食宠物
@@ -361,7 +449,8 @@ class Pet:
         
         if was_sleeping:
             # 唤醒宠物
-            wake_result = self.wake_up()
+            with self.autonomous():
+                wake_result = self.wake_up()
         
         effect = PetConfig.FOOD_EFFECTS.get(food_type, PetConfig.FOOD_EFFECTS["普通食物"])
         
@@ -384,12 +473,15 @@ class Pet:
         
         # 记录喂食偏好
         self.routine_preferences["feed"] += 1
+        self.mark_dirty("core")
+        self._emit(EventType.FEED, food_type=food_type)
         
         # 检查是否需要继续睡觉
         continue_sleep_result = ""
         if was_sleeping:
             # 如果之前在睡觉，吃完饭再继续睡觉
-            continue_sleep_result = self.sleep()
+            with self.autonomous():
+                continue_sleep_result = self.sleep()
         else:
             # 检查精力值，如果小于50%，则去睡觉
             continue_sleep_result = self._check_energy_and_sleep()
@@ -441,6 +533,7 @@ class Pet:
         # 提升技能
         for skill in effect.get("skills", []):
             self.skills[skill] += 0.5
+            self.mark_dirty("core")
         
         # 顽皮性格额外快乐
         if PetPersonality.PLAYFUL in self.personality_traits:
@@ -460,6 +553,8 @@ class Pet:
         
         # 记录游戏偏好
         self.routine_preferences["play"] += 1
+        self.mark_dirty("core")
+        self._emit(EventType.PLAY, game_type=game_type)
         
         # 检查精力值，如果小于50%，则去睡觉
         sleep_result = self._check_energy_and_sleep()
@@ -520,6 +615,7 @@ class Pet:
         
         # 添加记忆
         self._add_memory(effect["memory"])
+        self._emit(EventType.CLEAN, clean_type=clean_type)
         
         # 生成清洁结果消息
         result_message = ""
@@ -554,7 +650,7 @@ class Pet:
             return "宠物已经在睡觉了"
         
         self.is_sleeping = True
-        self.sleep_start_time = time.time()
+        self.sleep_start_time = self.clock.time()
         self.sleep_duration = 0
         
         # 根据性格调整睡眠行为
@@ -566,6 +662,7 @@ class Pet:
         self.emotional_system.trigger_emotion(EmotionType.CALM, 0.5, "开始睡觉")
         
         self._add_memory("去睡觉了")
+        self._emit(EventType.SLEEP)
         
         return sleep_message
     
@@ -590,7 +687,7 @@ class Pet:
         
         self.is_sleeping = False
         if self.sleep_start_time:
-            self.sleep_duration = time.time() - self.sleep_start_time
+            self.sleep_duration = self.clock.time() - self.sleep_start_time
         self.sleep_start_time = None
         
         # 唤醒时的能量恢复
@@ -605,6 +702,7 @@ class Pet:
             wake_message = f"{self.name}精神饱满地醒来了！"
         
         self._add_memory("醒来了")
+        self._emit(EventType.WAKE_UP, energy_gained=energy_gained)
         
         return wake_message
     
@@ -653,6 +751,7 @@ class Pet:
             
             self.energy = max(0, self.energy - energy_cost)
             self.skills[skill_type] += skill_gain
+            self.mark_dirty("core")
             self.experience += PetConfig.TRAIN_EXPERIENCE_GAIN
             self.happiness += 5
             
@@ -671,6 +770,7 @@ class Pet:
             # 获取技能名称，如果不存在则使用原始技能类型
             skill_name = skill_names.get(skill_type, skill_type)
             self._add_memory(f"进行了{skill_name}训练")
+            self._emit(EventType.TRAIN, skill_type=skill_type, skill_value=self.skills[skill_type])
             
             # 检查精力值，如果小于50%，则去睡觉
             sleep_result = self._check_energy_and_sleep()
@@ -716,6 +816,7 @@ class Pet:
             self.emotional_system.trigger_emotion(EmotionType.EXCITEMENT, 0.3, "改变颜色")
             
             self._add_memory(f"颜色从{old_color}变成了{new_color}")
+            self._emit(EventType.CHANGE_COLOR, old_color=old_color, new_color=new_color)
             
             return f"{self.name}的颜色已更改为{new_color}"
         except Exception as e:
@@ -752,12 +853,10 @@ class Pet:
                 - 如果宠物在睡觉，还会包含睡眠状态信息
         
         Notes:
-            - 只有在需要更新或强制更新时才会调用update()方法
-            - 这样可以避免不必要的状态更新，提高性能
+            - 仅用于展示，数值部分基于 get_vitals() 格式化
+            - 内部模块应直接使用 get_vitals()，避免解析格式化后的字符串
         """
-        # 只有在需要更新或强制更新时才执行更新操作
-        if force_update or self.needs_update:
-            self.update()
+        vitals = self.get_vitals(force_update)
         
         status = {
             "name": self.name,
@@ -766,14 +865,14 @@ class Pet:
             "state": self.state.value,
             "mood": self.mood.value,
             "level": self.level,
-            "health": f"{self.health:.1f}/100",
-            "hunger": f"{self.hunger:.1f}/100",
-            "energy": f"{self.energy:.1f}/100",
-            "hygiene": f"{self.hygiene:.1f}/100",
-            "happiness": f"{self.happiness:.1f}/100",
-            "weight": f"{self.weight:.1f}kg",
-            "relationship": f"{self.relationship_with_owner:.1f}/100",
-            "is_sleeping": self.is_sleeping,
+            "health": f"{vitals.health:.1f}/100",
+            "hunger": f"{vitals.hunger:.1f}/100",
+            "energy": f"{vitals.energy:.1f}/100",
+            "hygiene": f"{vitals.hygiene:.1f}/100",
+            "happiness": f"{vitals.happiness:.1f}/100",
+            "weight": f"{vitals.weight:.1f}kg",
+            "relationship": f"{vitals.relationship:.1f}/100",
+            "is_sleeping": vitals.is_sleeping,
             "is_sick": self.is_sick,
             "sickness": self.sickness_type if self.is_sick else "健康",
             "personality": [f"{t.value}({s:.1f})" for t, s in self.personality_traits.items()],
@@ -789,6 +888,24 @@ class Pet:
         
         return status
     
+    def get_vitals(self, force_update=False):
+        """获取宠物核心数值快照
+        
+        Args:
+            force_update (bool, optional): 是否强制更新状态，默认为False
+        
+        Returns:
+            PetVitals: 健康、饥饿、能量、清洁、快乐等数值的快照
+        
+        Notes:
+            - 只有在需要更新或强制更新时才会调用update()方法
+            - 决策系统、行为树和强化学习系统都应使用此方法读取数值
+        """
+        if force_update or self.needs_update:
+            self.update()
+        
+        return PetVitals.from_pet(self)
+    
     def get_sleep_status(self):
         """获取睡眠状态信息"""
         if not self.is_sleeping:
@@ -797,7 +914,7 @@ class Pet:
         # 计算已睡眠时长
         sleep_duration = 0
         if self.sleep_start_time:
-            sleep_duration = (time.time() - self.sleep_start_time) / 3600  # 转换为小时
+            sleep_duration = (self.clock.time() - self.sleep_start_time) / 3600  # 转换为小时
         
         # 计算预计醒来时间
         energy_needed = 100 - self.energy
@@ -809,44 +926,75 @@ class Pet:
             "estimated_wake_up_time": f"约{hours_needed:.1f}小时后"
         }
     
+    def to_dict(self):
+        """序列化宠物数据"""
+        data = self._core_dict()
+        data["memories"] = self.memories
+        data["emotional_system"] = self.emotional_system.to_dict()
+        return data
+    
+    def _core_dict(self):
+        """核心数据（不含记忆和情感系统）"""
+        return {
+            "name": self.name,
+            "species": self.species,
+            "birth_time": self.birth_time,
+            "age_in_days": self.age_in_days,
+            "health": self.health,
+            "hunger": self.hunger,
+            "energy": self.energy,
+            "hygiene": self.hygiene,
+            "happiness": self.happiness,
+            "weight": self.weight,
+            "size": self.size,
+            "color": self.color,
+            "state": self.state.value,
+            "mood": self.mood.value,
+            "is_sleeping": self.is_sleeping,
+            "is_sick": self.is_sick,
+            "sickness_type": self.sickness_type,
+            "sleep_start_time": self.sleep_start_time,
+            "sleep_duration": self.sleep_duration,
+            "skills": dict(self.skills),
+            "experience": self.experience,
+            "level": self.level,
+            "personality_traits": {t.value: v for t, v in self.personality_traits.items()},
+            "relationship_with_owner": self.relationship_with_owner,
+            "routine_preferences": dict(self.routine_preferences)
+        }
+    
+    def journal_section(self, section):
+        """增量存档的数据段"""
+        if section == "core":
+            return self._core_dict()
+        return list(self.memories)
+    
+    def journal_tail(self, section, count):
+        """记忆段只写入新增的记忆"""
+        if count >= len(self.memories):
+            return None
+        return self.memories[-count:], self.max_memory_length
+    
+    def _binary_sections(self):
+        """二进制存档的数据段，子类可以追加自己的数据段"""
+        return {"pet": self.to_dict()}
+    
+    def _restore_binary_sections(self, sections):
+        """从二进制存档的数据段恢复子类的数据"""
+    
     def save_to_file(self, file_path):
-        """保存宠物数据到文件"""
+        """保存宠物数据到文件（扩展名为 .vpet 时使用二进制格式，否则为 JSON；整体原子替换）"""
         try:
-            data = {
-                "name": self.name,
-                "species": self.species,
-                "birth_time": self.birth_time,
-                "age_in_days": self.age_in_days,
-                "health": self.health,
-                "hunger": self.hunger,
-                "energy": self.energy,
-                "hygiene": self.hygiene,
-                "happiness": self.happiness,
-                "weight": self.weight,
-                "size": self.size,
-                "color": self.color,
-                "state": self.state.value,
-                "mood": self.mood.value,
-                "is_sleeping": self.is_sleeping,
-                "is_sick": self.is_sick,
-                "sickness_type": self.sickness_type,
-                "sleep_start_time": self.sleep_start_time,
-                "sleep_duration": self.sleep_duration,
-                "skills": self.skills,
-                "experience": self.experience,
-                "level": self.level,
-                "personality_traits": {t.value: v for t, v in self.personality_traits.items()},
-                "relationship_with_owner": self.relationship_with_owner,
-                "memories": self.memories,
-                "routine_preferences": dict(self.routine_preferences),
-                "emotional_system": self.emotional_system.to_dict()
-            }
-            
             # 确保目录存在
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 先写入临时文件再替换，写入过程中崩溃不会损坏原存档
+            if binfmt.is_binary_path(file_path):
+                with atomic_write(file_path) as f:
+                    binfmt.dump(self._binary_sections(), f)
+            else:
+                with atomic_write(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
             
             return f"宠物 {self.name} 已保存到 {file_path}"
         except OSError as e:
@@ -859,74 +1007,89 @@ class Pet:
             return f"保存失败：未知错误 - {str(e)}"
     
     @classmethod
-    def load_from_file(cls, file_path):
+    def from_dict(cls, data, clock=None):
+        """从序列化数据创建宠物（缺少的字段使用默认值）"""
+        pet = cls(data["name"], data["species"], clock=clock)
+        pet.birth_time = data.get("birth_time", pet.clock.time())
+        pet.age_in_days = data.get("age_in_days", 0)
+        pet.health = data.get("health", 100.0)
+        pet.hunger = data.get("hunger", 0.0)
+        pet.energy = data.get("energy", 100.0)
+        pet.hygiene = data.get("hygiene", 100.0)
+        pet.happiness = data.get("happiness", 50.0)
+        pet.weight = data.get("weight", 1.0)
+        pet.size = data.get("size", "小")
+        pet.color = data.get("color", "白色")
+        
+        # 安全加载枚举值
+        try:
+            pet.state = PetState(data.get("state", "BABY"))
+        except ValueError:
+            pet.state = PetState.BABY
+        
+        try:
+            pet.mood = PetMood(data.get("mood", "NEUTRAL"))
+        except ValueError:
+            pet.mood = PetMood.NEUTRAL
+        
+        pet.is_sleeping = data.get("is_sleeping", False)
+        pet.is_sick = data.get("is_sick", False)
+        pet.sickness_type = data.get("sickness_type", None)
+        pet.sleep_start_time = data.get("sleep_start_time", None)
+        pet.sleep_duration = data.get("sleep_duration", 0)
+        pet.skills = data.get("skills", {"intelligence": 0, "strength": 0, "speed": 0, "social": 0})
+        pet.experience = data.get("experience", 0)
+        pet.level = data.get("level", 1)
+        
+        # 安全加载性格特征
+        try:
+            pet.personality_traits = {PetPersonality(t): v for t, v in data.get("personality_traits", {}).items()}
+        except ValueError:
+            pet.personality_traits = {}
+        
+        pet.relationship_with_owner = data.get("relationship_with_owner", 50.0)
+        pet.memories = data.get("memories", [])
+        pet.routine_preferences = defaultdict(int, data.get("routine_preferences", {}))
+        
+        # 恢复情感系统
+        if "emotional_system" in data:
+            try:
+                pet.emotional_system.from_dict(data["emotional_system"])
+            except Exception as e:
+                print(f"警告：情感系统恢复失败 - {str(e)}")
+        
+        return pet
+    
+    @classmethod
+    def load_from_file(cls, file_path, clock=None):
         """从文件加载宠物数据"""
         try:
             if not os.path.exists(file_path):
                 return f"加载失败：文件不存在 - {file_path}"
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            sections = None
+            if binfmt.is_binary_file(file_path):
+                sections = binfmt.read_container(file_path)
+                data = sections.get("pet", {})
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             
             # 检查必要字段
             if "name" not in data or "species" not in data:
                 return f"加载失败：文件格式错误，缺少必要字段"
             
-            pet = cls(data["name"], data["species"])
-            pet.birth_time = data.get("birth_time", time.time())
-            pet.age_in_days = data.get("age_in_days", 0)
-            pet.health = data.get("health", 100.0)
-            pet.hunger = data.get("hunger", 0.0)
-            pet.energy = data.get("energy", 100.0)
-            pet.hygiene = data.get("hygiene", 100.0)
-            pet.happiness = data.get("happiness", 50.0)
-            pet.weight = data.get("weight", 1.0)
-            pet.size = data.get("size", "小")
-            pet.color = data.get("color", "白色")
-            
-            # 安全加载枚举值
-            try:
-                pet.state = PetState(data.get("state", "BABY"))
-            except ValueError:
-                pet.state = PetState.BABY
-            
-            try:
-                pet.mood = PetMood(data.get("mood", "NEUTRAL"))
-            except ValueError:
-                pet.mood = PetMood.NEUTRAL
-            
-            pet.is_sleeping = data.get("is_sleeping", False)
-            pet.is_sick = data.get("is_sick", False)
-            pet.sickness_type = data.get("sickness_type", None)
-            pet.sleep_start_time = data.get("sleep_start_time", None)
-            pet.sleep_duration = data.get("sleep_duration", 0)
-            pet.skills = data.get("skills", {"intelligence": 0, "strength": 0, "speed": 0, "social": 0})
-            pet.experience = data.get("experience", 0)
-            pet.level = data.get("level", 1)
-            
-            # 安全加载性格特征
-            try:
-                pet.personality_traits = {PetPersonality(t): v for t, v in data.get("personality_traits", {}).items()}
-            except ValueError:
-                pet.personality_traits = {}
-            
-            pet.relationship_with_owner = data.get("relationship_with_owner", 50.0)
-            pet.memories = data.get("memories", [])
-            pet.routine_preferences = defaultdict(int, data.get("routine_preferences", {}))
+            pet = cls.from_dict(data, clock=clock)
             
-            # 恢复情感系统
-            if "emotional_system" in data:
-                try:
-                    pet.emotional_system.from_dict(data["emotional_system"])
-                except Exception as e:
-                    print(f"警告：情感系统恢复失败 - {str(e)}")
+            if sections is not None:
+                pet._restore_binary_sections(sections)
             
             return pet
         except OSError as e:
             return f"加载失败：无法读取文件 - {str(e)}"
         except PermissionError as e:
             return f"加载失败：权限不足 - {str(e)}"
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, binfmt.BinaryFormatError) as e:
             return f"加载失败：文件格式错误 - {str(e)}"
         except Exception as e:
             return f"加载失败：未知错误 - {str(e)}"
@@ -943,6 +1106,7 @@ class Pet:
         self.energy = max(0, self.energy - energy_cost)
         self.happiness = min(100, self.happiness + happiness_gain)
         self.skills["intelligence"] += intelligence_gain
+        self.mark_dirty("core")
         
         # 检查精力值，如果小于50%，则去睡觉
         sleep_result = self._check_energy_and_sleep()
@@ -969,5 +1133,25 @@ class Pet:
     def _check_energy_and_sleep(self):
         """检查精力值，如果小于50%，则去睡觉"""
         if not self.is_sleeping and self.energy < PetConfig.ENERGY_SLEEP_THRESHOLD:
-            return self.sleep()
+            with self.autonomous():
+                return self.sleep()
         return ""
+    
+    def _emit(self, event_type, **data):
+        """发布动作事件（没有订阅者时只有一次字典查找）"""
+        self.event_bus.emit(event_type, self, self._event_source, **data)
+    
+    @contextlib.contextmanager
+    def autonomous(self):
+        """在 with 块中执行的动作以宠物自身为事件来源
+        
+        Notes:
+            - 用于宠物自发的动作和动作中连带发生的动作（例如吃完后自动睡觉），
+              任务和成就只统计用户发起的动作
+        """
+        previous = self._event_source
+        self._event_source = SOURCE_PET
+        try:
+            yield
+        finally:
+            self._event_source = previous
@@ -0,0 +1,341 @@
+"""二进制存档格式
+
+容器布局：
+    头部    struct "<4sHHI"：魔数 b"VPET"、格式版本、保留标志、段表长度
+    段表    记录编码的列表，每项为 [名称, 类型, dtype, 形状, 偏移, 字节数]
+    数据段  按 16 字节对齐；数组段为原始字节，记录段为记录编码
+
+记录编码是 MessagePack 的子集（nil/bool/int/float64/str/bin/array/map），
+用于保存数组以外的数据。数组段读取时直接映射到文件内容，不逐项解析，
+因此包含大型Q表和经验回放缓冲区的存档也能快速加载。
+"""
+import os
+import struct
+import numpy as np
+
+MAGIC = b"VPET"
+FORMAT_VERSION = 1
+BINARY_EXTENSION = ".vpet"
+
+HEADER = struct.Struct("<4sHHI")
+ALIGNMENT = 16
+
+SECTION_RECORD = 0
+SECTION_ARRAY = 1
+
+
+class BinaryFormatError(ValueError):
+    """二进制存档格式错误"""
+
+
+# ---------------------------------------------------------------------------
+# 记录编码（MessagePack 子集）
+# ---------------------------------------------------------------------------
+
+_UINT = ((0xff, 0xcc, ">B"), (0xffff, 0xcd, ">H"), (0xffffffff, 0xce, ">I"), (0xffffffffffffffff, 0xcf, ">Q"))
+_INT = ((0x7f, 0xd0, ">b"), (0x7fff, 0xd1, ">h"), (0x7fffffff, 0xd2, ">i"), (0x7fffffffffffffff, 0xd3, ">q"))
+
+
+def _pack_length(parts, length, fix_tag, fix_max, tags):
+    """写入长度前缀（fix 格式或 8/16/32 位长度）"""
+    if fix_tag is not None and length <= fix_max:
+        parts.append(bytes((fix_tag | length,)))
+        return
+    for limit, tag, fmt in zip((0xff, 0xffff, 0xffffffff), tags, (">B", ">H", ">I")):
+        if tag is not None and length <= limit:
+            parts.append(bytes((tag,)) + struct.pack(fmt, length))
+            return
+    raise BinaryFormatError(f"数据过长: {length}")
+
+
+def _pack_into(parts, obj):
+    if obj is None:
+        parts.append(b"\xc0")
+    elif obj is True or obj is False or isinstance(obj, np.bool_):
+        parts.append(b"\xc3" if obj else b"\xc2")
+    elif isinstance(obj, (int, np.integer)):
+        obj = int(obj)
+        if -32 <= obj < 128:
+            parts.append(struct.pack(">b", obj))
+        elif obj >= 0:
+            for limit, tag, fmt in _UINT:
+                if obj <= limit:
+                    parts.append(bytes((tag,)) + struct.pack(fmt, obj))
+                    break
+            else:
+                raise BinaryFormatError(f"整数超出范围: {obj}")
+        else:
+            for limit, tag, fmt in _INT:
+                if obj >= -limit - 1:
+                    parts.append(bytes((tag,)) + struct.pack(fmt, obj))
+                    break
+            else:
+                raise BinaryFormatError(f"整数超出范围: {obj}")
+    elif isinstance(obj, (float, np.floating)):
+        parts.append(b"\xcb" + struct.pack(">d", float(obj)))
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        _pack_length(parts, len(data), 0xa0, 31, (0xd9, 0xda, 0xdb))
+        parts.append(data)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        _pack_length(parts, len(data), None, 0, (0xc4, 0xc5, 0xc6))
+        parts.append(data)
+    elif isinstance(obj, (list, tuple)):
+        _pack_length(parts, len(obj), 0x90, 15, (None, 0xdc, 0xdd))
+        for item in obj:
+            _pack_into(parts, item)
+    elif isinstance(obj, dict):
+        _pack_length(parts, len(obj), 0x80, 15, (None, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack_into(parts, key)
+            _pack_into(parts, value)
+    else:
+        raise BinaryFormatError(f"无法编码的类型: {type(obj).__name__}")
+
+
+def pack(obj):
+    """将记录编码为字节串
+
+    Args:
+        obj: None、bool、int、float、str、bytes、list/tuple、dict 及其嵌套
+
+    Returns:
+        bytes: 编码结果（元组解码后为列表）
+    """
+    parts = []
+    _pack_into(parts, obj)
+    return b"".join(parts)
+
+
+# 定长类型：标签 -> (struct 格式, 字节数)
+_FIXED = {
+    0xca: (">f", 4), 0xcb: (">d", 8),
+    0xcc: (">B", 1), 0xcd: (">H", 2), 0xce: (">I", 4), 0xcf: (">Q", 8),
+    0xd0: (">b", 1), 0xd1: (">h", 2), 0xd2: (">i", 4), 0xd3: (">q", 8),
+}
+# 变长类型：标签 -> (种类, 长度前缀格式, 前缀字节数)
+_SIZED = {
+    0xd9: ("str", ">B", 1), 0xda: ("str", ">H", 2), 0xdb: ("str", ">I", 4),
+    0xc4: ("bin", ">B", 1), 0xc5: ("bin", ">H", 2), 0xc6: ("bin", ">I", 4),
+    0xdc: ("array", ">H", 2), 0xdd: ("array", ">I", 4),
+    0xde: ("map", ">H", 2), 0xdf: ("map", ">I", 4),
+}
+
+
+def _unpack_from(data, offset):
+    tag = data[offset]
+    offset += 1
+    if tag <= 0x7f:
+        return tag, offset
+    if tag >= 0xe0:
+        return tag - 0x100, offset
+    if 0xa0 <= tag <= 0xbf:
+        kind, length = "str", tag & 0x1f
+    elif 0x90 <= tag <= 0x9f:
+        kind, length = "array", tag & 0x0f
+    elif 0x80 <= tag <= 0x8f:
+        kind, length = "map", tag & 0x0f
+    elif tag == 0xc0:
+        return None, offset
+    elif tag == 0xc2:
+        return False, offset
+    elif tag == 0xc3:
+        return True, offset
+    elif tag in _FIXED:
+        fmt, size = _FIXED[tag]
+        return struct.unpack_from(fmt, data, offset)[0], offset + size
+    elif tag in _SIZED:
+        kind, fmt, size = _SIZED[tag]
+        length = struct.unpack_from(fmt, data, offset)[0]
+        offset += size
+    else:
+        raise BinaryFormatError(f"未知的记录标签: 0x{tag:02x}")
+
+    if kind in ("str", "bin") and offset + length > len(data):
+        raise BinaryFormatError("记录数据不完整")
+    if kind == "str":
+        return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+    if kind == "bin":
+        return bytes(data[offset:offset + length]), offset + length
+    if kind == "array":
+        items = []
+        for _ in range(length):
+            item, offset = _unpack_from(data, offset)
+            items.append(item)
+        return items, offset
+    result = {}
+    for _ in range(length):
+        key, offset = _unpack_from(data, offset)
+        value, offset = _unpack_from(data, offset)
+        result[key] = value
+    return result, offset
+
+
+def unpack(data):
+    """解码记录
+
+    Raises:
+        BinaryFormatError: 数据不完整或包含未知标签
+    """
+    try:
+        obj, offset = _unpack_from(data, 0)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise BinaryFormatError(f"记录数据不完整: {e}") from e
+    if offset != len(data):
+        raise BinaryFormatError("记录数据后有多余的字节")
+    return obj
+
+
+# ---------------------------------------------------------------------------
+# 容器
+# ---------------------------------------------------------------------------
+
+def is_binary_path(file_path):
+    """根据扩展名判断是否应使用二进制格式保存"""
+    return str(file_path).endswith(BINARY_EXTENSION)
+
+
+def is_binary_file(file_path):
+    """根据文件头的魔数判断文件是否为二进制存档"""
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _iter_chunks(sections):
+    """按顺序生成存档的字节块（头部、段表、对齐填充和各数据段）"""
+    payloads = []
+    table = []
+    for name, value in sections.items():
+        if isinstance(value, np.ndarray):
+            if value.dtype.hasobject:
+                raise BinaryFormatError(f"数组段不能包含对象: {name}")
+            array = np.ascontiguousarray(value)
+            payloads.append(memoryview(array.reshape(-1).view(np.uint8)))
+            table.append([name, SECTION_ARRAY, array.dtype.str, list(array.shape)])
+        else:
+            payloads.append(pack(value))
+            table.append([name, SECTION_RECORD, "", []])
+
+    # 段表中的偏移依赖段表自身的长度，先用占位偏移计算段表长度的上界
+    for entry, payload in zip(table, payloads):
+        entry.extend([0xffffffffffffffff, len(payload)])
+    table_size = len(pack(table))
+    offset = _align(HEADER.size + table_size)
+    for entry, payload in zip(table, payloads):
+        entry[4] = offset
+        offset = _align(offset + len(payload))
+    table_bytes = pack(table)
+
+    yield HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(table_bytes))
+    yield table_bytes
+    position = HEADER.size + len(table_bytes)
+    for entry, payload in zip(table, payloads):
+        yield b"\0" * (entry[4] - position)
+        yield payload
+        position = entry[4] + len(payload)
+
+
+def dump(sections, f):
+    """把数据段写入已打开的二进制文件（格式与 write_container 相同）"""
+    for chunk in _iter_chunks(sections):
+        f.write(chunk)
+
+
+def write_container(file_path, sections):
+    """写入二进制存档
+
+    Args:
+        file_path (str): 文件路径
+        sections (dict): 段名称 -> 数据；np.ndarray 保存为数组段，其他值保存为记录段
+    """
+    with open(file_path, "wb") as f:
+        dump(sections, f)
+
+
+def dumps(sections):
+    """将数据段编码为存档字节串（格式与 write_container 相同）"""
+    return b"".join(_iter_chunks(sections))
+
+
+def _read_table(data):
+    if len(data) < HEADER.size:
+        raise BinaryFormatError("文件过短，不是二进制存档")
+    magic, version, _, table_size = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise BinaryFormatError("文件头魔数不匹配，不是二进制存档")
+    if version > FORMAT_VERSION:
+        raise BinaryFormatError(f"不支持的存档版本: {version}")
+    return unpack(memoryview(data)[HEADER.size:HEADER.size + table_size])
+
+
+def read_container(file_path, names=None):
+    """读取二进制存档
+
+    Args:
+        file_path (str): 文件路径
+        names (iterable, optional): 只读取这些段，默认读取全部
+
+    Returns:
+        dict: 段名称 -> 数据
+
+    Notes:
+        - 数组段是文件内容的可写视图，不逐项复制
+    """
+    size = os.path.getsize(file_path)
+    # 未初始化的缓冲区，避免大文件先清零再读取
+    data = np.empty(size, dtype=np.uint8)
+    with open(file_path, "rb") as f:
+        f.readinto(data)
+    return loads(data, names)
+
+
+def loads(data, names=None):
+    """从字节串或缓冲区解码存档
+
+    Args:
+        data (bytes-like): 存档内容
+        names (iterable, optional): 只解码这些段，默认解码全部
+
+    Returns:
+        dict: 段名称 -> 数据；数组段是 data 的视图（data 只读时数组也只读）
+    """
+    table = _read_table(data)
+    size = len(data)
+    wanted = set(names) if names is not None else None
+    sections = {}
+    view = memoryview(data)
+    for name, kind, dtype, shape, offset, nbytes in table:
+        if wanted is not None and name not in wanted:
+            continue
+        if nbytes and offset + nbytes > size:
+            raise BinaryFormatError(f"数据段超出范围: {name}")
+        if kind == SECTION_ARRAY:
+            dtype = np.dtype(dtype)
+            if nbytes:
+                sections[name] = np.frombuffer(data, dtype=dtype, count=nbytes // dtype.itemsize, offset=offset).reshape(shape)
+            else:
+                sections[name] = np.zeros(shape, dtype=dtype)
+        elif kind == SECTION_RECORD:
+            sections[name] = unpack(view[offset:offset + nbytes])
+        else:
+            raise BinaryFormatError(f"未知的段类型: {kind}")
+    return sections
+
+
+def list_sections(file_path):
+    """只读取段表，返回段名称列表"""
+    with open(file_path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise BinaryFormatError("文件过短，不是二进制存档")
+        table_size = HEADER.unpack(header)[3]
+        data = header + f.read(table_size)
+    return [entry[0] for entry in _read_table(data)]
@@ -0,0 +1,70 @@
+"""时钟
+
+宠物及其子系统通过时钟读取当前时间，而不是直接调用 time.time() 或 datetime.now()。
+默认使用系统时钟；无界面模拟和测试可以注入 SimulationClock，手动推进虚拟时间。
+"""
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    """系统时钟，读取真实时间"""
+
+    def time(self):
+        """获取当前时间戳（秒）"""
+        return time.time()
+
+    def now(self):
+        """获取当前时间（datetime）"""
+        return datetime.now()
+
+    def sleep(self, seconds):
+        """等待指定秒数"""
+        time.sleep(seconds)
+
+
+class SimulationClock:
+    """模拟时钟，时间只在调用 advance/sleep 时前进，结果可重复"""
+
+    def __init__(self, start=None):
+        """初始化模拟时钟
+
+        Args:
+            start (float, optional): 起始时间戳，默认为当前真实时间
+        """
+        self.current = time.time() if start is None else float(start)
+
+    def time(self):
+        """获取当前虚拟时间戳（秒）"""
+        return self.current
+
+    def now(self):
+        """获取当前虚拟时间（datetime）"""
+        return datetime.fromtimestamp(self.current)
+
+    def sleep(self, seconds):
+        """立即推进虚拟时间，不真正等待"""
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        """推进虚拟时间
+
+        Args:
+            seconds (float): 推进的秒数
+
+        Returns:
+            float: 推进后的时间戳
+        """
+        if seconds < 0:
+            raise ValueError("模拟时钟不能倒退")
+        self.current += seconds
+        return self.current
+
+
+# 默认时钟，未注入时钟的对象共用
+SYSTEM_CLOCK = SystemClock()
+
+
+def get_clock(owner):
+    """获取对象使用的时钟，没有时钟的对象返回系统时钟"""
+    return getattr(owner, "clock", None) or SYSTEM_CLOCK
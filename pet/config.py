@@ -44,6 +44,33 @@ class PetConfig:
     
     # 自发行为参数
     SPONTANEOUS_ACTION_COOLDOWN = 30  # 自发行为冷却时间（秒）
+    WORLD_TICK_INTERVAL = 60  # 环境和社交系统的更新间隔（秒）
+    RUNTIME_MAX_SLEEP = 1.0  # 异步运行时模拟循环单次最长等待时间（秒）
+    RENDER_INTERVAL = 10  # 等待菜单输入时状态变化后刷新界面的最短间隔（秒）
+    
+    # 社交互动历史参数
+    SOCIAL_RECENT_INTERACTIONS = 20  # 每段关系保留的最近互动记录数
+    SOCIAL_HISTORY_BUCKET = 86400  # 互动统计的时间桶长度（秒）
+    SOCIAL_HISTORY_BUCKETS = 30  # 保留的时间桶数，更早的统计合并到累计统计
+    
+    # 任务参数
+    TASK_COMPLETED_HISTORY = 50  # 任务系统保留的已完成（或失败）任务数，更早的任务移入归档
+    TASK_ARCHIVE_PENDING_LIMIT = 1000  # 等待写入存储归档的任务数上限
+    
+    # 存储路径
+    PET_STORE_PATH = "data/pets.db"  # SQLite 宠物存储
+    SAVED_PETS_DIR = "data/pets"  # JSON/二进制存档目录（启动时导入到宠物存储）
+    
+    # 多宠物服务器参数
+    SERVER_HOST = "127.0.0.1"  # 监听地址
+    SERVER_PORT = 8765  # 监听端口
+    SERVER_STORE_PATH = "data/server.db"  # 服务器使用的宠物存储
+    SERVER_HOT_PETS = 1000  # 内存中保留的宠物数量，其余宠物保存在存储中，访问时加载
+    SERVER_FLUSH_INTERVAL = 5  # 把修改写入存储的间隔（秒）
+    
+    # 自动保存参数
+    AUTOSAVE_INTERVAL = 5  # 收集修改的间隔（秒）
+    AUTOSAVE_COALESCE_DELAY = 0.5  # 写入前等待合并后续修改的时间（秒）
     
     # 食物效果
     FOOD_EFFECTS = {
@@ -143,6 +170,7 @@ class PetConfig:
     RL_ALPHA = 0.6  # 优先级指数
     RL_BETA = 0.4  # 重要性采样权重指数
     RL_BETA_INCREMENT = 0.001
+    RL_Q_TABLE_BACKEND = "dict"  # Q表存储方式："dict"（稀疏字典）或 "dense"（NumPy 数组）
     
     # 状态离散化参数
     STATE_BINS = {
@@ -1,8 +1,182 @@
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
+from collections.abc import MutableMapping
+import numpy as np
 from .enums import EmotionType
+from .clock import get_clock
+from .journal import DirtyTracking
 import random
 
+# 情感维度顺序，情感向量和关联矩阵都按这个顺序排列
+EMOTION_TYPES = tuple(EmotionType)
+EMOTION_INDEX = {emotion_type: i for i, emotion_type in enumerate(EMOTION_TYPES)}
+NUM_EMOTIONS = len(EMOTION_TYPES)
+CALM_INDEX = EMOTION_INDEX[EmotionType.CALM]
+
+# 初始情感值（0.0-1.0）
+DEFAULT_EMOTIONS = {
+    EmotionType.JOY: 0.5,
+    EmotionType.EXCITEMENT: 0.3,
+    EmotionType.CALM: 0.6,
+    EmotionType.ANXIETY: 0.1,
+    EmotionType.FEAR: 0.1,
+    EmotionType.ANGER: 0.1,
+    EmotionType.SADNESS: 0.1,
+    EmotionType.LOVE: 0.5,
+    EmotionType.CURIOSITY: 0.4,
+    EmotionType.GRATITUDE: 0.3,  # 新增情感：感激
+    EmotionType.PRIDE: 0.2,       # 新增情感：自豪
+    EmotionType.ENVY: 0.1         # 新增情感：嫉妒
+}
+
+# 情感关联（情感之间的相互影响）
+DEFAULT_EMOTION_CONNECTIONS = {
+    EmotionType.JOY: {
+        EmotionType.EXCITEMENT: 0.3,
+        EmotionType.LOVE: 0.2,
+        EmotionType.CALM: -0.2
+    },
+    EmotionType.EXCITEMENT: {
+        EmotionType.JOY: 0.2,
+        EmotionType.CURIOSITY: 0.3,
+        EmotionType.ANXIETY: 0.1
+    },
+    EmotionType.ANGER: {
+        EmotionType.SADNESS: 0.3,
+        EmotionType.ANXIETY: 0.2,
+        EmotionType.JOY: -0.5
+    },
+    EmotionType.SADNESS: {
+        EmotionType.ANXIETY: 0.3,
+        EmotionType.LOVE: -0.2
+    },
+    EmotionType.LOVE: {
+        EmotionType.JOY: 0.3,
+        EmotionType.CALM: 0.2,
+        EmotionType.GRATITUDE: 0.3
+    },
+    EmotionType.FEAR: {
+        EmotionType.ANXIETY: 0.5,
+        EmotionType.SADNESS: 0.2
+    },
+    EmotionType.CURIOSITY: {
+        EmotionType.EXCITEMENT: 0.3,
+        EmotionType.JOY: 0.1
+    }
+}
+
+# 情感衰减速率（每秒，即每分钟0.05），平静状态以一半的速率恢复
+EMOTION_DECAY_PER_SECOND = 0.05 / 60.0
+CALM_RECOVERY_RATIO = 0.5
+# 衰减的下限和平静状态恢复的上限
+EMOTION_FLOOR = 0.05
+CALM_CEILING = 0.8
+
+
+def emotion_vector(emotions=None):
+    """创建情感向量
+
+    Args:
+        emotions (dict, optional): 情感类型到强度的映射，未给出的维度使用初始值
+
+    Returns:
+        numpy.ndarray: 长度为 NUM_EMOTIONS 的强度向量
+    """
+    values = np.array([DEFAULT_EMOTIONS[t] for t in EMOTION_TYPES], dtype=np.float64)
+    if emotions:
+        for emotion_type, intensity in emotions.items():
+            values[EMOTION_INDEX[emotion_type]] = intensity
+    return values
+
+
+def build_connection_matrix(connections):
+    """将嵌套字典形式的情感关联转换为关联矩阵
+
+    Returns:
+        numpy.ndarray: NUM_EMOTIONS x NUM_EMOTIONS 矩阵，第 i 行为情感 i 对各情感的影响系数
+    """
+    matrix = np.zeros((NUM_EMOTIONS, NUM_EMOTIONS), dtype=np.float64)
+    for source, targets in connections.items():
+        for target, strength in targets.items():
+            matrix[EMOTION_INDEX[source], EMOTION_INDEX[target]] = strength
+    return matrix
+
+
+CONNECTION_MATRIX = build_connection_matrix(DEFAULT_EMOTION_CONNECTIONS)
+
+
+def apply_emotion_triggers(values, emotion_indices, intensities, connection_matrix=CONNECTION_MATRIX):
+    """批量触发情感（原地修改）
+
+    Args:
+        values (numpy.ndarray): (n, NUM_EMOTIONS) 情感矩阵，每行一只宠物
+        emotion_indices (array-like): 每只宠物触发的情感下标
+        intensities (array-like): 每只宠物的触发强度（0.0-1.0）
+        connection_matrix (numpy.ndarray, optional): 情感关联矩阵
+
+    Notes:
+        - 与 EmotionalSystem.trigger_emotion 的数值计算一致：增加强度、沿关联矩阵传播并截断到 [0, 1]
+        - 不包含时间衰减，调用前应先用 decay_emotion_values 衰减到当前时间
+    """
+    rows = np.arange(values.shape[0])
+    emotion_indices = np.asarray(emotion_indices, dtype=np.intp)
+    intensities = np.clip(np.asarray(intensities, dtype=np.float64), 0.0, 1.0)
+    values[rows, emotion_indices] = np.minimum(1.0, values[rows, emotion_indices] + intensities)
+    values += intensities[:, None] * connection_matrix[emotion_indices]
+    np.clip(values, 0.0, 1.0, out=values)
+
+
+def decay_emotion_values(values, elapsed):
+    """按经过的时间衰减情感（原地修改，支持单个向量或按行排列的情感矩阵）
+
+    Args:
+        values (numpy.ndarray): 情感向量或 (n, NUM_EMOTIONS) 情感矩阵
+        elapsed (float or array-like): 经过的秒数，情感矩阵可以每行一个值
+
+    Notes:
+        - 衰减是线性的，一次计算经过任意时长后的结果，与中间读取多少次无关
+        - 除平静外的情感衰减后不低于 EMOTION_FLOOR，平静状态恢复后不高于 CALM_CEILING
+    """
+    decay = EMOTION_DECAY_PER_SECOND * np.asarray(elapsed, dtype=np.float64)
+    calm = np.minimum(CALM_CEILING, values[..., CALM_INDEX] + decay * CALM_RECOVERY_RATIO)
+    if decay.ndim:
+        decay = decay[:, None]
+    np.maximum(values - decay, EMOTION_FLOOR, out=values)
+    values[..., CALM_INDEX] = calm
+
+
+class EmotionVector(MutableMapping):
+    """情感向量的字典视图
+
+    以 EmotionType 为键读写情感系统的强度向量，兼容原先的字典接口，不复制数据。
+    """
+    __slots__ = ("_system",)
+
+    def __init__(self, system):
+        self._system = system
+
+    def __getitem__(self, emotion_type):
+        return float(self._system.values[EMOTION_INDEX[emotion_type]])
+
+    def __setitem__(self, emotion_type, intensity):
+        self._system.values[EMOTION_INDEX[emotion_type]] = intensity
+        self._system.mark_dirty("state")
+
+    def __delitem__(self, emotion_type):
+        raise TypeError("情感维度不能删除")
+
+    def __iter__(self):
+        return iter(EMOTION_TYPES)
+
+    def __len__(self):
+        return NUM_EMOTIONS
+
+    def __contains__(self, emotion_type):
+        return emotion_type in EMOTION_INDEX
+
+    def __repr__(self):
+        return f"EmotionVector({dict(self)!r})"
+
 class EmotionEvent:
     """情感事件"""
     def __init__(self, emotion_type, intensity, trigger, timestamp=None):
@@ -31,26 +205,19 @@ class EmotionEvent:
         event.duration = data.get("duration", random.uniform(1.0, 5.0))
         return event
 
-class EmotionalSystem:
+class EmotionalSystem(DirtyTracking):
     """情感系统"""
+    # state 为情感向量和衰减时间戳（衰减按时间戳推算，不需要保存），history 只追加
+    JOURNAL_SECTIONS = {"state": None, "history": "emotion_history", "memories": "emotion_memories"}
+    
     def __init__(self, pet):
+        self._init_dirty_tracking()
         self.pet = pet
         
-        # 情感维度（0.0-1.0）
-        self.emotions = {
-            EmotionType.JOY: 0.5,
-            EmotionType.EXCITEMENT: 0.3,
-            EmotionType.CALM: 0.6,
-            EmotionType.ANXIETY: 0.1,
-            EmotionType.FEAR: 0.1,
-            EmotionType.ANGER: 0.1,
-            EmotionType.SADNESS: 0.1,
-            EmotionType.LOVE: 0.5,
-            EmotionType.CURIOSITY: 0.4,
-            EmotionType.GRATITUDE: 0.3,  # 新增情感：感激
-            EmotionType.PRIDE: 0.2,       # 新增情感：自豪
-            EmotionType.ENVY: 0.1         # 新增情感：嫉妒
-        }
+        # 情感维度（0.0-1.0），按 EMOTION_TYPES 顺序存放在向量中
+        self.values = emotion_vector()
+        # 情感向量已衰减到的时间，读取情感时才按经过的时间衰减
+        self.last_decay_time = get_clock(pet).time()
         
         # 情感历史
         self.emotion_history = deque(maxlen=200)  # 使用双端队列，自动限制长度
@@ -58,41 +225,8 @@ class EmotionalSystem:
         # 情感触发记忆
         self.emotion_triggers = defaultdict(list)
         
-        # 情感关联矩阵（情感之间的相互影响）
-        self.emotion_connections = {
-            EmotionType.JOY: {
-                EmotionType.EXCITEMENT: 0.3,
-                EmotionType.LOVE: 0.2,
-                EmotionType.CALM: -0.2
-            },
-            EmotionType.EXCITEMENT: {
-                EmotionType.JOY: 0.2,
-                EmotionType.CURIOSITY: 0.3,
-                EmotionType.ANXIETY: 0.1
-            },
-            EmotionType.ANGER: {
-                EmotionType.SADNESS: 0.3,
-                EmotionType.ANXIETY: 0.2,
-                EmotionType.JOY: -0.5
-            },
-            EmotionType.SADNESS: {
-                EmotionType.ANXIETY: 0.3,
-                EmotionType.LOVE: -0.2
-            },
-            EmotionType.LOVE: {
-                EmotionType.JOY: 0.3,
-                EmotionType.CALM: 0.2,
-                EmotionType.GRATITUDE: 0.3
-            },
-            EmotionType.FEAR: {
-                EmotionType.ANXIETY: 0.5,
-                EmotionType.SADNESS: 0.2
-            },
-            EmotionType.CURIOSITY: {
-                EmotionType.EXCITEMENT: 0.3,
-                EmotionType.JOY: 0.1
-            }
-        }
+        # 情感关联矩阵（情感之间的相互影响），第 i 行为情感 i 对各情感的影响系数
+        self.connection_matrix = CONNECTION_MATRIX
         
         # 情感表达库
         self.emotion_expressions = {
@@ -177,29 +311,50 @@ class EmotionalSystem:
         # 最近的情感状态
         self.recent_emotions = deque(maxlen=10)
     
+    @property
+    def emotions(self):
+        """情感强度的字典视图（已衰减到当前时间）"""
+        self._apply_decay()
+        return EmotionVector(self)
+    
+    @property
+    def emotion_connections(self):
+        """嵌套字典形式的情感关联（由关联矩阵生成）"""
+        matrix = self.connection_matrix
+        return {
+            EMOTION_TYPES[i]: {EMOTION_TYPES[j]: float(matrix[i, j]) for j in np.flatnonzero(matrix[i])}
+            for i in range(NUM_EMOTIONS) if matrix[i].any()
+        }
+    
     def trigger_emotion(self, emotion_type, intensity, trigger):
         """触发情感"""
         # 确保强度在有效范围内
         intensity = max(0.0, min(1.0, intensity))
         
-        # 应用情感强度
-        old_intensity = self.emotions[emotion_type]
-        self.emotions[emotion_type] = min(1.0, self.emotions[emotion_type] + intensity)
-        new_intensity = self.emotions[emotion_type]
+        # 先衰减到当前时间，再应用情感强度
+        self._apply_decay()
+        values = self.values
+        index = EMOTION_INDEX[emotion_type]
+        values[index] = min(1.0, values[index] + intensity)
+        new_intensity = float(values[index])
         
         # 情感关联影响
         self._apply_emotion_connections(emotion_type, intensity)
         
+        return self._record_trigger(emotion_type, intensity, new_intensity, trigger)
+    
+    def _record_trigger(self, emotion_type, intensity, new_intensity, trigger):
+        """记录情感事件、触发因素和情感记忆"""
         # 创建情感事件
-        event = EmotionEvent(emotion_type, intensity, trigger)
+        now = get_clock(self.pet).now()
+        event = EmotionEvent(emotion_type, intensity, trigger, now)
         self.emotion_history.append(event)
         self.recent_emotions.append((emotion_type, new_intensity))
+        self.mark_dirty("state")
+        self.mark_appended("history")
         
         # 记录触发因素
-        self.emotion_triggers[emotion_type].append((trigger, intensity, datetime.now()))
-        
-        # 情感衰减（情感会随时间减弱）
-        self._decay_emotions()
+        self.emotion_triggers[emotion_type].append((trigger, intensity, now))
         
         # 形成情感记忆
         if intensity > 0.5:
@@ -209,22 +364,22 @@ class EmotionalSystem:
     
     def _apply_emotion_connections(self, emotion_type, intensity):
         """应用情感关联影响"""
-        if emotion_type in self.emotion_connections:
-            for connected_emotion, connection_strength in self.emotion_connections[emotion_type].items():
-                influence = intensity * connection_strength
-                if influence != 0:
-                    new_intensity = self.emotions[connected_emotion] + influence
-                    self.emotions[connected_emotion] = max(0.0, min(1.0, new_intensity))
+        values = self.values
+        values += intensity * self.connection_matrix[EMOTION_INDEX[emotion_type]]
+        np.clip(values, 0.0, 1.0, out=values)
     
-    def _decay_emotions(self):
-        """情感衰减"""
-        decay_rate = 0.03  # 衰减速率
-        for emotion_type in self.emotions:
-            if emotion_type != EmotionType.CALM:  # 平静状态不衰减
-                self.emotions[emotion_type] = max(0.05, self.emotions[emotion_type] - decay_rate)
+    def _apply_decay(self, now=None):
+        """将情感衰减到当前时间（平静状态不衰减，而是自然恢复）
         
-        # 平静状态会自然恢复
-        self.emotions[EmotionType.CALM] = min(0.8, self.emotions[EmotionType.CALM] + 0.03)
+        Args:
+            now (float, optional): 当前时间戳，默认为宠物时钟的当前时间
+        """
+        if now is None:
+            now = get_clock(self.pet).time()
+        elapsed = now - self.last_decay_time
+        if elapsed > 0:
+            decay_emotion_values(self.values, elapsed)
+            self.last_decay_time = now
     
     def _form_emotion_memory(self, emotion_type, intensity, trigger):
         """形成情感记忆"""
@@ -232,7 +387,7 @@ class EmotionalSystem:
             "emotion_type": emotion_type,
             "intensity": intensity,
             "trigger": trigger,
-            "timestamp": datetime.now(),
+            "timestamp": get_clock(self.pet).now(),
             "recall_strength": intensity
         }
         self.emotion_memories.append(memory)
@@ -240,10 +395,12 @@ class EmotionalSystem:
         # 限制记忆长度
         if len(self.emotion_memories) > self.max_memory_length:
             self.emotion_memories.pop(0)
+        self.mark_dirty("memories")
     
     def get_dominant_emotion(self):
         """获取当前主导情感"""
-        return max(self.emotions.items(), key=lambda x: x[1])[0]
+        self._apply_decay()
+        return EMOTION_TYPES[int(np.argmax(self.values))]
     
     def get_emotional_state(self):
         """获取情感状态"""
@@ -264,10 +421,11 @@ class EmotionalSystem:
     
     def get_mood(self):
         """获取整体情绪状态"""
-        joy = self.emotions[EmotionType.JOY]
-        sadness = self.emotions[EmotionType.SADNESS]
-        anger = self.emotions[EmotionType.ANGER]
-        calm = self.emotions[EmotionType.CALM]
+        emotions = self.emotions
+        joy = emotions[EmotionType.JOY]
+        sadness = emotions[EmotionType.SADNESS]
+        anger = emotions[EmotionType.ANGER]
+        calm = emotions[EmotionType.CALM]
         
         if joy > 0.7:
             return "非常开心"
@@ -279,16 +437,18 @@ class EmotionalSystem:
             return "愤怒"
         elif calm > 0.7:
             return "平静"
-        elif self.emotions[EmotionType.ANXIETY] > 0.6:
+        elif emotions[EmotionType.ANXIETY] > 0.6:
             return "焦虑"
-        elif self.emotions[EmotionType.EXCITEMENT] > 0.7:
+        elif emotions[EmotionType.EXCITEMENT] > 0.7:
             return "兴奋"
         else:
             return "中性"
     
     def get_emotion_intensity(self, emotion_type):
         """获取特定情感的强度"""
-        return self.emotions.get(emotion_type, 0.0)
+        index = EMOTION_INDEX.get(emotion_type)
+        self._apply_decay()
+        return float(self.values[index]) if index is not None else 0.0
     
     def recall_emotion_memory(self, trigger_similarity):
         """回忆情感记忆"""
@@ -304,47 +464,72 @@ class EmotionalSystem:
             memory = random.choice(strong_memories)
             # 减弱记忆强度
             memory["recall_strength"] *= 0.8
+            self.mark_dirty("memories")
             return memory
         return None
     
-    def update_emotional_state(self, time_passed):
-        """更新情感状态（随时间）"""
-        # 情感衰减
-        decay_factor = time_passed / 60.0 * 0.05  # 每分钟衰减
-        for emotion_type in self.emotions:
-            if emotion_type != EmotionType.CALM:
-                self.emotions[emotion_type] = max(0.05, self.emotions[emotion_type] - decay_factor)
+    def update_emotional_state(self, time_passed=None):
+        """更新情感状态（随时间）
         
-        # 平静状态恢复
-        self.emotions[EmotionType.CALM] = min(0.8, self.emotions[EmotionType.CALM] + decay_factor * 0.5)
+        Args:
+            time_passed (float, optional): 保留参数；衰减按上次衰减的时间戳计算，不再需要传入经过的时间
+        
+        Notes:
+            - 读取情感时会自动衰减，不需要定期调用
+        """
+        self._apply_decay()
     
     def to_dict(self):
         """序列化情感系统状态"""
         return {
             "emotions": {k.value: v for k, v in self.emotions.items()},
+            "last_decay_time": self.last_decay_time,
             "emotion_history": [e.to_dict() for e in self.emotion_history],
-            "emotion_memories": [
-                {
-                    "emotion_type": m["emotion_type"].value,
-                    "intensity": m["intensity"],
-                    "trigger": m["trigger"],
-                    "timestamp": m["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
-                    "recall_strength": m["recall_strength"]
-                }
-                for m in self.emotion_memories
-            ]
+            "emotion_memories": [self._memory_to_dict(m) for m in self.emotion_memories]
         }
     
+    @staticmethod
+    def _memory_to_dict(memory):
+        return {
+            "emotion_type": memory["emotion_type"].value,
+            "intensity": memory["intensity"],
+            "trigger": memory["trigger"],
+            "timestamp": memory["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+            "recall_strength": memory["recall_strength"]
+        }
+    
+    def journal_section(self, section):
+        """增量存档的数据段"""
+        if section == "state":
+            # 保存未衰减的向量和对应的时间戳，读取时再衰减，衰减本身不产生修改
+            return {
+                "emotions": {t.value: float(v) for t, v in zip(EMOTION_TYPES, self.values)},
+                "last_decay_time": self.last_decay_time
+            }
+        if section == "history":
+            return [e.to_dict() for e in self.emotion_history]
+        return [self._memory_to_dict(m) for m in self.emotion_memories]
+    
+    def journal_tail(self, section, count):
+        """情感历史只写入新增的事件"""
+        history = self.emotion_history
+        if section != "history" or count >= len(history):
+            return None
+        return [history[i].to_dict() for i in range(len(history) - count, len(history))], history.maxlen
+    
     def from_dict(self, data):
         """从序列化数据恢复情感系统状态"""
         if "emotions" in data:
             for emotion_name, intensity in data["emotions"].items():
                 try:
                     emotion_type = EmotionType(emotion_name)
-                    self.emotions[emotion_type] = intensity
+                    self.values[EMOTION_INDEX[emotion_type]] = intensity
                 except ValueError:
                     pass
         
+        if "last_decay_time" in data:
+            self.last_decay_time = data["last_decay_time"]
+        
         if "emotion_history" in data:
             self.emotion_history = deque([EmotionEvent.from_dict(e) for e in data["emotion_history"]], maxlen=200)
         
@@ -362,3 +547,38 @@ class EmotionalSystem:
                     self.emotion_memories.append(memory)
                 except ValueError:
                     pass
+        
+        self.mark_dirty()
+
+
+def trigger_emotions(systems, emotion_type, intensities, trigger):
+    """为多只宠物同时触发同一种情感
+
+    Args:
+        systems (list): EmotionalSystem 列表
+        emotion_type (EmotionType): 情感类型
+        intensities (float or array-like): 触发强度，可以是单个值或每只宠物一个值
+        trigger (str): 触发原因
+
+    Returns:
+        list: 每只宠物的情感事件
+
+    Notes:
+        - 数值部分在 (n, NUM_EMOTIONS) 情感矩阵上一次完成，使用默认的情感关联矩阵
+    """
+    if not systems:
+        return []
+    for system in systems:
+        system._apply_decay()
+    count = len(systems)
+    index = EMOTION_INDEX[emotion_type]
+    values = np.stack([system.values for system in systems])
+    intensities = np.clip(np.broadcast_to(np.asarray(intensities, dtype=np.float64), (count,)), 0.0, 1.0)
+    new_intensities = np.minimum(1.0, values[:, index] + intensities)
+    apply_emotion_triggers(values, np.full(count, index), intensities)
+
+    events = []
+    for system, row, intensity, new_intensity in zip(systems, values, intensities, new_intensities):
+        system.values[:] = row
+        events.append(system._record_trigger(emotion_type, float(intensity), float(new_intensity), trigger))
+    return events
@@ -0,0 +1,194 @@
+"""游戏事件总线
+
+宠物的动作（喂食、玩耍、清洁、睡觉、训练、抚摸等）发布事件，任务、成就、学习、强化学习和
+自动保存等系统订阅事件，动作本身不需要知道有哪些观察者。
+
+EventBus 为每种事件类型预先生成投递函数元组，发布事件只遍历该元组；订阅和取消订阅时
+重新生成元组（写时复制），投递过程中修改订阅不影响本次投递。投递方式：
+    - DELIVERY_SYNC：发布时立即调用 callback(event)
+    - DELIVERY_DEFERRED：事件先排队，flush 时按订阅者批量调用 callback(events)
+    - DELIVERY_ASYNC：callback 为协程函数，在运行中的事件循环上创建任务；
+      没有运行中的事件循环时排队，flush 时在运行中的事件循环上创建任务，
+      仍然没有事件循环时依次运行
+"""
+import asyncio
+import contextlib
+from collections import namedtuple
+from enum import Enum
+from functools import partial
+from .clock import get_clock
+
+
+class EventType(Enum):
+    """游戏事件类型（值与成就定义中的事件名一致）"""
+    FEED = "feed"  # 喂食
+    PLAY = "play"  # 玩耍
+    CLEAN = "clean"  # 清洁
+    SLEEP = "sleep"  # 睡觉
+    WAKE_UP = "wake_up"  # 醒来
+    TRAIN = "train"  # 训练
+    PET = "pet"  # 抚摸
+    CHANGE_COLOR = "change_color"  # 改变颜色
+    INTERACTION = "interaction"  # 用户交互（IntelligentPet.interact_with_user）
+
+
+# 宠物动作事件（不包括带学习数据的 INTERACTION）
+ACTION_EVENTS = (
+    EventType.FEED, EventType.PLAY, EventType.CLEAN, EventType.SLEEP, EventType.WAKE_UP,
+    EventType.TRAIN, EventType.PET, EventType.CHANGE_COLOR
+)
+
+# 事件来源
+SOURCE_USER = "user"  # 用户发起的动作
+SOURCE_PET = "pet"  # 宠物自发的动作，或动作中连带发生的动作（例如吃完后自动睡觉）
+
+DELIVERY_SYNC = "sync"
+DELIVERY_DEFERRED = "deferred"
+DELIVERY_ASYNC = "async"
+
+# 游戏事件：类型、宠物、来源、时间戳、附加数据
+GameEvent = namedtuple("GameEvent", ["type", "pet", "source", "time", "data"])
+
+
+class EventBus:
+    """事件总线"""
+
+    def __init__(self):
+        self._subscriptions = []  # (事件类型元组, 回调, 投递方式)
+        self._delivery = {}  # 事件类型 -> 投递函数元组
+        self._pending = {}  # 延迟投递：回调 -> 事件列表
+        self._async_backlog = []  # 没有事件循环时排队的 (协程函数, 事件)
+        self._tasks = set()  # 运行中的异步投递任务
+
+    def subscribe(self, event_types, callback, delivery=DELIVERY_SYNC):
+        """订阅事件
+
+        Args:
+            event_types (EventType or iterable): 事件类型
+            callback (callable): 回调；延迟投递时参数为事件列表，异步投递时为协程函数
+            delivery (str, optional): 投递方式，DELIVERY_SYNC、DELIVERY_DEFERRED 或 DELIVERY_ASYNC
+
+        Returns:
+            callable: callback，便于之后取消订阅
+        """
+        if isinstance(event_types, EventType):
+            event_types = (event_types,)
+        if delivery not in (DELIVERY_SYNC, DELIVERY_DEFERRED, DELIVERY_ASYNC):
+            raise ValueError(f"未知的投递方式: {delivery}")
+        self._subscriptions.append((tuple(event_types), callback, delivery))
+        self._rebuild()
+        return callback
+
+    def unsubscribe(self, callback):
+        """取消回调的所有订阅
+
+        Returns:
+            bool: 是否有订阅被取消
+        """
+        count = len(self._subscriptions)
+        self._subscriptions = [s for s in self._subscriptions if s[1] != callback]
+        self._rebuild()
+        return len(self._subscriptions) < count
+
+    def _rebuild(self):
+        """重新生成每种事件类型的投递函数元组"""
+        delivery = {}
+        for event_types, callback, mode in self._subscriptions:
+            if mode == DELIVERY_SYNC:
+                deliver = callback
+            elif mode == DELIVERY_DEFERRED:
+                deliver = partial(self._enqueue, callback)
+            else:
+                deliver = partial(self._schedule, callback)
+            for event_type in event_types:
+                delivery.setdefault(event_type, []).append(deliver)
+        self._delivery = {event_type: tuple(funcs) for event_type, funcs in delivery.items()}
+
+    def has_subscribers(self, event_type):
+        """是否有订阅者"""
+        return event_type in self._delivery
+
+    def emit(self, event_type, pet=None, source=SOURCE_USER, **data):
+        """发布事件
+
+        Args:
+            event_type (EventType): 事件类型
+            pet (Pet, optional): 发布事件的宠物，时间戳取自宠物的时钟
+            source (str, optional): 事件来源，SOURCE_USER 或 SOURCE_PET
+            **data: 附加数据
+
+        Returns:
+            GameEvent: 发布的事件，没有订阅者时返回 None（不创建事件）
+        """
+        delivery = self._delivery.get(event_type)
+        if delivery is None:
+            return None
+        event = GameEvent(event_type, pet, source, get_clock(pet).time(), data)
+        for deliver in delivery:
+            deliver(event)
+        return event
+
+    def _enqueue(self, callback, event):
+        events = self._pending.get(callback)
+        if events is None:
+            self._pending[callback] = [event]
+        else:
+            events.append(event)
+
+    def _schedule(self, callback, event):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._async_backlog.append((callback, event))
+            return
+        self._create_task(loop, callback, event)
+
+    def _create_task(self, loop, callback, event):
+        task = loop.create_task(callback(event))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def pending(self):
+        """排队等待投递的事件数量"""
+        return sum(len(events) for events in self._pending.values()) + len(self._async_backlog)
+
+    def flush(self):
+        """投递排队的事件
+
+        Returns:
+            int: 投递的事件数量
+
+        Notes:
+            - 在事件循环中调用时，排队的异步事件在该循环上创建任务（可通过 drain 等待完成）
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        delivered = 0
+        while self._pending or self._async_backlog:
+            pending, self._pending = self._pending, {}
+            for callback, events in pending.items():
+                callback(events)
+                delivered += len(events)
+            backlog, self._async_backlog = self._async_backlog, []
+            for callback, event in backlog:
+                if loop is None:
+                    asyncio.run(callback(event))
+                else:
+                    self._create_task(loop, callback, event)
+                delivered += 1
+        return delivered
+
+    async def drain(self):
+        """等待运行中的异步投递完成（在事件循环中调用）"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+    @contextlib.contextmanager
+    def deferred(self):
+        """在 with 块结束时投递排队的事件，用于批量执行动作"""
+        try:
+            yield self
+        finally:
+            self.flush()
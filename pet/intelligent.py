@@ -1,7 +1,8 @@
-import time
 from collections import defaultdict, Counter
 from .base import Pet
 from .config import PetConfig
+from .vitals import PetVitals
+from .events import EventType, SOURCE_USER
 from .systems.decision import DecisionSystem
 from .systems.behavior import BehaviorSystem, BehaviorTreeBuilder
 from .systems.learning import LearningSystem
@@ -9,8 +10,8 @@ from .systems.reinforcement import ReinforcementLearningSystem
 
 class IntelligentPet(Pet):
     """智能宠物类 - 第二阶段强化学习智能体"""
-    def __init__(self, name="未命名", species="未知"):
-        super().__init__(name, species)
+    def __init__(self, name="未命名", species="未知", clock=None):
+        super().__init__(name, species, clock=clock)
         
         # 智能体相关属性
         self.decision_system = DecisionSystem(self)
@@ -24,12 +25,16 @@ class IntelligentPet(Pet):
         self.behavior_tree = BehaviorTreeBuilder.build_pet_behavior_tree()
         
         # 主动行为相关
-        self.last_spontaneous_action = time.time()
+        self.last_spontaneous_action = self.clock.time()
         self.spontaneous_action_cooldown = PetConfig.SPONTANEOUS_ACTION_COOLDOWN  # 自发行为冷却时间（秒）
         
         # 用户偏好记录
         self.user_preferences = defaultdict(Counter)
         
+        # 学习系统和强化学习通过事件总线接收用户交互
+        self.event_bus.subscribe(EventType.INTERACTION, self._learn_from_interaction)
+        self.event_bus.subscribe(EventType.INTERACTION, self._reinforce_from_interaction)
+        
         print(f"🧠 智能宠物 {name} 已激活！")
         print(f"🚀 强化学习系统已启动！")
         print(f"🌳 行为树系统已初始化！")
@@ -40,7 +45,7 @@ class IntelligentPet(Pet):
         
         # 检查是否需要执行自发行为
         if current_time is None:
-            current_time = time.time()
+            current_time = self.clock.time()
         
         # 防止递归调用：只在非递归调用时执行自发行为
         if not hasattr(self, '_updating') or not self._updating:
@@ -52,31 +57,42 @@ class IntelligentPet(Pet):
                 finally:
                     self._updating = False
     
+    def _binary_sections(self):
+        """二进制存档同时保存强化学习数据（包括经验回放缓冲区）"""
+        sections = super()._binary_sections()
+        sections.update(self.reinforcement_learning.to_binary_sections())
+        return sections
+    
+    def _restore_binary_sections(self, sections):
+        """从二进制存档恢复强化学习数据"""
+        self.reinforcement_learning.restore_binary_sections(sections)
+    
+    def next_spontaneous_action_time(self):
+        """获取下一次自发行为的时间（冷却结束时）"""
+        return self.last_spontaneous_action + self.spontaneous_action_cooldown
+    
     def execute_spontaneous_action(self):
         """执行自发行为（使用强化学习和行为树）"""
         # 第二阶段：优先使用强化学习决策
         # 1. 获取当前的离散状态，用于强化学习决策
         state_before = self.reinforcement_learning.get_discrete_state()
+        # 记录执行前的数值快照，用于计算奖励
+        vitals_before = self.get_vitals()
         # 2. 使用强化学习系统选择一个动作
         action = self.reinforcement_learning.choose_action(state_before)
         
         if action:
-            # 3. 执行选择的行为
-            result = self._execute_action(action)
+            # 3. 执行选择的行为（自发行为不计入任务和成就）
+            with self.autonomous():
+                result = self._execute_action(action)
             
             # 4. 评估执行后的状态
             state_after = self.reinforcement_learning.get_discrete_state()
+            vitals_after = self.get_vitals()
             
-            # 5. 计算奖励 - 直接使用原始状态字典
-            # 获取执行前后的详细状态，使用 force_update=False 避免不必要的更新
-            status_before = self.get_status(force_update=False)
-            status_after = self.get_status(force_update=False)
-            # 提取需要的状态值（如饥饿、能量、清洁度等）
-            state_dict_before = self._extract_state_values(status_before)
-            state_dict_after = self._extract_state_values(status_after)
-            # 使用强化学习系统计算奖励
+            # 5. 使用执行前后的数值快照计算奖励
             reward = self.reinforcement_learning.calculate_reward(
-                state_dict_before, action, state_dict_after
+                vitals_before, action, vitals_after
             )
             
             # 6. 强化学习 - 根据执行结果更新Q-table
@@ -116,6 +132,10 @@ class IntelligentPet(Pet):
     
     def interact_with_user(self, interaction_type, **kwargs):
         """与用户交互并学习"""
+        # 记录交互前的状态，用于强化学习
+        state_before = self.reinforcement_learning.get_discrete_state()
+        vitals_before = self.get_vitals()
+        
         # 执行传统交互
         if interaction_type == "feed":
             food_type = kwargs.get("food_type", "普通食物")
@@ -142,40 +162,53 @@ class IntelligentPet(Pet):
         else:
             result = "未知交互类型"
         
-        # 记录用户交互偏好
-        self.learning_system.record_user_interaction(interaction_type, kwargs)
-        
-        # 学习系统更新
-        self.learning_system.learn_from_interaction(interaction_type, result)
+        # 发布交互事件，学习系统和强化学习在订阅的回调中更新
+        self.event_bus.emit(
+            EventType.INTERACTION, self, SOURCE_USER,
+            interaction_type=interaction_type, kwargs=kwargs, result=result,
+            state_before=state_before, vitals_before=vitals_before
+        )
         
-        # 第二阶段：强化学习更新
-        state_before = self.reinforcement_learning.get_discrete_state()
-        # 将用户交互映射到强化学习动作
-        rl_action = self._map_interaction_to_rl_action(interaction_type)
+        return result
+    
+    def _learn_from_interaction(self, event):
+        """记录用户交互偏好并更新学习系统"""
+        if event.pet is not self:
+            return
+        data = event.data
+        self.learning_system.record_user_interaction(data["interaction_type"], data["kwargs"])
+        self.learning_system.learn_from_interaction(data["interaction_type"], data["result"])
+    
+    def _reinforce_from_interaction(self, event):
+        """将用户交互映射到强化学习动作，根据交互前后的数值快照更新Q-table"""
+        if event.pet is not self:
+            return
+        data = event.data
+        rl_action = self._map_interaction_to_rl_action(data["interaction_type"])
         if rl_action:
             state_after = self.reinforcement_learning.get_discrete_state()
-            # 直接使用原始状态字典计算奖励
-            status_before = self.get_status()
-            status_after = self.get_status()
-            # 提取需要的状态值
-            state_dict_before = self._extract_state_values(status_before)
-            state_dict_after = self._extract_state_values(status_after)
+            vitals_after = self.get_vitals()
             reward = self.reinforcement_learning.calculate_reward(
-                state_dict_before, rl_action, state_dict_after
+                data["vitals_before"], rl_action, vitals_after
             )
-            self.reinforcement_learning.learn(state_before, rl_action, reward, state_after, False)
-        
-        return result
+            self.reinforcement_learning.learn(data["state_before"], rl_action, reward, state_after, False)
     
-    def _extract_state_values(self, status):
-        """从状态字典中提取需要的数值"""
-        return {
-            "hunger": float(status["hunger"].split("/")[0]),
-            "energy": float(status["energy"].split("/")[0]),
-            "hygiene": float(status["hygiene"].split("/")[0]),
-            "happiness": float(status["happiness"].split("/")[0]),
-            "health": float(status["health"].split("/")[0])
-        }
+    def _extract_state_values(self, status=None):
+        """提取强化学习奖励计算需要的数值
+        
+        Args:
+            status (PetVitals | dict, optional): 数值快照或 get_status() 返回的字典，
+                默认为None，读取当前数值快照
+        
+        Returns:
+            dict: 饥饿、能量、清洁度、快乐度和健康值
+        """
+        if status is None:
+            status = self.get_vitals()
+        if isinstance(status, PetVitals):
+            return {key: getattr(status, key) for key in PetVitals.STATE_FIELDS}
+        # 兼容旧的格式化状态字典
+        return {key: float(str(status[key]).split("/")[0]) for key in PetVitals.STATE_FIELDS}
     
     def _map_interaction_to_rl_action(self, interaction_type):
         """将用户交互映射到强化学习动作"""
@@ -214,7 +247,7 @@ class IntelligentPet(Pet):
             "exploration_rate": self.reinforcement_learning.exploration_rate,
             "average_reward": self.reinforcement_learning.average_reward,
             "learning_steps": self.reinforcement_learning.learning_steps,
-            "q_table_size": sum(len(v) for v in self.reinforcement_learning.q_table.values())
+            "q_table_size": self.reinforcement_learning.get_learning_stats()["q_table_size"]
         }
     
     def beg_for_food(self):
@@ -0,0 +1,447 @@
+"""增量存档
+
+DirtyTracking 记录对象自上次保存以来修改过的数据段；PetJournal 把宠物及其子系统保存为
+快照加追加日志：
+
+    <path>          快照，二进制存档容器，每个数据段一个记录段，另有 journal 段记录世代号；
+                    通过临时文件 + os.replace 原子替换
+    <path>.journal  追加日志，头部 struct "<4sHHQ"（魔数 b"VPJL"、版本、保留、世代号），
+                    之后每条记录为 struct "<II"（长度、CRC32）+ 记录编码 {段名: 操作}
+
+保存时只把修改过的段写入日志（整段重写，或只追加新记录），日志超过快照大小的一定倍数时
+压缩：写入新快照（世代号加一）并清空日志。加载时读取快照再按顺序重放世代号相同的日志，
+末尾写了一半或校验失败的记录（写入时崩溃）会被丢弃。
+"""
+import contextlib
+import os
+import struct
+import zlib
+from . import binfmt
+
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_MAGIC = b"VPJL"
+JOURNAL_VERSION = 1
+JOURNAL_HEADER = struct.Struct("<4sHHQ")
+RECORD_HEADER = struct.Struct("<II")
+
+# 日志超过快照大小的 COMPACT_RATIO 倍（且不小于 MIN_COMPACT_SIZE 字节）时压缩
+COMPACT_RATIO = 2.0
+MIN_COMPACT_SIZE = 64 * 1024
+
+OP_SET = "set"
+OP_APPEND = "append"
+
+
+@contextlib.contextmanager
+def atomic_write(file_path, mode="wb", encoding=None, sync=True):
+    """原子写入文件
+
+    先写入同目录下的临时文件，写完并刷新到磁盘后替换目标文件；写入失败时目标文件保持不变。
+
+    Args:
+        file_path (str): 目标文件路径
+        mode (str, optional): 打开模式，"wb" 或 "w"
+        encoding (str, optional): 文本模式的编码
+        sync (bool, optional): 替换前是否调用 fsync
+    """
+    temp_path = f"{file_path}.tmp"
+    try:
+        with open(temp_path, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+class DirtyTracking:
+    """脏段跟踪（混入类）
+
+    子类在 JOURNAL_SECTIONS 中声明数据段（段名 -> to_dict 中的键，None 表示该段是合并到
+    to_dict 顶层的字典），实现 journal_section 返回段数据；可追加的段另外实现 journal_tail。
+    修改数据后调用 mark_dirty（整段重写）或 mark_appended（只写入新追加的记录）。
+
+    journal_section 和 journal_tail 返回的数据可能在后台线程编码，不能与对象共享之后还会
+    修改的容器。
+    """
+    JOURNAL_SECTIONS = {}
+
+    def _init_dirty_tracking(self):
+        """初始化跟踪状态（新对象的所有数据段都需要写入）"""
+        self._dirty_sections = set(self.JOURNAL_SECTIONS)
+        self._appended_counts = {}
+
+    def mark_dirty(self, *sections):
+        """标记数据段需要整段重写，不指定时标记全部数据段"""
+        self._dirty_sections.update(sections or self.JOURNAL_SECTIONS)
+
+    def mark_appended(self, section, count=1):
+        """标记数据段末尾追加了 count 条记录"""
+        self._appended_counts[section] = self._appended_counts.get(section, 0) + count
+
+    def is_dirty(self):
+        """自上次保存以来是否有修改"""
+        return bool(self._dirty_sections or self._appended_counts)
+
+    def clear_dirty(self):
+        """清除修改标记（数据已与存档一致）"""
+        self._dirty_sections.clear()
+        self._appended_counts.clear()
+    
+    def take_dirty(self):
+        """取出修改过的数据段（包括只追加的段）并清除标记"""
+        sections = self._dirty_sections | set(self._appended_counts)
+        self.clear_dirty()
+        return sections
+
+    def journal_section(self, section):
+        """数据段的可编码数据"""
+        raise NotImplementedError
+
+    def journal_tail(self, section, count):
+        """可追加段最后 count 条记录
+
+        Returns:
+            tuple: (记录列表, 长度上限)；无法只写入追加的记录时返回 None
+        """
+        return None
+
+    def journal_snapshot(self):
+        """所有数据段"""
+        return {section: self.journal_section(section) for section in self.JOURNAL_SECTIONS}
+
+    def collect_changes(self):
+        """取出自上次保存以来的修改并清除标记
+
+        Returns:
+            dict: 段名 -> 操作，[OP_SET, 数据] 或 [OP_APPEND, 新记录, 长度上限]
+        """
+        changes = {section: [OP_SET, self.journal_section(section)] for section in self._dirty_sections}
+        for section, count in self._appended_counts.items():
+            if section in changes:
+                continue
+            tail = self.journal_tail(section, count)
+            if tail is None:
+                changes[section] = [OP_SET, self.journal_section(section)]
+            else:
+                changes[section] = [OP_APPEND, *tail]
+        self.clear_dirty()
+        return changes
+
+    @classmethod
+    def assemble(cls, sections):
+        """把数据段还原为 to_dict 格式的字典"""
+        data = {}
+        for section, key in cls.JOURNAL_SECTIONS.items():
+            if section not in sections:
+                continue
+            if key is None:
+                data.update(sections[section])
+            else:
+                data[key] = sections[section]
+        return data
+
+
+def apply_operation(sections, name, operation):
+    """对数据段应用一条日志操作"""
+    if operation[0] == OP_APPEND:
+        _, items, maxlen = operation
+        merged = list(sections.get(name) or []) + items
+        sections[name] = merged[-maxlen:] if maxlen else merged
+    elif operation[0] == OP_SET:
+        sections[name] = operation[1]
+    else:
+        raise binfmt.BinaryFormatError(f"未知的日志操作: {operation[0]}")
+
+
+def merge_records(older, newer):
+    """合并两条日志记录（依次应用两条记录与应用合并后的记录结果相同）"""
+    merged = dict(older)
+    for name, operation in newer.items():
+        previous = merged.get(name)
+        if operation[0] == OP_APPEND and previous is not None:
+            _, items, maxlen = operation
+            if previous[0] == OP_SET:
+                sections = {name: previous[1]}
+                apply_operation(sections, name, operation)
+                operation = [OP_SET, sections[name]]
+            else:
+                combined = previous[1] + items
+                operation = [OP_APPEND, combined[-maxlen:] if maxlen else combined, maxlen]
+        merged[name] = operation
+    return merged
+
+
+class PetJournal:
+    """宠物增量存档（快照 + 追加日志）"""
+
+    def __init__(self, path, compact_ratio=COMPACT_RATIO, min_compact_size=MIN_COMPACT_SIZE, sync=True):
+        """初始化存档
+
+        Args:
+            path (str): 快照文件路径，日志保存在 path + ".journal"
+            compact_ratio (float, optional): 日志超过快照大小的多少倍时压缩
+            min_compact_size (int, optional): 触发压缩的最小日志大小（字节）
+            sync (bool, optional): 写入后是否调用 fsync
+        """
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compact_ratio = compact_ratio
+        self.min_compact_size = min_compact_size
+        self.sync = sync
+        # 当前快照的世代号；None 表示本会话尚未加载或写入快照
+        self.generation = None
+        self.snapshot_size = 0
+        self.journal_size = 0
+        self.sections = {}
+
+    @staticmethod
+    def _parts(pet, social_system=None, task_system=None, achievement_system=None):
+        """要保存的对象：段名前缀 -> 对象"""
+        parts = {"pet": pet, "emotion": pet.emotional_system}
+        for prefix, system in (("social", social_system), ("tasks", task_system), ("achievements", achievement_system)):
+            if system is not None:
+                parts[prefix] = system
+        return parts
+
+    def collect(self, pet, social_system=None, task_system=None, achievement_system=None, full=False):
+        """收集修改过的数据段（在修改数据的线程上调用）
+
+        Args:
+            pet (Pet): 宠物
+            social_system (SocialSystem, optional): 社交系统
+            task_system (TaskSystem, optional): 任务系统
+            achievement_system (AchievementSystem, optional): 成就系统
+            full (bool, optional): 收集所有数据段；本会话尚未加载或写入快照时总是收集全部
+
+        Returns:
+            dict: 交给 commit 写入的日志记录，没有修改时返回 None
+        """
+        parts = self._parts(pet, social_system, task_system, achievement_system)
+        full = full or self.generation is None
+        record = {}
+        for prefix, part in parts.items():
+            if full:
+                changes = {section: [OP_SET, data] for section, data in part.journal_snapshot().items()}
+                part.clear_dirty()
+            else:
+                changes = part.collect_changes()
+            for section, operation in changes.items():
+                record[f"{prefix}.{section}"] = operation
+        return record or None
+
+    @staticmethod
+    def merge(older, newer):
+        """合并尚未写入的两条记录"""
+        return merge_records(older, newer)
+
+    def commit(self, record):
+        """写入 collect 收集的记录（可以在后台线程调用）
+
+        Returns:
+            int: 写入的字节数
+
+        Notes:
+            - 本会话第一次写入时写入完整快照
+            - 日志过大时压缩为新快照
+        """
+        if not record:
+            return 0
+        if self.generation is None:
+            # 第一次写入的记录包含所有数据段
+            self.sections = {}
+            for name, operation in record.items():
+                apply_operation(self.sections, name, operation)
+            return self._write_snapshot()
+
+        written = self._append(record)
+        if self.journal_size > max(self.min_compact_size, self.compact_ratio * self.snapshot_size):
+            written += self._write_snapshot()
+        return written
+
+    def save(self, pet, social_system=None, task_system=None, achievement_system=None):
+        """保存修改过的数据段
+
+        Args:
+            pet (Pet): 宠物
+            social_system (SocialSystem, optional): 社交系统
+            task_system (TaskSystem, optional): 任务系统
+            achievement_system (AchievementSystem, optional): 成就系统
+
+        Returns:
+            int: 写入的字节数，没有修改时为 0
+        """
+        return self.commit(self.collect(pet, social_system, task_system, achievement_system))
+
+    def compact(self):
+        """把当前数据写入新快照并清空日志
+
+        Returns:
+            int: 快照的字节数
+        """
+        if self.generation is None:
+            raise ValueError("尚未加载或保存快照")
+        return self._write_snapshot()
+
+    def _current_generation(self):
+        """已知的最大世代号（尚未读取快照时参考现有日志头，保证新快照不会与旧日志的世代号相同）"""
+        if self.generation is not None:
+            return self.generation
+        try:
+            with open(self.journal_path, "rb") as f:
+                header = f.read(JOURNAL_HEADER.size)
+        except OSError:
+            return 0
+        if len(header) < JOURNAL_HEADER.size:
+            return 0
+        magic, _, _, generation = JOURNAL_HEADER.unpack(header)
+        return generation if magic == JOURNAL_MAGIC else 0
+
+    def _write_snapshot(self):
+        """把 self.sections 写入新快照（世代号加一）并重置日志"""
+        generation = self._current_generation() + 1
+        sections = {"journal": {"generation": generation, "version": JOURNAL_VERSION}, **self.sections}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with atomic_write(self.path, sync=self.sync) as f:
+            binfmt.dump(sections, f)
+        # 先替换快照再重置日志：两步之间崩溃时，旧日志的世代号与新快照不同，加载时会被忽略
+        self._reset_journal(generation)
+        self.generation = generation
+        self.snapshot_size = os.path.getsize(self.path)
+        return self.snapshot_size
+
+    def _reset_journal(self, generation):
+        with atomic_write(self.journal_path, sync=self.sync) as f:
+            f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, 0, generation))
+        self.journal_size = JOURNAL_HEADER.size
+
+    def _append(self, record):
+        payload = binfmt.pack(record)
+        data = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with open(self.journal_path, "ab") as f:
+            f.write(data)
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        self.journal_size += len(data)
+        # 内存中保留一份当前数据，压缩时直接写入快照，不需要访问宠物对象
+        for name, operation in record.items():
+            apply_operation(self.sections, name, operation)
+        return len(data)
+
+    def exists(self):
+        """快照文件是否存在"""
+        return os.path.exists(self.path)
+
+    def read_sections(self):
+        """读取快照并重放日志
+
+        Returns:
+            dict: 段名 -> 数据；快照不存在时返回 None
+
+        Raises:
+            BinaryFormatError: 快照文件损坏
+
+        Notes:
+            - 丢弃日志末尾不完整的记录，之后的保存从有效记录之后继续追加
+        """
+        if not self.exists():
+            return None
+        sections = binfmt.read_container(self.path)
+        meta = sections.pop("journal", None) or {}
+        generation = meta.get("generation", 0)
+
+        valid_size = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+            valid_size = self._replay(data, generation, sections)
+        if valid_size == 0:
+            self._reset_journal(generation)
+        elif valid_size < os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(valid_size)
+        if valid_size:
+            self.journal_size = valid_size
+
+        self.generation = generation
+        self.snapshot_size = os.path.getsize(self.path)
+        self.sections = sections
+        return sections
+
+    @staticmethod
+    def _replay(data, generation, sections):
+        """重放日志记录，返回有效部分的长度（日志头无效或世代号不同时返回 0）"""
+        if len(data) < JOURNAL_HEADER.size:
+            return 0
+        magic, version, _, journal_generation = JOURNAL_HEADER.unpack_from(data, 0)
+        if magic != JOURNAL_MAGIC or version > JOURNAL_VERSION or journal_generation != generation:
+            return 0
+
+        offset = JOURNAL_HEADER.size
+        while offset + RECORD_HEADER.size <= len(data):
+            length, checksum = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            try:
+                record = binfmt.unpack(payload)
+            except binfmt.BinaryFormatError:
+                break
+            for name, operation in record.items():
+                apply_operation(sections, name, operation)
+            offset = start + length
+        return offset
+
+    def group(self, prefix):
+        """某个对象的所有数据段：段名（不含前缀） -> 数据"""
+        head = prefix + "."
+        return {name[len(head):]: data for name, data in self.sections.items() if name.startswith(head)}
+
+    def load(self, cls=None, clock=None):
+        """加载宠物（子系统通过 restore 恢复）
+
+        Args:
+            cls (type, optional): 宠物类，默认为 Pet
+            clock (optional): 宠物使用的时钟
+
+        Returns:
+            Pet: 宠物，快照不存在时返回 None
+        """
+        from .base import Pet
+        from .emotion import EmotionalSystem
+
+        cls = cls or Pet
+        if self.read_sections() is None:
+            return None
+        data = cls.assemble(self.group("pet"))
+        data["emotional_system"] = EmotionalSystem.assemble(self.group("emotion"))
+        pet = cls.from_dict(data, clock=clock)
+        pet.clear_dirty()
+        pet.emotional_system.clear_dirty()
+        return pet
+
+    def restore(self, system, prefix):
+        """从已读取的数据段恢复子系统
+
+        Args:
+            system: 子系统（SocialSystem、TaskSystem 或 AchievementSystem）
+            prefix (str): 段名前缀，"social"、"tasks" 或 "achievements"
+
+        Returns:
+            bool: 存档中是否有该子系统的数据
+        """
+        sections = self.group(prefix)
+        if not sections:
+            return False
+        system.from_dict(type(system).assemble(sections))
+        system.clear_dirty()
+        return True
@@ -0,0 +1,360 @@
+"""宠物种群批量模拟引擎"""
+import numpy as np
+from .base import Pet
+from .clock import SYSTEM_CLOCK, get_clock
+from .config import PetConfig
+from .enums import PetState, PetMood, PetPersonality
+from .vitals import PetVitals
+
+# 年龄阶段划分（天），与 Pet._update_age 一致
+AGE_STAGE_BOUNDS = np.array([1, 7, 14, 30], dtype=np.float64)
+AGE_STAGES = (PetState.BABY, PetState.CHILD, PetState.TEEN, PetState.ADULT, PetState.ELDER)
+
+# 心情划分（快乐度），与 Pet._update_mood 一致
+MOOD_BOUNDS = np.array([10, 30, 50, 70, 90], dtype=np.float64)
+MOODS = (PetMood.DEPRESSED, PetMood.SAD, PetMood.NEUTRAL, PetMood.CONTENT, PetMood.HAPPY, PetMood.ECSTATIC)
+MOOD_INDEX = {mood: i for i, mood in enumerate(MOODS)}
+SAD_MOOD = MOOD_INDEX[PetMood.SAD]
+NEUTRAL_MOOD = MOOD_INDEX[PetMood.NEUTRAL]
+
+
+class PetView:
+    """种群中单只宠物的只读视图，直接读取种群数组，不复制数据"""
+    __slots__ = ("_population", "_index")
+
+    def __init__(self, population, index):
+        self._population = population
+        self._index = index
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def name(self):
+        return self._population.names[self._index]
+
+    @property
+    def health(self):
+        return float(self._population.health[self._index])
+
+    @property
+    def hunger(self):
+        return float(self._population.hunger[self._index])
+
+    @property
+    def energy(self):
+        return float(self._population.energy[self._index])
+
+    @property
+    def hygiene(self):
+        return float(self._population.hygiene[self._index])
+
+    @property
+    def happiness(self):
+        return float(self._population.happiness[self._index])
+
+    @property
+    def age_in_days(self):
+        return float(self._population.age_in_days[self._index])
+
+    @property
+    def is_sleeping(self):
+        return bool(self._population.is_sleeping[self._index])
+
+    @property
+    def state(self):
+        return AGE_STAGES[self._population.state[self._index]]
+
+    @property
+    def mood(self):
+        return MOODS[self._population.mood[self._index]]
+
+    def get_vitals(self):
+        """获取数值快照"""
+        p = self._population
+        i = self._index
+        return PetVitals(
+            float(p.health[i]), float(p.hunger[i]), float(p.energy[i]),
+            float(p.hygiene[i]), float(p.happiness[i]),
+            is_sleeping=bool(p.is_sleeping[i])
+        )
+
+    def __repr__(self):
+        return f"PetView({self.name!r}, index={self._index})"
+
+
+class PetPopulation:
+    """宠物种群模拟引擎
+
+    将大量宠物的饥饿、能量、清洁、快乐、健康和年龄以结构数组（struct-of-arrays）
+    形式保存，按 PetConfig 的速率批量推进时间，可按需查看或物化为 Pet 对象。
+    """
+    _FLOAT_FIELDS = ("health", "hunger", "energy", "hygiene", "happiness", "age_in_days",
+                     "hunger_rate", "hygiene_rate")
+
+    def __init__(self, capacity=64, clock=None):
+        """初始化种群
+
+        Args:
+            capacity (int, optional): 初始容量，超出后自动扩容
+            clock (optional): 时钟，默认为系统时钟；种群时间从时钟的当前时间开始，
+                物化的宠物也使用该时钟
+        """
+        capacity = max(1, int(capacity))
+        self.size = 0
+        for field in self._FLOAT_FIELDS:
+            setattr(self, field, np.zeros(capacity, dtype=np.float64))
+        self.is_sleeping = np.zeros(capacity, dtype=bool)
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.mood = np.full(capacity, NEUTRAL_MOOD, dtype=np.int8)
+        self.names = []
+        self.pets = []  # 绑定的 Pet 对象，纯数组创建的宠物为 None
+        self.clock = clock or SYSTEM_CLOCK
+        self.current_time = self.clock.time()
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self.health)
+
+    def _ensure_capacity(self, needed):
+        """确保容量足够，按倍数扩容"""
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2)
+        for field in self._FLOAT_FIELDS + ("is_sleeping", "state", "mood"):
+            old = getattr(self, field)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, field, new)
+
+    @staticmethod
+    def _personality_rates(hungry, clean):
+        """根据性格计算饥饿和清洁速率"""
+        hunger_rate = PetConfig.HUNGER_RATE
+        if hungry:
+            hunger_rate *= PetConfig.PERSONALITY_FACTORS["HUNGRY"]["hunger_rate_multiplier"]
+        hygiene_rate = PetConfig.HYGIENE_RATE
+        if clean:
+            hygiene_rate *= PetConfig.PERSONALITY_FACTORS["CLEAN"]["hygiene_rate_multiplier"]
+        return hunger_rate, hygiene_rate
+
+    def add(self, pet):
+        """将已有的 Pet 加入种群
+
+        Args:
+            pet (Pet): 要加入的宠物
+
+        Returns:
+            int: 宠物在种群中的索引
+        """
+        index = self.size
+        self._ensure_capacity(index + 1)
+        self.size += 1
+
+        self.health[index] = pet.health
+        self.hunger[index] = pet.hunger
+        self.energy[index] = pet.energy
+        self.hygiene[index] = pet.hygiene
+        self.happiness[index] = pet.happiness
+        self.age_in_days[index] = pet.age_in_days
+        self.is_sleeping[index] = pet.is_sleeping
+        self.state[index] = AGE_STAGES.index(pet.state)
+        self.mood[index] = MOOD_INDEX.get(pet.mood, NEUTRAL_MOOD)
+        self.hunger_rate[index], self.hygiene_rate[index] = self._personality_rates(
+            PetPersonality.HUNGRY in pet.personality_traits,
+            PetPersonality.CLEAN in pet.personality_traits
+        )
+        self.names.append(pet.name)
+        self.pets.append(pet)
+        return index
+
+    @classmethod
+    def from_pets(cls, pets, clock=None):
+        """从 Pet 列表创建种群
+
+        Args:
+            pets (iterable): 宠物
+            clock (optional): 时钟，默认使用第一只宠物的时钟
+        """
+        pets = list(pets)
+        if clock is None and pets:
+            clock = get_clock(pets[0])
+        population = cls(capacity=len(pets), clock=clock)
+        for pet in pets:
+            population.add(pet)
+        return population
+
+    def spawn(self, count, seed=None, name_prefix="宠物"):
+        """批量创建新宠物（不创建 Pet 对象）
+
+        Args:
+            count (int): 创建数量
+            seed (int, optional): 随机种子，用于生成性格
+            name_prefix (str, optional): 名称前缀
+
+        Returns:
+            range: 新宠物的索引范围
+
+        Notes:
+            - 初始数值与 Pet.__init__ 一致
+            - 与 Pet._generate_personality 一样，每种性格有 30% 几率出现
+        """
+        start = self.size
+        end = start + count
+        self._ensure_capacity(end)
+        self.size = end
+
+        rng = np.random.default_rng(seed)
+        hungry = rng.random(count) > 0.7
+        clean = rng.random(count) > 0.7
+
+        self.health[start:end] = 100.0
+        self.hunger[start:end] = 0.0
+        self.energy[start:end] = 100.0
+        self.hygiene[start:end] = 100.0
+        self.happiness[start:end] = 50.0
+        self.age_in_days[start:end] = 0.0
+        self.is_sleeping[start:end] = False
+        self.state[start:end] = 0
+        self.mood[start:end] = NEUTRAL_MOOD
+
+        base_hunger, base_hygiene = self._personality_rates(False, False)
+        hungry_rate, clean_rate = self._personality_rates(True, True)
+        self.hunger_rate[start:end] = np.where(hungry, hungry_rate, base_hunger)
+        self.hygiene_rate[start:end] = np.where(clean, clean_rate, base_hygiene)
+
+        self.names.extend(f"{name_prefix}{i}" for i in range(start, end))
+        self.pets.extend([None] * count)
+        return range(start, end)
+
+    def advance(self, hours_passed, max_step=1.0):
+        """批量推进时间
+
+        Args:
+            hours_passed (float): 经过的小时数
+            max_step (float, optional): 单步最大小时数，较长的时间会被拆分为多个等长步，
+                避免阈值判断（饥饿、清洁、疲劳、自动醒来）一次跨过太多时间
+
+        Returns:
+            int: 本次自动醒来的宠物数量
+        """
+        if hours_passed <= 0 or self.size == 0:
+            return 0
+        steps = 1
+        if max_step and hours_passed > max_step:
+            steps = int(np.ceil(hours_passed / max_step))
+        step_hours = hours_passed / steps
+
+        woke = 0
+        for _ in range(steps):
+            woke += self._step(step_hours)
+        self._update_age(hours_passed)
+        self._update_mood()
+        self.current_time += hours_passed * 3600
+        return woke
+
+    def _step(self, hours):
+        """单步更新需求值，与 Pet._update_needs 的规则一致"""
+        n = self.size
+        hunger = self.hunger[:n]
+        energy = self.energy[:n]
+        hygiene = self.hygiene[:n]
+        happiness = self.happiness[:n]
+        sleeping = self.is_sleeping[:n]
+
+        # 饥饿增长（已包含贪吃性格倍率）
+        np.minimum(hunger + self.hunger_rate[:n] * hours, 100, out=hunger)
+
+        # 睡眠时恢复能量，活跃时消耗能量
+        energy_delta = np.where(sleeping, PetConfig.ENERGY_RATE_SLEEP, -PetConfig.ENERGY_RATE_ACTIVE) * hours
+        np.clip(energy + energy_delta, 0, 100, out=energy)
+
+        # 能量达到100%时自动醒来
+        woke = sleeping & (energy >= 100)
+        sleeping[woke] = False
+
+        # 清洁度下降（已包含爱干净性格倍率）
+        np.maximum(hygiene - self.hygiene_rate[:n] * hours, 0, out=hygiene)
+
+        # 快乐度受其他因素影响
+        happiness_change = np.zeros(n, dtype=np.float64)
+        hungry = hunger > PetConfig.HUNGER_THRESHOLD
+        happiness_change[hungry] -= PetConfig.HAPPINESS_HUNGER_PENALTY * hours
+        happiness_change[~hungry & (hunger < PetConfig.HYGIENE_THRESHOLD)] += PetConfig.HAPPINESS_HUNGER_BONUS * hours
+        happiness_change[hygiene < PetConfig.HYGIENE_THRESHOLD] -= PetConfig.HAPPINESS_HYGIENE_PENALTY * hours
+        happiness_change[energy < PetConfig.ENERGY_THRESHOLD] -= PetConfig.HAPPINESS_ENERGY_PENALTY * hours
+        np.clip(happiness + happiness_change, 0, 100, out=happiness)
+
+        return int(np.count_nonzero(woke))
+
+    def _update_age(self, hours_passed):
+        """批量更新年龄和成长阶段"""
+        n = self.size
+        self.age_in_days[:n] += hours_passed / 24
+        self.state[:n] = np.searchsorted(AGE_STAGE_BOUNDS, self.age_in_days[:n], side="right")
+
+    def _update_mood(self):
+        """批量更新心情（不包含情感系统的影响）"""
+        n = self.size
+        mood = np.searchsorted(MOOD_BOUNDS, self.happiness[:n], side="left").astype(np.int8)
+        mood[self.health[:n] < 30] = SAD_MOOD
+        self.mood[:n] = mood
+
+    def view(self, index):
+        """获取单只宠物的只读视图"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"宠物索引超出范围: {index}")
+        return PetView(self, index)
+
+    def materialize(self, index, pet=None):
+        """将种群中的数值写回 Pet 对象
+
+        Args:
+            index (int): 宠物索引
+            pet (Pet, optional): 目标宠物，默认为绑定的宠物；纯数组宠物会新建 Pet
+
+        Returns:
+            Pet: 同步后的宠物
+
+        Notes:
+            - 心情通过 Pet._update_mood 重新计算，以包含情感系统的影响
+            - 在种群中自动醒来的宠物会清除睡眠开始时间
+        """
+        if not 0 <= index < self.size:
+            raise IndexError(f"宠物索引超出范围: {index}")
+
+        if pet is None:
+            pet = self.pets[index]
+        if pet is None:
+            pet = Pet(self.names[index], clock=self.clock)
+            pet.personality_traits = {}
+            if self.hunger_rate[index] != PetConfig.HUNGER_RATE:
+                pet.personality_traits[PetPersonality.HUNGRY] = 0.8
+            if self.hygiene_rate[index] != PetConfig.HYGIENE_RATE:
+                pet.personality_traits[PetPersonality.CLEAN] = 0.8
+            self.pets[index] = pet
+
+        was_sleeping = pet.is_sleeping
+        pet.health = float(self.health[index])
+        pet.hunger = float(self.hunger[index])
+        pet.energy = float(self.energy[index])
+        pet.hygiene = float(self.hygiene[index])
+        pet.happiness = float(self.happiness[index])
+        pet.age_in_days = float(self.age_in_days[index])
+        pet.is_sleeping = bool(self.is_sleeping[index])
+        if was_sleeping and not pet.is_sleeping:
+            pet.sleep_start_time = None
+        pet.state = AGE_STAGES[self.state[index]]
+        pet._update_mood()
+        pet.last_update_time = self.current_time
+        return pet
+
+    def sync_to_pets(self):
+        """将所有绑定宠物的数值写回 Pet 对象"""
+        for index, pet in enumerate(self.pets):
+            if pet is not None:
+                self.materialize(index, pet)
@@ -0,0 +1,150 @@
+"""异步游戏运行时
+
+GameRuntime 在一个 asyncio 事件循环中同时运行：
+    - 模拟：等待调度器中最早的到期时间（或被唤醒）后执行到期的定时任务，
+      并投递各宠物事件总线中排队的事件；等待输入时需求、自发行为和情感照常推进
+    - 渲染（可选）：状态变化后按最短间隔刷新界面，界面可以在不方便刷新时跳过
+    - 主协程：例如读取输入的菜单循环；主协程结束时运行时停止
+
+输入通过 ainput 在工作线程中读取，事件循环不会被 input() 阻塞。
+一个运行时可以托管多只宠物，所有宠物共用同一个调度器。
+"""
+import asyncio
+from .config import PetConfig
+from .scheduler import Scheduler, schedule_pet, unschedule_pet
+
+
+async def ainput(prompt=""):
+    """在工作线程中读取一行输入，等待期间事件循环继续运行
+
+    Raises:
+        EOFError: 输入已结束
+    """
+    return await asyncio.to_thread(input, prompt)
+
+
+class GameRuntime:
+    """异步游戏运行时"""
+
+    def __init__(self, scheduler=None, max_sleep=None):
+        """初始化运行时
+
+        Args:
+            scheduler (Scheduler, optional): 调度器，默认新建使用系统时钟的调度器
+            max_sleep (float, optional): 模拟循环单次最长等待秒数，默认为 PetConfig.RUNTIME_MAX_SLEEP
+        """
+        self.scheduler = Scheduler() if scheduler is None else scheduler
+        self.clock = self.scheduler.clock
+        self.max_sleep = PetConfig.RUNTIME_MAX_SLEEP if max_sleep is None else max_sleep
+        self.pets = []
+        self.running = False
+        self._wakeup = None  # 运行时在事件循环中创建
+
+        # 状态版本：模拟执行了任务或投递了事件时递增，渲染时记录已渲染的版本
+        self.version = 0
+        self.rendered_version = 0
+
+        # 统计
+        self.steps = 0  # 执行了任务或投递了事件的模拟步数
+        self.jobs_run = 0  # 执行的定时任务数
+
+    def add_pet(self, pet, task_system=None):
+        """托管宠物并注册它的定时任务
+
+        Args:
+            pet (Pet): 宠物
+            task_system (TaskSystem, optional): 任务系统，注册任务过期检查
+        """
+        self.pets.append(pet)
+        schedule_pet(self.scheduler, pet, task_system)
+        self.wake()
+        return pet
+
+    def remove_pet(self, pet):
+        """取消托管宠物"""
+        if pet in self.pets:
+            self.pets.remove(pet)
+            unschedule_pet(self.scheduler, pet)
+
+    def wake(self):
+        """唤醒模拟循环（注册了更早的定时任务后调用）"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def step(self, now=None):
+        """执行已到期的定时任务，并投递各宠物事件总线中排队的事件
+
+        Returns:
+            int: 执行的定时任务数和投递的事件数之和
+        """
+        executed = self.scheduler.run_due(now)
+        self.jobs_run += executed
+        delivered = 0
+        for pet in self.pets:
+            delivered += pet.event_bus.flush()
+        if executed or delivered:
+            self.version += 1
+            self.steps += 1
+        return executed + delivered
+
+    def mark_rendered(self):
+        """记录当前状态已经渲染"""
+        self.rendered_version = self.version
+
+    async def run_simulation(self):
+        """模拟循环：在最早的到期时间醒来执行定时任务"""
+        while self.running:
+            self.step()
+            next_due = self.scheduler.next_due()
+            delay = self.max_sleep if next_due is None else next_due - self.clock.time()
+            delay = min(max(delay, 0), self.max_sleep)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_renderer(self, render, interval=None):
+        """渲染循环：状态变化后按最短间隔调用 render
+
+        Args:
+            render (callable): 渲染回调，返回 False 表示这次没有渲染（例如正在等待子菜单输入）
+            interval (float, optional): 最短渲染间隔（秒），默认为 PetConfig.RENDER_INTERVAL
+        """
+        interval = PetConfig.RENDER_INTERVAL if interval is None else interval
+        while self.running:
+            await asyncio.sleep(interval)
+            if self.version != self.rendered_version and render() is not False:
+                self.mark_rendered()
+
+    async def run(self, main, render=None, render_interval=None):
+        """运行模拟和渲染，直到主协程结束
+
+        Args:
+            main: 主协程（例如菜单输入循环）
+            render (callable, optional): 渲染回调
+            render_interval (float, optional): 最短渲染间隔（秒）
+
+        Returns:
+            主协程的返回值
+        """
+        self.running = True
+        self._wakeup = asyncio.Event()
+        background = [asyncio.create_task(self.run_simulation())]
+        if render is not None:
+            background.append(asyncio.create_task(self.run_renderer(render, render_interval)))
+        try:
+            return await main
+        finally:
+            self.running = False
+            for task in background:
+                task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+            # 投递最后一轮输入产生的事件
+            self.step()
+            self._wakeup = None
+
+    def stop(self):
+        """停止模拟和渲染循环（主协程需要自行结束）"""
+        self.running = False
+        self.wake()
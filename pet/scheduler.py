@@ -0,0 +1,198 @@
+"""定时调度器
+
+各子系统把下一次到期的时间注册到调度器中（每小时的需求更新、下一次自发行为、
+任务过期等），主循环只在最早的到期时间醒来执行到期的任务，
+而不是按固定帧率轮询。调度器使用最小堆，取消采用惰性删除。
+"""
+import heapq
+import itertools
+from .base import Pet
+from .clock import SYSTEM_CLOCK
+
+# 到期时间的余量，避免浮点误差导致"刚好不足一小时"之类的判断失败
+SCHEDULE_SLACK = 1e-3
+
+
+class ScheduledJob:
+    """调度任务
+
+    回调返回新的到期时间（时间戳）时自动重新调度，返回 None 时任务结束。
+    """
+    __slots__ = ("due", "callback", "key", "cancelled")
+
+    def __init__(self, due, callback, key=None):
+        self.due = due
+        self.callback = callback
+        self.key = key
+        self.cancelled = False
+
+    def cancel(self):
+        """取消任务（惰性删除，出堆时跳过）"""
+        self.cancelled = True
+
+    def __repr__(self):
+        return f"ScheduledJob(key={self.key!r}, due={self.due:.1f})"
+
+
+class Scheduler:
+    """最小堆定时调度器"""
+
+    def __init__(self, clock=None):
+        """初始化调度器
+
+        Args:
+            clock (optional): 时钟，默认为系统时钟
+        """
+        self.clock = clock or SYSTEM_CLOCK
+        self._heap = []
+        self._counter = itertools.count()  # 到期时间相同时按加入顺序执行
+        self._jobs = {}  # key -> ScheduledJob
+
+    def __len__(self):
+        return sum(1 for _, _, job in self._heap if not job.cancelled)
+
+    def schedule(self, due, callback, key=None):
+        """在指定时间执行回调
+
+        Args:
+            due (float): 到期时间戳
+            callback (callable): 回调 callback(now)，返回下一次到期时间或 None
+            key (hashable, optional): 任务键，同一个键只保留最新的任务
+
+        Returns:
+            ScheduledJob: 调度任务
+        """
+        if key is not None and key in self._jobs:
+            self._jobs[key].cancel()
+        job = ScheduledJob(due, callback, key)
+        if key is not None:
+            self._jobs[key] = job
+        heapq.heappush(self._heap, (due, next(self._counter), job))
+        return job
+
+    def schedule_after(self, delay, callback, key=None):
+        """在指定秒数后执行回调"""
+        return self.schedule(self.clock.time() + delay, callback, key)
+
+    def cancel(self, key):
+        """按键取消任务"""
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    def get_job(self, key):
+        """按键获取任务"""
+        return self._jobs.get(key)
+
+    def next_due(self):
+        """获取最早的到期时间，没有任务时返回 None"""
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def run_due(self, now=None):
+        """执行所有已到期的任务
+
+        Args:
+            now (float, optional): 当前时间戳，默认为时钟的当前时间
+
+        Returns:
+            int: 执行的任务数
+        """
+        if now is None:
+            now = self.clock.time()
+        heap = self._heap
+        executed = 0
+        while heap and heap[0][0] <= now:
+            _, _, job = heapq.heappop(heap)
+            if job.cancelled:
+                continue
+            executed += 1
+            next_due = job.callback(now)
+            if job.cancelled:
+                continue
+            if next_due is None:
+                if job.key is not None:
+                    self._jobs.pop(job.key, None)
+            else:
+                # 重新调度的时间不晚于当前时间时，推迟到下一轮执行，避免同一轮内反复执行
+                job.due = next_due if next_due > now else now + SCHEDULE_SLACK
+                heapq.heappush(heap, (job.due, next(self._counter), job))
+        return executed
+
+    def run_pending(self, max_wait=None):
+        """等待到最早的到期时间并执行到期任务
+
+        Args:
+            max_wait (float, optional): 最长等待秒数，默认为一直等到下一个任务
+
+        Returns:
+            int: 执行的任务数
+        """
+        next_due = self.next_due()
+        if next_due is None:
+            if max_wait:
+                self.clock.sleep(max_wait)
+            return 0
+        delay = next_due - self.clock.time()
+        if max_wait is not None:
+            delay = min(delay, max_wait)
+        if delay > 0:
+            self.clock.sleep(delay)
+        return self.run_due()
+
+
+def schedule_pet(scheduler, pet, task_system=None):
+    """为宠物注册定时任务
+
+    Args:
+        scheduler (Scheduler): 调度器
+        pet (Pet): 宠物
+        task_system (TaskSystem, optional): 任务系统，注册任务过期检查
+
+    Notes:
+        - 需求更新：每小时一次，与 Pet.update 的一小时间隔一致
+        - 自发行为：智能宠物的冷却结束时执行
+        - 任务过期：最早的过期时间，没有限时任务时每小时检查一次
+        - 情感衰减在读取情感时按时间戳计算，不需要定时任务
+    """
+    def needs_tick(now):
+        # 经过了时间，需求值需要重新计算
+        pet.needs_update = True
+        Pet.update(pet, now)
+        return pet.next_update_time() + SCHEDULE_SLACK
+
+    scheduler.schedule(pet.next_update_time() + SCHEDULE_SLACK, needs_tick, key=(id(pet), "needs"))
+
+    if hasattr(pet, "execute_spontaneous_action"):
+        def spontaneous_tick(now):
+            # 与 IntelligentPet.update 一致：先更新时间戳并标记正在更新，
+            # 避免动作内部调用 update 时再次触发自发行为
+            if getattr(pet, '_updating', False):
+                return pet.next_spontaneous_action_time()
+            pet._updating = True
+            try:
+                pet.last_spontaneous_action = now
+                pet.execute_spontaneous_action()
+            finally:
+                pet._updating = False
+            return pet.next_spontaneous_action_time()
+
+        scheduler.schedule(pet.next_spontaneous_action_time(), spontaneous_tick, key=(id(pet), "spontaneous"))
+
+    if task_system is not None:
+        def task_tick(now):
+            task_system._cleanup_expired_tasks()
+            next_expiry = task_system.next_expiry_time()
+            return next_expiry + SCHEDULE_SLACK if next_expiry is not None else now + 3600
+
+        next_expiry = task_system.next_expiry_time()
+        first_due = next_expiry + SCHEDULE_SLACK if next_expiry is not None else scheduler.clock.time() + 3600
+        scheduler.schedule(first_due, task_tick, key=(id(pet), "tasks"))
+
+
+def unschedule_pet(scheduler, pet):
+    """取消宠物的所有定时任务"""
+    for name in ("needs", "spontaneous", "tasks"):
+        scheduler.cancel((id(pet), name))
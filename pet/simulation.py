@@ -0,0 +1,115 @@
+"""无界面快进模拟
+
+在 SimulationClock 上推进虚拟时间，不等待真实时间，可用于训练和长时间稳定性测试。
+"""
+from collections import Counter
+from .base import Pet
+from .clock import SimulationClock
+
+# 策略可返回的动作及对应的宠物方法
+POLICY_ACTIONS = {
+    "feed": lambda pet: pet.feed(),
+    "play": lambda pet: pet.play(),
+    "sleep": lambda pet: pet.sleep(),
+    "wake_up": lambda pet: pet.wake_up(),
+    "clean": lambda pet: pet.clean(),
+    "train": lambda pet: pet.train(),
+    "pet": lambda pet: pet.pet(),
+    "explore": lambda pet: pet._explore(),
+    "rest": lambda pet: pet._rest(),
+}
+
+
+def care_policy(pet):
+    """简单的照顾策略：按最紧迫的需求选择动作
+
+    Args:
+        pet (Pet): 宠物
+
+    Returns:
+        str: 动作名称，不需要照顾时返回 None
+    """
+    vitals = pet.get_vitals()
+    if vitals.is_sleeping:
+        return None
+    if vitals.hunger > 70:
+        return "feed"
+    if vitals.energy < 20:
+        return "sleep"
+    if vitals.hygiene < 30:
+        return "clean"
+    if vitals.happiness < 30:
+        return "play"
+    return None
+
+
+def apply_action(pet, action):
+    """执行策略选择的动作
+
+    Notes:
+        - 智能宠物通过 interact_with_user 执行，交互同样会被学习系统和强化学习记录
+        - 普通宠物直接调用对应方法
+    """
+    if hasattr(pet, "interact_with_user") and action not in ("explore", "rest"):
+        return pet.interact_with_user(action)
+    if action not in POLICY_ACTIONS:
+        raise ValueError(f"未知的动作: {action}")
+    return POLICY_ACTIONS[action](pet)
+
+
+def fast_forward(pet, duration, policy=None, step=3600, spontaneous=True, on_step=None):
+    """快进模拟宠物的生活
+
+    Args:
+        pet (Pet): 使用 SimulationClock 的宠物
+        duration (float): 模拟时长（秒）
+        policy (callable, optional): 策略函数 policy(pet) -> 动作名称或 None，每步调用一次
+        step (float, optional): 每步推进的虚拟秒数，默认为1小时
+        spontaneous (bool, optional): 是否运行智能宠物的自发行为循环
+        on_step (callable, optional): 每步结束后的回调 on_step(pet, step_index)
+
+    Returns:
+        dict: 模拟统计，包括步数、模拟时长、各动作次数和最终数值快照
+
+    Notes:
+        - 每步先推进时钟，再更新宠物（需求值、年龄、心情以及自发行为），最后执行策略动作
+        - 需求值按阈值分段解析计算，较大的步长不会影响结果的准确性
+    """
+    clock = pet.clock
+    if not isinstance(clock, SimulationClock):
+        raise ValueError("快进模拟需要宠物使用 SimulationClock")
+    if step <= 0:
+        raise ValueError("步长必须大于0")
+
+    actions = Counter()
+    steps = 0
+    elapsed = 0.0
+    while elapsed < duration:
+        dt = min(step, duration - elapsed)
+        now = clock.advance(dt)
+        elapsed += dt
+
+        # 经过了时间，需求值需要重新计算
+        pet.needs_update = True
+        if spontaneous:
+            pet.update(now)
+        else:
+            Pet.update(pet, now)
+
+        if policy is not None:
+            action = policy(pet)
+            if action:
+                apply_action(pet, action)
+                actions[action] += 1
+
+        steps += 1
+        if on_step is not None:
+            on_step(pet, steps)
+
+    return {
+        "steps": steps,
+        "simulated_seconds": elapsed,
+        "simulated_days": elapsed / 86400,
+        "actions": dict(actions),
+        "vitals": pet.get_vitals()
+    }
@@ -0,0 +1,564 @@
+"""宠物存储
+
+PetStore 定义存储接口，SQLitePetStore 为 SQLite 实现：
+    - pets 表保存名称、种类、等级、状态和核心数值等可索引的列，以及核心数据记录，
+      列出和筛选宠物时只读这张表，不反序列化宠物
+    - pet_sections 表按段保存较大的数据（情感系统、记忆、强化学习数据、社交、任务和成就系统），
+      只在加载宠物或单独读取某个段时才查询
+    - task_archive 表保存移出任务系统的历史任务，只追加，按需分页读取
+
+保存分为 collect（在修改数据的线程上收集修改过的段）和 commit（写入数据库，可以在
+后台线程执行）两步，供自动保存使用；save 依次执行两步并写入全部数据。增量收集时记忆和
+情感历史只取新增的条目（与 PetJournal 相同的日志操作），commit 读出原有的段合并后写回，
+交互线程上不再复制整段数据。
+"""
+import contextlib
+import io
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+import numpy as np
+from . import binfmt
+from .base import Pet
+from .emotion import EmotionalSystem
+from .enums import PetState
+from .intelligent import IntelligentPet
+from .journal import apply_operation, merge_records
+
+# 列出宠物时返回的摘要
+PetSummary = namedtuple("PetSummary", [
+    "name", "species", "kind", "level", "experience", "state", "mood",
+    "health", "hunger", "energy", "hygiene", "happiness", "age_in_days",
+    "is_sleeping", "is_sick", "updated_at"
+])
+
+# 从核心数据中拆出、单独保存的大段数据
+HEAVY_SECTIONS = ("emotional_system", "memories")
+# 加载宠物时默认读取的段（子系统的段需要通过 load_section 单独读取）
+DEFAULT_LOAD_SECTIONS = HEAVY_SECTIONS + ("rl",)
+
+KIND_PET = "pet"
+KIND_INTELLIGENT = "intelligent"
+
+SORT_COLUMNS = ("name", "species", "level", "experience", "age_in_days", "updated_at")
+
+
+def pet_kind(pet):
+    """宠物的存储类型"""
+    return KIND_INTELLIGENT if isinstance(pet, IntelligentPet) else KIND_PET
+
+
+def _quiet(factory, *args, **kwargs):
+    """创建宠物时不输出激活提示"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return factory(*args, **kwargs)
+
+
+class PetStore:
+    """宠物存储接口"""
+
+    def save(self, pet, social_system=None, task_system=None, achievement_system=None):
+        """保存宠物（同名宠物会被覆盖）"""
+        raise NotImplementedError
+
+    def load(self, name, clock=None, sections=DEFAULT_LOAD_SECTIONS):
+        """加载宠物，不存在时返回 None"""
+        raise NotImplementedError
+
+    def load_section(self, name, section):
+        """单独读取宠物的一个数据段，不存在时返回 None"""
+        raise NotImplementedError
+
+    def list_pets(self, species=None, state=None, min_level=None, max_level=None, kind=None,
+                  order_by="name", limit=None, offset=0):
+        """列出宠物摘要"""
+        raise NotImplementedError
+
+    def delete(self, name):
+        """删除宠物"""
+        raise NotImplementedError
+
+    def names(self):
+        """所有宠物名称的集合"""
+        return {summary.name for summary in self.list_pets()}
+
+    def __contains__(self, name):
+        return name in self.names()
+
+    def close(self):
+        """关闭存储"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def import_directory(self, directory, skip_existing=True):
+        """导入目录中的宠物存档（JSON 及其 _rl.json，以及 .vpet 二进制存档）
+
+        Args:
+            directory (str): 存档目录
+            skip_existing (bool, optional): 跳过存储中已有的同名宠物
+
+        Returns:
+            list: 导入的宠物名称
+        """
+        if not os.path.isdir(directory):
+            return []
+        existing = self.names() if skip_existing else set()
+        files = sorted(os.listdir(directory))
+        # 同名时二进制存档优先
+        binary_names = {os.path.splitext(f)[0] for f in files if binfmt.is_binary_path(f)}
+        imported = []
+        for file_name in files:
+            name, ext = os.path.splitext(file_name)
+            if binfmt.is_binary_path(file_name):
+                pass
+            elif ext != ".json" or file_name == "pets.json" or name.endswith("_rl") or name in binary_names:
+                continue
+            if name in existing:
+                continue
+
+            file_path = os.path.join(directory, file_name)
+            rl_file = os.path.join(directory, f"{name}_rl.json")
+            if binfmt.is_binary_path(file_name):
+                intelligent = "rl" in binfmt.list_sections(file_path)
+            else:
+                intelligent = os.path.exists(rl_file)
+
+            pet = _quiet(IntelligentPet.load_from_file if intelligent else Pet.load_from_file, file_path)
+            if isinstance(pet, str):
+                print(f"跳过 {file_name}：{pet}")
+                continue
+            if intelligent and not binfmt.is_binary_path(file_name):
+                pet.reinforcement_learning.load_learning_data(rl_file)
+            self.save(pet)
+            imported.append(pet.name)
+        return imported
+
+
+class SQLitePetStore(PetStore):
+    """SQLite 宠物存储"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS pets (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        species TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        level INTEGER NOT NULL,
+        experience REAL NOT NULL,
+        state TEXT NOT NULL,
+        mood TEXT NOT NULL,
+        health REAL NOT NULL,
+        hunger REAL NOT NULL,
+        energy REAL NOT NULL,
+        hygiene REAL NOT NULL,
+        happiness REAL NOT NULL,
+        age_in_days REAL NOT NULL,
+        is_sleeping INTEGER NOT NULL,
+        is_sick INTEGER NOT NULL,
+        updated_at REAL NOT NULL,
+        core BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_pets_species ON pets(species);
+    CREATE INDEX IF NOT EXISTS idx_pets_level ON pets(level);
+    CREATE INDEX IF NOT EXISTS idx_pets_state ON pets(state);
+    CREATE TABLE IF NOT EXISTS pet_sections (
+        pet_id INTEGER NOT NULL REFERENCES pets(id) ON DELETE CASCADE,
+        section TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (pet_id, section)
+    );
+    CREATE TABLE IF NOT EXISTS task_archive (
+        pet_id INTEGER NOT NULL REFERENCES pets(id) ON DELETE CASCADE,
+        task_id TEXT NOT NULL,
+        task_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        completed_at REAL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (pet_id, task_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_task_archive_completed ON task_archive(pet_id, completed_at);
+    """
+
+    SUMMARY_COLUMNS = ", ".join(PetSummary._fields)
+
+    def __init__(self, path=":memory:"):
+        """打开或创建存储
+
+        Args:
+            path (str, optional): 数据库文件路径，默认为内存数据库
+        """
+        if path != ":memory:":
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # 自动保存在后台线程写入，所有数据库操作都在锁内执行
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(self.SCHEMA)
+        # 本会话中加载或写入过的宠物，之后只需要写入修改过的段
+        self._synced = set()
+        # 宠物名称 -> 上次收集时的强化学习步数
+        self._rl_steps = {}
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def _pet_id(self, name):
+        row = self.connection.execute("SELECT id FROM pets WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, pet, social_system=None, task_system=None, achievement_system=None):
+        """保存宠物的全部数据
+
+        Args:
+            pet (Pet): 宠物
+            social_system (SocialSystem, optional): 社交系统，保存为 social 段
+            task_system (TaskSystem, optional): 任务系统，保存为 tasks 段
+            achievement_system (AchievementSystem, optional): 成就系统，保存为 achievements 段
+
+        Notes:
+            - 核心数值写入索引列，大段数据按段写入 pet_sections
+            - 整个保存在一个事务中完成
+        """
+        self.commit(self.collect(pet, social_system, task_system, achievement_system, full=True))
+
+    def collect(self, pet, social_system=None, task_system=None, achievement_system=None, full=False):
+        """收集需要保存的数据（在修改数据的线程上调用）
+
+        Args:
+            full (bool, optional): 收集全部数据；本会话尚未加载或保存过该宠物时总是收集全部
+
+        Returns:
+            dict: 交给 commit 写入的记录，没有修改时返回 None
+
+        Notes:
+            - 根据各对象的修改标记只收集修改过的段，返回的数据不与宠物共享可变容器
+            - 增量收集时记忆和情感系统以日志操作（"段名" 或 "段名.子段" -> 操作）放入 changes，
+              只追加的记忆和情感历史只包含新增的条目
+        """
+        full = full or pet.name not in self._synced
+
+        sections = {}
+        changes = {}
+        core_dict = None
+        if full:
+            pet.clear_dirty()
+            pet.emotional_system.clear_dirty()
+            sections["memories"] = list(pet.memories)
+            sections["emotional_system"] = pet.emotional_system.to_dict()
+        else:
+            pet_changes = pet.collect_changes()
+            if "core" in pet_changes:
+                core_dict = pet_changes["core"][1]
+            if "memories" in pet_changes:
+                changes["memories"] = pet_changes["memories"]
+            for sub, operation in pet.emotional_system.collect_changes().items():
+                changes[f"emotional_system.{sub}"] = operation
+        for section, system in (("social", social_system), ("tasks", task_system), ("achievements", achievement_system)):
+            if system is not None and (system.take_dirty() or full):
+                sections[section] = system.journal_section("state")
+        # 移出任务系统的历史任务追加到归档
+        task_archive = task_system.take_archived() if task_system is not None else []
+
+        rl = None
+        if isinstance(pet, IntelligentPet):
+            steps = pet.reinforcement_learning.learning_steps
+            if full or self._rl_steps.get(pet.name) != steps:
+                self._rl_steps[pet.name] = steps
+                # 经验回放缓冲区导出的是视图，复制后再交给写入线程
+                rl = {name: value.copy() if isinstance(value, np.ndarray) else value
+                      for name, value in pet.reinforcement_learning.to_binary_sections().items()}
+
+        core = None
+        if full or core_dict is not None:
+            core = (
+                pet.name, pet.species, pet_kind(pet), pet.level, pet.experience,
+                pet.state.value, pet.mood.value, pet.health, pet.hunger, pet.energy,
+                pet.hygiene, pet.happiness, pet.age_in_days, int(pet.is_sleeping), int(pet.is_sick),
+                pet.clock.time(), pet._core_dict() if core_dict is None else core_dict
+            )
+        if core is None and not sections and not changes and rl is None and not task_archive:
+            return None
+        return {"name": pet.name, "intelligent": isinstance(pet, IntelligentPet),
+                "core": core, "sections": sections, "changes": changes, "rl": rl,
+                "task_archive": task_archive}
+
+    @staticmethod
+    def _apply_changes(section, data, operations):
+        """对一个存储段的数据应用日志操作，返回新的数据（不修改 data）
+
+        Args:
+            section (str): 存储段，"memories" 或 "emotional_system"
+            data: 段原有的数据，不存在时为 None
+            operations (dict): 子段（memories 段为段名本身）-> 操作
+        """
+        if section == "memories":
+            parts = {"memories": data or []}
+            for name, operation in operations.items():
+                apply_operation(parts, name, operation)
+            return parts["memories"]
+        # 按情感系统的日志段拆分 to_dict 格式的数据，应用操作后再合并
+        data = data or {}
+        keys = {key for key in EmotionalSystem.JOURNAL_SECTIONS.values() if key is not None}
+        parts = {}
+        for name, key in EmotionalSystem.JOURNAL_SECTIONS.items():
+            parts[name] = {k: v for k, v in data.items() if k not in keys} if key is None else data.get(key, [])
+        for name, operation in operations.items():
+            apply_operation(parts, name, operation)
+        return EmotionalSystem.assemble(parts)
+
+    @staticmethod
+    def _group_changes(changes):
+        """按存储段分组日志操作：存储段 -> {子段: 操作}"""
+        grouped = {}
+        for name, operation in changes.items():
+            section, _, sub = name.partition(".")
+            grouped.setdefault(section, {})[sub or section] = operation
+        return grouped
+
+    @classmethod
+    def merge(cls, older, newer):
+        """合并尚未写入的两条记录（同一只宠物）"""
+        sections = {**older["sections"], **newer["sections"]}
+        # 被新记录整段重写的段丢弃旧的日志操作
+        changes = {name: operation for name, operation in older.get("changes", {}).items()
+                   if name.partition(".")[0] not in newer["sections"]}
+        newer_changes = {}
+        for name, operation in newer.get("changes", {}).items():
+            if name.partition(".")[0] in sections:
+                newer_changes[name] = operation
+            else:
+                changes = merge_records(changes, {name: operation})
+        # 旧记录中整段写入的段直接应用新的日志操作
+        for section, operations in cls._group_changes(newer_changes).items():
+            sections[section] = cls._apply_changes(section, sections[section], operations)
+        return {
+            "name": newer["name"],
+            "intelligent": newer["intelligent"],
+            "core": newer["core"] if newer["core"] is not None else older["core"],
+            "sections": sections,
+            "changes": changes,
+            "rl": newer["rl"] if newer["rl"] is not None else older["rl"],
+            "task_archive": older.get("task_archive", []) + newer.get("task_archive", [])
+        }
+
+    def commit(self, record):
+        """写入 collect 收集的记录（可以在后台线程调用）
+
+        Returns:
+            int: 写入的数据段数量
+        """
+        if not record:
+            return 0
+        blobs = {section: binfmt.pack(data) for section, data in record["sections"].items()}
+        task_archive = record.get("task_archive", [])
+        if record["rl"] is not None:
+            blobs["rl"] = binfmt.dumps(record["rl"])
+        core = record["core"]
+        if core is not None:
+            core = core[:-1] + (binfmt.pack(core[-1]),)
+
+        with self.lock, self.connection:
+            if core is not None:
+                self.connection.execute(f"""
+                    INSERT INTO pets ({self.SUMMARY_COLUMNS}, core)
+                    VALUES ({", ".join("?" * len(core))})
+                    ON CONFLICT(name) DO UPDATE SET
+                        {", ".join(f"{column} = excluded.{column}" for column in PetSummary._fields[1:])},
+                        core = excluded.core
+                """, core)
+            pet_id = self._pet_id(record["name"])
+            if pet_id is None:
+                raise KeyError(f"宠物不存在: {record['name']}")
+            if not record["intelligent"]:
+                self.connection.execute("DELETE FROM pet_sections WHERE pet_id = ? AND section = 'rl'", (pet_id,))
+            # 增量修改：读出原有的段，应用日志操作后整段写回
+            grouped = self._group_changes(record.get("changes", {}))
+            stored = self._fetch_sections(pet_id, tuple(grouped))
+            for section, operations in grouped.items():
+                data = binfmt.unpack(stored[section]) if section in stored else None
+                blobs[section] = binfmt.pack(self._apply_changes(section, data, operations))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO pet_sections (pet_id, section, data) VALUES (?, ?, ?)",
+                [(pet_id, section, blob) for section, blob in blobs.items()]
+            )
+            if task_archive:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO task_archive (pet_id, task_id, task_type, status, completed_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(pet_id, task["task_id"], task["task_type"], task["status"], task["completed_at"],
+                      binfmt.pack(task)) for task in task_archive]
+                )
+        self._synced.add(record["name"])
+        return len(blobs) + (core is not None) + bool(task_archive)
+
+    def _fetch_sections(self, pet_id, sections):
+        if not sections:
+            return {}
+        placeholders = ", ".join("?" * len(sections))
+        rows = self.connection.execute(
+            f"SELECT section, data FROM pet_sections WHERE pet_id = ? AND section IN ({placeholders})",
+            (pet_id, *sections)
+        ).fetchall()
+        return dict(rows)
+
+    def load(self, name, clock=None, sections=DEFAULT_LOAD_SECTIONS):
+        """加载宠物
+
+        Args:
+            name (str): 宠物名称
+            clock (optional): 宠物使用的时钟
+            sections (tuple, optional): 要读取的大段数据，为空时只加载核心数据
+
+        Returns:
+            Pet: 宠物（智能宠物按存储类型创建为 IntelligentPet），不存在时返回 None
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT id, kind, core FROM pets WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            pet_id, kind, core = row
+            blobs = self._fetch_sections(pet_id, tuple(sections))
+        data = binfmt.unpack(core)
+        for section in HEAVY_SECTIONS:
+            if section in blobs:
+                data[section] = binfmt.unpack(blobs[section])
+
+        cls = IntelligentPet if kind == KIND_INTELLIGENT else Pet
+        pet = _quiet(cls.from_dict, data, clock=clock)
+        if "rl" in blobs and isinstance(pet, IntelligentPet):
+            pet.reinforcement_learning.restore_binary_sections(binfmt.loads(blobs["rl"]))
+            self._rl_steps[name] = pet.reinforcement_learning.learning_steps
+        # 加载全部数据段时宠物与存储一致，之后只需要保存修改过的段
+        if set(HEAVY_SECTIONS) <= set(sections):
+            pet.clear_dirty()
+            pet.emotional_system.clear_dirty()
+            self._synced.add(name)
+        return pet
+
+    def load_section(self, name, section):
+        """单独读取宠物的一个数据段
+
+        Returns:
+            rl 段返回二进制存档的数据段字典，其他段返回解码后的记录；不存在时返回 None
+        """
+        with self.lock:
+            pet_id = self._pet_id(name)
+            if pet_id is None:
+                return None
+            blob = self._fetch_sections(pet_id, (section,)).get(section)
+        if blob is None:
+            return None
+        return binfmt.loads(blob) if section == "rl" else binfmt.unpack(blob)
+
+    def load_task_archive(self, name, task_type=None, limit=None, offset=0):
+        """读取宠物的历史任务归档（按完成时间从新到旧）
+
+        Args:
+            name (str): 宠物名称
+            task_type (str, optional): 任务类型（TaskType 的值）
+            limit (int, optional): 最多返回的数量
+            offset (int, optional): 跳过的数量
+
+        Returns:
+            list: 任务字典列表，可以用 Task.from_dict 恢复
+        """
+        query = "SELECT a.data FROM task_archive a JOIN pets p ON p.id = a.pet_id WHERE p.name = ?"
+        params = [name]
+        if task_type is not None:
+            query += " AND a.task_type = ?"
+            params.append(task_type)
+        query += " ORDER BY a.completed_at DESC LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [binfmt.unpack(row[0]) for row in rows]
+
+    def list_pets(self, species=None, state=None, min_level=None, max_level=None, kind=None,
+                  order_by="name", limit=None, offset=0):
+        """列出宠物摘要（只查询索引列）
+
+        Args:
+            species (str, optional): 种类
+            state (PetState or str, optional): 成长阶段
+            min_level (int, optional): 最低等级
+            max_level (int, optional): 最高等级
+            kind (str, optional): "pet" 或 "intelligent"
+            order_by (str, optional): 排序列，前缀 "-" 表示降序
+            limit (int, optional): 最多返回的数量
+            offset (int, optional): 跳过的数量
+
+        Returns:
+            list: PetSummary 列表
+        """
+        conditions = []
+        params = []
+        if species is not None:
+            conditions.append("species = ?")
+            params.append(species)
+        if state is not None:
+            conditions.append("state = ?")
+            params.append(state.value if isinstance(state, PetState) else state)
+        if min_level is not None:
+            conditions.append("level >= ?")
+            params.append(min_level)
+        if max_level is not None:
+            conditions.append("level <= ?")
+            params.append(max_level)
+        if kind is not None:
+            conditions.append("kind = ?")
+            params.append(kind)
+
+        descending = order_by.startswith("-")
+        column = order_by.lstrip("-")
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"不支持的排序列: {column}")
+
+        query = f"SELECT {self.SUMMARY_COLUMNS} FROM pets"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {column} {'DESC' if descending else 'ASC'}"
+        if limit is not None or offset:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else limit, offset])
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        summaries = []
+        for row in rows:
+            summary = PetSummary(*row)
+            summaries.append(summary._replace(is_sleeping=bool(summary.is_sleeping), is_sick=bool(summary.is_sick)))
+        return summaries
+
+    def names(self):
+        with self.lock:
+            return {row[0] for row in self.connection.execute("SELECT name FROM pets")}
+
+    def __contains__(self, name):
+        with self.lock:
+            return self._pet_id(name) is not None
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM pets").fetchone()[0]
+
+    def delete(self, name):
+        """删除宠物及其数据段
+
+        Returns:
+            bool: 是否删除了宠物
+        """
+        with self.lock, self.connection:
+            cursor = self.connection.execute("DELETE FROM pets WHERE name = ?", (name,))
+        self._synced.discard(name)
+        return cursor.rowcount > 0
@@ -1,5 +1,4 @@
 import random
-import time
 
 class BehaviorSystem:
     """行为系统"""
@@ -29,8 +28,8 @@ class BehaviorSystem:
             "action": action,
             "result": result,
             "context": context,
-            "timestamp": time.time(),
-            "pet_state": self.pet.get_status()
+            "timestamp": self.pet.clock.time(),
+            "pet_state": self.pet.get_vitals()
         }
         
         self.behavior_history.append(behavior)
@@ -40,7 +39,7 @@ class BehaviorSystem:
             self.behavior_history.pop(0)
         
         # 更新冷却时间
-        self.action_cooldowns[action] = time.time()
+        self.action_cooldowns[action] = self.pet.clock.time()
     
     def get_available_actions(self):
         """获取当前可用的行为"""
@@ -163,23 +162,23 @@ class BehaviorTreeBuilder:
         root = SelectorNode([
             # 高优先级：基本需求
             SequenceNode([
-                ConditionNode(lambda pet: float(pet.get_status()["hunger"].split("/")[0]) > 70),
+                ConditionNode(lambda pet: pet.get_vitals().hunger > 70),
                 ActionNode(lambda pet: pet.feed("普通食物"))
             ], "喂食序列"),
             
             SequenceNode([
-                ConditionNode(lambda pet: float(pet.get_status()["energy"].split("/")[0]) < 30),
+                ConditionNode(lambda pet: pet.get_vitals().energy < 30),
                 ActionNode(lambda pet: pet.sleep())
             ], "睡眠序列"),
             
             SequenceNode([
-                ConditionNode(lambda pet: float(pet.get_status()["hygiene"].split("/")[0]) < 30),
+                ConditionNode(lambda pet: pet.get_vitals().hygiene < 30),
                 ActionNode(lambda pet: pet.clean())
             ], "清洁序列"),
             
             # 中优先级：娱乐和训练
             SequenceNode([
-                ConditionNode(lambda pet: float(pet.get_status()["energy"].split("/")[0]) > 50),
+                ConditionNode(lambda pet: pet.get_vitals().energy > 50),
                 SelectorNode([
                     ActionNode(lambda pet: pet.play("普通游戏")),
                     ActionNode(lambda pet: pet.train("intelligence"))
@@ -24,7 +24,7 @@ class DecisionSystem:
         self.decision_history.append({
             "action": best_action,
             "confidence": confidence,
-            "state": self.pet.get_status()
+            "state": self.pet.get_vitals()
         })
         
         # 限制历史长度
@@ -38,28 +38,23 @@ class DecisionSystem:
         value = 0
         
         # 基于当前状态评估
-        status = self.pet.get_status()
+        vitals = self.pet.get_vitals()
         
         if action == "feed":
             # 饥饿时喂食价值高
-            hunger = float(status["hunger"].split("/")[0])
-            value += hunger * 0.8
+            value += vitals.hunger * 0.8
         elif action == "play":
             # 精力充足时玩耍价值高
-            energy = float(status["energy"].split("/")[0])
-            value += energy * 0.6
+            value += vitals.energy * 0.6
         elif action == "sleep":
             # 精力不足时睡觉价值高
-            energy = float(status["energy"].split("/")[0])
-            value += (100 - energy) * 0.7
+            value += (100 - vitals.energy) * 0.7
         elif action == "clean":
             # 清洁度低时清洁价值高
-            hygiene = float(status["hygiene"].split("/")[0])
-            value += (100 - hygiene) * 0.5
+            value += (100 - vitals.hygiene) * 0.5
         elif action == "train":
             # 精力充足时训练价值高
-            energy = float(status["energy"].split("/")[0])
-            value += energy * 0.4
+            value += vitals.energy * 0.4
         
         # 考虑性格偏好
         if hasattr(self.pet, "personality_traits"):
@@ -77,14 +72,14 @@ class DecisionSystem:
     
     def predict_needs(self):
         """预测宠物需求"""
-        status = self.pet.get_status()
+        vitals = self.pet.get_vitals()
         needs = []
         
         # 检查各项指标
-        hunger = float(status["hunger"].split("/")[0])
-        energy = float(status["energy"].split("/")[0])
-        hygiene = float(status["hygiene"].split("/")[0])
-        happiness = float(status["happiness"].split("/")[0])
+        hunger = vitals.hunger
+        energy = vitals.energy
+        hygiene = vitals.hygiene
+        happiness = vitals.happiness
         
         if hunger > 70:
             needs.append(("hunger", "高", 0.9))
@@ -1,5 +1,4 @@
 from collections import defaultdict, Counter
-import time
 
 class LearningSystem:
     """学习系统"""
@@ -23,8 +22,8 @@ class LearningSystem:
             "action": action,
             "result": result,
             "context": context,
-            "timestamp": time.time(),
-            "pet_state_before": self.pet.get_status()
+            "timestamp": self.pet.clock.time(),
+            "pet_state_before": self.pet.get_vitals()
         }
         
         self.behavior_history.append(behavior)
@@ -41,8 +40,8 @@ class LearningSystem:
         interaction = {
             "interaction_type": interaction_type,
             "kwargs": kwargs,
-            "timestamp": time.time(),
-            "pet_state": self.pet.get_status()
+            "timestamp": self.pet.clock.time(),
+            "pet_state": self.pet.get_vitals()
         }
         
         self.user_interactions[interaction_type].append(interaction)
@@ -56,7 +55,7 @@ class LearningSystem:
         self.behavior_effects[action].append({
             "result": result,
             "context": context,
-            "timestamp": time.time()
+            "timestamp": self.pet.clock.time()
         })
         
         # 基于效果调整偏好
@@ -82,8 +81,8 @@ class LearningSystem:
         self.behavior_history.append({
             "action": interaction_type,
             "result": result,
-            "timestamp": time.time(),
-            "pet_state": self.pet.get_status()
+            "timestamp": self.pet.clock.time(),
+            "pet_state": self.pet.get_vitals()
         })
         
         # 基于结果调整偏好
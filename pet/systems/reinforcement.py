@@ -3,10 +3,21 @@ import random
 import json
 from collections import defaultdict
 from ..config import PetConfig
+from ..vitals import PetVitals
+from .replay import PrioritizedReplayBuffer
+from .. import binfmt
 
 class ReinforcementLearningSystem:
-    """强化学习系统"""
-    def __init__(self, pet, learning_rate=None, discount_factor=None, exploration_rate=None, exploration_decay=None, min_exploration=None):
+    """强化学习系统
+    
+    Q表支持两种存储方式（PetConfig.RL_Q_TABLE_BACKEND 或 q_backend 参数）：
+        - "dict"：defaultdict(dict)，键为离散状态元组，值为动作名称到Q值的映射
+        - "dense"：形状为 (状态数, 动作数) 的 NumPy 数组，状态使用混合进制整数编码，
+          get_discrete_state 直接返回该整数
+    """
+    Q_BACKENDS = ("dict", "dense")
+    
+    def __init__(self, pet, learning_rate=None, discount_factor=None, exploration_rate=None, exploration_decay=None, min_exploration=None, q_backend=None):
         self.pet = pet
         self.learning_rate = learning_rate or PetConfig.RL_LEARNING_RATE
         self.discount_factor = discount_factor or PetConfig.RL_DISCOUNT_FACTOR
@@ -14,21 +25,37 @@ class ReinforcementLearningSystem:
         self.exploration_decay = exploration_decay or PetConfig.RL_EXPLORATION_DECAY
         self.min_exploration = min_exploration or PetConfig.RL_MIN_EXPLORATION
         
-        # Q表 - 使用字典的字典结构，键为离散状态元组，值为动作到Q值的映射
-        self.q_table = defaultdict(dict)
-        self.q_table_2 = defaultdict(dict)  # 双Q学习
+        # 状态离散化参数
+        self.state_bins = PetConfig.STATE_BINS
+        
+        # 可能的动作
+        self.actions = PetConfig.RL_ACTIONS
+        self._action_index = {action: i for i, action in enumerate(self.actions)}
+        
+        # 混合进制状态编码：第 i 维的位权为其后各维分箱数之积
+        self._state_radix = [len(self.state_bins[key]) for key in PetVitals.STATE_FIELDS]
+        self._state_weights = []
+        weight = 1
+        for radix in reversed(self._state_radix):
+            self._state_weights.insert(0, weight)
+            weight *= radix
+        self.num_states = weight
+        self._state_weights_array = np.array(self._state_weights, dtype=np.int64)
+        
+        # Q表
+        self.q_backend = q_backend or PetConfig.RL_Q_TABLE_BACKEND
+        if self.q_backend not in self.Q_BACKENDS:
+            raise ValueError(f"未知的Q表存储方式: {self.q_backend}")
+        self.q_table, self.q_table_2 = self._new_q_tables()  # 双Q学习
         
         # Q表优化参数
         self.q_table_compression_threshold = 1000  # 当Q表大小超过此阈值时进行压缩
         self.q_table_cleanup_interval = 1000  # 每学习多少步进行一次Q表清理
         
-        # 经验回放
-        self.replay_buffer = []
+        # 优先级经验回放 - 环形缓冲区 + 求和树
         self.max_replay_buffer_size = PetConfig.RL_MAX_REPLAY_BUFFER_SIZE
         self.batch_size = PetConfig.RL_BATCH_SIZE
-        
-        # 优先级经验回放
-        self.priorities = []
+        self.replay_buffer = PrioritizedReplayBuffer(self.max_replay_buffer_size, len(self.state_bins))
         self.alpha = PetConfig.RL_ALPHA  # 优先级指数
         self.beta = PetConfig.RL_BETA  # 重要性采样权重指数
         self.beta_increment = PetConfig.RL_BETA_INCREMENT
@@ -37,65 +64,106 @@ class ReinforcementLearningSystem:
         self.learning_steps = 0
         self.average_reward = 0
         self.total_reward = 0
+        # 训练场合并的经验回放统计（经验数、奖励和、奖励平方和、各动作的经验数等）
+        self.replay_statistics = {}
         
-        # 状态离散化参数
-        self.state_bins = PetConfig.STATE_BINS
-        
-        # 可能的动作
-        self.actions = PetConfig.RL_ACTIONS
-        
-        # 状态缓存 - 减少重复计算
+        # 状态缓存 - 数值快照未变化时直接复用上一次的离散结果
         self._state_cache = {}
-        self._last_status_time = 0
-        self._status_cache_timeout = 0.1  # 状态缓存超时时间（秒）
+        self._last_state_values = None
+    
+    @property
+    def dense(self):
+        """是否使用 NumPy 数组Q表"""
+        return self.q_backend == "dense"
+    
+    def _new_q_tables(self):
+        """创建一对空Q表"""
+        if self.dense:
+            shape = (self.num_states, len(self.actions))
+            return np.zeros(shape, dtype=np.float64), np.zeros(shape, dtype=np.float64)
+        return defaultdict(dict), defaultdict(dict)
+    
+    def encode_state(self, state):
+        """将离散状态元组编码为整数"""
+        return sum(i * w for i, w in zip(state, self._state_weights))
+    
+    def encode_states(self, states):
+        """批量编码离散状态（每行一个状态）"""
+        return np.asarray(states, dtype=np.int64) @ self._state_weights_array
+    
+    def decode_state(self, code):
+        """将整数状态编码还原为离散状态元组"""
+        state = []
+        for radix in reversed(self._state_radix):
+            code, digit = divmod(code, radix)
+            state.append(digit)
+        return tuple(reversed(state))
+    
+    def decode_states(self, codes):
+        """批量还原状态编码（返回每行一个状态的数组）"""
+        codes = np.asarray(codes, dtype=np.int64)
+        radix = np.array(self._state_radix, dtype=np.int64)
+        return (codes[:, None] // self._state_weights_array) % radix
+    
+    def _to_table_state(self, state):
+        """将状态转换为当前Q表使用的键（字典模式为元组，数组模式为整数）"""
+        if self.dense:
+            if isinstance(state, (tuple, list)):
+                return self.encode_state(state)
+            return int(state)
+        if isinstance(state, list):
+            return tuple(state)
+        if isinstance(state, (int, np.integer)):
+            return self.decode_state(int(state))
+        return state
     
     def get_discrete_state(self):
-        """获取离散状态"""
-        import time
-        current_time = time.time()
+        """获取离散状态
         
-        # 检查是否需要更新状态缓存
-        if current_time - self._last_status_time > self._status_cache_timeout:
-            status = self.pet.get_status()
-            
-            # 提取需要离散化的状态
-            state = {
-                "hunger": float(status["hunger"].split("/")[0]),
-                "energy": float(status["energy"].split("/")[0]),
-                "hygiene": float(status["hygiene"].split("/")[0]),
-                "happiness": float(status["happiness"].split("/")[0]),
-                "health": float(status["health"].split("/")[0])
-            }
-            
-            # 离散化状态
-            discrete_state = []
-            for key, value in state.items():
-                bins = self.state_bins[key]
-                for i, bin_threshold in enumerate(bins):
-                    if value <= bin_threshold:
-                        discrete_state.append(i)
-                        break
-                else:
-                    discrete_state.append(len(bins) - 1)
-            
-            # 转换为元组以便作为字典键
-            discrete_state_tuple = tuple(discrete_state)
-            
-            # 更新缓存
-            self._state_cache["discrete_state"] = discrete_state_tuple
-            self._state_cache["continuous_state"] = state
-            self._last_status_time = current_time
-            
-            return discrete_state_tuple
-        else:
-            # 使用缓存的状态
-            return self._state_cache.get("discrete_state", tuple([0] * len(self.state_bins)))
+        Returns:
+            tuple | int: 字典模式返回各维分箱索引组成的元组，数组模式返回整数状态编码
+        """
+        vitals = self.pet.get_vitals()
+        values = vitals.state_values()
+        
+        # 数值未变化时复用缓存
+        if values == self._last_state_values:
+            return self._state_cache["discrete_state"]
+        
+        # 离散化状态（顺序与 PetVitals.STATE_FIELDS 一致）
+        discrete_state = []
+        for key, value in zip(vitals.STATE_FIELDS, values):
+            bins = self.state_bins[key]
+            for i, bin_threshold in enumerate(bins):
+                if value <= bin_threshold:
+                    discrete_state.append(i)
+                    break
+            else:
+                discrete_state.append(len(bins) - 1)
+        
+        # 转换为元组以便作为字典键，数组模式下编码为整数
+        discrete_state = tuple(discrete_state)
+        if self.dense:
+            discrete_state = self.encode_state(discrete_state)
+        
+        # 更新缓存
+        self._state_cache["discrete_state"] = discrete_state
+        self._state_cache["continuous_state"] = vitals
+        self._last_state_values = values
+        
+        return discrete_state
     
     def choose_action(self, state):
         """选择动作"""
         # 探索与利用
         if random.random() < self.exploration_rate:
             return random.choice(self.actions)
+        elif self.dense:
+            # 未学习过的状态（整行为0）随机选择
+            state_q = self.q_table[self._to_table_state(state)]
+            if not state_q.any():
+                return random.choice(self.actions)
+            return self.actions[int(state_q.argmax())]
         else:
             # 利用Q表选择最优动作
             state_q = self.q_table.get(state)
@@ -183,11 +251,9 @@ class ReinforcementLearningSystem:
     
     def learn(self, state, action, reward, next_state, done):
         """学习"""
-        # 1. 确保状态是元组（以便作为字典键）
-        if isinstance(state, list):
-            state = tuple(state)
-        if isinstance(next_state, list):
-            next_state = tuple(next_state)
+        # 1. 转换为Q表使用的状态键
+        state = self._to_table_state(state)
+        next_state = self._to_table_state(next_state)
         
         # 2. 存储经验到回放缓冲区
         self._store_experience(state, action, reward, next_state, done)
@@ -208,37 +274,59 @@ class ReinforcementLearningSystem:
         self.beta = min(1.0, self.beta + self.beta_increment)
     
     def _store_experience(self, state, action, reward, next_state, done):
-        """存储经验"""
-        # 计算优先级
-        priority = self._calculate_priority(state, action, reward, next_state, done)
+        """存储经验
+        
+        Returns:
+            int: 经验在回放缓冲区中的位置，无效经验返回 None
         
-        # 存储经验和优先级
-        self.replay_buffer.append((state, action, reward, next_state, done))
-        self.priorities.append(priority)
+        Notes:
+            - 写入前校验经验，无效经验直接丢弃，不再定期扫描整个缓冲区
+            - 缓冲区满时覆盖最旧的经验
+        """
+        if not self._is_valid_experience(state, action, reward, next_state, done):
+            return None
         
-        # 限制回放缓冲区大小
-        if len(self.replay_buffer) > self.max_replay_buffer_size:
-            self.replay_buffer.pop(0)
-            self.priorities.pop(0)
+        # 计算优先级
+        priority = self._calculate_priority(state, action, reward, next_state, done)
         
-        # 优化：定期清理无效经验
-        if len(self.replay_buffer) % 100 == 0:
-            self._cleanup_invalid_experiences()
+        # 存储经验和优先级（缓冲区统一保存各维分箱索引）
+        if self.dense:
+            state = self.decode_state(state)
+            next_state = self.decode_state(next_state)
+        return self.replay_buffer.add(state, self._action_index[action], reward, next_state, done, priority)
+    
+    def _is_valid_state(self, state):
+        """检查状态是否为当前Q表可用的离散状态"""
+        if self.dense:
+            return isinstance(state, (int, np.integer)) and 0 <= state < self.num_states
+        return isinstance(state, (tuple, list)) and len(state) == len(self._state_radix)
+    
+    def _is_valid_experience(self, state, action, reward, next_state, done):
+        """检查经验是否有效"""
+        return (self._is_valid_state(state) and
+                action in self._action_index and
+                isinstance(reward, (int, float)) and
+                self._is_valid_state(next_state) and
+                isinstance(done, bool))
     
     def _calculate_priority(self, state, action, reward, next_state, done):
         """计算经验优先级"""
-        # 确保状态是元组
-        if isinstance(state, list):
-            state = tuple(state)
-        if isinstance(next_state, list):
-            next_state = tuple(next_state)
+        state = self._to_table_state(state)
+        next_state = self._to_table_state(next_state)
         
         # 获取当前Q值
-        current_q = self.q_table.get(state, {}).get(action, 0)
+        if self.dense:
+            current_q = self.q_table[state, self._action_index[action]]
+        else:
+            current_q = self.q_table.get(state, {}).get(action, 0)
         
         # 计算目标Q值
         if done:
             target_q = reward
+        elif self.dense:
+            # 双Q学习：用Q表1选动作，Q表2估值
+            best_action = self.q_table[next_state].argmax()
+            target_q = reward + self.discount_factor * self.q_table_2[next_state, best_action]
         else:
             # 双Q学习
             if next_state in self.q_table and self.q_table[next_state]:
@@ -254,68 +342,30 @@ class ReinforcementLearningSystem:
         epsilon = 1e-6
         priority = (td_error + epsilon) ** self.alpha
         
-        return priority
-    
-    def _cleanup_invalid_experiences(self):
-        """清理无效经验"""
-        valid_experiences = []
-        valid_priorities = []
-        
-        for exp, priority in zip(self.replay_buffer, self.priorities):
-            state, action, reward, next_state, done = exp
-            # 检查经验是否有效
-            if (isinstance(state, (tuple, list)) and 
-                isinstance(action, str) and 
-                isinstance(reward, (int, float)) and 
-                isinstance(next_state, (tuple, list)) and 
-                isinstance(done, bool)):
-                valid_experiences.append(exp)
-                valid_priorities.append(priority)
-        
-        # 更新回放缓冲区和优先级
-        self.replay_buffer = valid_experiences
-        self.priorities = valid_priorities
+        return float(priority)
     
     def _prioritized_sample(self):
-        """优先级采样"""
-        # 确保 priorities 和 replay_buffer 长度相同
-        min_length = min(len(self.priorities), len(self.replay_buffer))
-        if min_length < len(self.priorities):
-            self.priorities = self.priorities[:min_length]
-        if min_length < len(self.replay_buffer):
-            self.replay_buffer = self.replay_buffer[:min_length]
+        """优先级采样
+        
+        Returns:
+            tuple: (samples, indices, weights)，samples 中的动作已还原为动作名称
+        """
+        size = len(self.replay_buffer)
         
         # 确保有足够的经验可采样
-        if min_length < self.batch_size:
+        if size < self.batch_size:
             # 经验不足时，返回所有经验
-            samples = self.replay_buffer[:min_length]
-            indices = list(range(min_length))
-            weights = [1.0] * min_length
-            return samples, indices, weights
-        
-        # 计算采样概率
-        total_priority = sum(self.priorities)
-        if total_priority == 0:
-            # 所有优先级为0时，均匀采样
-            probabilities = [1.0 / len(self.priorities)] * len(self.priorities)
+            indices = list(range(size))
+            weights = [1.0] * size
         else:
-            probabilities = [p / total_priority for p in self.priorities]
-        
-        # 采样
-        indices = random.choices(range(len(self.replay_buffer)), weights=probabilities, k=self.batch_size)
-        samples = [self.replay_buffer[i] for i in indices]
+            indices, weights = self.replay_buffer.sample(self.batch_size, self.beta)
+            indices = indices.tolist()
+            weights = weights.tolist()
         
-        # 计算重要性采样权重
-        weights = []
+        samples = []
         for i in indices:
-            probability = probabilities[i]
-            weight = (len(self.replay_buffer) * probability) ** (-self.beta)
-            weights.append(weight)
-        
-        # 归一化权重
-        if weights:
-            max_weight = max(weights)
-            weights = [w / max_weight for w in weights]
+            state, action_index, reward, next_state, done = self.replay_buffer.get(i)
+            samples.append((state, self.actions[action_index], reward, next_state, done))
         
         return samples, indices, weights
     
@@ -339,22 +389,29 @@ class ReinforcementLearningSystem:
     
     def _cleanup_q_tables(self):
         """清理和压缩Q表"""
+        # 数组Q表大小固定，无需压缩
+        if self.dense:
+            return
         # 压缩Q表
         self.q_table = self._compress_q_table(self.q_table)
         self.q_table_2 = self._compress_q_table(self.q_table_2)
     
     def _learn_from_replay_buffer(self):
         """从回放缓冲区学习"""
-        # 优先级采样
-        samples, indices, weights = self._prioritized_sample()
+        if self.dense:
+            self._learn_batch_dense()
+        else:
+            # 优先级采样
+            samples, indices, weights = self._prioritized_sample()
+            self._learn_from_samples_dict(samples, indices, weights)
         
+        # 定期清理Q表
+        if self.learning_steps % self.q_table_cleanup_interval == 0:
+            self._cleanup_q_tables()
+    
+    def _learn_from_samples_dict(self, samples, indices, weights):
+        """使用字典Q表学习一批样本"""
         for i, (state, action, reward, next_state, done) in enumerate(samples):
-            # 确保状态是元组
-            if isinstance(state, list):
-                state = tuple(state)
-            if isinstance(next_state, list):
-                next_state = tuple(next_state)
-            
             # 获取当前Q值
             current_q = self.q_table.get(state, {}).get(action, 0)
             current_q_2 = self.q_table_2.get(state, {}).get(action, 0)
@@ -390,11 +447,63 @@ class ReinforcementLearningSystem:
             
             # 更新优先级
             new_priority = self._calculate_priority(state, action, reward, next_state, done)
-            self.priorities[indices[i]] = new_priority
-        
-        # 定期清理Q表
-        if self.learning_steps % self.q_table_cleanup_interval == 0:
-            self._cleanup_q_tables()
+            self.replay_buffer.update_priority(indices[i], new_priority)
+    
+    def _learn_batch_dense(self):
+        """使用数组Q表对一个小批量做向量化的双Q更新
+        
+        Notes:
+            - 所有样本的目标值都基于更新前的Q表计算
+            - 同一 (状态, 动作) 的 k 个样本合并为一次更新：步长为复合步长 1-∏(1-lr·w)，
+              目标为按 lr·w 加权的平均目标，与逐个样本顺序更新一样不会越过目标值
+            - 更新后一次性重新计算整批样本的优先级
+        """
+        size = len(self.replay_buffer)
+        if size < self.batch_size:
+            indices = np.arange(size)
+            weights = np.ones(size, dtype=np.float64)
+        else:
+            indices, weights = self.replay_buffer.sample(self.batch_size, self.beta)
+        
+        states, actions, rewards, next_states, dones = self.replay_buffer.batch(indices)
+        states = self.encode_states(states)
+        next_states = self.encode_states(next_states)
+        actions = actions.astype(np.int64)
+        
+        q_table = self.q_table
+        q_table_2 = self.q_table_2
+        target_q, target_q_2 = self._double_q_targets(rewards, next_states, dones)
+        
+        # 使用重要性采样权重，按 (状态, 动作) 分组合并重复样本
+        num_actions = len(self.actions)
+        keys, groups = np.unique(states * num_actions + actions, return_inverse=True)
+        group_states, group_actions = np.divmod(keys, num_actions)
+        step = np.clip(self.learning_rate * weights, 0.0, 1.0)
+        remaining = np.ones(len(keys), dtype=np.float64)
+        np.multiply.at(remaining, groups, 1.0 - step)
+        group_step = 1.0 - remaining
+        step_sum = np.bincount(groups, weights=step, minlength=len(keys))
+        for table, target in ((q_table, target_q), (q_table_2, target_q_2)):
+            current = table[group_states, group_actions]
+            mean_target = np.divide(
+                np.bincount(groups, weights=step * target, minlength=len(keys)), step_sum,
+                out=current.copy(), where=step_sum > 0
+            )
+            table[group_states, group_actions] = current + group_step * (mean_target - current)
+        
+        # 更新优先级
+        target_q, _ = self._double_q_targets(rewards, next_states, dones)
+        td_errors = np.abs(target_q - q_table[states, actions])
+        self.replay_buffer.update_priorities(indices, (td_errors + 1e-6) ** self.alpha)
+    
+    def _double_q_targets(self, rewards, next_states, dones):
+        """批量计算双Q学习的两组目标值（一张表选动作，另一张表估值）"""
+        not_done = ~dones
+        best_actions = self.q_table[next_states].argmax(axis=1)
+        best_actions_2 = self.q_table_2[next_states].argmax(axis=1)
+        target_q = rewards + not_done * self.discount_factor * self.q_table_2[next_states, best_actions]
+        target_q_2 = rewards + not_done * self.discount_factor * self.q_table[next_states, best_actions_2]
+        return target_q, target_q_2
     
     def get_learning_stats(self):
         """获取学习统计"""
@@ -403,11 +512,161 @@ class ReinforcementLearningSystem:
             "average_reward": self.average_reward,
             "exploration_rate": self.exploration_rate,
             "replay_buffer_size": len(self.replay_buffer),
-            "q_table_size": sum(len(v) for v in self.q_table.values())
+            "q_table_size": self._q_table_size()
         }
     
+    def _q_table_size(self):
+        """Q表中已学习的条目数"""
+        if self.dense:
+            return int(np.count_nonzero(self.q_table))
+        return sum(len(v) for v in self.q_table.values())
+    
+    def _q_table_to_dict(self, q_table):
+        """将数组Q表转换为与字典模式相同的 {状态元组: {动作: Q值}} 结构，只保留非零条目"""
+        table = {}
+        for code in np.flatnonzero(q_table.any(axis=1)):
+            row = q_table[code]
+            table[self.decode_state(int(code))] = {
+                self.actions[a]: float(row[a]) for a in np.flatnonzero(row)
+            }
+        return table
+    
+    def _q_table_from_dict(self, table):
+        """将 {状态元组: {动作: Q值}} 结构转换为当前模式的Q表"""
+        if not self.dense:
+            return defaultdict(dict, table)
+        q_table = self._new_q_tables()[0]
+        for state, actions in table.items():
+            # 跳过与当前分箱设置不匹配的状态
+            if (not isinstance(state, tuple) or len(state) != len(self._state_radix) or
+                    any(not 0 <= i < radix for i, radix in zip(state, self._state_radix))):
+                continue
+            code = self.encode_state(state)
+            for action, q_value in actions.items():
+                if action in self._action_index:
+                    q_table[code, self._action_index[action]] = q_value
+        return q_table
+    
+    def export_state(self):
+        """导出学习状态（二进制存档使用）
+        
+        Returns:
+            tuple: (记录, 数组字典)
+        
+        Notes:
+            - Q表按稀疏行保存：q_states 每行一个状态，q_values/q_values_2 的列按 actions 排列，
+              缺失的条目为 NaN；两种Q表模式导出的格式相同
+            - 经验回放缓冲区的列数组以 replay. 为前缀
+        """
+        num_actions = len(self.actions)
+        if self.dense:
+            codes = np.flatnonzero(self.q_table.any(axis=1) | self.q_table_2.any(axis=1))
+            states = self.decode_states(codes)
+            # 与字典格式一致，0 表示没有条目
+            q_values = np.where(self.q_table[codes] != 0, self.q_table[codes], np.nan)
+            q_values_2 = np.where(self.q_table_2[codes] != 0, self.q_table_2[codes], np.nan)
+        else:
+            dim = len(self._state_radix)
+            keys = [state for state in set(self.q_table) | set(self.q_table_2)
+                    if isinstance(state, tuple) and len(state) == dim]
+            states = np.array(sorted(keys), dtype=np.int64).reshape(len(keys), dim)
+            q_values = np.full((len(keys), num_actions), np.nan)
+            q_values_2 = np.full((len(keys), num_actions), np.nan)
+            for row, state in enumerate(sorted(keys)):
+                for table, values in ((self.q_table, q_values), (self.q_table_2, q_values_2)):
+                    for action, q_value in table.get(state, {}).items():
+                        if action in self._action_index:
+                            values[row, self._action_index[action]] = q_value
+        
+        meta = {
+            "q_backend": self.q_backend,
+            "actions": list(self.actions),
+            "learning_steps": self.learning_steps,
+            "average_reward": self.average_reward,
+            "total_reward": self.total_reward,
+            "exploration_rate": self.exploration_rate,
+            "beta": self.beta,
+            "replay_position": self.replay_buffer.position,
+            "replay_statistics": self.replay_statistics
+        }
+        arrays = {
+            "q_states": states.astype(np.int16),
+            "q_values": q_values,
+            "q_values_2": q_values_2
+        }
+        for key, column in self.replay_buffer.export_arrays().items():
+            arrays[f"replay.{key}"] = column
+        return meta, arrays
+    
+    def import_state(self, meta, arrays):
+        """导入 export_state 导出的学习状态
+        
+        Notes:
+            - 与当前分箱设置不匹配的状态和未知的动作会被跳过
+            - 状态维度不匹配时不恢复经验回放缓冲区
+        """
+        columns = [self._action_index.get(action, -1) for action in meta.get("actions", [])]
+        states = np.asarray(arrays.get("q_states", np.zeros((0, len(self._state_radix)))), dtype=np.int64)
+        tables = []
+        for name in ("q_values", "q_values_2"):
+            values = np.asarray(arrays.get(name, np.zeros((len(states), len(columns)))))
+            if self.dense:
+                table = self._new_q_tables()[0]
+                if len(states) and states.shape[1] == len(self._state_radix):
+                    valid = np.all((states >= 0) & (states < np.array(self._state_radix)), axis=1)
+                    codes = self.encode_states(states[valid])
+                    for j, column in enumerate(columns):
+                        if column >= 0:
+                            table[codes, column] = np.nan_to_num(values[valid, j])
+            else:
+                table = defaultdict(dict)
+                for state, row in zip(map(tuple, states.tolist()), values.tolist()):
+                    for column, q_value in zip(columns, row):
+                        if column >= 0 and q_value == q_value:  # 跳过 NaN
+                            table[state][self.actions[column]] = q_value
+            tables.append(table)
+        self.q_table, self.q_table_2 = tables
+        
+        self.learning_steps = meta.get("learning_steps", 0)
+        self.average_reward = meta.get("average_reward", 0)
+        self.total_reward = meta.get("total_reward", 0)
+        self.exploration_rate = meta.get("exploration_rate", self.exploration_rate)
+        self.beta = meta.get("beta", self.beta)
+        self.replay_statistics = meta.get("replay_statistics", {})
+        
+        replay = {key[len("replay."):]: value for key, value in arrays.items() if key.startswith("replay.")}
+        if replay:
+            try:
+                self.replay_buffer.import_arrays(replay, meta.get("replay_position"))
+            except (KeyError, ValueError) as e:
+                print(f"经验回放数据未恢复: {e}")
+    
+    def to_binary_sections(self):
+        """导出为二进制存档的数据段（记录段 rl，数组段以 rl. 为前缀）"""
+        meta, arrays = self.export_state()
+        sections = {"rl": meta}
+        sections.update((f"rl.{key}", value) for key, value in arrays.items())
+        return sections
+    
+    def restore_binary_sections(self, sections):
+        """从二进制存档的数据段恢复学习状态
+        
+        Returns:
+            bool: 存档中是否有强化学习数据
+        """
+        if "rl" not in sections:
+            return False
+        self.import_state(sections["rl"], {
+            key[len("rl."):]: value for key, value in sections.items() if key.startswith("rl.")
+        })
+        return True
+    
     def save_learning_data(self, file_path):
-        """保存学习数据"""
+        """保存学习数据（扩展名为 .vpet 时使用二进制格式，包括经验回放缓冲区）"""
+        if binfmt.is_binary_path(file_path):
+            binfmt.write_container(file_path, self.to_binary_sections())
+            return
+        
         # 转换Q表为可序列化格式
         def convert_keys(obj):
             if isinstance(obj, dict):
@@ -420,23 +679,35 @@ class ReinforcementLearningSystem:
                 return new_obj
             return obj
         
+        q_table, q_table_2 = self.q_table, self.q_table_2
+        if self.dense:
+            # 数组Q表按字典模式的格式保存，两种模式的存档可以互相加载
+            q_table = self._q_table_to_dict(q_table)
+            q_table_2 = self._q_table_to_dict(q_table_2)
+        
         data = {
-            "q_table": convert_keys(self.q_table),
-            "q_table_2": convert_keys(self.q_table_2),
+            "q_table": convert_keys(q_table),
+            "q_table_2": convert_keys(q_table_2),
             "learning_steps": self.learning_steps,
             "average_reward": self.average_reward,
             "total_reward": self.total_reward,
-            "exploration_rate": self.exploration_rate
+            "exploration_rate": self.exploration_rate,
+            "replay_statistics": self.replay_statistics
         }
         
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
     
     def load_learning_data(self, file_path):
-        """加载学习数据"""
+        """加载学习数据（自动识别 JSON 和二进制格式）"""
         import json
         
         try:
+            if binfmt.is_binary_file(file_path):
+                if not self.restore_binary_sections(binfmt.read_container(file_path)):
+                    raise binfmt.BinaryFormatError("存档中没有强化学习数据")
+                return True
+            
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
@@ -463,14 +734,15 @@ class ReinforcementLearningSystem:
                 return obj
             
             # 恢复Q表
-            self.q_table = defaultdict(dict, convert_keys_back(data.get("q_table", {})))
-            self.q_table_2 = defaultdict(dict, convert_keys_back(data.get("q_table_2", {})))
+            self.q_table = self._q_table_from_dict(convert_keys_back(data.get("q_table", {})))
+            self.q_table_2 = self._q_table_from_dict(convert_keys_back(data.get("q_table_2", {})))
             
             # 恢复学习统计
             self.learning_steps = data.get("learning_steps", 0)
             self.average_reward = data.get("average_reward", 0)
             self.total_reward = data.get("total_reward", 0)
             self.exploration_rate = data.get("exploration_rate", self.exploration_rate)
+            self.replay_statistics = data.get("replay_statistics", {})
             
             return True
         except Exception as e:
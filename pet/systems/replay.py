@@ -0,0 +1,300 @@
+import numpy as np
+
+
+class SumTree:
+    """求和树（线段树），用于按优先级比例采样
+
+    叶子保存每条经验的优先级，内部节点保存子树优先级之和。
+    单点更新和按前缀和查找都是 O(log n)，容量按需倍增。
+    """
+    def __init__(self, capacity=1):
+        self.capacity = 2
+        while self.capacity < capacity:
+            self.capacity *= 2
+        # 1 为根节点，叶子位于 [capacity, 2 * capacity)
+        self.tree = np.zeros(2 * self.capacity, dtype=np.float64)
+
+    def total(self):
+        """获取所有优先级之和"""
+        return float(self.tree[1])
+
+    def get(self, index):
+        """获取单条优先级"""
+        return float(self.tree[self.capacity + index])
+
+    def leaves(self, size):
+        """获取前 size 个叶子的优先级（视图）"""
+        return self.tree[self.capacity:self.capacity + size]
+
+    def grow(self, capacity):
+        """扩容并重建内部节点"""
+        if capacity <= self.capacity:
+            return
+        new_capacity = self.capacity
+        while new_capacity < capacity:
+            new_capacity *= 2
+        tree = np.zeros(2 * new_capacity, dtype=np.float64)
+        tree[new_capacity:new_capacity + self.capacity] = self.leaves(self.capacity)
+        self.capacity = new_capacity
+        self.tree = tree
+        self.rebuild()
+
+    def rebuild(self):
+        """根据叶子自底向上逐层重建内部节点，O(n)"""
+        tree = self.tree
+        level = self.capacity // 2
+        while level >= 1:
+            tree[level:2 * level] = tree[2 * level:4 * level:2] + tree[2 * level + 1:4 * level:2]
+            level //= 2
+
+    @classmethod
+    def from_leaves(cls, priorities, capacity=None):
+        """由叶子优先级批量构建求和树"""
+        priorities = np.asarray(priorities, dtype=np.float64)
+        tree = cls(max(len(priorities), capacity or 0))
+        tree.tree[tree.capacity:tree.capacity + len(priorities)] = priorities
+        tree.rebuild()
+        return tree
+
+    def update(self, index, priority):
+        """更新单条优先级"""
+        node = self.capacity + index
+        tree = self.tree
+        tree[node] = priority
+        node //= 2
+        while node >= 1:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def update_batch(self, indices, priorities):
+        """批量更新优先级
+
+        Notes:
+            - 重复的索引以最后一次出现的优先级为准
+            - 每层只重新计算受影响的父节点，重复的父节点写入相同的值，无需去重
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        priorities = np.asarray(priorities, dtype=np.float64)
+        if indices.size == 0:
+            return
+        # 对重复索引保留最后一次的值
+        reversed_unique, last = np.unique(indices[::-1], return_index=True)
+        nodes = reversed_unique + self.capacity
+        tree = self.tree
+        tree[nodes] = priorities[::-1][last]
+        while nodes[0] > 1:
+            nodes //= 2
+            tree[nodes] = tree[2 * nodes] + tree[2 * nodes + 1]
+
+    def find(self, values):
+        """按前缀和批量查找叶子索引
+
+        Args:
+            values (np.ndarray): 取值范围 [0, total) 的前缀和
+
+        Returns:
+            np.ndarray: 叶子索引
+        """
+        tree = self.tree
+        nodes = np.ones(len(values), dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        while nodes[0] < self.capacity:
+            left = tree[2 * nodes]
+            go_right = values >= left
+            values -= left * go_right
+            nodes = 2 * nodes + go_right
+        return nodes - self.capacity
+
+
+class PrioritizedReplayBuffer:
+    """优先级经验回放缓冲区
+
+    固定容量的环形缓冲区，按列保存状态、动作、奖励、下一状态和结束标志，
+    优先级保存在求和树中：插入、更新优先级和批量采样为 O(log n)，
+    缓冲区满时直接覆盖最旧的经验（O(1) 淘汰）。存储空间按需倍增，
+    因此较大的容量上限不会预先占用内存。
+    """
+    def __init__(self, capacity, state_dim, initial_capacity=1024, seed=None):
+        self.capacity = int(capacity)
+        self.rng = np.random.default_rng(seed)
+        self.state_dim = int(state_dim)
+        self.size = 0
+        self.position = 0  # 下一条经验写入的位置
+        self._allocate(min(self.capacity, initial_capacity))
+        self.tree = SumTree(len(self.rewards))
+
+    def _allocate(self, storage):
+        """分配或扩展列存储"""
+        def grow(old, shape, dtype):
+            new = np.zeros(shape, dtype=dtype)
+            if old is not None:
+                new[:len(old)] = old
+            return new
+
+        self.states = grow(getattr(self, "states", None), (storage, self.state_dim), np.int16)
+        self.actions = grow(getattr(self, "actions", None), storage, np.int16)
+        self.rewards = grow(getattr(self, "rewards", None), storage, np.float64)
+        self.next_states = grow(getattr(self, "next_states", None), (storage, self.state_dim), np.int16)
+        self.dones = grow(getattr(self, "dones", None), storage, bool)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """按从旧到新的顺序遍历经验"""
+        start = self.position - self.size
+        for offset in range(self.size):
+            yield self.get((start + offset) % self.capacity)
+
+    def add(self, state, action, reward, next_state, done, priority):
+        """添加经验
+
+        Args:
+            state (tuple): 离散状态
+            action (int): 动作索引
+            reward (float): 奖励
+            next_state (tuple): 下一离散状态
+            done (bool): 是否结束
+            priority (float): 优先级
+
+        Returns:
+            int: 经验写入的位置
+        """
+        index = self.position
+        if index >= len(self.rewards):
+            self._allocate(min(self.capacity, 2 * len(self.rewards)))
+            self.tree.grow(len(self.rewards))
+
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = next_state
+        self.dones[index] = done
+        self.tree.update(index, priority)
+
+        self.position = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return index
+
+    def export_arrays(self):
+        """导出有效经验的列数组（按存储位置排列，不复制）
+
+        Returns:
+            dict: states、actions、rewards、next_states、dones、priorities
+        """
+        size = self.size
+        return {
+            "states": self.states[:size],
+            "actions": self.actions[:size],
+            "rewards": self.rewards[:size],
+            "next_states": self.next_states[:size],
+            "dones": self.dones[:size],
+            "priorities": self.tree.leaves(size)
+        }
+
+    def import_arrays(self, arrays, position=None):
+        """从列数组恢复经验，替换当前内容
+
+        Args:
+            arrays (dict): export_arrays 导出的列数组
+            position (int, optional): 导出时下一条经验写入的位置，用于确定环形缓冲区中最旧的经验
+
+        Notes:
+            - 导入后经验按从旧到新的顺序存放；多于容量时保留最新的经验
+            - 状态维度与缓冲区不一致时抛出 ValueError
+        """
+        states = np.asarray(arrays["states"], dtype=np.int16)
+        size = len(states)
+        if size and states.shape[1] != self.state_dim:
+            raise ValueError(f"状态维度不匹配: {states.shape[1]} != {self.state_dim}")
+        columns = {
+            "states": states,
+            "actions": np.asarray(arrays["actions"], dtype=np.int16),
+            "rewards": np.asarray(arrays["rewards"], dtype=np.float64),
+            "next_states": np.asarray(arrays["next_states"], dtype=np.int16),
+            "dones": np.asarray(arrays["dones"], dtype=bool),
+            "priorities": np.asarray(arrays["priorities"], dtype=np.float64)
+        }
+        if position is not None and 0 < position < size:
+            # 环形缓冲区已回绕：先按从旧到新的顺序排列
+            order = (position + np.arange(size)) % size
+            columns = {key: column[order] for key, column in columns.items()}
+        if size > self.capacity:
+            # 只保留最新的 capacity 条
+            columns = {key: column[size - self.capacity:] for key, column in columns.items()}
+            size = self.capacity
+
+        self.size = size
+        self.position = size % self.capacity
+        if size == 0:
+            self.tree = SumTree(len(self.rewards))
+            return
+        self.states = np.array(columns["states"]).reshape(size, self.state_dim)
+        self.actions = np.array(columns["actions"])
+        self.rewards = np.array(columns["rewards"])
+        self.next_states = np.array(columns["next_states"]).reshape(size, self.state_dim)
+        self.dones = np.array(columns["dones"])
+        self.tree = SumTree.from_leaves(columns["priorities"])
+
+    def get(self, index):
+        """获取单条经验
+
+        Returns:
+            tuple: (state, action_index, reward, next_state, done)
+        """
+        return (
+            tuple(self.states[index].tolist()),
+            int(self.actions[index]),
+            float(self.rewards[index]),
+            tuple(self.next_states[index].tolist()),
+            bool(self.dones[index])
+        )
+
+    def batch(self, indices):
+        """按索引批量获取经验数组
+
+        Returns:
+            tuple: (states, actions, rewards, next_states, dones)，均为 np.ndarray
+        """
+        return (self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.dones[indices])
+
+    def get_priority(self, index):
+        """获取单条经验的优先级"""
+        return self.tree.get(index)
+
+    def update_priority(self, index, priority):
+        """更新单条经验的优先级"""
+        self.tree.update(index, priority)
+
+    def update_priorities(self, indices, priorities):
+        """批量更新优先级"""
+        self.tree.update_batch(indices, priorities)
+
+    def sample(self, batch_size, beta):
+        """按优先级比例采样
+
+        Args:
+            batch_size (int): 采样数量
+            beta (float): 重要性采样权重指数
+
+        Returns:
+            tuple: (indices, weights)，均为 np.ndarray，权重已按批内最大值归一化
+        """
+        total = self.tree.total()
+        if total <= 0:
+            # 所有优先级为0时，均匀采样
+            indices = self.rng.integers(0, self.size, size=batch_size)
+            return indices, np.ones(batch_size, dtype=np.float64)
+
+        values = self.rng.random(batch_size) * total
+        # 避免浮点误差落到最后一个叶子之外
+        np.minimum(values, np.nextafter(total, 0), out=values)
+        indices = self.tree.find(values)
+        np.minimum(indices, self.size - 1, out=indices)
+
+        # 计算重要性采样权重并归一化
+        probabilities = np.maximum(self.tree.tree[self.tree.capacity + indices] / total, 1e-12)
+        weights = (self.size * probabilities) ** (-beta)
+        weights /= weights.max()
+        return indices, weights
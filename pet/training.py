@@ -0,0 +1,231 @@
+"""多进程强化学习训练场
+
+每个工作进程在模拟时钟上快进运行若干只无界面的智能宠物，使用各自的
+ReinforcementLearningSystem（数组Q表）学习；每轮结束后主进程对各进程的Q表取平均，
+作为下一轮的起点，并汇总各进程经验回放缓冲区的统计（经验数、奖励分布、各动作的经验数）。
+训练结果按 _rl.json 格式保存（汇总的统计保存在 replay_statistics 中），可直接被 main 加载。
+
+用法：
+    python -m pet.training --workers 4 --rounds 10 --days 30 --name 小白
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .clock import SimulationClock
+from .intelligent import IntelligentPet
+from .simulation import fast_forward
+from .systems.reinforcement import ReinforcementLearningSystem
+
+
+def _quiet_pet(name, clock=None):
+    """创建智能宠物，不输出激活提示"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return IntelligentPet(name, clock=clock)
+
+
+def _run_worker(task):
+    """工作进程：从给定的Q表出发运行若干回合
+
+    Args:
+        task (dict): 工作参数，包括初始Q表、探索率、回合数、回合时长、步长和随机种子
+
+    Returns:
+        dict: 训练后的Q表和学习统计
+    """
+    random.seed(task["seed"])
+    rl = None
+    for episode in range(task["episodes"]):
+        pet = _quiet_pet(f"训练宠物{task['worker_id']}_{episode}", SimulationClock(0))
+        if rl is None:
+            rl = ReinforcementLearningSystem(pet, q_backend="dense")
+            rl.q_table[:] = task["q_table"]
+            rl.q_table_2[:] = task["q_table_2"]
+            rl.exploration_rate = task["exploration_rate"]
+            rl.beta = task["beta"]
+            rl.replay_buffer.rng = np.random.default_rng(task["seed"])
+        else:
+            # 同一进程内的回合共享学习系统，只更换宠物
+            rl.pet = pet
+            rl._last_state_values = None
+        pet.reinforcement_learning = rl
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            fast_forward(pet, task["episode_seconds"], step=task["step"])
+
+    return {
+        "q_table": rl.q_table,
+        "q_table_2": rl.q_table_2,
+        "learning_steps": rl.learning_steps,
+        "total_reward": rl.total_reward,
+        "exploration_rate": rl.exploration_rate,
+        "beta": rl.beta,
+        "replay_statistics": replay_statistics(rl)
+    }
+
+
+def replay_statistics(rl):
+    """经验回放缓冲区的统计
+
+    Returns:
+        dict: 经验数、奖励和、奖励平方和，以及动作名称 -> 经验数
+    """
+    size = len(rl.replay_buffer)
+    rewards = rl.replay_buffer.rewards[:size]
+    counts = np.bincount(rl.replay_buffer.actions[:size], minlength=len(rl.actions))
+    return {
+        "experiences": size,
+        "reward_sum": float(rewards.sum()),
+        "reward_sq_sum": float(np.square(rewards).sum()),
+        "action_counts": {action: int(count) for action, count in zip(rl.actions, counts)}
+    }
+
+
+def merge_replay_statistics(total, stats):
+    """把一组经验回放统计累加到 total 中，并更新奖励的均值和标准差"""
+    total["experiences"] = total.get("experiences", 0) + stats["experiences"]
+    total["reward_sum"] = total.get("reward_sum", 0.0) + stats["reward_sum"]
+    total["reward_sq_sum"] = total.get("reward_sq_sum", 0.0) + stats["reward_sq_sum"]
+    action_counts = dict(total.get("action_counts", {}))
+    for action, count in stats["action_counts"].items():
+        action_counts[action] = action_counts.get(action, 0) + count
+    total["action_counts"] = action_counts
+    if total["experiences"]:
+        mean = total["reward_sum"] / total["experiences"]
+        variance = max(total["reward_sq_sum"] / total["experiences"] - mean * mean, 0.0)
+        total["reward_mean"] = mean
+        total["reward_std"] = variance ** 0.5
+    return total
+
+
+def merge_results(rl, results):
+    """将各工作进程的结果合并到学习系统中
+
+    Notes:
+        - Q表按元素取平均；各进程从同一张表出发，相当于对各自的更新量取平均
+        - 学习步数和累计奖励求和，探索率和 beta 取平均
+        - 各进程的经验回放统计累加到 rl.replay_statistics（跨轮累计）
+    """
+    rl.q_table = np.mean([r["q_table"] for r in results], axis=0)
+    rl.q_table_2 = np.mean([r["q_table_2"] for r in results], axis=0)
+    rl.learning_steps += sum(r["learning_steps"] for r in results)
+    rl.total_reward += sum(r["total_reward"] for r in results)
+    if rl.learning_steps:
+        rl.average_reward = rl.total_reward / rl.learning_steps
+    rl.exploration_rate = float(np.mean([r["exploration_rate"] for r in results]))
+    rl.beta = float(np.mean([r["beta"] for r in results]))
+    for r in results:
+        merge_replay_statistics(rl.replay_statistics, r["replay_statistics"])
+
+
+def train_policy(workers=None, rounds=5, episodes=1, days=30, step=3600, seed=None, rl=None, progress=None):
+    """并行训练强化学习策略
+
+    Args:
+        workers (int, optional): 工作进程数，默认为CPU核数；为1时在当前进程中运行
+        rounds (int, optional): 合并轮数
+        episodes (int, optional): 每个进程每轮运行的回合数（每回合一只新宠物）
+        days (float, optional): 每回合模拟的天数
+        step (float, optional): 模拟步长（秒），每步执行一次自发行为
+        seed (int, optional): 随机种子
+        rl (ReinforcementLearningSystem, optional): 继续训练的学习系统，默认新建（数组Q表）
+        progress (callable, optional): 每轮结束后的回调 progress(round_index, rl)
+
+    Returns:
+        ReinforcementLearningSystem: 合并后的学习系统
+    """
+    workers = workers or os.cpu_count() or 1
+    if rl is None:
+        rl = ReinforcementLearningSystem(_quiet_pet("训练宠物"), q_backend="dense")
+    elif not rl.dense:
+        raise ValueError("训练场需要使用数组Q表的学习系统")
+    rng = random.Random(seed)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for round_index in range(rounds):
+            tasks = [{
+                "worker_id": worker_id,
+                "q_table": rl.q_table,
+                "q_table_2": rl.q_table_2,
+                "exploration_rate": rl.exploration_rate,
+                "beta": rl.beta,
+                "episodes": episodes,
+                "episode_seconds": days * 86400,
+                "step": step,
+                "seed": rng.getrandbits(32)
+            } for worker_id in range(workers)]
+
+            if executor is None:
+                results = [_run_worker(task) for task in tasks]
+            else:
+                results = list(executor.map(_run_worker, tasks))
+
+            merge_results(rl, results)
+            if progress is not None:
+                progress(round_index, rl)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return rl
+
+
+def save_trained_pet(rl, name, pets_dir="data/pets"):
+    """保存训练结果，生成 main 可以直接加载的智能宠物
+
+    Returns:
+        tuple: (宠物文件路径, 强化学习数据文件路径)
+    """
+    pet_file = os.path.join(pets_dir, f"{name}.json")
+    rl_file = os.path.join(pets_dir, f"{name}_rl.json")
+    os.makedirs(pets_dir, exist_ok=True)
+    if not os.path.exists(pet_file):
+        _quiet_pet(name).save_to_file(pet_file)
+    rl.save_learning_data(rl_file)
+    return pet_file, rl_file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程训练智能宠物的强化学习策略")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认为CPU核数")
+    parser.add_argument("--rounds", type=int, default=5, help="合并轮数")
+    parser.add_argument("--episodes", type=int, default=1, help="每个进程每轮的回合数")
+    parser.add_argument("--days", type=float, default=30, help="每回合模拟的天数")
+    parser.add_argument("--step", type=float, default=3600, help="模拟步长（秒）")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--name", default=None, help="宠物名称，结果保存到 data/pets/<名称>_rl.json")
+    parser.add_argument("--output", default=None, help="强化学习数据输出路径（与 --name 二选一）")
+    args = parser.parse_args(argv)
+
+    if not args.name and not args.output:
+        parser.error("需要指定 --name 或 --output")
+
+    rl = ReinforcementLearningSystem(_quiet_pet("训练宠物"), q_backend="dense")
+    if args.output and os.path.exists(args.output):
+        rl.load_learning_data(args.output)
+
+    def report(round_index, rl):
+        stats = rl.get_learning_stats()
+        print(f"第 {round_index + 1}/{args.rounds} 轮：学习步数 {stats['learning_steps']}，"
+              f"平均奖励 {stats['average_reward']:.3f}，探索率 {stats['exploration_rate']:.3f}，"
+              f"Q表条目 {stats['q_table_size']}，"
+              f"经验奖励均值 {rl.replay_statistics.get('reward_mean', 0.0):.3f}")
+
+    train_policy(workers=args.workers, rounds=args.rounds, episodes=args.episodes,
+                 days=args.days, step=args.step, seed=args.seed, rl=rl, progress=report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        rl.save_learning_data(args.output)
+        print(f"强化学习数据已保存到 {args.output}")
+    else:
+        pet_file, rl_file = save_trained_pet(rl, args.name)
+        print(f"智能宠物已保存到 {pet_file}，强化学习数据已保存到 {rl_file}")
+
+
+if __name__ == "__main__":
+    main()
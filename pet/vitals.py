@@ -0,0 +1,69 @@
+"""宠物数值快照"""
+
+
+class PetVitals:
+    """宠物核心数值快照
+
+    使用 __slots__ 保存浮点数值，供决策、行为树和强化学习等内部模块直接读取，
+    避免在热路径上格式化字符串再解析回来。
+    """
+    __slots__ = ("health", "hunger", "energy", "hygiene", "happiness",
+                 "weight", "relationship", "is_sleeping")
+
+    # 强化学习状态离散化使用的字段顺序（与 PetConfig.STATE_BINS 一致）
+    STATE_FIELDS = ("hunger", "energy", "hygiene", "happiness", "health")
+
+    def __init__(self, health, hunger, energy, hygiene, happiness,
+                 weight=1.0, relationship=50.0, is_sleeping=False):
+        self.health = health
+        self.hunger = hunger
+        self.energy = energy
+        self.hygiene = hygiene
+        self.happiness = happiness
+        self.weight = weight
+        self.relationship = relationship
+        self.is_sleeping = is_sleeping
+
+    @classmethod
+    def from_pet(cls, pet):
+        """从宠物当前属性创建快照"""
+        return cls(
+            float(pet.health),
+            float(pet.hunger),
+            float(pet.energy),
+            float(pet.hygiene),
+            float(pet.happiness),
+            float(pet.weight),
+            float(pet.relationship_with_owner),
+            pet.is_sleeping
+        )
+
+    def __getitem__(self, key):
+        """支持 vitals["hunger"] 形式的访问，兼容按字典读取数值的调用方"""
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __eq__(self, other):
+        if not isinstance(other, PetVitals):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return (f"PetVitals(health={self.health:.1f}, hunger={self.hunger:.1f}, "
+                f"energy={self.energy:.1f}, hygiene={self.hygiene:.1f}, "
+                f"happiness={self.happiness:.1f}, is_sleeping={self.is_sleeping})")
+
+    def as_tuple(self):
+        """按 __slots__ 顺序返回数值元组"""
+        return (self.health, self.hunger, self.energy, self.hygiene, self.happiness,
+                self.weight, self.relationship, self.is_sleeping)
+
+    def state_values(self):
+        """按 STATE_FIELDS 顺序返回强化学习使用的五项数值"""
+        return (self.hunger, self.energy, self.hygiene, self.happiness, self.health)
+
+    def to_dict(self):
+        """转换为字典"""
+        return {name: getattr(self, name) for name in self.__slots__}
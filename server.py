@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""本地多宠物服务器
+
+一个进程同时托管多只宠物（Pet / IntelligentPet），通过 HTTP/JSON（TCP 或 Unix 套接字）访问：
+    POST /pets                     创建宠物，请求体 {"name", "species", "kind": "pet" | "intelligent"}
+    GET  /pets                     列出宠物名称（?limit=N）
+    GET  /pets/<name>              宠物状态
+    POST /pets/<name>/<action>     执行动作（feed、play、clean、train、sleep、wake_up、pet），
+                                   请求体为动作参数，例如 {"food_type": "零食"}
+    GET  /stats                    服务器统计
+
+PetHost 在内存中保留最近访问的宠物（LRU，容量为 PetConfig.SERVER_HOT_PETS），
+其余宠物保存在 SQLitePetStore 中，访问时在线程池中加载。每只宠物有自己的锁；正在处理请求
+（包括等待锁）的宠物不会被换出。修改过的宠物定期在后台线程写入存储，被换出的宠物在
+写入完成前仍可直接取回，不会读到旧数据。
+
+用法：
+    python server.py [--host 127.0.0.1] [--port 8765] [--unix PATH] [--db data/server.db]
+压测见 loadgen.py。
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit, parse_qs
+from pet import Pet, IntelligentPet
+from pet.config import PetConfig
+from pet.store import SQLitePetStore, KIND_PET, KIND_INTELLIGENT, _quiet
+
+# 动作 -> 允许的参数
+ACTIONS = {
+    "feed": ("food_type",),
+    "play": ("game_type",),
+    "clean": ("clean_type",),
+    "train": ("skill_type",),
+    "sleep": (),
+    "wake_up": (),
+    "pet": ("duration",),
+}
+
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error"
+}
+
+MAX_BODY = 64 * 1024  # 请求体的最大字节数
+
+
+class ApiError(Exception):
+    """返回给客户端的错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def catch_up(pet):
+    """按经过的时间更新需求（与定时调度器的需求更新一致，不满一小时时不更新）"""
+    pet.needs_update = True
+    Pet.update(pet)
+
+
+def pet_summary(pet):
+    """宠物状态（数值不格式化，便于客户端处理）"""
+    return {
+        "name": pet.name,
+        "species": pet.species,
+        "kind": KIND_INTELLIGENT if isinstance(pet, IntelligentPet) else KIND_PET,
+        "level": pet.level,
+        "state": pet.state.value,
+        "mood": pet.mood.value,
+        "vitals": pet.get_vitals().to_dict(),
+        "skills": pet.skills,
+        "color": pet.color,
+    }
+
+
+class PetSession:
+    """内存中的宠物及其锁"""
+    __slots__ = ("pet", "lock", "last_access", "pins")
+
+    def __init__(self, pet):
+        self.pet = pet
+        self.lock = asyncio.Lock()
+        self.last_access = time.monotonic()
+        self.pins = 0  # 正在使用该会话的请求数（包括等待锁的请求）
+
+    @property
+    def evictable(self):
+        """没有请求在使用时才能换出"""
+        return self.pins == 0 and not self.lock.locked()
+
+
+class PetHost:
+    """宠物托管：LRU 热宠物 + 存储中的冷宠物"""
+
+    def __init__(self, store, capacity=None, flush_interval=None):
+        """初始化托管
+
+        Args:
+            store (SQLitePetStore): 宠物存储
+            capacity (int, optional): 内存中保留的宠物数量，默认为 PetConfig.SERVER_HOT_PETS
+            flush_interval (float, optional): 写入修改的间隔（秒），默认为 PetConfig.SERVER_FLUSH_INTERVAL
+        """
+        self.store = store
+        self.capacity = PetConfig.SERVER_HOT_PETS if capacity is None else capacity
+        self.flush_interval = PetConfig.SERVER_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._hot = OrderedDict()  # 名称 -> PetSession，最近访问的在末尾
+        self._evicted = {}  # 已换出、等待写入完成的会话，写入前可以直接取回
+        self._write_lock = asyncio.Lock()  # 按顺序写入
+        self._flush_task = None  # 换出过多时提前开始的写入
+        self._known = None  # 存储中的宠物名称（首次使用时读取）
+        self._failed = {}  # 名称 -> 写入失败的记录，下一次写入时重试
+        self._loading = {}  # 名称 -> 正在从存储加载的任务
+        self.last_error = None  # 最近一次写入失败的异常
+
+        # 统计
+        self.loads = 0  # 从存储加载的次数
+        self.evictions = 0  # 换出的次数
+        self.writes = 0  # 写入存储的记录数
+        self.write_errors = 0  # 写入失败的记录数
+
+    def _names(self):
+        if self._known is None:
+            self._known = self.store.names()
+        return self._known
+
+    def __contains__(self, name):
+        return name in self._hot or name in self._evicted or name in self._names()
+
+    def names(self):
+        """所有宠物名称"""
+        return self._names() | set(self._hot) | set(self._evicted)
+
+    @property
+    def hot_count(self):
+        """内存中的宠物数量"""
+        return len(self._hot)
+
+    def create(self, name, species="未知", kind=KIND_PET):
+        """创建宠物并放入内存（下一次写入时保存）
+
+        Raises:
+            ApiError: 名称为空、已存在或名称、种类、类型无效
+        """
+        if not name:
+            raise ApiError(400, "缺少宠物名称")
+        if not isinstance(name, str):
+            raise ApiError(400, "宠物名称必须是字符串")
+        if not isinstance(species, str):
+            raise ApiError(400, "宠物种类必须是字符串")
+        if name in self:
+            raise ApiError(409, f"宠物已存在: {name}")
+        if kind not in (KIND_PET, KIND_INTELLIGENT):
+            raise ApiError(400, f"无效的宠物类型: {kind}")
+        cls = IntelligentPet if kind == KIND_INTELLIGENT else Pet
+        pet = _quiet(cls, name=name, species=species)
+        self._names().add(name)
+        return self._admit(name, PetSession(pet))
+
+    async def get(self, name, pin=False):
+        """获取宠物会话，不在内存中时在线程池中从存储加载（不阻塞事件循环）
+
+        Args:
+            name (str): 宠物名称
+            pin (bool): 是否固定会话，固定后直到 release 之前不会被换出
+
+        Raises:
+            ApiError: 宠物不存在
+
+        Notes:
+            - 同一只宠物同时只加载一次，等待同一次加载的请求取得同一个会话
+        """
+        session = self._lookup(name, pin)
+        while session is None:
+            if name not in self._names():
+                raise ApiError(404, f"宠物不存在: {name}")
+            loading = self._loading.get(name)
+            if loading is None:
+                loading = asyncio.ensure_future(asyncio.to_thread(self.store.load, name))
+                self._loading[name] = loading
+                loading.add_done_callback(lambda _, name=name: self._loading.pop(name, None))
+            # 请求被取消时不取消共享的加载
+            pet = await asyncio.shield(loading)
+            # 先恢复的请求放入内存，其余请求直接取回同一个会话
+            session = self._lookup(name, pin)
+            if session is None:
+                if pet is None:
+                    raise ApiError(404, f"宠物不存在: {name}")
+                self.loads += 1
+                session = PetSession(pet)
+                if pin:
+                    session.pins += 1
+                self._admit(name, session)
+        session.last_access = time.monotonic()
+        return session
+
+    def _lookup(self, name, pin):
+        """从内存或等待写入的换出会话中取回宠物，都没有时返回 None"""
+        session = self._hot.get(name)
+        if session is not None:
+            self._hot.move_to_end(name)
+        else:
+            session = self._evicted.pop(name, None)
+            if session is None:
+                return None
+        # 先固定再放入内存，放入时换出其他宠物不会换出这个会话
+        if pin:
+            session.pins += 1
+        if self._hot.get(name) is not session:
+            self._admit(name, session)
+        return session
+
+    def release(self, session):
+        """取消 get(pin=True) 的固定，超过容量时换出多余的宠物"""
+        session.pins -= 1
+        if session.pins == 0:
+            self._evict_excess()
+
+    def _admit(self, name, session):
+        """放入内存，超过容量时换出最久未访问且没有请求在使用的宠物"""
+        self._hot[name] = session
+        self._evict_excess(keep=name)
+        return session
+
+    def _evict_excess(self, keep=None):
+        while len(self._hot) > self.capacity:
+            victim = next((n for n, s in self._hot.items() if s.evictable), None)
+            if victim is None or victim == keep:
+                break
+            self._evicted[victim] = self._hot.pop(victim)
+            self.evictions += 1
+        if len(self._evicted) >= self.capacity:
+            self._flush_soon()
+
+    def _flush_soon(self):
+        """换出的宠物达到容量时不等定时写入，立即开始写入（限制内存占用）"""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush(include_hot=False))
+        except RuntimeError:
+            # 没有运行中的事件循环（例如同步调用），等待下一次定时写入
+            pass
+
+    def _collect(self, sessions):
+        """在事件循环线程上收集修改（store.collect 只复制修改过的段）"""
+        records = []
+        for session in sessions:
+            record = self.store.collect(session.pet)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def _commit(self, records):
+        """逐条写入，一条记录失败不影响其他宠物
+
+        Returns:
+            dict: 名称 -> (写入失败的记录, 异常)
+        """
+        failed = {}
+        for record in records:
+            try:
+                self.store.commit(record)
+            except Exception as e:
+                failed[record["name"]] = (record, e)
+        return failed
+
+    async def flush(self, include_hot=True):
+        """写入换出的宠物和（可选）内存中修改过的宠物
+
+        Returns:
+            int: 写入的记录数
+        """
+        async with self._write_lock:
+            evicted = dict(self._evicted)
+            sessions = list(evicted.values())
+            if include_hot:
+                sessions.extend(self._hot.values())
+            # 上次写入失败的记录与新的修改合并后重试
+            retry, self._failed = self._failed, {}
+            records = []
+            for record in self._collect(sessions):
+                older = retry.pop(record["name"], None)
+                records.append(record if older is None else self.store.merge(older, record))
+            records.extend(retry.values())
+            failed = {}
+            if records:
+                failed = await asyncio.to_thread(self._commit, records)
+                for name, (record, error) in failed.items():
+                    print(f"写入宠物失败：{name}（{error}）")
+                    self._failed[name] = record
+                    self.last_error = error
+                self.writes += len(records) - len(failed)
+                self.write_errors += len(failed)
+            # 写入完成后丢弃换出的会话（写入期间被取回的会话已经不在 _evicted 中，
+            # 写入失败的会话保留到写入成功，避免从存储读到旧数据）
+            for name, session in evicted.items():
+                if self._evicted.get(name) is session and name not in self._failed:
+                    del self._evicted[name]
+            return len(records) - len(failed)
+
+    async def run_flusher(self):
+        """定期写入修改，一次写入出错不会停止之后的写入"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.last_error = e
+                print(f"写入宠物失败：{e}")
+
+    def stats(self):
+        """托管统计"""
+        return {
+            "hot": len(self._hot),
+            "evicted_pending": len(self._evicted),
+            "capacity": self.capacity,
+            "known": len(self._names()),
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "writes": self.writes,
+            "write_errors": self.write_errors,
+        }
+
+
+class PetServer:
+    """HTTP/JSON 宠物服务器"""
+
+    def __init__(self, host):
+        """初始化服务器
+
+        Args:
+            host (PetHost): 宠物托管
+        """
+        self.host = host
+        self.requests = 0
+        self.errors = 0
+        self.started_at = time.monotonic()
+
+    async def dispatch(self, method, target, body):
+        """处理请求
+
+        Returns:
+            tuple: (状态码, 响应数据)
+        """
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        data = {}
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                raise ApiError(400, "请求体不是有效的 JSON")
+            if not isinstance(data, dict):
+                raise ApiError(400, "请求体必须是 JSON 对象")
+
+        if parts == ["stats"] and method == "GET":
+            return 200, self.stats()
+        if not parts or parts[0] != "pets" or len(parts) > 3:
+            raise ApiError(404, f"未知路径: {url.path}")
+
+        if len(parts) == 1:
+            if method == "POST":
+                pet = self.host.create(data.get("name"), data.get("species", "未知"), data.get("kind", KIND_PET)).pet
+                return 201, pet_summary(pet)
+            if method == "GET":
+                query = parse_qs(url.query)
+                names = sorted(self.host.names())
+                if "limit" in query:
+                    names = names[:int(query["limit"][0])]
+                return 200, {"pets": names}
+            raise ApiError(405, f"不支持的方法: {method}")
+
+        if len(parts) == 2:
+            if method != "GET":
+                raise ApiError(405, f"不支持的方法: {method}")
+        else:
+            if method != "POST":
+                raise ApiError(405, f"不支持的方法: {method}")
+            action = parts[2]
+            if action not in ACTIONS:
+                raise ApiError(404, f"未知动作: {action}")
+            unknown = set(data) - set(ACTIONS[action])
+            if unknown:
+                raise ApiError(400, f"未知参数: {', '.join(sorted(unknown))}")
+
+        # 固定会话后再等待锁，等待期间宠物不会被换出
+        session = await self.host.get(parts[1], pin=True)
+        try:
+            return await self._run_locked(session, parts[2] if len(parts) == 3 else None, data)
+        finally:
+            self.host.release(session)
+
+    async def _run_locked(self, session, action, data):
+        """持有宠物的锁读取状态（action 为 None）或执行动作"""
+        async with session.lock:
+            if action is None:
+                catch_up(session.pet)
+                return 200, pet_summary(session.pet)
+            pet = session.pet
+            catch_up(pet)
+            if isinstance(pet, IntelligentPet):
+                result = pet.interact_with_user(action, **data)
+            else:
+                result = getattr(pet, action)(**data)
+            return 200, {"result": result, "vitals": pet.get_vitals().to_dict()}
+
+    def stats(self):
+        """服务器统计"""
+        uptime = time.monotonic() - self.started_at
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "uptime": uptime,
+            "requests_per_second": self.requests / uptime if uptime > 0 else 0.0,
+            **self.host.stats(),
+        }
+
+    async def respond(self, method, target, body):
+        """处理请求并编码响应
+
+        Returns:
+            tuple: (状态码, 响应体字节)
+        """
+        self.requests += 1
+        try:
+            status, payload = await self.dispatch(method, target, body)
+        except ApiError as e:
+            status, payload = e.status, {"error": e.message}
+        except (TypeError, ValueError) as e:
+            # 动作参数类型错误等
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            # 其他错误返回 500，连接继续可用
+            status, payload = 500, {"error": f"服务器内部错误: {e}"}
+        if status >= 400:
+            self.errors += 1
+        return status, json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+    async def handle_connection(self, reader, writer):
+        """处理一个连接上的请求（HTTP/1.1 长连接）"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    key, sep, value = line.partition(":")
+                    if sep:
+                        headers[key.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # 无法确定请求体的边界，响应后关闭连接
+                    status, body = 400, json.dumps({"error": "无效的 Content-Length"}).encode("utf-8")
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, body = 413, json.dumps({"error": "请求体过大"}).encode("utf-8")
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, body = await self.respond(method, target, body)
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def start(self, host=None, port=None, unix_path=None):
+        """开始监听
+
+        Args:
+            host (str, optional): 监听地址，默认为 PetConfig.SERVER_HOST
+            port (int, optional): 端口，默认为 PetConfig.SERVER_PORT；为 0 时自动分配
+            unix_path (str, optional): Unix 套接字路径，指定时不监听 TCP
+
+        Returns:
+            asyncio.Server: 监听的服务器
+        """
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_path)
+        return await asyncio.start_server(
+            self.handle_connection,
+            PetConfig.SERVER_HOST if host is None else host,
+            PetConfig.SERVER_PORT if port is None else port
+        )
+
+
+async def serve(db_path=None, host=None, port=None, unix_path=None, capacity=None):
+    """运行服务器直到被取消，退出前写入全部修改"""
+    store = SQLitePetStore(PetConfig.SERVER_STORE_PATH if db_path is None else db_path)
+    pet_host = PetHost(store, capacity)
+    server = PetServer(pet_host)
+    listener = await server.start(host, port, unix_path)
+    flusher = asyncio.create_task(pet_host.run_flusher())
+    address = unix_path or "%s:%d" % listener.sockets[0].getsockname()[:2]
+    print(f"宠物服务器已启动：{address}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        await pet_host.flush()
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地多宠物服务器")
+    parser.add_argument("--host", default=PetConfig.SERVER_HOST, help="监听地址")
+    parser.add_argument("--port", type=int, default=PetConfig.SERVER_PORT, help="监听端口")
+    parser.add_argument("--unix", help="Unix 套接字路径（指定时不监听 TCP）")
+    parser.add_argument("--db", default=PetConfig.SERVER_STORE_PATH, help="宠物存储路径")
+    parser.add_argument("--hot", type=int, default=PetConfig.SERVER_HOT_PETS, help="内存中保留的宠物数量")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.unix, args.hot))
+    except KeyboardInterrupt:
+        print("宠物服务器已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 #!/usr/bin/env python3
+import bisect
+import copy
+import itertools
 import random
-import time
+from collections import deque, namedtuple
+from collections.abc import MutableMapping
 from enum import Enum
+import numpy as np
+from pet.clock import SYSTEM_CLOCK, get_clock
+from pet.config import PetConfig
+from pet.journal import DirtyTracking
 
 class NPCPet:
     """NPC宠物类"""
@@ -92,13 +100,36 @@ class SocialRelationshipStatus(Enum):
     RIVAL = "rival"  # 竞争对手
     ENEMY = "enemy"  # 敌人
 
+class InteractionRule(namedtuple("InteractionRule", [
+        "base_chance", "friend_chance", "enemy_chance", "success_bond", "failure_bond"])):
+    """互动规则：成功率（一般、朋友、敌人）和成功、失败时的纽带值变化"""
+    __slots__ = ()
+    
+    def success_chance(self, status):
+        """按关系状态的成功率"""
+        if status == SocialRelationshipStatus.FRIEND:
+            return self.friend_chance
+        if status == SocialRelationshipStatus.ENEMY:
+            return self.enemy_chance
+        return self.base_chance
+
+# 单次互动（SocialSystem）和批量模拟（NPCWorld）共用的互动规则；
+# 竞争的成功率由双方的社交技能决定，不使用规则中的成功率
+INTERACTION_RULES = {
+    SocialInteractionType.GREET: InteractionRule(0.7, 0.9, 0.3, 5, -2),
+    SocialInteractionType.PLAY: InteractionRule(0.6, 0.8, 0.2, 10, -5),
+    SocialInteractionType.SHARE: InteractionRule(0.5, 0.8, 0.1, 12, -3),
+    SocialInteractionType.COMPETE: InteractionRule(None, None, None, -2, -4),
+    SocialInteractionType.HELP: InteractionRule(0.6, 0.9, 0.2, 15, -3),
+}
+
 class SocialEvent:
     """社交事件类"""
     def __init__(self, event_id, event_type, participants, timestamp=None, description=None):
         self.event_id = event_id
         self.event_type = event_type
         self.participants = participants  # 参与者列表
-        self.timestamp = timestamp or time.time()
+        self.timestamp = timestamp or SYSTEM_CLOCK.time()
         self.description = description
         self.resolved = False
         self.outcome = None
@@ -120,15 +151,144 @@ class SocialEvent:
             "outcome": self.outcome
         }
 
+class InteractionHistory:
+    """分层的互动历史
+    
+    最近的互动原样保存在固定长度的环形缓冲区中；每次互动同时累加到所在时间桶按互动类型
+    的统计（次数、成功次数、纽带值变化之和）。时间桶超过保留数量时，最早的桶合并到累计
+    统计，因此每段关系占用的内存有上限，仍然可以查询全部历史的统计。
+    """
+    
+    def __init__(self, recent_length=None, bucket_size=None, max_buckets=None):
+        """初始化互动历史
+        
+        Args:
+            recent_length (int, optional): 保留的最近互动记录数，默认为 PetConfig.SOCIAL_RECENT_INTERACTIONS
+            bucket_size (float, optional): 时间桶长度（秒），默认为 PetConfig.SOCIAL_HISTORY_BUCKET
+            max_buckets (int, optional): 保留的时间桶数，默认为 PetConfig.SOCIAL_HISTORY_BUCKETS
+        """
+        self.recent = deque(maxlen=recent_length or PetConfig.SOCIAL_RECENT_INTERACTIONS)
+        self.bucket_size = bucket_size or PetConfig.SOCIAL_HISTORY_BUCKET
+        self.max_buckets = max_buckets or PetConfig.SOCIAL_HISTORY_BUCKETS
+        self.buckets = {}  # 时间桶起点 -> {互动类型值: [次数, 成功次数, 纽带值变化]}
+        self.archived = {}  # 已合并的早期时间桶：互动类型值 -> [次数, 成功次数, 纽带值变化]
+    
+    def __len__(self):
+        """记录过的互动总数"""
+        return self.stats()["count"]
+    
+    @staticmethod
+    def _fold(target, counts):
+        """把按互动类型的统计累加到 target"""
+        for interaction_type, (count, successes, bond_change) in counts.items():
+            total = target.setdefault(interaction_type, [0, 0, 0])
+            total[0] += count
+            total[1] += successes
+            total[2] += bond_change
+    
+    def add(self, interaction):
+        """记录一次互动
+        
+        Args:
+            interaction (dict): 互动记录，包含 interaction_type、outcome 和 timestamp
+        """
+        self.recent.append(interaction)
+        outcome = interaction.get("outcome")
+        if isinstance(outcome, dict):
+            success = bool(outcome.get("success"))
+            bond_change = outcome.get("bond_change", 0)
+        else:
+            success = bool(outcome)
+            bond_change = 0
+        counts = {interaction["interaction_type"]: [1, int(success), bond_change]}
+        
+        start = (interaction.get("timestamp") or 0) // self.bucket_size * self.bucket_size
+        if start not in self.buckets and len(self.buckets) >= self.max_buckets and start < min(self.buckets):
+            # 比保留的所有时间桶都早（例如时钟被回拨），直接计入累计统计
+            self._fold(self.archived, counts)
+            return
+        self._fold(self.buckets.setdefault(start, {}), counts)
+        while len(self.buckets) > self.max_buckets:
+            self._fold(self.archived, self.buckets.pop(min(self.buckets)))
+    
+    def stats(self, interaction_type=None, since=None):
+        """互动统计
+        
+        Args:
+            interaction_type (SocialInteractionType, optional): 只统计该类型的互动
+            since (float, optional): 只统计该时间之后的互动；按时间桶统计，从 since 所在的桶开始，
+                早于保留的时间桶的互动只计入不指定 since 的统计
+        
+        Returns:
+            dict: count（次数）、successes（成功次数）、success_rate（成功率）、bond_change（纽带值变化之和）
+        """
+        totals = {}
+        if since is None:
+            self._fold(totals, self.archived)
+            sources = self.buckets.values()
+        else:
+            first = since // self.bucket_size * self.bucket_size
+            sources = (counts for start, counts in self.buckets.items() if start >= first)
+        for counts in sources:
+            self._fold(totals, counts)
+        
+        if interaction_type is not None:
+            totals = {k: v for k, v in totals.items() if k == interaction_type.value}
+        count = sum(v[0] for v in totals.values())
+        successes = sum(v[1] for v in totals.values())
+        return {
+            "count": count,
+            "successes": successes,
+            "success_rate": successes / count if count else 0.0,
+            "bond_change": sum(v[2] for v in totals.values())
+        }
+    
+    def stats_by_type(self, since=None):
+        """按互动类型的统计：互动类型值 -> stats 的结果（只包含有记录的类型）"""
+        result = {}
+        for interaction_type in SocialInteractionType:
+            type_stats = self.stats(interaction_type, since)
+            if type_stats["count"]:
+                result[interaction_type.value] = type_stats
+        return result
+    
+    def to_dict(self):
+        """转换为字典（时间桶保存为列表，兼容 JSON 的字符串键）"""
+        return {
+            "buckets": [[start, counts] for start, counts in sorted(self.buckets.items())],
+            "archived": self.archived
+        }
+    
+    def load(self, recent, data=None):
+        """加载保存的历史
+        
+        Args:
+            recent (list): 最近的互动记录
+            data (dict, optional): to_dict 保存的统计；没有统计的旧存档把所有记录重新累加，
+                只保留最近的记录
+        """
+        self.recent.clear()
+        self.buckets = {}
+        self.archived = {}
+        if data is None:
+            for interaction in recent:
+                self.add(interaction)
+            return
+        self.recent.extend(recent)
+        self.buckets = {start: {k: list(v) for k, v in counts.items()} for start, counts in data.get("buckets", [])}
+        self.archived = {k: list(v) for k, v in data.get("archived", {}).items()}
+
 class SocialRelationship:
     """社交关系类"""
-    def __init__(self, pet1_id, pet2_id, status=SocialRelationshipStatus.STRANGER, bond=0):
+    def __init__(self, pet1_id, pet2_id, status=SocialRelationshipStatus.STRANGER, bond=0, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
         self.pet1_id = pet1_id
         self.pet2_id = pet2_id
         self.status = status
         self.bond = bond  # 关系纽带值，范围0-100
-        self.interaction_history = []
+        self.history = InteractionHistory()
         self.last_interaction = None
+        self._index = None  # (SocialGraph, 其他宠物ID)，加入社交关系图后由图设置
     
     def update_bond(self, change):
         """更新关系纽带值"""
@@ -149,16 +309,30 @@ class SocialRelationship:
             self.status = SocialRelationshipStatus.BEST_FRIEND
         else:
             self.status = SocialRelationshipStatus.BEST_FRIEND
+        
+        # 通知社交关系图更新状态索引和纽带值排序
+        if self._index is not None:
+            graph, pet_id = self._index
+            graph._reindex(pet_id)
     
     def add_interaction(self, interaction_type, outcome, timestamp=None):
         """添加互动记录"""
         interaction = {
             "interaction_type": interaction_type.value,
             "outcome": outcome,
-            "timestamp": timestamp or time.time()
+            "timestamp": timestamp or self.clock.time()
         }
-        self.interaction_history.append(interaction)
-        self.last_interaction = timestamp or time.time()
+        self.history.add(interaction)
+        self.last_interaction = interaction["timestamp"]
+    
+    @property
+    def interaction_history(self):
+        """最近的互动记录（从旧到新）"""
+        return list(self.history.recent)
+    
+    def get_interaction_stats(self, interaction_type=None, since=None):
+        """互动统计，参数和返回值见 InteractionHistory.stats"""
+        return self.history.stats(interaction_type, since)
     
     def get_status(self):
         """获取关系状态"""
@@ -178,29 +352,460 @@ class SocialRelationship:
             "status": self.status.value,
             "bond": self.bond,
             "interaction_history": self.interaction_history,
+            "interaction_stats": self.history.to_dict(),
             "last_interaction": self.last_interaction
         }
     
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, clock=None):
         """从字典创建社交关系"""
         status = SocialRelationshipStatus(data["status"])
         relationship = cls(
             pet1_id=data["pet1_id"],
             pet2_id=data["pet2_id"],
             status=status,
-            bond=data["bond"]
+            bond=data["bond"],
+            clock=clock
         )
-        relationship.interaction_history = data.get("interaction_history", [])
+        relationship.history.load(data.get("interaction_history", []), data.get("interaction_stats"))
         relationship.last_interaction = data.get("last_interaction")
         return relationship
 
-class SocialSystem:
+FRIEND_STATUSES = (SocialRelationshipStatus.FRIEND, SocialRelationshipStatus.BEST_FRIEND)
+RIVAL_STATUSES = (SocialRelationshipStatus.RIVAL, SocialRelationshipStatus.ENEMY)
+
+class SocialGraph(MutableMapping):
+    """社交关系图
+    
+    以其他宠物ID为键保存 SocialRelationship（字典接口），并维护：
+        - 按关系状态的二级索引：状态 -> 按进入该状态的顺序排列的宠物ID
+        - 朋友按纽带值降序排列的有序列表，取纽带值最高的 k 个朋友为 O(k)
+        - 社交事件按时间排列的索引和按ID的索引，取最近 k 个事件为 O(k)
+    
+    关系的纽带值或状态变化时，SocialRelationship._update_status 通知图增量更新索引。
+    """
+    
+    def __init__(self):
+        self._relationships = {}
+        self._by_status = {status: {} for status in SocialRelationshipStatus}  # 字典用作有序集合
+        self._indexed_status = {}  # 宠物ID -> 已索引的状态
+        self._friend_keys = []  # 升序排列的 (-纽带值, 序号, 宠物ID)
+        self._friend_key = {}  # 宠物ID -> 朋友排序键
+        self._order = {}  # 宠物ID -> 加入顺序，纽带值相同时按加入顺序排列
+        self._sequence = itertools.count()
+        
+        self.events = []  # 按加入顺序保存的社交事件
+        self._event_keys = []  # 升序排列的 (时间戳, -序号, 事件)
+        self._events_by_id = {}
+        self._event_sequence = itertools.count()
+    
+    def __getitem__(self, pet_id):
+        return self._relationships[pet_id]
+    
+    def __setitem__(self, pet_id, relationship):
+        if pet_id in self._relationships:
+            del self[pet_id]
+        self._relationships[pet_id] = relationship
+        self._order[pet_id] = next(self._sequence)
+        relationship._index = (self, pet_id)
+        self._index_add(pet_id, relationship)
+    
+    def __delitem__(self, pet_id):
+        relationship = self._relationships.pop(pet_id)
+        self._index_remove(pet_id)
+        del self._order[pet_id]
+        relationship._index = None
+    
+    def __iter__(self):
+        return iter(self._relationships)
+    
+    def __len__(self):
+        return len(self._relationships)
+    
+    def __contains__(self, pet_id):
+        return pet_id in self._relationships
+    
+    def _index_add(self, pet_id, relationship):
+        status = relationship.status
+        self._by_status[status][pet_id] = None
+        self._indexed_status[pet_id] = status
+        if status in FRIEND_STATUSES:
+            key = (-relationship.bond, self._order[pet_id], pet_id)
+            bisect.insort(self._friend_keys, key)
+            self._friend_key[pet_id] = key
+    
+    def _index_remove(self, pet_id):
+        del self._by_status[self._indexed_status.pop(pet_id)][pet_id]
+        key = self._friend_key.pop(pet_id, None)
+        if key is not None:
+            del self._friend_keys[bisect.bisect_left(self._friend_keys, key)]
+    
+    def _reindex(self, pet_id):
+        """关系的纽带值或状态变化后更新索引"""
+        relationship = self._relationships[pet_id]
+        key = self._friend_key.get(pet_id)
+        if self._indexed_status[pet_id] == relationship.status and (key is None or key[0] == -relationship.bond):
+            return
+        self._index_remove(pet_id)
+        self._index_add(pet_id, relationship)
+    
+    def with_status(self, *statuses):
+        """处于指定状态的宠物ID列表"""
+        return [pet_id for status in statuses for pet_id in self._by_status[status]]
+    
+    def count_status(self, *statuses):
+        """处于指定状态的关系数量"""
+        return sum(len(self._by_status[status]) for status in statuses)
+    
+    def top_friends(self, k=None):
+        """按纽带值从高到低排列的朋友ID
+        
+        Args:
+            k (int, optional): 最多返回的数量，默认返回全部朋友
+        """
+        keys = self._friend_keys if k is None else self._friend_keys[:k]
+        return [key[2] for key in keys]
+    
+    def add_event(self, event):
+        """添加社交事件"""
+        self.events.append(event)
+        bisect.insort(self._event_keys, (event.timestamp, -next(self._event_sequence), event))
+        self._events_by_id[event.event_id] = event
+    
+    def get_event(self, event_id):
+        """按ID获取社交事件"""
+        return self._events_by_id.get(event_id)
+    
+    def recent_events(self, k=None):
+        """按时间从新到旧排列的社交事件（时间相同时按加入顺序）"""
+        keys = self._event_keys
+        if k is not None:
+            keys = keys[len(keys) - k:] if k > 0 else []
+        return [key[2] for key in reversed(keys)]
+
+# 批量模拟的互动类型，以及按 SocialRelationshipStatus 定义顺序排列的状态编号
+BATCH_INTERACTION_TYPES = (
+    SocialInteractionType.GREET, SocialInteractionType.PLAY, SocialInteractionType.SHARE,
+    SocialInteractionType.COMPETE, SocialInteractionType.HELP
+)
+_STATUSES = tuple(SocialRelationshipStatus)
+_COMPETE = BATCH_INTERACTION_TYPES.index(SocialInteractionType.COMPETE)
+_PLAY = BATCH_INTERACTION_TYPES.index(SocialInteractionType.PLAY)
+# 纽带值划分，与 SocialRelationship._update_status 一致
+_BOND_BOUNDS = np.array([20, 40, 70], dtype=np.float64)
+_BOND_STATUS_CODES = np.array([_STATUSES.index(status) for status in (
+    SocialRelationshipStatus.STRANGER, SocialRelationshipStatus.ACQUAINTANCE,
+    SocialRelationshipStatus.FRIEND, SocialRelationshipStatus.BEST_FRIEND
+)])
+_ENEMY_CODE = _STATUSES.index(SocialRelationshipStatus.ENEMY)
+# [互动类型, 关系状态] -> 成功率（竞争为 NaN，按技能计算）；[互动类型, 是否成功] -> 纽带值变化
+_SUCCESS_CHANCES = np.array([
+    [np.nan if INTERACTION_RULES[t].base_chance is None else INTERACTION_RULES[t].success_chance(status)
+     for status in _STATUSES]
+    for t in BATCH_INTERACTION_TYPES
+], dtype=np.float64)
+_BOND_CHANGES = np.array([
+    [INTERACTION_RULES[t].failure_bond, INTERACTION_RULES[t].success_bond] for t in BATCH_INTERACTION_TYPES
+], dtype=np.float64)
+# 玩耍成功时双方的快乐度和能量变化，与 SocialSystem._play 一致
+PLAY_HAPPINESS_GAIN = 15
+PLAY_ENERGY_COST = 10
+# 关系键：发起者索引 * _KEY_STRIDE + 对象索引
+_KEY_STRIDE = 1 << 32
+
+class NPCView:
+    """NPCWorld 中单个 NPC 的视图
+    
+    直接读写世界数组，可以作为 SocialSystem.interact_with_other 的互动对象
+    （没有情感系统，互动不触发 NPC 的情感）。
+    """
+    __slots__ = ("_world", "_index")
+    
+    def __init__(self, world, index):
+        self._world = world
+        self._index = index
+    
+    @property
+    def index(self):
+        return self._index
+    
+    @property
+    def name(self):
+        return self._world.names[self._index]
+    
+    @property
+    def species(self):
+        return self._world.species[self._index]
+    
+    @property
+    def pet_id(self):
+        return self._world.pet_ids[self._index]
+    
+    @property
+    def happiness(self):
+        return float(self._world.happiness[self._index])
+    
+    @happiness.setter
+    def happiness(self, value):
+        self._world.happiness[self._index] = value
+    
+    @property
+    def energy(self):
+        return float(self._world.energy[self._index])
+    
+    @energy.setter
+    def energy(self, value):
+        self._world.energy[self._index] = value
+    
+    @property
+    def social_system(self):
+        # 竞争互动读取 other_pet.social_system.social_skills
+        return self
+    
+    @property
+    def social_skills(self):
+        skill = float(self._world.skill[self._index])
+        return {name: skill for name in NPCWorld.SKILL_NAMES}
+    
+    def __repr__(self):
+        return f"NPCView({self.name!r}, happiness={self.happiness:.1f}, energy={self.energy:.1f})"
+
+class NPCWorld:
+    """NPC 社区批量社交模拟
+    
+    把大量 NPC 的快乐度、能量和社交技能以结构数组保存，NPC 之间的关系纽带值按
+    (发起者, 对象) 的关系键排序保存在数组中。每次 tick 随机抽取互动对和互动类型，
+    按 INTERACTION_RULES 的成功率批量决定结果，再批量累加纽带值变化。
+    
+    Notes:
+        - 同一次 tick 的互动都按 tick 开始时的关系状态决定成功率，纽带值变化累加后再限制在 0-100
+        - 与 SocialSystem 一样，关系是单向的：A 与 B 互动只改变 A 对 B 的纽带值
+    """
+    SKILL_NAMES = ("communication", "empathy", "conflict_resolution", "cooperation")
+    _FLOAT_FIELDS = ("happiness", "energy", "skill")
+    
+    def __init__(self, capacity=64, seed=None):
+        """初始化 NPC 社区
+        
+        Args:
+            capacity (int, optional): 初始容量，超出后自动扩容
+            seed (int, optional): 随机种子
+        """
+        capacity = max(1, int(capacity))
+        self.size = 0
+        for field in self._FLOAT_FIELDS:
+            setattr(self, field, np.zeros(capacity, dtype=np.float64))
+        self.names = []
+        self.species = []
+        self.pet_ids = []
+        self._index = {}  # pet_id -> 索引
+        self.relation_keys = np.empty(0, dtype=np.int64)  # 升序排列的关系键
+        self.bonds = np.empty(0, dtype=np.float64)  # 与 relation_keys 对应的纽带值
+        self.rng = np.random.default_rng(seed)
+        
+        # 统计
+        self.interaction_count = 0
+        self.success_count = 0
+    
+    def __len__(self):
+        return self.size
+    
+    @property
+    def capacity(self):
+        return len(self.happiness)
+    
+    def _ensure_capacity(self, needed):
+        """确保容量足够，按倍数扩容"""
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2)
+        for field in self._FLOAT_FIELDS:
+            old = getattr(self, field)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, field, new)
+    
+    def add(self, npc):
+        """把 NPCPet 加入社区
+        
+        Returns:
+            int: NPC 在社区中的索引
+        """
+        index = self.size
+        self._ensure_capacity(index + 1)
+        self.size += 1
+        self.happiness[index] = npc.happiness
+        self.energy[index] = npc.energy
+        skills = npc.social_system.social_skills
+        self.skill[index] = sum(skills.values()) / len(skills)
+        self.names.append(npc.name)
+        self.species.append(npc.species)
+        self.pet_ids.append(npc.pet_id)
+        self._index[npc.pet_id] = index
+        return index
+    
+    @classmethod
+    def from_manager(cls, manager, seed=None):
+        """从 NPCManager 的 NPC 创建社区"""
+        npcs = manager.get_all_npcs()
+        world = cls(capacity=len(npcs), seed=seed)
+        for npc in npcs:
+            world.add(npc)
+        return world
+    
+    def spawn(self, count, name_prefix="NPC", species="狗狗"):
+        """批量创建 NPC（不创建 NPCPet 对象），初始数值的范围与 NPCPet 一致
+        
+        Returns:
+            range: 新 NPC 的索引范围
+        """
+        start = self.size
+        end = start + count
+        self._ensure_capacity(end)
+        self.size = end
+        self.happiness[start:end] = self.rng.integers(50, 81, count)
+        self.energy[start:end] = self.rng.integers(50, 81, count)
+        self.skill[start:end] = self.rng.integers(40, 71, (count, len(self.SKILL_NAMES))).mean(axis=1)
+        for i in range(start, end):
+            name = f"{name_prefix}{i}"
+            pet_id = f"npc_{i}"
+            self.names.append(name)
+            self.species.append(species)
+            self.pet_ids.append(pet_id)
+            self._index[pet_id] = i
+        return range(start, end)
+    
+    def index_of(self, pet_id):
+        """NPC 的索引，不存在时返回 None"""
+        return self._index.get(pet_id)
+    
+    def view(self, index):
+        """获取 NPC 的视图"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"NPC索引超出范围: {index}")
+        return NPCView(self, index)
+    
+    def bond(self, pet_id, other_id):
+        """pet_id 对 other_id 的纽带值，没有关系时为 0"""
+        key = self._index[pet_id] * _KEY_STRIDE + self._index[other_id]
+        pos = np.searchsorted(self.relation_keys, key)
+        if pos < len(self.relation_keys) and self.relation_keys[pos] == key:
+            return float(self.bonds[pos])
+        return 0.0
+    
+    def status(self, pet_id, other_id):
+        """pet_id 对 other_id 的关系状态"""
+        return _STATUSES[int(self._status_codes(np.array([self.bond(pet_id, other_id)]))[0])]
+    
+    @staticmethod
+    def _status_codes(bonds):
+        """按纽带值批量计算关系状态编号"""
+        codes = _BOND_STATUS_CODES[np.searchsorted(_BOND_BOUNDS, bonds, side="right")]
+        return np.where(bonds < 0, _ENEMY_CODE, codes)
+    
+    def status_counts(self):
+        """各关系状态的关系数量（只包含有关系的状态）"""
+        counts = np.bincount(self._status_codes(self.bonds), minlength=len(_STATUSES))
+        return {status: int(count) for status, count in zip(_STATUSES, counts) if count}
+    
+    def _relation_positions(self, keys):
+        """关系键在 relation_keys 中的位置，不存在的关系以纽带值 0 插入"""
+        pos = np.searchsorted(self.relation_keys, keys)
+        found = pos < len(self.relation_keys)
+        found[found] = self.relation_keys[pos[found]] == keys[found]
+        if not found.all():
+            new_keys = np.unique(keys[~found])
+            insert_at = np.searchsorted(self.relation_keys, new_keys)
+            self.relation_keys = np.insert(self.relation_keys, insert_at, new_keys)
+            self.bonds = np.insert(self.bonds, insert_at, 0.0)
+            pos = np.searchsorted(self.relation_keys, keys)
+        return pos
+    
+    def interact(self, initiators, targets, types):
+        """批量执行互动
+        
+        Args:
+            initiators (array): 发起者索引
+            targets (array): 互动对象索引（不能与发起者相同）
+            types (array): 互动类型在 BATCH_INTERACTION_TYPES 中的编号
+        
+        Returns:
+            ndarray: 每次互动是否成功
+        """
+        initiators = np.asarray(initiators, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        types = np.asarray(types, dtype=np.int64)
+        pos = self._relation_positions(initiators * _KEY_STRIDE + targets)
+        
+        chances = _SUCCESS_CHANCES[types, self._status_codes(self.bonds[pos])]
+        # 竞争按双方的社交技能决定胜负
+        compete = types == _COMPETE
+        self_skill = self.skill[initiators[compete]]
+        chances[compete] = self_skill / (self_skill + self.skill[targets[compete]])
+        success = self.rng.random(len(types)) < chances
+        
+        np.add.at(self.bonds, pos, _BOND_CHANGES[types, success.astype(np.int64)])
+        self.bonds[pos] = np.clip(self.bonds[pos], 0, 100)
+        
+        played = (types == _PLAY) & success
+        if played.any():
+            both = np.concatenate([initiators[played], targets[played]])
+            np.add.at(self.happiness, both, PLAY_HAPPINESS_GAIN)
+            np.add.at(self.energy, both, -PLAY_ENERGY_COST)
+            self.happiness[both] = np.minimum(self.happiness[both], 100)
+            self.energy[both] = np.maximum(self.energy[both], 0)
+        
+        self.interaction_count += len(types)
+        self.success_count += int(success.sum())
+        return success
+    
+    def tick(self, interaction_rate=0.1, player_systems=(), player_interactions=1, type_weights=None):
+        """模拟一轮社交
+        
+        Args:
+            interaction_rate (float, optional): 每个 NPC 发起互动的概率
+            player_systems (iterable, optional): 玩家宠物的 SocialSystem，每个玩家宠物与随机的 NPC 互动
+            player_interactions (int, optional): 每个玩家宠物的互动次数
+            type_weights (sequence, optional): BATCH_INTERACTION_TYPES 各类型的权重，默认均等
+        
+        Returns:
+            dict: interactions（NPC 之间的互动次数）、successes（成功次数）、player_results（玩家宠物的互动结果）
+        
+        Notes:
+            - 玩家宠物的互动通过 interact_with_other 逐次执行，更新玩家宠物的关系、情感和互动历史
+        """
+        if self.size < 2:
+            return {"interactions": 0, "successes": 0, "player_results": []}
+        if type_weights is not None:
+            type_weights = np.asarray(type_weights, dtype=np.float64)
+            type_weights = type_weights / type_weights.sum()
+        
+        initiators = np.flatnonzero(self.rng.random(self.size) < interaction_rate)
+        # 从其他 NPC 中均匀抽取互动对象
+        targets = self.rng.integers(0, self.size - 1, len(initiators))
+        targets += targets >= initiators
+        types = self.rng.choice(len(BATCH_INTERACTION_TYPES), len(initiators), p=type_weights)
+        success = self.interact(initiators, targets, types)
+        
+        player_results = []
+        for system in player_systems:
+            partners = self.rng.integers(0, self.size, player_interactions)
+            player_types = self.rng.choice(len(BATCH_INTERACTION_TYPES), player_interactions, p=type_weights)
+            for index, type_code in zip(partners, player_types):
+                result = system.interact_with_other(self.view(int(index)), BATCH_INTERACTION_TYPES[type_code])
+                player_results.append(result)
+        
+        return {"interactions": len(initiators), "successes": int(success.sum()), "player_results": player_results}
+
+class SocialSystem(DirtyTracking):
     """社交系统"""
+    JOURNAL_SECTIONS = {"state": None}
+    
     def __init__(self, pet):
+        self._init_dirty_tracking()
         self.pet = pet
-        self.relationships = {}  # 键为其他宠物ID，值为SocialRelationship对象
-        self.events = []  # 社交事件列表
+        self.clock = get_clock(pet)
+        self.graph = SocialGraph()  # 社交关系和事件，带状态、纽带值和时间索引
         self.social_skills = {
             "communication": 50,  # 沟通能力
             "empathy": 50,  # 同理心
@@ -208,8 +813,26 @@ class SocialSystem:
             "cooperation": 50  # 合作能力
         }
         self.interaction_count = 0
-        self.friends = []  # 朋友列表
-        self.rivals = []  # 竞争对手列表
+    
+    @property
+    def relationships(self):
+        """社交关系（键为其他宠物ID，值为SocialRelationship对象）"""
+        return self.graph
+    
+    @property
+    def events(self):
+        """社交事件列表（按加入顺序；添加事件请使用 graph.add_event）"""
+        return self.graph.events
+    
+    @property
+    def friends(self):
+        """朋友列表（按纽带值从高到低）"""
+        return self.graph.top_friends()
+    
+    @property
+    def rivals(self):
+        """竞争对手列表"""
+        return self.graph.with_status(*RIVAL_STATUSES)
     
     def interact_with_other(self, other_pet, interaction_type):
         """与其他宠物互动"""
@@ -226,11 +849,9 @@ class SocialSystem:
         # 更新关系
         self._update_relationship(other_pet.pet_id, interaction_type, result)
         
-        # 记录互动
+        # 记录互动（朋友和竞争对手由社交关系图的索引增量维护）
         self.interaction_count += 1
-        
-        # 更新朋友和竞争对手列表
-        self._update_social_lists()
+        self.mark_dirty()
         
         return result
     
@@ -239,7 +860,7 @@ class SocialSystem:
         # 获取当前宠物的ID，如果没有pet_id属性，使用名称
         self_pet_id = getattr(self.pet, 'pet_id', self.pet.name)
         if other_pet_id not in self.relationships:
-            self.relationships[other_pet_id] = SocialRelationship(self_pet_id, other_pet_id)
+            self.relationships[other_pet_id] = SocialRelationship(self_pet_id, other_pet_id, clock=self.clock)
         return self.relationships[other_pet_id]
     
     def _execute_interaction(self, other_pet, interaction_type, relationship):
@@ -266,14 +887,11 @@ class SocialSystem:
         from pet.enums import EmotionType
         
         # 基于关系状态和社交技能决定结果
-        success_chance = 0.7
-        if relationship.status == SocialRelationshipStatus.FRIEND:
-            success_chance = 0.9
-        elif relationship.status == SocialRelationshipStatus.ENEMY:
-            success_chance = 0.3
+        rule = INTERACTION_RULES[SocialInteractionType.GREET]
+        success_chance = rule.success_chance(relationship.status)
         
         if random.random() < success_chance:
-            bond_change = 5
+            bond_change = rule.success_bond
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -289,7 +907,7 @@ class SocialSystem:
                 "effects": {"happiness": 5}
             }
         else:
-            bond_change = -2
+            bond_change = rule.failure_bond
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -311,14 +929,11 @@ class SocialSystem:
         from pet.enums import EmotionType
         
         # 基于关系状态和社交技能决定结果
-        success_chance = 0.6
-        if relationship.status == SocialRelationshipStatus.FRIEND:
-            success_chance = 0.8
-        elif relationship.status == SocialRelationshipStatus.ENEMY:
-            success_chance = 0.2
+        rule = INTERACTION_RULES[SocialInteractionType.PLAY]
+        success_chance = rule.success_chance(relationship.status)
         
         if random.random() < success_chance:
-            bond_change = 10
+            bond_change = rule.success_bond
             relationship.update_bond(bond_change)
             
             # 更新双方的情感和状态
@@ -341,7 +956,7 @@ class SocialSystem:
                 "effects": {"happiness": 15, "energy": -10}
             }
         else:
-            bond_change = -5
+            bond_change = rule.failure_bond
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -363,14 +978,11 @@ class SocialSystem:
         from pet.enums import EmotionType
         
         # 基于关系状态和社交技能决定结果
-        success_chance = 0.5
-        if relationship.status == SocialRelationshipStatus.FRIEND:
-            success_chance = 0.8
-        elif relationship.status == SocialRelationshipStatus.ENEMY:
-            success_chance = 0.1
+        rule = INTERACTION_RULES[SocialInteractionType.SHARE]
+        success_chance = rule.success_chance(relationship.status)
         
         if random.random() < success_chance:
-            bond_change = 12
+            bond_change = rule.success_bond
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -386,7 +998,7 @@ class SocialSystem:
                 "effects": {"happiness": 8}
             }
         else:
-            bond_change = -3
+            bond_change = rule.failure_bond
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -413,10 +1025,11 @@ class SocialSystem:
         if hasattr(other_pet, 'social_system') and hasattr(other_pet.social_system, 'social_skills'):
             other_skill = sum(other_pet.social_system.social_skills.values()) / len(other_pet.social_system.social_skills)
         
+        rule = INTERACTION_RULES[SocialInteractionType.COMPETE]
         win_chance = self_skill / (self_skill + other_skill)
         if random.random() < win_chance:
             # 获胜
-            bond_change = -2  # 竞争会稍微降低关系
+            bond_change = rule.success_bond  # 竞争会稍微降低关系
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -433,7 +1046,7 @@ class SocialSystem:
             }
         else:
             # 失败
-            bond_change = -4  # 失败会更多地降低关系
+            bond_change = rule.failure_bond  # 失败会更多地降低关系
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -455,14 +1068,11 @@ class SocialSystem:
         from pet.enums import EmotionType
         
         # 基于关系状态和社交技能决定结果
-        success_chance = 0.6
-        if relationship.status == SocialRelationshipStatus.FRIEND:
-            success_chance = 0.9
-        elif relationship.status == SocialRelationshipStatus.ENEMY:
-            success_chance = 0.2
+        rule = INTERACTION_RULES[SocialInteractionType.HELP]
+        success_chance = rule.success_chance(relationship.status)
         
         if random.random() < success_chance:
-            bond_change = 15
+            bond_change = rule.success_bond
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -478,7 +1088,7 @@ class SocialSystem:
                 "effects": {"happiness": 12}
             }
         else:
-            bond_change = -3
+            bond_change = rule.failure_bond
             relationship.update_bond(bond_change)
             
             # 更新双方的情感
@@ -540,27 +1150,31 @@ class SocialSystem:
         if relationship:
             relationship.add_interaction(interaction_type, result)
     
-    def _update_social_lists(self):
-        """更新朋友和竞争对手列表"""
-        self.friends = [pet_id for pet_id, rel in self.relationships.items() 
-                      if rel.status in [SocialRelationshipStatus.FRIEND, SocialRelationshipStatus.BEST_FRIEND]]
-        self.rivals = [pet_id for pet_id, rel in self.relationships.items() 
-                      if rel.status in [SocialRelationshipStatus.RIVAL, SocialRelationshipStatus.ENEMY]]
-    
     def get_relationship_status(self, other_pet_id):
         """获取与其他宠物的关系状态"""
         relationship = self.relationships.get(other_pet_id)
         if relationship:
             return relationship.get_status()
         return {"status": "stranger", "bond": 0}
-    
+
+    def get_interaction_stats(self, other_pet_id, since=None):
+        """获取与其他宠物按互动类型的统计，没有关系时返回空字典"""
+        relationship = self.relationships.get(other_pet_id)
+        if relationship:
+            return relationship.history.stats_by_type(since)
+        return {}
+
     def get_all_relationships(self):
         """获取所有社交关系"""
         return [rel.get_status() for rel in self.relationships.values()]
     
-    def get_friends(self):
-        """获取朋友列表"""
-        return self.friends
+    def get_friends(self, limit=None):
+        """获取朋友列表（按纽带值从高到低）
+        
+        Args:
+            limit (int, optional): 只返回纽带值最高的 limit 个朋友
+        """
+        return self.graph.top_friends(limit)
     
     def get_rivals(self):
         """获取竞争对手列表"""
@@ -570,7 +1184,8 @@ class SocialSystem:
         """生成社交事件"""
         event_types = list(SocialInteractionType)
         event_type = random.choice(event_types)
-        event_id = f"event_{int(time.time())}_{random.randint(1000, 9999)}"
+        now = self.clock.time()
+        event_id = f"event_{int(now)}_{random.randint(1000, 9999)}"
         
         descriptions = {
             SocialInteractionType.GREET: f"{self.pet.name}遇到了{other_pet.name}，想要打招呼。",
@@ -590,24 +1205,26 @@ class SocialSystem:
             event_id=event_id,
             event_type=event_type,
             participants=[self_pet_id, other_pet_id],
+            timestamp=now,
             description=descriptions.get(event_type, "社交事件")
         )
         
-        self.events.append(event)
+        self.graph.add_event(event)
+        self.mark_dirty()
         return event
     
     def resolve_social_event(self, event_id, outcome):
         """解决社交事件"""
-        for event in self.events:
-            if event.event_id == event_id:
-                event.resolve(outcome)
-                return True
-        return False
+        event = self.graph.get_event(event_id)
+        if event is None:
+            return False
+        event.resolve(outcome)
+        self.mark_dirty()
+        return True
     
     def get_recent_events(self, limit=10):
         """获取最近的社交事件"""
-        sorted_events = sorted(self.events, key=lambda e: e.timestamp, reverse=True)
-        return sorted_events[:limit]
+        return self.graph.recent_events(limit)
     
     def update_social_skills(self, time_passed):
         """更新社交技能"""
@@ -615,13 +1232,15 @@ class SocialSystem:
         skill_gain = min(0.1, self.interaction_count / 1000)
         for skill in self.social_skills:
             self.social_skills[skill] = min(100, self.social_skills[skill] + skill_gain)
+        if skill_gain > 0:
+            self.mark_dirty()
     
     def get_social_summary(self):
         """获取社交摘要"""
         summary = {
             "total_relationships": len(self.relationships),
-            "friends_count": len(self.friends),
-            "rivals_count": len(self.rivals),
+            "friends_count": self.graph.count_status(*FRIEND_STATUSES),
+            "rivals_count": self.graph.count_status(*RIVAL_STATUSES),
             "interaction_count": self.interaction_count,
             "social_skills": self.social_skills,
             "recent_events": [e.to_dict() for e in self.get_recent_events(5)]
@@ -641,14 +1260,12 @@ class SocialSystem:
     
     def from_dict(self, data):
         """从字典加载"""
+        self.graph = SocialGraph()
         relationships_data = data.get("relationships", {})
-        self.relationships = {}
         for pet_id, rel_data in relationships_data.items():
-            rel = SocialRelationship.from_dict(rel_data)
-            self.relationships[pet_id] = rel
+            self.graph[pet_id] = SocialRelationship.from_dict(rel_data, self.clock)
         
         events_data = data.get("events", [])
-        self.events = []
         for event_data in events_data:
             event = SocialEvent(
                 event_id=event_data["event_id"],
@@ -659,7 +1276,7 @@ class SocialSystem:
             )
             event.resolved = event_data.get("resolved", False)
             event.outcome = event_data.get("outcome")
-            self.events.append(event)
+            self.graph.add_event(event)
         
         self.interaction_count = data.get("interaction_count", 0)
         self.social_skills = data.get("social_skills", {
@@ -668,5 +1285,9 @@ class SocialSystem:
             "conflict_resolution": 50,
             "cooperation": 50
         })
-        self.friends = data.get("friends", [])
-        self.rivals = data.get("rivals", [])
+        # friends 和 rivals 由关系状态索引得出，不再读取保存的列表
+        self.mark_dirty()
+    
+    def journal_section(self, section):
+        """增量存档的数据段（to_dict 引用了互动历史等列表，复制后再交给存档）"""
+        return copy.deepcopy(self.to_dict())
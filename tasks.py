@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
+import heapq
 import random
-import time
+from collections import deque
 from datetime import datetime
 from enum import Enum
+from pet.clock import SYSTEM_CLOCK, get_clock
+from pet.config import PetConfig
+from pet.journal import DirtyTracking
+from pet.events import EventType, SOURCE_USER
 
 class TaskType(Enum):
     """任务类型枚举"""
@@ -14,6 +19,16 @@ class TaskType(Enum):
     PET = "抚摸"
     SPECIAL = "特殊"
 
+# 宠物动作事件 -> 推进的任务类型
+EVENT_TASK_TYPES = {
+    EventType.FEED: TaskType.FEED,
+    EventType.PLAY: TaskType.PLAY,
+    EventType.CLEAN: TaskType.CLEAN,
+    EventType.TRAIN: TaskType.TRAIN,
+    EventType.SLEEP: TaskType.SLEEP,
+    EventType.PET: TaskType.PET,
+}
+
 class TaskDifficulty(Enum):
     """任务难度枚举"""
     EASY = "简单"
@@ -29,7 +44,8 @@ class TaskStatus(Enum):
 
 class Task:
     """任务类"""
-    def __init__(self, task_id, task_type, description, difficulty, target, reward, time_limit=None):
+    def __init__(self, task_id, task_type, description, difficulty, target, reward, time_limit=None, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
         self.task_id = task_id
         self.task_type = task_type
         self.description = description
@@ -39,7 +55,7 @@ class Task:
         self.time_limit = time_limit  # 时间限制（秒）
         self.status = TaskStatus.PENDING
         self.progress = 0
-        self.created_at = time.time()
+        self.created_at = self.clock.time()
         self.started_at = None
         self.completed_at = None
     
@@ -47,7 +63,7 @@ class Task:
         """开始任务"""
         if self.status == TaskStatus.PENDING:
             self.status = TaskStatus.IN_PROGRESS
-            self.started_at = time.time()
+            self.started_at = self.clock.time()
             return True
         return False
     
@@ -57,7 +73,7 @@ class Task:
             self.progress = min(progress, self.target)
             if self.progress >= self.target:
                 self.complete()
-            elif self.time_limit and time.time() - self.created_at > self.time_limit:
+            elif self.time_limit and self.clock.time() - self.created_at > self.time_limit:
                 self.fail()
             return True
         return False
@@ -67,7 +83,7 @@ class Task:
         if self.status == TaskStatus.IN_PROGRESS:
             self.status = TaskStatus.COMPLETED
             self.progress = self.target
-            self.completed_at = time.time()
+            self.completed_at = self.clock.time()
             return True
         return False
     
@@ -75,14 +91,20 @@ class Task:
         """失败任务"""
         if self.status == TaskStatus.IN_PROGRESS:
             self.status = TaskStatus.FAILED
-            self.completed_at = time.time()
+            self.completed_at = self.clock.time()
             return True
         return False
     
+    def deadline(self):
+        """过期时间，没有时间限制时返回 None"""
+        if self.time_limit:
+            return self.created_at + self.time_limit
+        return None
+    
     def is_expired(self):
         """检查任务是否过期"""
         if self.time_limit:
-            return time.time() - self.created_at > self.time_limit and self.status not in [TaskStatus.COMPLETED, TaskStatus.FAILED]
+            return self.clock.time() - self.created_at > self.time_limit and self.status not in [TaskStatus.COMPLETED, TaskStatus.FAILED]
         return False
     
     def to_dict(self):
@@ -103,7 +125,7 @@ class Task:
         }
     
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, clock=None):
         """从字典创建任务"""
         task = cls(
             task_id=data["task_id"],
@@ -112,7 +134,8 @@ class Task:
             difficulty=TaskDifficulty(data["difficulty"]),
             target=data["target"],
             reward=data["reward"],
-            time_limit=data.get("time_limit")
+            time_limit=data.get("time_limit"),
+            clock=clock
         )
         task.status = TaskStatus(data["status"])
         task.progress = data["progress"]
@@ -121,15 +144,25 @@ class Task:
         task.completed_at = data.get("completed_at")
         return task
 
-class TaskSystem:
+class TaskSystem(DirtyTracking):
     """任务系统"""
+    JOURNAL_SECTIONS = {"state": None}
+    
     def __init__(self, pet):
+        self._init_dirty_tracking()
         self.pet = pet
-        self.tasks = []
-        self.completed_tasks = []
+        self.clock = get_clock(pet)
+        # 活跃任务：任务ID -> 任务（按添加顺序），以及按类型的索引
+        self._active = {}
+        self._by_type = {}
+        # 过期时间最小堆：(过期时间, 任务ID)，任务完成后的条目在弹出时跳过
+        self._expiry_heap = []
+        # 最近完成或失败的任务，超出上限的任务移入待归档队列，由存储写入归档
+        self.completed_tasks = deque(maxlen=PetConfig.TASK_COMPLETED_HISTORY)
+        self._archive_pending = deque(maxlen=PetConfig.TASK_ARCHIVE_PENDING_LIMIT)
         self.max_active_tasks = 3
         self.daily_tasks_generated = False
-        self.last_daily_reset = time.time()
+        self.last_daily_reset = self.clock.time()
         self.task_counter = 0
         
         # 任务模板
@@ -164,10 +197,56 @@ class TaskSystem:
             ]
         }
     
+    @property
+    def tasks(self):
+        """活跃任务列表（按添加顺序）"""
+        return list(self._active.values())
+    
+    @tasks.setter
+    def tasks(self, tasks):
+        self._active = {}
+        self._by_type = {}
+        self._expiry_heap = []
+        for task in tasks:
+            self.add_task(task)
+    
+    def add_task(self, task):
+        """添加活跃任务并建立类型和过期时间索引"""
+        self._active[task.task_id] = task
+        self._by_type.setdefault(task.task_type, {})[task.task_id] = task
+        deadline = task.deadline()
+        if deadline is not None:
+            heapq.heappush(self._expiry_heap, (deadline, task.task_id))
+        self.mark_dirty()
+        return task
+    
+    def get_tasks_by_type(self, task_type):
+        """某种类型的活跃任务"""
+        return list(self._by_type.get(task_type, {}).values())
+    
+    def _retire(self, task):
+        """把完成或失败的任务移出活跃任务，放入已完成任务"""
+        del self._active[task.task_id]
+        del self._by_type[task.task_type][task.task_id]
+        if len(self.completed_tasks) == self.completed_tasks.maxlen:
+            self._archive_pending.append(self.completed_tasks[0])
+        self.completed_tasks.append(task)
+        self.mark_dirty()
+    
+    def take_archived(self):
+        """取出等待归档的任务（由存储在收集修改时调用）
+        
+        Returns:
+            list: 任务字典列表
+        """
+        archived = [task.to_dict() for task in self._archive_pending]
+        self._archive_pending.clear()
+        return archived
+    
     def generate_daily_tasks(self):
         """生成每日任务"""
         # 检查是否已经生成过今日任务
-        today = datetime.now().date()
+        today = self.clock.now().date()
         last_reset_date = datetime.fromtimestamp(self.last_daily_reset).date()
         
         if today != last_reset_date or not self.daily_tasks_generated:
@@ -188,7 +267,8 @@ class TaskSystem:
                     difficulty=template["difficulty"],
                     target=template["target"],
                     reward=template["reward"],
-                    time_limit=3600 * 24  # 24小时时间限制
+                    time_limit=3600 * 24,  # 24小时时间限制
+                    clock=self.clock
                 )
                 new_tasks.append(task)
             
@@ -202,21 +282,24 @@ class TaskSystem:
                 difficulty=template["difficulty"],
                 target=template["target"],
                 reward=template["reward"],
-                time_limit=3600 * 24
+                time_limit=3600 * 24,
+                clock=self.clock
             )
             new_tasks.append(random_task)
             
             # 添加到任务列表
-            self.tasks.extend(new_tasks)
+            for task in new_tasks:
+                self.add_task(task)
             self.daily_tasks_generated = True
-            self.last_daily_reset = time.time()
+            self.last_daily_reset = self.clock.time()
+            self.mark_dirty()
             
             return new_tasks
         return []
     
     def generate_special_task(self):
         """生成特殊任务"""
-        if len(self.tasks) < self.max_active_tasks:
+        if len(self._active) < self.max_active_tasks:
             template = random.choice(self.task_templates[TaskType.SPECIAL])
             task = Task(
                 task_id=self._generate_task_id(),
@@ -225,22 +308,23 @@ class TaskSystem:
                 difficulty=template["difficulty"],
                 target=template["target"],
                 reward=template["reward"],
-                time_limit=3600 * 12  # 12小时时间限制
+                time_limit=3600 * 12,  # 12小时时间限制
+                clock=self.clock
             )
-            self.tasks.append(task)
-            return task
+            return self.add_task(task)
         return None
     
     def update_task_progress(self, task_type, progress_increment=1):
-        """更新任务进度"""
+        """更新任务进度（只查找该类型的活跃任务）"""
         completed_tasks = []
         rewards = []
         
-        for task in self.tasks:
-            if task.task_type == task_type and task.status in [TaskStatus.PENDING, TaskStatus.IN_PROGRESS]:
+        for task in list(self._by_type.get(task_type, {}).values()):
+            if task.status in [TaskStatus.PENDING, TaskStatus.IN_PROGRESS]:
                 # 开始任务（如果尚未开始）
                 if task.status == TaskStatus.PENDING:
                     task.start()
+                self.mark_dirty()
                 
                 # 更新进度
                 old_progress = task.progress
@@ -253,48 +337,93 @@ class TaskSystem:
         
         # 处理完成的任务
         for task in completed_tasks:
-            self.tasks.remove(task)
-            self.completed_tasks.append(task)
+            self._retire(task)
         
         return rewards
     
+    def attach(self, event_bus):
+        """订阅宠物动作事件，用户发起的动作自动推进对应类型的任务
+        
+        Args:
+            event_bus (EventBus): 事件总线（通常为 pet.event_bus）
+        """
+        event_bus.subscribe(EVENT_TASK_TYPES, self.handle_event)
+    
+    def detach(self, event_bus):
+        """取消订阅宠物动作事件"""
+        event_bus.unsubscribe(self.handle_event)
+    
+    def handle_event(self, event):
+        """处理宠物动作事件
+        
+        Returns:
+            list: 完成任务的奖励，事件不推进任务时为空列表
+        """
+        if event.source != SOURCE_USER:
+            return []
+        return self.update_task_progress(EVENT_TASK_TYPES[event.type])
+    
     def get_active_tasks(self):
         """获取活跃任务"""
         # 清理过期任务
         self._cleanup_expired_tasks()
         
         # 确保有足够的活跃任务
-        if len(self.tasks) < 2:
+        if len(self._active) < 2:
             self.generate_daily_tasks()
         
         return self.tasks
     
     def get_completed_tasks(self, limit=10):
         """获取已完成的任务"""
-        return self.completed_tasks[-limit:]
+        if limit <= 0:
+            return []
+        return list(self.completed_tasks)[-limit:]
+    
+    def _live_expiry(self, entry):
+        """过期堆条目对应的任务仍然活跃且未结束时返回该任务"""
+        task = self._active.get(entry[1])
+        if task is None or task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
+            return None
+        return task
+    
+    def next_expiry_time(self):
+        """获取活跃任务中最早的过期时间，没有限时任务时返回 None"""
+        heap = self._expiry_heap
+        while heap and self._live_expiry(heap[0]) is None:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
     
     def _cleanup_expired_tasks(self):
-        """清理过期任务"""
+        """清理过期任务（只弹出已到期的堆条目）
+        
+        Returns:
+            list: 过期的任务
+        """
+        now = self.clock.time()
+        heap = self._expiry_heap
         expired_tasks = []
-        for task in self.tasks:
-            if task.is_expired():
+        while heap and heap[0][0] < now:
+            entry = heapq.heappop(heap)
+            task = self._live_expiry(entry)
+            if task is not None and task.is_expired():
                 task.fail()
                 expired_tasks.append(task)
         
         for task in expired_tasks:
-            self.tasks.remove(task)
-            self.completed_tasks.append(task)
+            self._retire(task)
+        return expired_tasks
     
     def _generate_task_id(self):
         """生成任务ID"""
         self.task_counter += 1
-        return f"task_{int(time.time())}_{self.task_counter}"
+        return f"task_{int(self.clock.time())}_{self.task_counter}"
     
     def to_dict(self):
         """转换为字典"""
         return {
             "tasks": [task.to_dict() for task in self.tasks],
-            "completed_tasks": [task.to_dict() for task in self.completed_tasks[-50:]],  # 只保存最近50个完成的任务
+            "completed_tasks": [task.to_dict() for task in self.completed_tasks],  # 更早的任务在存储的归档中
             "daily_tasks_generated": self.daily_tasks_generated,
             "last_daily_reset": self.last_daily_reset,
             "task_counter": self.task_counter
@@ -302,8 +431,16 @@ class TaskSystem:
     
     def from_dict(self, data):
         """从字典加载"""
-        self.tasks = [Task.from_dict(task_data) for task_data in data.get("tasks", [])]
-        self.completed_tasks = [Task.from_dict(task_data) for task_data in data.get("completed_tasks", [])]
+        self.tasks = [Task.from_dict(task_data, self.clock) for task_data in data.get("tasks", [])]
+        self.completed_tasks = deque(
+            (Task.from_dict(task_data, self.clock) for task_data in data.get("completed_tasks", [])),
+            maxlen=PetConfig.TASK_COMPLETED_HISTORY
+        )
         self.daily_tasks_generated = data.get("daily_tasks_generated", False)
-        self.last_daily_reset = data.get("last_daily_reset", time.time())
+        self.last_daily_reset = data.get("last_daily_reset", self.clock.time())
         self.task_counter = data.get("task_counter", 0)
+        self.mark_dirty()
+    
+    def journal_section(self, section):
+        """增量存档的数据段"""
+        return self.to_dict()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+测试 achievements.py 模块中的 AchievementSystem 类
+"""
+
+import unittest
+import os
+import sys
+import random
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.clock import SimulationClock
+from achievements import AchievementSystem, AchievementStatus, load_achievement_definitions
+
+def definition(achievement_id, event, requirement, mode="count"):
+    """测试用的成就定义"""
+    return {
+        "achievement_id": achievement_id, "name": achievement_id, "description": "",
+        "category": "照顾", "event": event, "mode": mode,
+        "requirement": requirement, "reward": {"points": requirement}
+    }
+
+class TestAchievementSystem(unittest.TestCase):
+    """测试 AchievementSystem 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.pet = Pet('测试宠物', clock=SimulationClock(0))
+        self.system = AchievementSystem(self.pet)
+    
+    def test_definitions_loaded_from_file(self):
+        """测试从数据文件加载成就定义并按事件建立索引"""
+        self.assertEqual(self.system.get_total_count(), len(load_achievement_definitions()))
+        self.assertEqual([a.achievement_id for a in self.system.achievements_for_event("feed")], ["care_1", "care_2", "care_3"])
+        self.assertEqual(self.system.achievements_for_event("unknown"), [])
+    
+    def test_count_events_accumulate(self):
+        """测试计数类成就累加事件数量，解锁时返回一次奖励"""
+        rewards = []
+        for _ in range(10):
+            rewards.extend(self.system.update_care_achievements("feed"))
+        self.assertEqual(rewards, [self.system.get_achievement("care_1").reward])
+        self.assertTrue(self.system.get_achievement("care_1").is_unlocked())
+        self.assertEqual(self.system.get_achievement("care_2").progress, 10)
+        self.assertEqual(self.system.get_achievement("care_4").status, AchievementStatus.LOCKED)
+        self.assertEqual(self.system.get_unlocked_count(), 1)
+        self.assertEqual(self.system.get_recently_unlocked()[-1].achievement_id, "care_1")
+        
+        # 一次达到要求的成就直接解锁
+        self.system.update_special_achievements("pet_created")
+        self.assertTrue(self.system.get_achievement("special_1").is_unlocked())
+    
+    def test_value_events_keep_maximum(self):
+        """测试数值类成就取达到过的最大值"""
+        self.pet.relationship_with_owner = 60
+        self.system.update_social_achievements("pet")
+        self.pet.relationship_with_owner = 40
+        self.system.update_social_achievements("pet")
+        self.assertEqual(self.system.get_achievement("social_3").progress, 60)
+        self.assertEqual(self.system.get_achievement("social_2").progress, 2)
+    
+    def test_ids_are_not_substring_matched(self):
+        """测试成就按事件索引，不会按ID子串误匹配"""
+        system = AchievementSystem(self.pet, definitions=[
+            definition("care_1", "feed", 2), definition("care_10", "clean", 2)
+        ])
+        system.record_event("feed", 2)
+        self.assertTrue(system.get_achievement("care_1").is_unlocked())
+        self.assertEqual(system.get_achievement("care_10").progress, 0)
+        system.update_achievement_progress("care_1", 0)
+        self.assertEqual(system.get_achievement("care_10").progress, 0)
+    
+    def test_all_unlocked_and_counters(self):
+        """测试其他成就全部解锁后解锁"全部解锁"成就，以及已解锁数量的增量维护"""
+        definitions = [definition(f"a{i}", f"e{i % 50}", 1 + i % 7) for i in range(2000)]
+        definitions.append(definition("all", "all_unlocked", 1))
+        system = AchievementSystem(self.pet, definitions=definitions)
+        self.assertEqual(len(system.achievements_for_event("e3")), 40)
+        
+        rng = random.Random(1)
+        for _ in range(300):
+            system.record_event(f"e{rng.randrange(50)}", rng.randrange(1, 3))
+            self.assertEqual(system.get_unlocked_count(), sum(a.is_unlocked() for a in system.achievements))
+        self.assertFalse(system.get_achievement("all").is_unlocked())
+        for i in range(50):
+            system.record_event(f"e{i}", 7)
+        self.assertTrue(system.get_achievement("all").is_unlocked())
+        self.assertEqual(system.get_unlocked_count(), system.get_total_count())
+    
+    def test_from_dict_merges_definitions(self):
+        """测试加载存档后重建索引，旧存档按定义补齐事件信息"""
+        for _ in range(12):
+            self.system.update_care_achievements("feed")
+        data = self.system.to_dict()
+        for achievement_data in data["achievements"]:
+            del achievement_data["event"], achievement_data["mode"]
+        data["achievements"] = [a for a in data["achievements"] if a["achievement_id"] != "care_5"]
+        
+        restored = AchievementSystem(self.pet)
+        restored.from_dict(data)
+        self.assertEqual(restored.get_unlocked_count(), 1)
+        self.assertEqual(restored.get_achievement("care_2").progress, 12)
+        self.assertEqual(restored.get_achievement("care_5").progress, 0)
+        self.assertIs(restored.get_recently_unlocked()[0], restored.get_achievement("care_1"))
+        restored.record_event("feed", 38)
+        self.assertTrue(restored.get_achievement("care_2").is_unlocked())
+
+if __name__ == '__main__':
+    unittest.main()
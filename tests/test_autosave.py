@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+测试 autosave.py 模块中的 AutosaveService 类
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.clock import SimulationClock
+from pet.journal import PetJournal
+from pet.store import SQLitePetStore
+from pet.autosave import AutosaveService
+from social import SocialSystem, SocialInteractionType
+
+class BlockingTarget:
+    """写入时阻塞的存储目标，用于验证调用方不等待写入"""
+    
+    def __init__(self, target):
+        self.target = target
+        self.release = threading.Event()
+        self.committed = []
+        self.failures = 0
+    
+    def collect(self, *args, **kwargs):
+        return self.target.collect(*args, **kwargs)
+    
+    def merge(self, older, newer):
+        return self.target.merge(older, newer)
+    
+    def commit(self, record):
+        self.release.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise OSError("磁盘已满")
+        self.committed.append(record)
+        return self.target.commit(record)
+
+class TestAutosaveService(unittest.TestCase):
+    """测试 AutosaveService 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'pet.vpet')
+        self.clock = SimulationClock(1_700_000_000)
+        self.pet = Pet('测试宠物', '狗', clock=self.clock)
+        self.social = SocialSystem(self.pet)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.temp_dir.cleanup()
+    
+    def test_burst_coalesced(self):
+        """测试一连串修改合并为一次写入，结果与逐次保存相同"""
+        journal = PetJournal(self.path, sync=False)
+        journal.save(self.pet, self.social)
+        service = AutosaveService(journal, self.pet, self.social, coalesce_delay=5)
+        service.start()
+        for _ in range(10):
+            self.pet.feed()
+            self.clock.advance(60)
+            self.social.interact_with_other(Pet('朋友', clock=self.clock), SocialInteractionType.GREET)
+            self.assertTrue(service.request_save())
+        self.assertTrue(service.stop())
+        self.assertEqual(service.saves, 1)
+        self.assertEqual(service.coalesced, 9)
+        
+        loaded = PetJournal(self.path)
+        pet = loaded.load(clock=self.clock)
+        social = SocialSystem(pet)
+        loaded.restore(social, 'social')
+        self.assertEqual(json.dumps(pet.to_dict()), json.dumps(self.pet.to_dict()))
+        self.assertEqual(social.to_dict(), self.social.to_dict())
+    
+    def test_request_does_not_block(self):
+        """测试写入进行中时请求保存立即返回"""
+        target = BlockingTarget(PetJournal(self.path, sync=False))
+        service = AutosaveService(target, self.pet, coalesce_delay=0)
+        service.start()
+        service.request_save()
+        self.pet.feed()
+        self.assertTrue(service.request_save())
+        self.assertTrue(service.pending())
+        self.assertEqual(target.committed, [])
+        
+        target.release.set()
+        self.assertTrue(service.flush(timeout=5))
+        self.assertFalse(service.pending())
+        self.assertEqual(PetJournal(self.path).load(clock=self.clock).hunger, self.pet.hunger)
+        service.stop()
+    
+    def test_retry_after_failure(self):
+        """测试写入失败后保留数据并重试"""
+        target = BlockingTarget(PetJournal(self.path, sync=False))
+        target.failures = 1
+        target.release.set()
+        service = AutosaveService(target, self.pet, interval=0.01, coalesce_delay=0)
+        service.start()
+        self.assertFalse(service.flush(timeout=5))
+        self.assertIsInstance(service.last_error, OSError)
+        
+        self.pet.feed()
+        self.assertTrue(service.stop(timeout=5))
+        self.assertIsNone(service.last_error)
+        self.assertEqual(PetJournal(self.path).load(clock=self.clock).hunger, self.pet.hunger)
+    
+    def test_tick_interval(self):
+        """测试 tick 按间隔收集修改，没有修改时不写入"""
+        journal = PetJournal(self.path, sync=False)
+        service = AutosaveService(journal, self.pet, interval=3600)
+        self.pet.feed()
+        self.assertFalse(service.tick())
+        service.interval = 0
+        self.assertTrue(service.tick())
+        self.assertTrue(service.flush())
+        self.assertFalse(service.tick())
+    
+    def test_store_target(self):
+        """测试自动保存到宠物存储，之后只写入修改过的段"""
+        store = SQLitePetStore()
+        service = AutosaveService(store, self.pet, self.social, coalesce_delay=0)
+        service.start()
+        self.assertTrue(service.flush(timeout=5))
+        
+        self.pet.feed()
+        store.commit(store.collect(self.pet, self.social))
+        self.pet.feed()
+        record = store.collect(self.pet, self.social)
+        # 记忆和情感历史只收集新增的条目，不复制整段数据
+        self.assertEqual(record['sections'], {})
+        self.assertEqual(record['changes']['memories'][0], 'append')
+        self.assertEqual(len(record['changes']['memories'][1]), 1)
+        self.assertEqual(record['changes']['emotional_system.history'][0], 'append')
+        self.assertIsNotNone(record['core'])
+        store.commit(record)
+        
+        self.social.interact_with_other(Pet('朋友', clock=self.clock), SocialInteractionType.PLAY)
+        self.assertTrue(service.stop(timeout=5))
+        self.assertEqual(store.load_section('测试宠物', 'social'), self.social.to_dict())
+        loaded = store.load('测试宠物', clock=self.clock)
+        self.assertEqual(json.dumps(loaded.to_dict()), json.dumps(self.pet.to_dict()))
+        store.close()
+
+if __name__ == '__main__':
+    unittest.main()
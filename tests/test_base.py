@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from pet.base import Pet
 from pet.enums import PetState
+from pet.vitals import PetVitals
 
 class TestPet(unittest.TestCase):
     """测试 Pet 类的功能"""
@@ -91,6 +92,19 @@ class TestPet(unittest.TestCase):
         self.assertIn('energy', status)
         self.assertIn('hygiene', status)
     
+    def test_get_vitals(self):
+        """测试获取数值快照"""
+        self.pet.hunger = 42.25
+        vitals = self.pet.get_vitals()
+        self.assertIsInstance(vitals, PetVitals)
+        self.assertEqual(vitals.hunger, 42.25)
+        self.assertEqual(vitals["hunger"], 42.25)
+        # 快照不随宠物后续变化
+        self.pet.hunger = 10.0
+        self.assertEqual(vitals.hunger, 42.25)
+        # 展示用的状态字典基于同一组数值格式化
+        self.assertEqual(self.pet.get_status()['hunger'], '10.0/100')
+    
     def test_save_and_load(self):
         """测试保存和加载功能"""
         # 创建临时文件
@@ -112,6 +126,33 @@ class TestPet(unittest.TestCase):
             if os.path.exists(temp_file):
                 os.unlink(temp_file)
     
+    def test_update_needs_piecewise(self):
+        """测试需求值按阈值分段计算"""
+        self.pet.personality_traits = {}
+        self.pet.hunger = 60.0
+        self.pet.happiness = 50.0
+        self.pet._update_needs(10)
+        self.assertAlmostEqual(self.pet.hunger, 90.0)
+        self.assertAlmostEqual(self.pet.energy, 80.0)
+        self.assertAlmostEqual(self.pet.hygiene, 90.0)
+        # 饥饿在 10/3 小时后才超过阈值，只有之后的时间扣除快乐度
+        self.assertAlmostEqual(self.pet.happiness, 50.0 - 0.5 * (10 - 10 / 3))
+    
+    def test_update_long_absence(self):
+        """测试长时间离线后的追赶：睡眠中途自动醒来"""
+        self.pet.personality_traits = {}
+        self.pet.sleep()
+        self.pet.energy = 40.0
+        self.pet.needs_update = True
+        self.pet.last_update_time -= 365 * 24 * 3600
+        self.pet.update()
+        self.assertFalse(self.pet.is_sleeping)
+        self.assertEqual(self.pet.energy, 0)
+        self.assertEqual(self.pet.hunger, 100)
+        self.assertEqual(self.pet.hygiene, 0)
+        self.assertEqual(self.pet.happiness, 0)
+        self.assertEqual(self.pet.state, PetState.ELDER)
+    
     def test_update(self):
         """测试状态更新功能"""
         initial_age = self.pet.age_in_days
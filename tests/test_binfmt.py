@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+测试 binfmt.py 模块中的二进制存档格式
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import contextlib
+import io
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from pet import binfmt
+from pet.base import Pet
+from pet.intelligent import IntelligentPet
+from pet.clock import SimulationClock
+from pet.simulation import fast_forward
+
+class TestRecordEncoding(unittest.TestCase):
+    """测试记录编码"""
+    
+    def test_round_trip(self):
+        """测试各种类型编码后解码结果一致"""
+        record = {
+            "none": None, "flags": [True, False],
+            "ints": [0, 127, 128, -1, -33, 70000, -70000, 2 ** 40, -2 ** 40, 2 ** 64 - 1],
+            "float": 3.25, "text": "宠物" * 40, "bytes": b"\x00\x01",
+            "nested": {"list": list(range(20)), "map": {str(i): i for i in range(20)}}
+        }
+        self.assertEqual(binfmt.unpack(binfmt.pack(record)), record)
+    
+    def test_numpy_scalars(self):
+        """测试 NumPy 标量按 Python 类型编码"""
+        self.assertEqual(binfmt.unpack(binfmt.pack([np.int16(5), np.float64(0.5), np.bool_(True)])), [5, 0.5, True])
+    
+    def test_truncated(self):
+        """测试数据不完整时抛出格式错误"""
+        with self.assertRaises(binfmt.BinaryFormatError):
+            binfmt.unpack(binfmt.pack("宠物" * 40)[:-1])
+
+class TestContainer(unittest.TestCase):
+    """测试二进制容器"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "test.vpet")
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.temp_dir.cleanup()
+    
+    def test_write_and_read(self):
+        """测试记录段和数组段的读写"""
+        sections = {
+            "meta": {"name": "测试"},
+            "values": np.arange(12, dtype=np.float64).reshape(3, 4),
+            "flags": np.array([True, False, True]),
+            "empty": np.zeros((0, 5), dtype=np.int16)
+        }
+        binfmt.write_container(self.file_path, sections)
+        self.assertTrue(binfmt.is_binary_file(self.file_path))
+        self.assertEqual(binfmt.list_sections(self.file_path), ["meta", "values", "flags", "empty"])
+        
+        loaded = binfmt.read_container(self.file_path)
+        self.assertEqual(loaded["meta"], {"name": "测试"})
+        for name in ("values", "flags", "empty"):
+            self.assertEqual(loaded[name].dtype, sections[name].dtype)
+            np.testing.assert_array_equal(loaded[name], sections[name])
+        
+        partial = binfmt.read_container(self.file_path, names=["meta"])
+        self.assertEqual(list(partial), ["meta"])
+    
+    def test_bad_magic(self):
+        """测试非二进制存档抛出格式错误"""
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump({"name": "测试"}, f)
+        self.assertFalse(binfmt.is_binary_file(self.file_path))
+        with self.assertRaises(binfmt.BinaryFormatError):
+            binfmt.read_container(self.file_path)
+
+class TestPetBinarySave(unittest.TestCase):
+    """测试宠物的二进制存档"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.temp_dir.cleanup()
+    
+    def test_pet_round_trip(self):
+        """测试普通宠物的二进制存档与 JSON 存档内容一致"""
+        clock = SimulationClock(0)
+        pet = Pet('测试宠物', clock=clock)
+        pet.feed()
+        pet.play()
+        binary_file = os.path.join(self.temp_dir.name, '测试宠物.vpet')
+        json_file = os.path.join(self.temp_dir.name, '测试宠物.json')
+        pet.save_to_file(binary_file)
+        pet.save_to_file(json_file)
+        
+        from_binary = Pet.load_from_file(binary_file, clock=clock)
+        from_json = Pet.load_from_file(json_file, clock=clock)
+        self.assertIsInstance(from_binary, Pet)
+        self.assertEqual(from_binary.to_dict(), from_json.to_dict())
+    
+    def test_intelligent_pet_round_trip(self):
+        """测试智能宠物的二进制存档包含Q表和经验回放缓冲区"""
+        clock = SimulationClock(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            pet = IntelligentPet('测试宠物', clock=clock)
+            fast_forward(pet, 2 * 86400)
+            file_path = os.path.join(self.temp_dir.name, '测试宠物.vpet')
+            pet.save_to_file(file_path)
+            loaded = IntelligentPet.load_from_file(file_path, clock=clock)
+        
+        rl = pet.reinforcement_learning
+        loaded_rl = loaded.reinforcement_learning
+        self.assertEqual(loaded_rl.learning_steps, rl.learning_steps)
+        self.assertEqual(dict(loaded_rl.q_table), dict(rl.q_table))
+        self.assertEqual(dict(loaded_rl.q_table_2), dict(rl.q_table_2))
+        self.assertEqual(list(loaded_rl.replay_buffer), list(rl.replay_buffer))
+        self.assertAlmostEqual(loaded_rl.replay_buffer.tree.total(), rl.replay_buffer.tree.total())
+    
+    def test_learning_data_backends(self):
+        """测试二进制学习数据可以在两种Q表模式之间加载"""
+        from pet.systems.reinforcement import ReinforcementLearningSystem
+        clock = SimulationClock(0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            pet = IntelligentPet('测试宠物', clock=clock)
+            fast_forward(pet, 2 * 86400)
+        file_path = os.path.join(self.temp_dir.name, 'rl.vpet')
+        pet.reinforcement_learning.save_learning_data(file_path)
+        
+        dense = ReinforcementLearningSystem(pet, q_backend="dense")
+        self.assertTrue(dense.load_learning_data(file_path))
+        for state, actions in pet.reinforcement_learning.q_table.items():
+            for action, q_value in actions.items():
+                self.assertAlmostEqual(dense.q_table[dense.encode_state(state), dense._action_index[action]], q_value)
+
+if __name__ == '__main__':
+    unittest.main()
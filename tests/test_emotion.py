@@ -6,6 +6,7 @@
 import unittest
 import os
 import sys
+from collections.abc import Mapping
 
 # 添加项目根目录到 Python 搜索路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -23,7 +24,7 @@ class TestEmotionalSystem(unittest.TestCase):
     def test_initialization(self):
         """测试情感系统初始化"""
         self.assertIsNotNone(self.emotion_system)
-        self.assertIsInstance(self.emotion_system.emotions, dict)
+        self.assertIsInstance(self.emotion_system.emotions, Mapping)
     
     def test_trigger_emotion(self):
         """测试触发情感"""
@@ -56,5 +57,81 @@ class TestEmotionalSystem(unittest.TestCase):
         self.assertGreaterEqual(intensity, 0.0)
         self.assertLessEqual(intensity, 1.0)
 
+    def test_emotions_view_writes_vector(self):
+        """测试情感字典视图与情感向量共享数据"""
+        from pet.enums import EmotionType
+        from pet.emotion import EMOTION_INDEX
+        self.emotion_system.emotions[EmotionType.FEAR] = 0.7
+        self.assertEqual(self.emotion_system.values[EMOTION_INDEX[EmotionType.FEAR]], 0.7)
+        self.assertEqual(len(self.emotion_system.emotions), 12)
+        self.assertEqual(self.emotion_system.get_dominant_emotion(), EmotionType.FEAR)
+    
+    def test_connection_propagation(self):
+        """测试情感沿关联矩阵传播并截断到有效范围"""
+        from pet.enums import EmotionType
+        emotions = self.emotion_system.emotions
+        emotions[EmotionType.JOY] = 0.9
+        self.emotion_system.trigger_emotion(EmotionType.ANGER, 1.0, '测试触发')
+        # 愤怒对愉悦的影响为 -0.5，愤怒截断到1
+        self.assertAlmostEqual(emotions[EmotionType.JOY], 0.4, places=4)
+        self.assertAlmostEqual(emotions[EmotionType.SADNESS], 0.1 + 0.3, places=4)
+        self.assertAlmostEqual(emotions[EmotionType.ANGER], 1.0, places=4)
+    
+    def test_trigger_emotions_batch(self):
+        """测试批量触发与逐只触发结果一致"""
+        from pet.enums import EmotionType
+        from pet.emotion import trigger_emotions
+        from pet.clock import SimulationClock
+        clock = SimulationClock(0)
+        pets = [Pet(f'宠物{i}', clock=clock) for i in range(3)]
+        expected = [Pet(f'宠物{i}', clock=clock) for i in range(3)]
+        clock.advance(120)
+        intensities = [0.2, 0.5, 0.9]
+        events = trigger_emotions([p.emotional_system for p in pets], EmotionType.LOVE, intensities, '批量测试')
+        for pet, intensity in zip(expected, intensities):
+            pet.emotional_system.trigger_emotion(EmotionType.LOVE, intensity, '批量测试')
+        
+        self.assertEqual(len(events), 3)
+        for pet, other in zip(pets, expected):
+            self.assertEqual(dict(pet.emotional_system.emotions), dict(other.emotional_system.emotions))
+            self.assertEqual(len(pet.emotional_system.emotion_history), 1)
+
+    def test_lazy_decay(self):
+        """测试情感在读取时按经过的时间衰减，与触发频率无关"""
+        from pet.enums import EmotionType
+        from pet.clock import SimulationClock
+        clock = SimulationClock(0)
+        frequent = Pet('频繁', clock=clock).emotional_system
+        idle = Pet('空闲', clock=clock).emotional_system
+        for _ in range(10):
+            frequent.trigger_emotion(EmotionType.FEAR, 0.0, '测试触发')
+            clock.advance(6)
+        
+        # 一分钟衰减0.05，平静状态恢复0.025
+        for system in (frequent, idle):
+            self.assertAlmostEqual(system.get_emotion_intensity(EmotionType.JOY), 0.45)
+            self.assertAlmostEqual(system.get_emotion_intensity(EmotionType.CALM), 0.625)
+        self.assertEqual(idle.last_decay_time, 60)
+        
+        clock.advance(3600)
+        self.assertEqual(idle.get_emotion_intensity(EmotionType.JOY), 0.05)
+        self.assertEqual(idle.get_emotion_intensity(EmotionType.CALM), 0.8)
+        self.assertEqual(idle.get_dominant_emotion(), EmotionType.CALM)
+    
+    def test_decay_time_serialization(self):
+        """测试序列化保存衰减时间"""
+        from pet.enums import EmotionType
+        from pet.clock import SimulationClock
+        clock = SimulationClock(0)
+        system = Pet('测试宠物', clock=clock).emotional_system
+        clock.advance(60)
+        data = system.to_dict()
+        self.assertEqual(data['last_decay_time'], 60)
+        
+        restored = Pet('测试宠物', clock=clock).emotional_system
+        restored.from_dict(data)
+        clock.advance(60)
+        self.assertAlmostEqual(restored.get_emotion_intensity(EmotionType.JOY), 0.4)
+
 if __name__ == '__main__':
     unittest.main()
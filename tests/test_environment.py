@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+测试 environment.py 模块中的互动注册表和 EnvironmentElement 类
+"""
+
+import unittest
+import os
+import sys
+from enum import Enum
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.clock import SimulationClock
+from environment import (
+    EnvironmentElement, EnvironmentElementType, EnvironmentSystem, INTERACTION_HANDLERS,
+    INTERACTION_LABELS, register_element_type, register_interaction, available_interactions
+)
+
+HOUR = 3600
+
+class GardenElementType(Enum):
+    """测试用的第三方环境元素类型"""
+    POND = "pond"
+
+class TestInteractionRegistry(unittest.TestCase):
+    """测试环境元素互动注册表"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.pet = Pet('测试宠物', clock=SimulationClock(0))
+        self.environment = EnvironmentSystem(self.pet)
+    
+    def tearDown(self):
+        """移除测试注册的互动"""
+        INTERACTION_HANDLERS.pop((GardenElementType.POND, "swim"), None)
+        INTERACTION_LABELS.pop(GardenElementType.POND, None)
+    
+    def test_builtin_interactions(self):
+        """测试内置互动的效果"""
+        self.pet.energy = 95
+        result = self.environment.interact_with_element("toy_1", "play")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["effects"], {"happiness": 15, "energy": -10})
+        self.assertEqual(self.pet.energy, 85)
+        
+        self.pet.hunger = 10
+        result = self.environment.interact_with_element("food_bowl_1", "eat")
+        self.assertEqual(result["effects"]["hunger"], -10)
+        self.assertEqual(self.pet.hunger, 0)
+        self.assertFalse(self.environment.interact_with_element("food_bowl_1", "eat")["success"])
+        
+        self.assertEqual(self.environment.interact_with_element("bed_1", "fly")["message"], "无效的互动类型")
+        self.assertEqual(self.environment.get_element("food_bowl_1").interaction_count, 2)
+        self.assertEqual([t for t, _ in available_interactions(EnvironmentElementType.BED)], ["sleep", "rest"])
+    
+    def test_effects_not_shared(self):
+        """测试每次互动返回新的效果字典"""
+        first = self.environment.interact_with_element("sofa_1", "rest")
+        first["effects"]["energy"] = 0
+        second = self.environment.interact_with_element("sofa_1", "rest")
+        self.assertEqual(second["effects"]["energy"], 8)
+    
+    def test_third_party_element_type(self):
+        """测试第三方环境元素类型的注册、互动和存档恢复"""
+        pond = EnvironmentElement("pond_1", GardenElementType.POND, "池塘", "花园里的小池塘。")
+        self.environment.add_element(pond)
+        self.assertEqual(self.environment.interact_with_element("pond_1", "swim")["message"], "未知的环境元素类型")
+        
+        register_element_type(GardenElementType.POND)
+        
+        @register_interaction(GardenElementType.POND, "swim", label="游泳")
+        def swim(element, pet):
+            element.status["ripples"] = element.status.get("ripples", 0) + 1
+            pet.hygiene = min(100, pet.hygiene + 5)
+            return {"success": True, "message": "宠物在池塘里游泳。"}
+        
+        self.pet.hygiene = 50
+        self.assertTrue(self.environment.interact_with_element("pond_1", "swim")["success"])
+        self.assertEqual(self.pet.hygiene, 55)
+        self.assertEqual(available_interactions(GardenElementType.POND), [("swim", "游泳")])
+        
+        restored = EnvironmentSystem(self.pet)
+        restored.from_dict(self.environment.to_dict())
+        element = restored.get_element("pond_1")
+        self.assertIs(element.element_type, GardenElementType.POND)
+        self.assertEqual(element.status, {"ripples": 1})
+
+class TestEnvironmentResources(unittest.TestCase):
+    """测试按时间延迟计算的环境资源"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.clock = SimulationClock(0)
+        self.pet = Pet('测试宠物', clock=self.clock)
+        self.environment = EnvironmentSystem(self.pet)
+    
+    def test_resources_change_with_time(self):
+        """测试资源在查询时按经过的时间计算"""
+        water = self.environment.get_element("water_bowl_1")
+        self.clock.advance(10 * HOUR)
+        self.environment.update_environment(10 * HOUR)
+        # 没有查询之前不会计算
+        self.assertEqual(water.status["water_level"], 100.0)
+        self.assertEqual(water.get_status()["status"]["water_level"], 80.0)
+        self.assertEqual(self.environment.get_element("food_bowl_1").get_status()["status"]["food_level"], 90.0)
+        
+        # 分多次查询与一次查询的结果相同
+        self.clock.advance(5 * HOUR)
+        water.get_status()
+        self.clock.advance(100 * HOUR)
+        self.assertEqual(water.get_status()["status"]["water_level"], 0.0)
+        self.assertIn("空了", self.environment.interact_with_element("water_bowl_1", "check")["message"])
+        self.assertFalse(self.environment.interact_with_element("water_bowl_1", "drink")["success"])
+        self.assertTrue(self.environment.interact_with_element("water_bowl_1", "refill")["success"])
+        self.assertEqual(water.status["water_level"], 100.0)
+    
+    def test_eating_consumes_food(self):
+        """测试进食消耗食物，食物不够时只吃剩下的"""
+        bowl = self.environment.get_element("food_bowl_1")
+        bowl.status["food_level"] = 40.0
+        self.pet.hunger = 80
+        self.environment.interact_with_element("food_bowl_1", "eat")
+        self.assertEqual(bowl.status["food_level"], 10.0)
+        result = self.environment.interact_with_element("food_bowl_1", "eat")
+        self.assertEqual(result["effects"]["hunger"], -10.0)
+        self.assertEqual(self.pet.hunger, 40)
+        self.assertFalse(self.environment.interact_with_element("food_bowl_1", "eat")["success"])
+    
+    def test_toy_wear_and_save(self):
+        """测试玩具磨损以及保存后继续计算"""
+        self.pet.energy = 100
+        self.environment.interact_with_element("toy_1", "play")
+        self.environment.interact_with_element("toy_1", "explore")
+        self.clock.advance(10 * HOUR)
+        self.assertAlmostEqual(self.environment.get_element("toy_1").get_status()["status"]["wear"], 6.0)
+        
+        data = self.environment.to_dict()
+        self.clock.advance(20 * HOUR)
+        restored = EnvironmentSystem(self.pet)
+        restored.from_dict(data)
+        self.assertAlmostEqual(restored.get_element("toy_1").get_status()["status"]["wear"], 8.0)
+        self.assertEqual(restored.get_element("toy_1").interaction_count, 2)
+    
+    def test_added_element_uses_pet_clock(self):
+        """测试添加的元素改用宠物的时钟，并补齐旧存档缺少的资源"""
+        plant = EnvironmentElement.from_dict({
+            "element_id": "plant_1", "element_type": "plant", "name": "盆栽", "description": "一盆绿植。"
+        })
+        self.environment.add_element(plant)
+        self.assertEqual(plant.status["growth"], 10.0)
+        self.clock.advance(20 * HOUR)
+        self.assertEqual(plant.get_status()["status"]["growth"], 20.0)
+
+if __name__ == '__main__':
+    unittest.main()
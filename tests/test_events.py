@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+测试 events.py 模块中的 EventBus 以及宠物动作事件的订阅者
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.clock import SimulationClock
+from pet.events import (EventBus, EventType, SOURCE_USER, SOURCE_PET,
+                        DELIVERY_DEFERRED, DELIVERY_ASYNC)
+from pet.intelligent import IntelligentPet
+from pet.store import SQLitePetStore
+from pet.autosave import AutosaveService
+from tasks import TaskSystem, Task, TaskType, TaskDifficulty
+from achievements import AchievementSystem
+
+class TestEventBus(unittest.TestCase):
+    """测试 EventBus 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.bus = EventBus()
+        self.received = []
+    
+    def test_emit_without_subscribers(self):
+        """测试没有订阅者时不创建事件"""
+        self.assertIsNone(self.bus.emit(EventType.FEED))
+        self.assertFalse(self.bus.has_subscribers(EventType.FEED))
+    
+    def test_sync_delivery(self):
+        """测试同步投递只发给订阅了该类型的回调"""
+        self.bus.subscribe([EventType.FEED, EventType.PLAY], self.received.append)
+        event = self.bus.emit(EventType.FEED, food_type="零食")
+        self.bus.emit(EventType.CLEAN)
+        self.assertEqual(self.received, [event])
+        self.assertEqual(event.type, EventType.FEED)
+        self.assertEqual(event.source, SOURCE_USER)
+        self.assertEqual(event.data, {"food_type": "零食"})
+    
+    def test_unsubscribe(self):
+        """测试取消订阅"""
+        self.bus.subscribe(EventType.FEED, self.received.append)
+        self.assertTrue(self.bus.unsubscribe(self.received.append))
+        self.assertFalse(self.bus.unsubscribe(self.received.append))
+        self.assertIsNone(self.bus.emit(EventType.FEED))
+        self.assertEqual(self.received, [])
+    
+    def test_subscribe_during_delivery(self):
+        """测试投递过程中新增的订阅不影响本次投递"""
+        def subscribe_more(event):
+            self.bus.subscribe(EventType.FEED, self.received.append)
+        self.bus.subscribe(EventType.FEED, subscribe_more)
+        self.bus.emit(EventType.FEED)
+        self.assertEqual(self.received, [])
+        self.bus.emit(EventType.FEED)
+        self.assertEqual(len(self.received), 1)
+    
+    def test_deferred_delivery(self):
+        """测试延迟投递按订阅者批量投递"""
+        batches = []
+        self.bus.subscribe(EventType.FEED, batches.append, DELIVERY_DEFERRED)
+        for _ in range(3):
+            self.bus.emit(EventType.FEED)
+        self.assertEqual(batches, [])
+        self.assertEqual(self.bus.pending(), 3)
+    
+        self.assertEqual(self.bus.flush(), 3)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0]), 3)
+        self.assertEqual(self.bus.pending(), 0)
+    
+    def test_deferred_context(self):
+        """测试 deferred 上下文结束时投递"""
+        batches = []
+        self.bus.subscribe(EventType.PLAY, batches.append, DELIVERY_DEFERRED)
+        with self.bus.deferred():
+            self.bus.emit(EventType.PLAY)
+            self.bus.emit(EventType.PLAY)
+        self.assertEqual([len(batch) for batch in batches], [2])
+    
+    def test_invalid_delivery(self):
+        """测试未知的投递方式"""
+        with self.assertRaises(ValueError):
+            self.bus.subscribe(EventType.FEED, self.received.append, "later")
+    
+    def test_async_delivery_in_loop(self):
+        """测试在事件循环中异步投递"""
+        async def handler(event):
+            await asyncio.sleep(0)
+            self.received.append(event)
+    
+        async def run():
+            self.bus.subscribe(EventType.TRAIN, handler, DELIVERY_ASYNC)
+            self.bus.emit(EventType.TRAIN)
+            self.assertEqual(self.received, [])
+            await self.bus.drain()
+    
+        asyncio.run(run())
+        self.assertEqual(len(self.received), 1)
+    
+    def test_async_delivery_without_loop(self):
+        """测试没有事件循环时异步订阅者在 flush 时运行"""
+        async def handler(event):
+            self.received.append(event)
+    
+        self.bus.subscribe(EventType.TRAIN, handler, DELIVERY_ASYNC)
+        self.bus.emit(EventType.TRAIN)
+        self.assertEqual(self.bus.pending(), 1)
+        self.assertEqual(self.bus.flush(), 1)
+        self.assertEqual(len(self.received), 1)
+
+    def test_async_backlog_flushed_in_loop(self):
+        """测试没有事件循环时排队的异步事件可以在事件循环中 flush"""
+        async def handler(event):
+            await asyncio.sleep(0)
+            self.received.append(event)
+    
+        self.bus.subscribe(EventType.TRAIN, handler, DELIVERY_ASYNC)
+        self.bus.emit(EventType.TRAIN)
+    
+        async def run():
+            self.assertEqual(self.bus.flush(), 1)
+            self.assertEqual(self.bus.pending(), 0)
+            await self.bus.drain()
+    
+        asyncio.run(run())
+        self.assertEqual(len(self.received), 1)
+
+class TestPetEvents(unittest.TestCase):
+    """测试宠物动作发布的事件"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.clock = SimulationClock(start=1_000_000.0)
+        self.pet = Pet("事件宠物", clock=self.clock)
+        self.events = []
+        self.pet.event_bus.subscribe(list(EventType), self.events.append)
+    
+    def test_actions_emit_events(self):
+        """测试成功的动作发布事件，事件时间取自宠物时钟"""
+        self.pet.feed("零食")
+        self.pet.clean()
+        self.pet.pet()
+        self.assertEqual([e.type for e in self.events], [EventType.FEED, EventType.CLEAN, EventType.PET])
+        self.assertTrue(all(e.source == SOURCE_USER for e in self.events))
+        self.assertTrue(all(e.pet is self.pet for e in self.events))
+        self.assertEqual(self.events[0].time, self.clock.time())
+        self.assertEqual(self.events[0].data["food_type"], "零食")
+    
+    def test_failed_action_emits_nothing(self):
+        """测试失败的动作不发布事件"""
+        self.pet.is_sleeping = True
+        self.pet.play()
+        self.pet.train()
+        self.assertEqual(self.events, [])
+    
+    def test_nested_actions_are_autonomous(self):
+        """测试动作中连带发生的睡觉和醒来以宠物为事件来源"""
+        self.pet.energy = 45
+        self.pet.feed()
+        self.assertEqual([(e.type, e.source) for e in self.events],
+                         [(EventType.FEED, SOURCE_USER), (EventType.SLEEP, SOURCE_PET)])
+    
+        self.events.clear()
+        self.pet.feed()
+        self.assertEqual([(e.type, e.source) for e in self.events], [
+            (EventType.WAKE_UP, SOURCE_PET), (EventType.FEED, SOURCE_USER), (EventType.SLEEP, SOURCE_PET)
+        ])
+
+class TestEventSubscribers(unittest.TestCase):
+    """测试任务、成就、学习和自动保存订阅宠物事件"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.clock = SimulationClock(start=1_000_000.0)
+        self.pet = Pet("订阅宠物", clock=self.clock)
+    
+    def test_tasks_progress_from_events(self):
+        """测试用户动作推进任务，自发动作不推进"""
+        task_system = TaskSystem(self.pet)
+        task = Task("t1", TaskType.FEED, "喂食3次", TaskDifficulty.MEDIUM, 3, {"experience": 10}, clock=self.clock)
+        task_system.add_task(task)
+        task_system.attach(self.pet.event_bus)
+    
+        self.pet.feed()
+        with self.pet.autonomous():
+            self.pet.feed()
+        self.assertEqual(task.progress, 1)
+    
+        self.pet.feed()
+        self.pet.feed()
+        self.assertIn(task, task_system.completed_tasks)
+    
+        task_system.detach(self.pet.event_bus)
+        self.assertFalse(self.pet.event_bus.has_subscribers(EventType.FEED))
+    
+    def test_achievements_from_events(self):
+        """测试用户动作更新成就"""
+        achievement_system = AchievementSystem(self.pet)
+        achievement_system.attach(self.pet.event_bus)
+    
+        for _ in range(10):
+            self.pet.feed()
+        self.pet.train("strength")
+        self.pet.pet()
+        with self.pet.autonomous():
+            self.pet.pet()
+    
+        self.assertTrue(achievement_system.get_achievement("care_1").is_unlocked())
+        self.assertEqual(achievement_system.get_achievement("training_1").progress, 1)
+        self.assertEqual(achievement_system.get_achievement("social_2").progress, 1)
+    
+    def test_intelligent_pet_learns_from_interaction_events(self):
+        """测试智能宠物通过交互事件更新强化学习"""
+        pet = IntelligentPet("学习宠物", clock=self.clock)
+        interactions = []
+        pet.event_bus.subscribe(EventType.INTERACTION, interactions.append)
+        steps = pet.reinforcement_learning.learning_steps
+    
+        pet.interact_with_user("feed", food_type="零食")
+        self.assertEqual(pet.reinforcement_learning.learning_steps, steps + 1)
+        self.assertEqual(interactions[0].data["interaction_type"], "feed")
+        self.assertEqual(interactions[0].data["result"][:4], "喂食成功")
+    
+    def test_autosave_deferred(self):
+        """测试自动保存在 flush 时对一批动作只收集一次"""
+        store = SQLitePetStore()
+        autosave = AutosaveService(store, self.pet, coalesce_delay=0)
+        autosave.attach(self.pet.event_bus)
+    
+        self.pet.feed()
+        self.pet.clean()
+        self.assertFalse(autosave.pending())
+        self.pet.event_bus.flush()
+        self.assertTrue(autosave.pending())
+        self.assertTrue(autosave.flush())
+        self.assertIn(self.pet.name, store)
+        store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+测试 journal.py 模块中的增量存档
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.clock import SimulationClock
+from pet import binfmt
+from pet.journal import PetJournal, OP_APPEND, JOURNAL_HEADER, JOURNAL_MAGIC, JOURNAL_VERSION, RECORD_HEADER
+from social import SocialSystem, SocialInteractionType
+from tasks import TaskSystem, TaskType
+from achievements import AchievementSystem
+
+class TestPetJournal(unittest.TestCase):
+    """测试 PetJournal 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'pet.vpet')
+        self.clock = SimulationClock(1_700_000_000)
+        self.pet = Pet('测试宠物', '狗', clock=self.clock)
+        self.social = SocialSystem(self.pet)
+        self.tasks = TaskSystem(self.pet)
+        self.achievements = AchievementSystem(self.pet)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.temp_dir.cleanup()
+    
+    def _save(self, journal):
+        return journal.save(self.pet, self.social, self.tasks, self.achievements)
+    
+    def _load(self):
+        journal = PetJournal(self.path, sync=False)
+        pet = journal.load(clock=self.clock)
+        social = SocialSystem(pet)
+        tasks = TaskSystem(pet)
+        achievements = AchievementSystem(pet)
+        for system, prefix in ((social, 'social'), (tasks, 'tasks'), (achievements, 'achievements')):
+            journal.restore(system, prefix)
+        return journal, pet, social, tasks, achievements
+    
+    def _assert_same(self, loaded):
+        _, pet, social, tasks, achievements = loaded
+        # 元组保存后变为列表，与 JSON 存档相同
+        self.assertEqual(json.dumps(pet.to_dict()), json.dumps(self.pet.to_dict()))
+        self.assertEqual(social.to_dict(), self.social.to_dict())
+        self.assertEqual(tasks.to_dict(), self.tasks.to_dict())
+        self.assertEqual(achievements.to_dict(), self.achievements.to_dict())
+    
+    def test_round_trip(self):
+        """测试快照和日志重放后与原数据一致"""
+        journal = PetJournal(self.path, sync=False)
+        self._save(journal)
+        self.pet.feed()
+        self.clock.advance(600)
+        self.pet.play()
+        self.social.interact_with_other(Pet('朋友', clock=self.clock), SocialInteractionType.GREET)
+        self.tasks.generate_daily_tasks()
+        self.tasks.update_task_progress(TaskType.FEED)
+        self.achievements.update_care_achievements('feed')
+        self._save(journal)
+        
+        loaded = self._load()
+        self.assertFalse(loaded[1].is_dirty())
+        self._assert_same(loaded)
+    
+    def test_incremental_save(self):
+        """测试只写入修改过的数据段，记忆和情感历史只追加"""
+        journal = PetJournal(self.path, sync=False)
+        self.pet.feed()
+        snapshot_size = self._save(journal)
+        self.assertEqual(self._save(journal), 0)
+        
+        self.pet.feed()
+        self.assertTrue(self.pet.is_dirty())
+        self.assertFalse(self.social.is_dirty())
+        written = self._save(journal)
+        self.assertGreater(written, 0)
+        self.assertLess(written, snapshot_size / 2)
+        
+        with open(journal.journal_path, 'rb') as f:
+            data = f.read()
+        length, _ = RECORD_HEADER.unpack_from(data, JOURNAL_HEADER.size)
+        record = binfmt.unpack(data[JOURNAL_HEADER.size + RECORD_HEADER.size:][:length])
+        self.assertEqual(set(record), {'pet.core', 'pet.memories', 'emotion.state', 'emotion.history'})
+        self.assertEqual(record['pet.memories'][0], OP_APPEND)
+        self.assertEqual(record['emotion.history'][0], OP_APPEND)
+        self._assert_same(self._load())
+    
+    def test_torn_record_discarded(self):
+        """测试日志末尾写了一半的记录被丢弃"""
+        journal = PetJournal(self.path, sync=False)
+        self._save(journal)
+        self.pet.feed()
+        self._save(journal)
+        expected = json.dumps(self.pet.to_dict())
+        
+        self.pet.play()
+        self._save(journal)
+        with open(journal.journal_path, 'r+b') as f:
+            f.truncate(os.path.getsize(journal.journal_path) - 3)
+        
+        journal, pet, *_ = self._load()
+        self.assertEqual(json.dumps(pet.to_dict()), expected)
+        # 之后的保存从有效记录之后继续追加
+        pet.clean()
+        journal.save(pet)
+        self.assertEqual(PetJournal(self.path).load(clock=self.clock).hygiene, pet.hygiene)
+    
+    def test_compaction(self):
+        """测试日志过大时压缩为新快照"""
+        journal = PetJournal(self.path, min_compact_size=0, compact_ratio=1.0, sync=False)
+        self._save(journal)
+        for _ in range(20):
+            self.pet.feed()
+            self.clock.advance(60)
+            self._save(journal)
+        self.assertGreater(journal.generation, 1)
+        self.assertLessEqual(journal.journal_size, journal.compact_ratio * journal.snapshot_size)
+        self._assert_same(self._load())
+    
+    def test_stale_journal_ignored(self):
+        """测试世代号与快照不同的日志（压缩时崩溃留下的旧日志）被忽略"""
+        journal = PetJournal(self.path, sync=False)
+        self._save(journal)
+        self.pet.feed()
+        self._save(journal)
+        journal_data = open(journal.journal_path, 'rb').read()
+        
+        journal.compact()
+        expected = json.dumps(self.pet.to_dict())
+        with open(journal.journal_path, 'wb') as f:
+            f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, 0, journal.generation - 1))
+            f.write(journal_data[JOURNAL_HEADER.size:])
+        
+        _, pet, *_ = self._load()
+        self.assertEqual(json.dumps(pet.to_dict()), expected)
+    
+    def test_save_to_file_atomic(self):
+        """测试保存失败时原存档保持不变"""
+        file_path = os.path.join(self.temp_dir.name, 'pet.json')
+        self.pet.save_to_file(file_path)
+        original = open(file_path, encoding='utf-8').read()
+        
+        self.pet.color = object()
+        self.assertIn('保存失败', self.pet.save_to_file(file_path))
+        self.assertEqual(open(file_path, encoding='utf-8').read(), original)
+        self.assertEqual(os.listdir(self.temp_dir.name), ['pet.json'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+测试 population.py 模块中的 PetPopulation 类
+"""
+
+import unittest
+import os
+import sys
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.enums import PetState, PetPersonality
+from pet.clock import SimulationClock
+from pet.population import PetPopulation
+
+class TestPetPopulation(unittest.TestCase):
+    """测试 PetPopulation 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.pets = [Pet(f'宠物{i}') for i in range(3)]
+        self.pets[0].personality_traits = {PetPersonality.HUNGRY: 0.8}
+        self.pets[1].personality_traits = {PetPersonality.CLEAN: 0.8}
+        self.pets[2].personality_traits = {}
+        self.pets[2].hunger = 65.0
+        self.population = PetPopulation.from_pets(self.pets)
+    
+    def test_advance_matches_pet_update_needs(self):
+        """测试批量推进与单只宠物的需求更新一致"""
+        self.population.advance(1.0)
+        for i, pet in enumerate(self.pets):
+            pet._update_needs(1.0)
+            view = self.population.view(i)
+            self.assertAlmostEqual(view.hunger, pet.hunger)
+            self.assertAlmostEqual(view.energy, pet.energy)
+            self.assertAlmostEqual(view.hygiene, pet.hygiene)
+            self.assertAlmostEqual(view.happiness, pet.happiness)
+    
+    def test_sleep_recovery_and_auto_wake(self):
+        """测试睡眠恢复和自动醒来"""
+        self.pets[0].energy = 80.0
+        self.pets[0].is_sleeping = True
+        population = PetPopulation.from_pets(self.pets[:1])
+        woke = population.advance(1.0)
+        self.assertEqual(woke, 0)
+        self.assertAlmostEqual(population.view(0).energy, 95.0)
+        woke = population.advance(1.0)
+        self.assertEqual(woke, 1)
+        self.assertFalse(population.view(0).is_sleeping)
+    
+    def test_spawn_and_materialize(self):
+        """测试批量创建和物化为 Pet 对象"""
+        indices = self.population.spawn(100, seed=1)
+        self.assertEqual(len(self.population), 103)
+        self.population.advance(24 * 2)
+        pet = self.population.materialize(indices[0])
+        self.assertIsInstance(pet, Pet)
+        self.assertEqual(pet.state, PetState.CHILD)
+        self.assertAlmostEqual(pet.hunger, self.population.view(indices[0]).hunger)
+    
+    def test_sync_to_pets(self):
+        """测试将数值写回绑定的宠物"""
+        self.population.advance(5.0)
+        self.population.sync_to_pets()
+        self.assertAlmostEqual(self.pets[1].hygiene, self.population.view(1).hygiene)
+        self.assertGreater(self.pets[0].hunger, 0)
+    
+    def test_simulation_clock(self):
+        """测试种群使用宠物的模拟时钟，同步后宠物的更新时间与模拟时间一致"""
+        clock = SimulationClock(1_000_000.0)
+        pet = Pet('模拟宠物', clock=clock)
+        population = PetPopulation.from_pets([pet])
+        self.assertIs(population.clock, clock)
+        population.advance(2.0)
+        population.sync_to_pets()
+        self.assertEqual(pet.last_update_time, 1_000_000.0 + 7200)
+        
+        # 之后按模拟时钟继续更新
+        clock.advance(7200 + 3600)
+        hunger = pet.hunger
+        pet.needs_update = True
+        pet.update()
+        self.assertGreater(pet.hunger, hunger)
+        self.assertEqual(pet.last_update_time, clock.time())
+        
+        spawned = population.spawn(1)
+        self.assertIs(population.materialize(spawned[0]).clock, clock)
+
+if __name__ == '__main__':
+    unittest.main()
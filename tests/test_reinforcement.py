@@ -11,7 +11,10 @@ import sys
 # 添加项目根目录到 Python 搜索路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import numpy as np
 from pet.intelligent import IntelligentPet
+from pet.systems.reinforcement import ReinforcementLearningSystem
+from pet.systems.replay import PrioritizedReplayBuffer
 
 class TestReinforcementLearningSystem(unittest.TestCase):
     """测试 ReinforcementLearningSystem 类的功能"""
@@ -26,7 +29,7 @@ class TestReinforcementLearningSystem(unittest.TestCase):
         self.assertIsNotNone(self.rl)
         self.assertIsInstance(self.rl.q_table, dict)
         self.assertIsInstance(self.rl.q_table_2, dict)
-        self.assertIsInstance(self.rl.replay_buffer, list)
+        self.assertIsInstance(self.rl.replay_buffer, PrioritizedReplayBuffer)
     
     def test_get_discrete_state(self):
         """测试获取离散状态"""
@@ -61,6 +64,39 @@ class TestReinforcementLearningSystem(unittest.TestCase):
         # 学习步数应该增加
         self.assertGreater(self.rl.learning_steps, 0)
     
+    def test_replay_buffer_eviction(self):
+        """测试回放缓冲区满时覆盖最旧的经验"""
+        self.rl.replay_buffer = PrioritizedReplayBuffer(4, len(self.rl.state_bins))
+        state = (0, 0, 0, 0, 0)
+        for i in range(6):
+            self.rl._store_experience(state, "feed", float(i), state, False)
+        
+        self.assertEqual(len(self.rl.replay_buffer), 4)
+        rewards = [reward for _, _, reward, _, _ in self.rl.replay_buffer]
+        self.assertEqual(rewards, [2.0, 3.0, 4.0, 5.0])
+    
+    def test_store_invalid_experience(self):
+        """测试无效经验在写入时被丢弃"""
+        state = (0, 0, 0, 0, 0)
+        self.assertIsNone(self.rl._store_experience(state, "unknown", 1.0, state, False))
+        self.assertIsNone(self.rl._store_experience(state, "feed", "1.0", state, False))
+        self.assertIsNone(self.rl._store_experience((0, 0), "feed", 1.0, state, False))
+        self.assertEqual(len(self.rl.replay_buffer), 0)
+    
+    def test_prioritized_sample(self):
+        """测试优先级采样返回动作名称和归一化权重"""
+        state = (1, 2, 3, 0, 1)
+        for action in self.rl.actions * 10:
+            self.rl._store_experience(state, action, 1.0, state, False)
+        
+        samples, indices, weights = self.rl._prioritized_sample()
+        self.assertEqual(len(samples), self.rl.batch_size)
+        self.assertEqual(len(indices), self.rl.batch_size)
+        self.assertAlmostEqual(max(weights), 1.0)
+        for sample_state, action, reward, next_state, done in samples:
+            self.assertEqual(sample_state, state)
+            self.assertIn(action, self.rl.actions)
+    
     def test_compress_q_table(self):
         """测试压缩Q表功能"""
         # 添加一些测试数据到Q表
@@ -121,5 +157,130 @@ class TestReinforcementLearningSystem(unittest.TestCase):
             if os.path.exists(temp_file):
                 os.unlink(temp_file)
 
+class TestDenseQTable(unittest.TestCase):
+    """测试 NumPy 数组Q表模式"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.pet = IntelligentPet('测试宠物')
+        self.rl = ReinforcementLearningSystem(self.pet, q_backend="dense")
+    
+    def test_initialization(self):
+        """测试数组Q表初始化"""
+        self.assertEqual(self.rl.num_states, 4 ** 5)
+        self.assertEqual(self.rl.q_table.shape, (4 ** 5, len(self.rl.actions)))
+        self.assertEqual(self.rl.q_table_2.shape, self.rl.q_table.shape)
+        with self.assertRaises(ValueError):
+            ReinforcementLearningSystem(self.pet, q_backend="unknown")
+    
+    def test_state_encoding(self):
+        """测试混合进制状态编码可逆"""
+        self.assertEqual(self.rl.encode_state((0, 0, 0, 0, 0)), 0)
+        self.assertEqual(self.rl.encode_state((0, 0, 0, 0, 1)), 1)
+        self.assertEqual(self.rl.encode_state((1, 0, 0, 0, 0)), 256)
+        for code in (0, 1, 255, 700, 1023):
+            self.assertEqual(self.rl.encode_state(self.rl.decode_state(code)), code)
+    
+    def test_get_discrete_state(self):
+        """测试数组模式下返回整数状态编码"""
+        state = self.rl.get_discrete_state()
+        self.assertIsInstance(state, int)
+        dict_rl = ReinforcementLearningSystem(self.pet)
+        self.assertEqual(self.rl.decode_state(state), dict_rl.get_discrete_state())
+    
+    def test_choose_action(self):
+        """测试按数组Q表选择最优动作"""
+        self.rl.exploration_rate = 0
+        state = self.rl.get_discrete_state()
+        self.rl.q_table[state, self.rl.actions.index("play")] = 1.0
+        self.assertEqual(self.rl.choose_action(state), "play")
+    
+    def test_learn(self):
+        """测试数组模式下的经验回放学习"""
+        state = self.rl.encode_state((1, 2, 3, 0, 1))
+        next_state = self.rl.encode_state((1, 2, 3, 1, 1))
+        for _ in range(self.rl.batch_size):
+            self.rl.learn(state, "feed", 1.0, next_state, False)
+        
+        self.assertEqual(len(self.rl.replay_buffer), self.rl.batch_size)
+        self.assertGreater(self.rl.q_table[state, self.rl.actions.index("feed")], 0)
+        self.assertGreater(self.rl.get_learning_stats()["q_table_size"], 0)
+    
+    def test_learn_batch_duplicates(self):
+        """测试向量化批量更新按复合步长合并同一 (状态, 动作) 的重复样本"""
+        state = (1, 2, 3, 0, 1)
+        code = self.rl.encode_state(state)
+        feed = self.rl.actions.index("feed")
+        self.rl.replay_buffer.add(state, feed, 1.0, state, True, 1.0)
+        self.rl.replay_buffer.add(state, feed, 1.0, state, True, 1.0)
+        
+        self.rl._learn_batch_dense()
+        # 与顺序执行两次更新的结果一致
+        expected = 1.0 - (1.0 - self.rl.learning_rate) ** 2
+        self.assertAlmostEqual(self.rl.q_table[code, feed], expected)
+        self.assertAlmostEqual(self.rl.q_table_2[code, feed], expected)
+        # 更新后的优先级按新的 TD 误差计算
+        expected_priority = (1.0 - expected + 1e-6) ** self.rl.alpha
+        self.assertAlmostEqual(self.rl.replay_buffer.get_priority(0), expected_priority)
+    
+    def test_learn_batch_many_duplicates_match_sequential(self):
+        """测试大量重复样本不会越过目标值，结果与逐个样本更新的字典Q表一致"""
+        dict_rl = ReinforcementLearningSystem(self.pet)
+        for rl in (self.rl, dict_rl):
+            rl.learning_rate = 0.2
+        samples = [((1, 2, 3, 0, 1), "feed", 1.0)] * 20 + [((0, 1, 2, 3, 0), "play", -0.5)] * 5
+        samples.append(((3, 3, 3, 3, 3), "sleep", 0.3))
+        for state, action, reward in samples:
+            for rl in (self.rl, dict_rl):
+                rl.replay_buffer.add(state, self.rl.actions.index(action), reward, state, True, 1.0)
+        
+        for _ in range(3):
+            self.rl._learn_batch_dense()
+            dict_samples, indices, weights = dict_rl._prioritized_sample()
+            dict_rl._learn_from_samples_dict(dict_samples, indices, weights)
+        
+        for state, action, reward in set(samples):
+            code = self.rl.encode_state(state)
+            index = self.rl.actions.index(action)
+            self.assertAlmostEqual(self.rl.q_table[code, index], dict_rl.q_table[state][action])
+            self.assertAlmostEqual(self.rl.q_table_2[code, index], dict_rl.q_table_2[state][action])
+            self.assertLessEqual(abs(self.rl.q_table[code, index]), abs(reward))
+    
+    def test_learn_batch_double_q_target(self):
+        """测试双Q目标值：Q表1选动作，Q表2估值"""
+        state = (0, 0, 0, 0, 0)
+        next_state = (3, 3, 3, 3, 3)
+        next_code = self.rl.encode_state(next_state)
+        self.rl.q_table[next_code] = [0.0, 2.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+        self.rl.q_table_2[next_code] = [0.0, 0.5, 0.0, 0.0, 0.0, 0.0, 3.0]
+        self.rl.replay_buffer.add(state, 0, 1.0, next_state, False, 1.0)
+        
+        self.rl._learn_batch_dense()
+        gamma = self.rl.discount_factor
+        lr = self.rl.learning_rate
+        self.assertAlmostEqual(self.rl.q_table[0, 0], lr * (1.0 + gamma * 0.5))
+        self.assertAlmostEqual(self.rl.q_table_2[0, 0], lr * (1.0 + gamma * 1.0))
+    
+    def test_save_and_load_interchangeable(self):
+        """测试数组Q表与字典Q表的存档可以互相加载"""
+        state = (1, 2, 3, 0, 1)
+        self.rl.q_table[self.rl.encode_state(state), self.rl.actions.index("sleep")] = 0.75
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as f:
+            temp_file = f.name
+        try:
+            self.rl.save_learning_data(temp_file)
+            
+            dict_rl = ReinforcementLearningSystem(self.pet)
+            self.assertTrue(dict_rl.load_learning_data(temp_file))
+            self.assertEqual(dict_rl.q_table[state], {"sleep": 0.75})
+            
+            dense_rl = ReinforcementLearningSystem(self.pet, q_backend="dense")
+            self.assertTrue(dense_rl.load_learning_data(temp_file))
+            np.testing.assert_array_equal(dense_rl.q_table, self.rl.q_table)
+        finally:
+            if os.path.exists(temp_file):
+                os.unlink(temp_file)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+测试 replay.py 模块中的 SumTree 和 PrioritizedReplayBuffer 类
+"""
+
+import unittest
+import os
+import sys
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from pet.systems.replay import SumTree, PrioritizedReplayBuffer
+
+class TestSumTree(unittest.TestCase):
+    """测试 SumTree 类的功能"""
+    
+    def test_update_and_total(self):
+        """测试更新优先级后总和正确"""
+        tree = SumTree(5)
+        for i, priority in enumerate([1.0, 2.0, 3.0, 4.0, 5.0]):
+            tree.update(i, priority)
+        self.assertAlmostEqual(tree.total(), 15.0)
+        
+        tree.update(2, 0.5)
+        self.assertAlmostEqual(tree.total(), 12.5)
+        self.assertAlmostEqual(tree.get(2), 0.5)
+    
+    def test_update_batch(self):
+        """测试批量更新与逐条更新结果一致，重复索引以最后一次为准"""
+        tree = SumTree(8)
+        expected = SumTree(8)
+        for i in range(8):
+            tree.update(i, 1.0)
+            expected.update(i, 1.0)
+        
+        tree.update_batch([1, 5, 1, 7], [2.0, 3.0, 4.0, 0.0])
+        for index, priority in [(1, 4.0), (5, 3.0), (7, 0.0)]:
+            expected.update(index, priority)
+        np.testing.assert_allclose(tree.tree, expected.tree)
+    
+    def test_find(self):
+        """测试按前缀和查找叶子"""
+        tree = SumTree(4)
+        for i, priority in enumerate([1.0, 0.0, 2.0, 1.0]):
+            tree.update(i, priority)
+        indices = tree.find(np.array([0.0, 0.99, 1.0, 2.99, 3.0, 3.99]))
+        self.assertEqual(indices.tolist(), [0, 0, 2, 2, 3, 3])
+    
+    def test_grow(self):
+        """测试扩容后保留原有优先级"""
+        tree = SumTree(2)
+        tree.update(0, 1.0)
+        tree.update(1, 2.0)
+        tree.grow(10)
+        self.assertGreaterEqual(tree.capacity, 10)
+        self.assertAlmostEqual(tree.total(), 3.0)
+        tree.update(9, 4.0)
+        self.assertAlmostEqual(tree.total(), 7.0)
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+    """测试 PrioritizedReplayBuffer 类的功能"""
+    
+    def test_lazy_growth(self):
+        """测试存储按需扩容，不预先分配完整容量"""
+        buffer = PrioritizedReplayBuffer(1000000, 5, initial_capacity=4)
+        self.assertEqual(len(buffer.rewards), 4)
+        for i in range(10):
+            buffer.add((i, 0, 0, 0, 0), 1, float(i), (0, 0, 0, 0, i), i % 2 == 0, 1.0)
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(len(buffer.rewards), 16)
+        self.assertEqual(buffer.get(9), ((9, 0, 0, 0, 0), 1, 9.0, (0, 0, 0, 0, 9), False))
+        self.assertAlmostEqual(buffer.tree.total(), 10.0)
+    
+    def test_ring_overwrite(self):
+        """测试环形覆盖时同时替换优先级"""
+        buffer = PrioritizedReplayBuffer(3, 5)
+        state = (0, 0, 0, 0, 0)
+        for i in range(5):
+            buffer.add(state, 0, float(i), state, False, float(i + 1))
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual([exp[2] for exp in buffer], [2.0, 3.0, 4.0])
+        self.assertAlmostEqual(buffer.tree.total(), 3.0 + 4.0 + 5.0)
+    
+    def test_sample_proportional(self):
+        """测试采样频率与优先级成正比"""
+        buffer = PrioritizedReplayBuffer(4, 5, seed=0)
+        state = (0, 0, 0, 0, 0)
+        for priority in [1.0, 0.0, 3.0, 0.0]:
+            buffer.add(state, 0, 0.0, state, False, priority)
+        
+        indices, weights = buffer.sample(4000, beta=0.4)
+        counts = np.bincount(indices, minlength=4)
+        self.assertEqual(counts[1], 0)
+        self.assertEqual(counts[3], 0)
+        self.assertAlmostEqual(counts[2] / counts[0], 3.0, delta=0.5)
+        self.assertAlmostEqual(weights.max(), 1.0)
+    
+    def test_sample_zero_priorities(self):
+        """测试所有优先级为0时均匀采样"""
+        buffer = PrioritizedReplayBuffer(4, 5)
+        state = (0, 0, 0, 0, 0)
+        for _ in range(2):
+            buffer.add(state, 0, 0.0, state, False, 0.0)
+        indices, weights = buffer.sample(10, beta=0.4)
+        self.assertTrue(all(0 <= i < 2 for i in indices))
+        self.assertTrue(np.all(weights == 1.0))
+    
+    def test_export_import_wrapped(self):
+        """测试导出导入环形缓冲区时按从旧到新的顺序恢复"""
+        buffer = PrioritizedReplayBuffer(3, 5)
+        state = (0, 0, 0, 0, 0)
+        for i in range(5):
+            buffer.add(state, 0, float(i), state, False, float(i + 1))
+        
+        restored = PrioritizedReplayBuffer(2, 5)
+        restored.import_arrays(buffer.export_arrays(), buffer.position)
+        self.assertEqual([exp[2] for exp in restored], [3.0, 4.0])
+        self.assertAlmostEqual(restored.tree.total(), 4.0 + 5.0)
+        
+        restored.add(state, 0, 5.0, state, False, 6.0)
+        self.assertEqual([exp[2] for exp in restored], [4.0, 5.0])
+
+if __name__ == '__main__':
+    unittest.main()
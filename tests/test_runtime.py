@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+测试 runtime.py 模块中的 GameRuntime 类
+"""
+
+import unittest
+import os
+import sys
+import asyncio
+from unittest import mock
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.clock import SimulationClock
+from pet.events import EventType, DELIVERY_DEFERRED
+from pet.scheduler import Scheduler
+from pet.runtime import GameRuntime, ainput
+
+class TestGameRuntime(unittest.TestCase):
+    """测试 GameRuntime 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.clock = SimulationClock(start=1_000_000.0)
+        self.runtime = GameRuntime(Scheduler(self.clock), max_sleep=0.01)
+    
+    def test_simulation_runs_while_main_waits(self):
+        """测试主协程等待时定时任务照常执行"""
+        pet = Pet('运行时宠物', clock=self.clock)
+        self.runtime.add_pet(pet)
+        
+        async def main():
+            # 模拟等待输入期间时间流逝
+            self.clock.advance(2 * 3600)
+            await asyncio.sleep(0.1)
+            return "done"
+        
+        self.assertEqual(asyncio.run(self.runtime.run(main())), "done")
+        self.assertGreaterEqual(self.runtime.jobs_run, 1)
+        self.assertEqual(pet.last_update_time, self.clock.time())
+        self.assertFalse(self.runtime.running)
+    
+    def test_hosts_many_pets(self):
+        """测试一个运行时托管多只宠物"""
+        pets = [self.runtime.add_pet(Pet(f'宠物{i}', clock=self.clock)) for i in range(20)]
+        self.clock.advance(3600 + 1)
+        self.assertEqual(self.runtime.step(), 20)
+        self.assertTrue(all(pet.last_update_time == self.clock.time() for pet in pets))
+        
+        self.runtime.remove_pet(pets[0])
+        self.assertEqual(len(self.runtime.pets), 19)
+        self.clock.advance(3600 + 1)
+        self.assertEqual(self.runtime.step(), 19)
+    
+    def test_step_flushes_event_buses(self):
+        """测试模拟步投递宠物事件总线中排队的事件"""
+        pet = self.runtime.add_pet(Pet('事件宠物', clock=self.clock))
+        batches = []
+        pet.event_bus.subscribe(EventType.FEED, batches.append, DELIVERY_DEFERRED)
+        pet.feed()
+        self.assertEqual(batches, [])
+        self.assertEqual(self.runtime.step(), 1)
+        self.assertEqual(len(batches), 1)
+    
+    def test_renderer_throttled(self):
+        """测试只在状态变化后渲染，且可以跳过渲染"""
+        renders = []
+        allow = [False]
+        
+        def render():
+            if not allow[0]:
+                return False
+            renders.append(self.runtime.version)
+            return True
+        
+        async def main():
+            await asyncio.sleep(0.05)
+            self.assertEqual(renders, [])  # 状态没有变化
+            self.runtime.version += 1
+            await asyncio.sleep(0.05)
+            self.assertEqual(renders, [])  # 渲染回调拒绝渲染
+            allow[0] = True
+            await asyncio.sleep(0.05)
+        
+        asyncio.run(self.runtime.run(main(), render=render, render_interval=0.01))
+        self.assertEqual(renders, [1])
+    
+    def test_ainput(self):
+        """测试在工作线程中读取输入"""
+        with mock.patch('builtins.input', return_value='1'):
+            self.assertEqual(asyncio.run(ainput("请选择: ")), '1')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+测试 scheduler.py 模块中的 Scheduler 类
+"""
+
+import unittest
+import os
+import sys
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.intelligent import IntelligentPet
+from pet.clock import SimulationClock
+from pet.scheduler import Scheduler, schedule_pet, unschedule_pet
+from tasks import TaskSystem, TaskStatus
+
+class TestScheduler(unittest.TestCase):
+    """测试 Scheduler 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.clock = SimulationClock(0)
+        self.scheduler = Scheduler(self.clock)
+    
+    def test_run_due_in_order(self):
+        """测试按到期时间顺序执行，未到期的任务不执行"""
+        calls = []
+        self.scheduler.schedule(20, lambda now: calls.append("b"))
+        self.scheduler.schedule(10, lambda now: calls.append("a"))
+        self.scheduler.schedule(30, lambda now: calls.append("c"))
+        
+        self.assertEqual(self.scheduler.next_due(), 10)
+        self.assertEqual(self.scheduler.run_due(25), 2)
+        self.assertEqual(calls, ["a", "b"])
+        self.assertEqual(self.scheduler.next_due(), 30)
+    
+    def test_periodic_and_cancel(self):
+        """测试回调返回下一次到期时间时重新调度，按键取消"""
+        calls = []
+        
+        def tick(now):
+            calls.append(now)
+            return now + 10
+        
+        self.scheduler.schedule(10, tick, key="tick")
+        self.scheduler.run_due(10)
+        self.scheduler.run_due(20)
+        self.assertEqual(calls, [10, 20])
+        
+        self.scheduler.cancel("tick")
+        self.assertEqual(self.scheduler.run_due(100), 0)
+        self.assertIsNone(self.scheduler.next_due())
+    
+    def test_same_key_replaces(self):
+        """测试同一个键只保留最新的任务"""
+        calls = []
+        self.scheduler.schedule(10, lambda now: calls.append("old"), key="job")
+        self.scheduler.schedule(15, lambda now: calls.append("new"), key="job")
+        self.scheduler.run_due(20)
+        self.assertEqual(calls, ["new"])
+    
+    def test_run_pending_sleeps_until_due(self):
+        """测试 run_pending 等待到最早的到期时间"""
+        calls = []
+        self.scheduler.schedule(50, lambda now: calls.append(now))
+        self.assertEqual(self.scheduler.run_pending(), 1)
+        self.assertEqual(self.clock.time(), 50)
+        self.assertEqual(calls, [50])
+
+class TestSchedulePet(unittest.TestCase):
+    """测试为宠物注册的定时任务"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.clock = SimulationClock(0)
+        self.scheduler = Scheduler(self.clock)
+    
+    def test_needs_tick_hourly(self):
+        """测试每小时更新一次需求值"""
+        pet = Pet('测试宠物', clock=self.clock)
+        schedule_pet(self.scheduler, pet)
+        
+        self.clock.advance(1800)
+        self.scheduler.run_due()
+        self.assertEqual(pet.hunger, 0.0)
+        
+        for _ in range(3):
+            self.clock.advance(3600)
+            self.scheduler.run_due()
+        self.assertGreater(pet.hunger, 0.0)
+        self.assertAlmostEqual(pet.age_in_days, 3.5 / 24, places=3)
+    
+    def test_spontaneous_tick(self):
+        """测试智能宠物在冷却结束时执行自发行为"""
+        pet = IntelligentPet('测试宠物', clock=self.clock)
+        schedule_pet(self.scheduler, pet)
+        
+        self.clock.advance(pet.spontaneous_action_cooldown - 1)
+        self.scheduler.run_due()
+        self.assertEqual(pet.reinforcement_learning.learning_steps, 0)
+        
+        self.clock.advance(1)
+        self.scheduler.run_due()
+        self.assertEqual(pet.reinforcement_learning.learning_steps, 1)
+        self.assertEqual(pet.next_spontaneous_action_time(), self.clock.time() + pet.spontaneous_action_cooldown)
+        
+        unschedule_pet(self.scheduler, pet)
+        self.assertIsNone(self.scheduler.next_due())
+    
+    def test_spontaneous_tick_runs_once_per_cooldown(self):
+        """测试每次冷却只执行一次自发行为（动作内部的 update 不再触发）"""
+        pet = IntelligentPet('测试宠物', clock=self.clock)
+        executions = []
+        original = pet.execute_spontaneous_action
+        
+        def counting():
+            executions.append(self.clock.time())
+            return original()
+        
+        pet.execute_spontaneous_action = counting
+        schedule_pet(self.scheduler, pet)
+        
+        for _ in range(10):
+            self.clock.advance(pet.spontaneous_action_cooldown + 60)
+            self.scheduler.run_due()
+        self.assertEqual(len(executions), 10)
+        self.assertEqual(len(set(executions)), 10)
+    
+    def test_task_expiry_tick(self):
+        """测试任务在最早的过期时间被清理"""
+        pet = Pet('测试宠物', clock=self.clock)
+        task_system = TaskSystem(pet)
+        tasks = task_system.generate_daily_tasks()
+        schedule_pet(self.scheduler, pet, task_system)
+        self.assertEqual(task_system.next_expiry_time(), 24 * 3600)
+        
+        self.clock.advance(24 * 3600 + 1)
+        tasks[0].start()
+        self.scheduler.run_due()
+        self.assertEqual(tasks[0].status, TaskStatus.FAILED)
+        self.assertNotIn(tasks[0], task_system.tasks)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+测试 server.py 模块中的 PetHost、PetServer 以及 loadgen.py 压测工具
+"""
+
+import unittest
+import os
+import sys
+import io
+import json
+import asyncio
+import contextlib
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.store import SQLitePetStore
+from server import PetHost, PetServer, ApiError
+from loadgen import HttpConnection, run_load
+
+class TestPetHost(unittest.TestCase):
+    """测试 PetHost 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.store = SQLitePetStore()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.store.close()
+    
+    def test_create_and_get(self):
+        """测试创建宠物和重复创建"""
+        async def run():
+            host = PetHost(self.store, capacity=10)
+            host.create('小白', '猫')
+            self.assertEqual((await host.get('小白')).pet.species, '猫')
+            with self.assertRaises(ApiError) as context:
+                host.create('小白')
+            self.assertEqual(context.exception.status, 409)
+            with self.assertRaises(ApiError) as context:
+                await host.get('不存在')
+            self.assertEqual(context.exception.status, 404)
+        
+        asyncio.run(run())
+    
+    def test_lru_eviction_and_page_in(self):
+        """测试超过容量时换出最久未访问的宠物，写入后从存储加载"""
+        async def run():
+            host = PetHost(self.store, capacity=2)
+            for name in ('a', 'b', 'c'):
+                host.create(name)
+            (await host.get('a')).pet.feed()
+            self.assertEqual(host.hot_count, 2)
+            self.assertEqual(host.evictions, 2)  # 先换出 a，取回 a 时换出 b
+        
+            # 换出的宠物写入前直接取回，不从存储加载
+            await host.get('b')
+            self.assertEqual(host.loads, 0)
+        
+            await host.flush()
+            self.assertEqual(set(self.store.names()), {'a', 'b', 'c'})
+            hunger = (await host.get('a')).pet.hunger
+            await host.get('b')
+            await host.get('c')  # 从存储加载 c，换出 a
+            await host.flush()
+            self.assertEqual((await host.get('a')).pet.hunger, hunger)
+            self.assertEqual(host.loads, 2)
+        
+        asyncio.run(run())
+    
+    def test_locked_pet_not_evicted(self):
+        """测试加锁的宠物不会被换出"""
+        async def run():
+            host = PetHost(self.store, capacity=1)
+            session = host.create('a')
+            async with session.lock:
+                # a 加锁、b 刚加入，暂时超过容量
+                host.create('b')
+                self.assertEqual(host.evictions, 0)
+                self.assertEqual(host.hot_count, 2)
+            host.create('c')
+            self.assertEqual(host.evictions, 2)
+            self.assertEqual(host.hot_count, 1)
+        
+        asyncio.run(run())
+
+    def test_pinned_pet_not_evicted(self):
+        """测试固定的宠物不会被换出，取消固定后再换出"""
+        async def run():
+            host = PetHost(self.store, capacity=1)
+            host.create('a')
+            session = await host.get('a', pin=True)
+            host.create('b')
+            self.assertEqual(host.evictions, 0)
+            self.assertIs(await host.get('a'), session)
+            host.release(session)
+            self.assertEqual(host.evictions, 1)
+            self.assertEqual(host.hot_count, 1)
+        
+        asyncio.run(run())
+
+    def test_cold_load_shared(self):
+        """测试同时请求冷宠物时只在线程池中加载一次，取得同一个会话"""
+        async def run():
+            host = PetHost(self.store, capacity=1)
+            host.create('a')
+            host.create('b')
+            await host.flush()
+            first, second = await asyncio.gather(host.get('a'), host.get('a'))
+            self.assertIs(first, second)
+            self.assertEqual(host.loads, 1)
+        
+        asyncio.run(run())
+    
+    def test_failed_write_does_not_stop_flusher(self):
+        """测试一只宠物写入失败时其他宠物照常写入，定时写入继续运行并重试"""
+        async def run():
+            host = PetHost(self.store, capacity=10, flush_interval=0.01)
+            host.create('坏').pet.species = [1]  # 无法写入存储的数据
+            host.create('好')
+            flusher = asyncio.create_task(host.run_flusher())
+            try:
+                await asyncio.sleep(0.05)
+                self.assertIn('好', self.store.names())
+                self.assertNotIn('坏', self.store.names())
+                self.assertGreater(host.write_errors, 0)
+                self.assertIsNotNone(host.last_error)
+                
+                (await host.get('坏')).pet.species = '猫'
+                host.create('新')
+                await asyncio.sleep(0.05)
+                self.assertFalse(flusher.done())
+                self.assertEqual(set(self.store.names()), {'好', '坏', '新'})
+                self.assertEqual(self.store.load('坏').species, '猫')
+            finally:
+                flusher.cancel()
+                await asyncio.gather(flusher, return_exceptions=True)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(run())
+
+class TestPetServer(unittest.TestCase):
+    """测试 PetServer 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.store = SQLitePetStore()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.store.close()
+    
+    def test_dispatch(self):
+        """测试创建、动作、状态和错误响应"""
+        async def run():
+            server = PetServer(PetHost(self.store))
+            status, body = await server.respond('POST', '/pets', json.dumps({'name': '小黑'}).encode())
+            self.assertEqual(status, 201)
+        
+            status, body = await server.respond('POST', '/pets/%E5%B0%8F%E9%BB%91/feed',
+                                                json.dumps({'food_type': '零食'}).encode())
+            self.assertEqual(status, 200)
+            self.assertIn('喂食成功', json.loads(body)['result'])
+        
+            status, body = await server.respond('GET', '/pets/小黑', b'')
+            self.assertEqual(json.loads(body)['name'], '小黑')
+        
+            status, _ = await server.respond('POST', '/pets/小黑/feed', b'{"speed": 1}')
+            self.assertEqual(status, 400)
+            status, _ = await server.respond('POST', '/pets/小黑/fly', b'')
+            self.assertEqual(status, 404)
+            status, _ = await server.respond('DELETE', '/pets/小黑', b'')
+            self.assertEqual(status, 405)
+            status, _ = await server.respond('POST', '/pets', b'not json')
+            self.assertEqual(status, 400)
+            status, _ = await server.respond('POST', '/pets', b'{"name": 5}')
+            self.assertEqual(status, 400)
+            status, _ = await server.respond('POST', '/pets', b'{"name": "c", "species": [1]}')
+            self.assertEqual(status, 400)
+            status, body = await server.respond('GET', '/pets', b'')
+            self.assertEqual(json.loads(body)['pets'], ['小黑'])
+        
+            status, body = await server.respond('GET', '/stats', b'')
+            self.assertEqual(json.loads(body)['requests'], 11)
+            self.assertEqual(json.loads(body)['errors'], 6)
+        
+        asyncio.run(run())
+    
+    def test_waiting_request_keeps_pet_in_memory(self):
+        """测试等待锁的请求不会因为宠物被换出而修改已写入存储的旧对象"""
+        async def run():
+            host = PetHost(self.store, capacity=1)
+            server = PetServer(host)
+            await server.respond('POST', '/pets', json.dumps({'name': 'a'}).encode())
+            session = await host.get('a')
+            session.pet.hunger = 60
+            
+            await session.lock.acquire()
+            feeding = asyncio.create_task(server.respond('POST', '/pets/a/feed', b''))
+            await asyncio.sleep(0)  # 请求开始等待锁
+            # 释放锁后、等待的请求取得锁之前创建 b，a 仍被等待的请求固定
+            session.lock.release()
+            status, _ = await server.respond('POST', '/pets', json.dumps({'name': 'b'}).encode())
+            self.assertEqual(status, 201)
+            await host.flush()
+            status, _ = await feeding
+            self.assertEqual(status, 200)
+            
+            await host.flush()
+            status, body = await server.respond('GET', '/pets/a', b'')
+            self.assertLess(json.loads(body)['vitals']['hunger'], 60)
+            self.assertLess(self.store.load('a').hunger, 60)
+        
+        asyncio.run(run())
+    
+    def test_internal_error(self):
+        """测试未预料的异常返回 500"""
+        async def run():
+            host = PetHost(self.store)
+            server = PetServer(host)
+            await server.respond('POST', '/pets', json.dumps({'name': '坏'}).encode())
+            
+            def broken(**kwargs):
+                raise RuntimeError('损坏')
+            
+            (await host.get('坏')).pet.clean = broken
+            status, body = await server.respond('POST', '/pets/坏/clean', b'')
+            self.assertEqual(status, 500)
+            self.assertIn('损坏', json.loads(body)['error'])
+            self.assertEqual((await host.get('坏')).pins, 0)
+        
+        asyncio.run(run())
+    
+    def test_invalid_content_length(self):
+        """测试无效的 Content-Length 返回 400 并关闭连接"""
+        async def run():
+            server = PetServer(PetHost(self.store))
+            listener = await server.start('127.0.0.1', 0)
+            port = listener.sockets[0].getsockname()[1]
+            async with listener:
+                for value in ('abc', '-5'):
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    writer.write(f'POST /pets HTTP/1.1\r\nContent-Length: {value}\r\n\r\n'.encode())
+                    await writer.drain()
+                    response = await reader.read()
+                    self.assertTrue(response.startswith(b'HTTP/1.1 400'))
+                    writer.close()
+        
+        asyncio.run(run())
+    
+    def test_intelligent_pet_learns(self):
+        """测试智能宠物的动作经过用户交互和强化学习"""
+        async def run():
+            host = PetHost(self.store)
+            server = PetServer(host)
+            await server.respond('POST', '/pets', json.dumps({'name': '智能', 'kind': 'intelligent'}).encode())
+            status, _ = await server.respond('POST', '/pets/智能/clean', b'')
+            self.assertEqual(status, 200)
+            self.assertEqual((await host.get('智能')).pet.reinforcement_learning.learning_steps, 1)
+        
+        asyncio.run(run())
+    
+    def test_http_and_load_generator(self):
+        """测试通过 TCP 长连接访问服务器，压测没有错误"""
+        async def run():
+            server = PetServer(PetHost(self.store, capacity=5))
+            listener = await server.start('127.0.0.1', 0)
+            port = listener.sockets[0].getsockname()[1]
+            async with listener:
+                connection = await HttpConnection.open('127.0.0.1', port)
+                status, _ = await connection.request('POST', '/pets', {'name': 'http'})
+                self.assertEqual(status, 201)
+                status, body = await connection.request('POST', '/pets/http/pet', {'duration': 2})
+                self.assertEqual(status, 200)
+                connection.close()
+        
+                result = await run_load('127.0.0.1', port, pets=20, connections=4, duration=0.3)
+            self.assertGreater(result['requests'], 0)
+            self.assertEqual(result['errors'], 0)
+            self.assertEqual(result['server']['hot'], 5)
+        
+        asyncio.run(run())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+测试 clock.py 和 simulation.py 模块中的模拟时钟与快进模拟
+"""
+
+import unittest
+import os
+import sys
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.intelligent import IntelligentPet
+from pet.clock import SimulationClock, SYSTEM_CLOCK
+from pet.simulation import fast_forward, care_policy
+from tasks import TaskSystem
+from social import SocialSystem, NPCPet, SocialInteractionType
+
+class TestSimulationClock(unittest.TestCase):
+    """测试 SimulationClock 类的功能"""
+    
+    def test_advance(self):
+        """测试推进虚拟时间"""
+        clock = SimulationClock(1000.0)
+        self.assertEqual(clock.time(), 1000.0)
+        clock.advance(60)
+        clock.sleep(30)
+        self.assertEqual(clock.time(), 1090.0)
+        with self.assertRaises(ValueError):
+            clock.advance(-1)
+    
+    def test_pet_uses_clock(self):
+        """测试宠物及其子系统使用注入的时钟"""
+        clock = SimulationClock(1000.0)
+        pet = Pet('测试宠物', clock=clock)
+        self.assertEqual(pet.birth_time, 1000.0)
+        self.assertIs(Pet('默认宠物').clock, SYSTEM_CLOCK)
+        
+        clock.advance(3600)
+        pet.sleep()
+        self.assertEqual(pet.sleep_start_time, 4600.0)
+        self.assertEqual(pet.emotional_system.emotion_history[-1].timestamp, clock.now())
+    
+    def test_subsystems_use_clock(self):
+        """测试任务和社交系统使用宠物的时钟"""
+        clock = SimulationClock(1000.0)
+        pet = Pet('测试宠物', clock=clock)
+        
+        task_system = TaskSystem(pet)
+        tasks = task_system.generate_daily_tasks()
+        self.assertTrue(all(task.created_at == 1000.0 for task in tasks))
+        clock.advance(3600 * 25)
+        self.assertTrue(all(task.is_expired() for task in tasks))
+        
+        social_system = SocialSystem(pet)
+        social_system.interact_with_other(NPCPet('小白', '狗狗'), SocialInteractionType.GREET)
+        relationship = next(iter(social_system.relationships.values()))
+        self.assertEqual(relationship.last_interaction, clock.time())
+
+class TestFastForward(unittest.TestCase):
+    """测试 fast_forward 快进模拟"""
+    
+    def test_requires_simulation_clock(self):
+        """测试非模拟时钟的宠物不能快进"""
+        with self.assertRaises(ValueError):
+            fast_forward(Pet('测试宠物'), 3600)
+    
+    def test_fast_forward_pet(self):
+        """测试快进推进年龄和需求值"""
+        clock = SimulationClock(0)
+        pet = Pet('测试宠物', clock=clock)
+        report = fast_forward(pet, 86400 * 3, step=3600)
+        
+        self.assertEqual(report["steps"], 72)
+        self.assertEqual(clock.time(), 86400 * 3)
+        self.assertAlmostEqual(pet.age_in_days, 3.0)
+        self.assertEqual(pet.hunger, 100.0)
+    
+    def test_fast_forward_with_policy(self):
+        """测试照顾策略让宠物保持健康"""
+        clock = SimulationClock(0)
+        pet = Pet('测试宠物', clock=clock)
+        report = fast_forward(pet, 86400 * 30, policy=care_policy, step=3600)
+        
+        self.assertGreater(report["actions"].get("feed", 0), 0)
+        self.assertLessEqual(pet.hunger, 80)
+        self.assertGreater(pet.health, 50)
+    
+    def test_fast_forward_spontaneous(self):
+        """测试快进时运行智能宠物的自发行为循环"""
+        clock = SimulationClock(0)
+        pet = IntelligentPet('测试宠物', clock=clock)
+        fast_forward(pet, 86400, step=3600)
+        self.assertEqual(pet.reinforcement_learning.learning_steps, 24)
+        self.assertEqual(pet.last_spontaneous_action, clock.time())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+测试 social.py 模块中的 SocialGraph 和 SocialSystem 类
+"""
+
+import unittest
+import os
+import sys
+import random
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.clock import SimulationClock
+import numpy as np
+from social import (
+    SocialSystem, SocialGraph, SocialRelationship, SocialRelationshipStatus,
+    SocialInteractionType, SocialEvent, InteractionHistory, FRIEND_STATUSES,
+    NPCManager, NPCWorld, BATCH_INTERACTION_TYPES, INTERACTION_RULES
+)
+
+class TestSocialGraph(unittest.TestCase):
+    """测试 SocialGraph 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.graph = SocialGraph()
+        for i in range(5):
+            self.graph[f'npc_{i}'] = SocialRelationship('我', f'npc_{i}')
+    
+    def test_status_index_follows_bond(self):
+        """测试纽带值变化后状态索引增量更新"""
+        self.assertEqual(self.graph.count_status(SocialRelationshipStatus.STRANGER), 5)
+        self.graph['npc_1'].update_bond(50)
+        self.graph['npc_3'].update_bond(95)
+        self.graph['npc_4'].update_bond(25)
+        self.assertEqual(self.graph.with_status(SocialRelationshipStatus.FRIEND), ['npc_1'])
+        self.assertEqual(self.graph.with_status(SocialRelationshipStatus.ACQUAINTANCE), ['npc_4'])
+        self.assertEqual(self.graph.count_status(SocialRelationshipStatus.STRANGER), 2)
+        
+        self.graph['npc_1'].update_bond(-40)
+        self.assertEqual(self.graph.with_status(SocialRelationshipStatus.FRIEND), [])
+        self.assertEqual(self.graph.top_friends(), ['npc_3'])
+        
+        del self.graph['npc_3']
+        self.assertEqual(self.graph.top_friends(), [])
+        self.assertIsNone(SocialRelationship('我', 'x')._index)
+    
+    def test_top_friends_by_bond(self):
+        """测试朋友按纽带值从高到低排列，纽带值相同时按加入顺序"""
+        for pet_id, bond in (('npc_0', 45), ('npc_1', 80), ('npc_2', 45), ('npc_3', 60)):
+            self.graph[pet_id].update_bond(bond)
+        self.assertEqual(self.graph.top_friends(), ['npc_1', 'npc_3', 'npc_0', 'npc_2'])
+        self.assertEqual(self.graph.top_friends(2), ['npc_1', 'npc_3'])
+        self.graph['npc_2'].update_bond(50)
+        self.assertEqual(self.graph.top_friends(1), ['npc_2'])
+    
+    def test_random_updates_match_scan(self):
+        """测试随机更新后索引与全量扫描的结果一致"""
+        rng = random.Random(7)
+        for _ in range(500):
+            pet_id = f'npc_{rng.randrange(5)}'
+            self.graph[pet_id].update_bond(rng.choice([-15, -8, -4, 5, 10, 15]))
+        expected = sorted(
+            (pet_id for pet_id, rel in self.graph.items() if rel.status in FRIEND_STATUSES),
+            key=lambda pet_id: -self.graph[pet_id].bond
+        )
+        self.assertEqual([self.graph[p].bond for p in self.graph.top_friends()], [self.graph[p].bond for p in expected])
+        for status in SocialRelationshipStatus:
+            self.assertEqual(
+                set(self.graph.with_status(status)),
+                {pet_id for pet_id, rel in self.graph.items() if rel.status == status}
+            )
+    
+    def test_recent_events(self):
+        """测试最近事件按时间从新到旧排列，与排序的结果一致"""
+        for i, timestamp in enumerate([30, 10, 30, 20, 40]):
+            self.graph.add_event(SocialEvent(f'e{i}', SocialInteractionType.GREET, [], timestamp=timestamp))
+        expected = sorted(self.graph.events, key=lambda e: e.timestamp, reverse=True)
+        self.assertEqual(self.graph.recent_events(), expected)
+        self.assertEqual([e.event_id for e in self.graph.recent_events(3)], ['e4', 'e0', 'e2'])
+        self.assertEqual(self.graph.recent_events(0), [])
+        self.assertIs(self.graph.get_event('e3'), self.graph.events[3])
+
+class TestInteractionHistory(unittest.TestCase):
+    """测试 InteractionHistory 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.relationship = SocialRelationship('我', '朋友', clock=SimulationClock(0))
+        self.relationship.history = InteractionHistory(recent_length=5, bucket_size=100, max_buckets=3)
+        # 每个时间桶两次互动：一次成功的问候，一次失败的玩耍
+        for i in range(10):
+            self.relationship.add_interaction(SocialInteractionType.GREET, {"success": True, "bond_change": 5}, timestamp=i * 100 + 10)
+            self.relationship.add_interaction(SocialInteractionType.PLAY, {"success": False, "bond_change": -2}, timestamp=i * 100 + 20)
+    
+    def test_bounded_memory(self):
+        """测试只保留最近的记录和有限的时间桶"""
+        history = self.relationship.history
+        self.assertEqual(len(self.relationship.interaction_history), 5)
+        self.assertEqual(self.relationship.interaction_history[-1]["timestamp"], 920)
+        self.assertEqual(sorted(history.buckets), [700, 800, 900])
+        self.assertEqual(len(history), 20)
+    
+    def test_stats(self):
+        """测试全部历史和指定时间之后的统计"""
+        stats = self.relationship.get_interaction_stats()
+        self.assertEqual(stats["count"], 20)
+        self.assertEqual(stats["successes"], 10)
+        self.assertAlmostEqual(stats["success_rate"], 0.5)
+        self.assertEqual(stats["bond_change"], 30)
+        
+        greet = self.relationship.get_interaction_stats(SocialInteractionType.GREET)
+        self.assertEqual((greet["count"], greet["success_rate"]), (10, 1.0))
+        recent = self.relationship.get_interaction_stats(SocialInteractionType.PLAY, since=850)
+        self.assertEqual((recent["count"], recent["bond_change"]), (2, -4))
+        self.assertEqual(set(self.relationship.history.stats_by_type()), {"greet", "play"})
+        
+        # 比保留的时间桶更早的互动计入累计统计
+        self.relationship.add_interaction(SocialInteractionType.HELP, {"success": True, "bond_change": 10}, timestamp=50)
+        self.assertEqual(self.relationship.get_interaction_stats(SocialInteractionType.HELP)["count"], 1)
+        self.assertEqual(self.relationship.get_interaction_stats(SocialInteractionType.HELP, since=0)["count"], 0)
+    
+    def test_round_trip(self):
+        """测试保存和加载统计，以及旧存档的完整历史"""
+        data = self.relationship.to_dict()
+        restored = SocialRelationship.from_dict(data)
+        self.assertEqual(restored.interaction_history, self.relationship.interaction_history)
+        self.assertEqual(restored.get_interaction_stats(), self.relationship.get_interaction_stats())
+        
+        # 旧存档只有完整的互动历史
+        legacy = dict(data, interaction_history=[
+            {"interaction_type": "greet", "outcome": {"success": True, "bond_change": 5}, "timestamp": t}
+            for t in range(100)
+        ])
+        del legacy["interaction_stats"]
+        restored = SocialRelationship.from_dict(legacy)
+        self.assertEqual(len(restored.interaction_history), restored.history.recent.maxlen)
+        self.assertEqual(restored.get_interaction_stats()["bond_change"], 500)
+
+class TestNPCWorld(unittest.TestCase):
+    """测试 NPCWorld 类的批量社交模拟"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.world = NPCWorld(seed=0)
+        self.world.spawn(200)
+    
+    def test_rules_applied_in_bulk(self):
+        """测试批量互动按规则的成功率和纽带值变化"""
+        n = 4000
+        initiators = np.zeros(n, dtype=np.int64)
+        targets = np.arange(1, n + 1) % 199 + 1
+        greet = BATCH_INTERACTION_TYPES.index(SocialInteractionType.GREET)
+        rule = INTERACTION_RULES[SocialInteractionType.GREET]
+        success = self.world.interact(initiators, targets, np.full(n, greet))
+        # 陌生人之间问候的成功率
+        self.assertAlmostEqual(success.mean(), rule.base_chance, delta=0.03)
+        
+        # 每个对象收到的纽带值变化累加后限制在 0-100
+        ids = self.world.pet_ids
+        for target in (1, 2, 3):
+            hits = success[targets == target]
+            expected = sum(np.where(hits, rule.success_bond, rule.failure_bond))
+            self.assertEqual(self.world.bond(ids[0], ids[target]), min(100, max(0, expected)))
+        self.assertEqual(self.world.bond(ids[1], ids[0]), 0.0)
+    
+    def test_friend_chance_and_play_effects(self):
+        """测试朋友的成功率以及玩耍对双方快乐度和能量的影响"""
+        ids = self.world.pet_ids
+        play = BATCH_INTERACTION_TYPES.index(SocialInteractionType.PLAY)
+        targets = np.tile(np.arange(1, 200), 10)
+        initiators = np.zeros(len(targets), dtype=np.int64)
+        self.world.interact(initiators[:199], targets[:199], np.full(199, play))
+        self.world.bonds[:] = 50
+        self.world.happiness[:] = 0
+        self.world.energy[:] = 100
+        self.assertEqual(self.world.status(ids[0], ids[1]), SocialRelationshipStatus.FRIEND)
+        
+        # 同一批互动都按开始时的关系状态（朋友）决定成功率
+        success = self.world.interact(initiators, targets, np.full(len(targets), play))
+        self.assertAlmostEqual(success.mean(), INTERACTION_RULES[SocialInteractionType.PLAY].friend_chance, delta=0.03)
+        played = np.bincount(targets[success], minlength=200)
+        np.testing.assert_allclose(self.world.happiness[1:200], np.minimum(played[1:] * 15, 100))
+        np.testing.assert_allclose(self.world.energy[1:200], 100 - played[1:] * 10)
+        self.assertEqual(self.world.happiness[0], 100)
+    
+    def test_tick_with_players(self):
+        """测试一轮模拟中 NPC 之间的互动以及玩家宠物与 NPC 的互动"""
+        world = NPCWorld.from_manager(NPCManager(), seed=1)
+        self.assertEqual(len(world), 5)
+        world.spawn(500)
+        pet = Pet('玩家宠物', clock=SimulationClock(0))
+        social = SocialSystem(pet)
+        
+        total = 0
+        for _ in range(20):
+            stats = world.tick(interaction_rate=0.5, player_systems=[social], player_interactions=2)
+            self.assertEqual(len(stats["player_results"]), 2)
+            total += stats["interactions"]
+        self.assertEqual(world.interaction_count, total)
+        self.assertEqual(sum(world.status_counts().values()), len(world.bonds))
+        self.assertEqual(social.interaction_count, 40)
+        self.assertTrue(all(pet_id.startswith('npc_') for pet_id in social.relationships))
+        self.assertTrue(((world.bonds >= 0) & (world.bonds <= 100)).all())
+
+class TestSocialSystem(unittest.TestCase):
+    """测试 SocialSystem 类使用社交关系图"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        random.seed(3)
+        self.clock = SimulationClock(0)
+        self.pet = Pet('测试宠物', clock=self.clock)
+        self.social = SocialSystem(self.pet)
+        self.others = [Pet(f'宠物{i}', clock=self.clock) for i in range(20)]
+    
+    def test_friends_and_round_trip(self):
+        """测试互动后的朋友列表，以及序列化后重建索引"""
+        for _ in range(10):
+            for other in self.others[:5]:
+                self.social.interact_with_other(other, SocialInteractionType.HELP)
+            self.social.interact_with_other(self.others[5], SocialInteractionType.CONFLICT)
+            self.clock.advance(60)
+        for other in self.others[:3]:
+            self.social.generate_social_event(other)
+            self.clock.advance(60)
+        
+        friends = self.social.get_friends()
+        self.assertTrue(friends)
+        bonds = [self.social.relationships[p].bond for p in friends]
+        self.assertEqual(bonds, sorted(bonds, reverse=True))
+        self.assertEqual(self.social.get_friends(limit=2), friends[:2])
+        
+        restored = SocialSystem(self.pet)
+        restored.from_dict(self.social.to_dict())
+        self.assertEqual(restored.friends, self.social.friends)
+        self.assertEqual(
+            [e.event_id for e in restored.get_recent_events()],
+            [e.event_id for e in self.social.get_recent_events()]
+        )
+        event = restored.get_recent_events(1)[0]
+        self.assertTrue(restored.resolve_social_event(event.event_id, '和好'))
+        self.assertTrue(event.resolved)
+        self.assertFalse(restored.resolve_social_event('不存在', '和好'))
+        
+        stats = restored.get_interaction_stats(self.others[0].pet_id)
+        self.assertEqual(stats["help"]["count"], 10)
+        self.assertEqual(restored.get_interaction_stats('不存在'), {})
+
+if __name__ == '__main__':
+    unittest.main()
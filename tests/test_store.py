@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+测试 store.py 模块中的 SQLitePetStore 类
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import contextlib
+import io
+import json
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.intelligent import IntelligentPet
+from pet.clock import SimulationClock
+from pet.enums import PetState
+from pet.simulation import fast_forward
+from pet.store import SQLitePetStore, KIND_INTELLIGENT
+from social import SocialSystem, SocialInteractionType
+
+class TestSQLitePetStore(unittest.TestCase):
+    """测试 SQLitePetStore 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.clock = SimulationClock(0)
+        self.store = SQLitePetStore()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        self.store.close()
+    
+    def _intelligent_pet(self, name):
+        with contextlib.redirect_stdout(io.StringIO()):
+            pet = IntelligentPet(name, '猫', clock=self.clock)
+            fast_forward(pet, 2 * 86400)
+        return pet
+    
+    def test_list_and_filter(self):
+        """测试按种类、等级和状态筛选，不加载宠物"""
+        for i in range(6):
+            pet = Pet(f'宠物{i}', '狗' if i % 2 else '猫', clock=self.clock)
+            pet.level = i
+            if i >= 4:
+                pet.state = PetState.ADULT
+            self.store.save(pet)
+        
+        self.assertEqual(len(self.store), 6)
+        self.assertEqual([s.name for s in self.store.list_pets(species='狗')], ['宠物1', '宠物3', '宠物5'])
+        self.assertEqual([s.name for s in self.store.list_pets(min_level=2, max_level=3)], ['宠物2', '宠物3'])
+        self.assertEqual([s.name for s in self.store.list_pets(state=PetState.ADULT)], ['宠物4', '宠物5'])
+        self.assertEqual([s.name for s in self.store.list_pets(order_by='-level', limit=2)], ['宠物5', '宠物4'])
+        with self.assertRaises(ValueError):
+            self.store.list_pets(order_by='core')
+    
+    def test_save_and_load(self):
+        """测试保存后加载的宠物与原宠物一致，重复保存覆盖原记录"""
+        pet = Pet('测试宠物', '狗', clock=self.clock)
+        pet.feed()
+        pet.play()
+        self.store.save(pet)
+        pet.train()
+        self.store.save(pet)
+        
+        loaded = self.store.load('测试宠物', clock=self.clock)
+        self.assertEqual(type(loaded), Pet)
+        # 元组保存后变为列表，与 JSON 存档相同
+        self.assertEqual(json.dumps(loaded.to_dict()), json.dumps(pet.to_dict()))
+        self.assertEqual(len(self.store), 1)
+        self.assertIsNone(self.store.load('不存在'))
+    
+    def test_incremental_changes_merged(self):
+        """测试增量记录只包含新增的记忆和情感历史，合并、写入后与宠物一致"""
+        # 抚摸不会让宠物睡着，每次都追加记忆和情感历史
+        pet = Pet('测试宠物', clock=self.clock)
+        for _ in range(3):
+            pet.pet()
+        self.store.save(pet)
+        
+        pet.pet()
+        first = self.store.collect(pet)
+        self.assertEqual(first['sections'], {})
+        self.assertEqual(first['changes']['memories'][0], 'append')
+        self.assertEqual(len(first['changes']['memories'][1]), 1)
+        pet.pet(2)
+        record = self.store.merge(first, self.store.collect(pet))
+        self.assertEqual(record['changes']['memories'][0], 'append')
+        self.assertEqual(len(record['changes']['memories'][1]), 2)
+        self.assertEqual(record['changes']['emotional_system.history'][0], 'append')
+        self.store.commit(record)
+        
+        loaded = self.store.load('测试宠物', clock=self.clock)
+        self.assertEqual(json.dumps(loaded.to_dict()), json.dumps(pet.to_dict()))
+        
+        # 整段写入的旧记录与增量的新记录合并
+        full = self.store.collect(pet, full=True)
+        pet.pet()
+        self.store.commit(self.store.merge(full, self.store.collect(pet)))
+        loaded = self.store.load('测试宠物', clock=self.clock)
+        self.assertEqual(json.dumps(loaded.to_dict()), json.dumps(pet.to_dict()))
+    
+    def test_partial_load(self):
+        """测试只加载核心数据时不读取记忆和情感历史"""
+        pet = Pet('测试宠物', clock=self.clock)
+        pet.feed()
+        self.store.save(pet)
+        
+        core = self.store.load('测试宠物', clock=self.clock, sections=())
+        self.assertEqual(core.hunger, pet.hunger)
+        self.assertEqual(core.memories, [])
+        self.assertEqual(len(core.emotional_system.emotion_history), 0)
+        
+        emotions = self.store.load_section('测试宠物', 'emotional_system')
+        self.assertEqual(len(emotions['emotion_history']), len(pet.emotional_system.emotion_history))
+    
+    def test_intelligent_pet(self):
+        """测试智能宠物连同强化学习数据一起保存"""
+        pet = self._intelligent_pet('智能宠物')
+        self.store.save(pet)
+        self.assertEqual(self.store.list_pets()[0].kind, KIND_INTELLIGENT)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            loaded = self.store.load('智能宠物', clock=self.clock)
+        self.assertIsInstance(loaded, IntelligentPet)
+        rl = pet.reinforcement_learning
+        loaded_rl = loaded.reinforcement_learning
+        self.assertEqual(loaded_rl.learning_steps, rl.learning_steps)
+        self.assertEqual(dict(loaded_rl.q_table), dict(rl.q_table))
+        self.assertEqual(len(loaded_rl.replay_buffer), len(rl.replay_buffer))
+    
+    def test_social_section(self):
+        """测试社交系统保存为单独的数据段"""
+        pet = Pet('测试宠物', clock=self.clock)
+        other = Pet('其他宠物', clock=self.clock)
+        social = SocialSystem(pet)
+        social.interact_with_other(other, SocialInteractionType.GREET)
+        self.store.save(pet, social)
+        
+        restored = SocialSystem(pet)
+        restored.from_dict(self.store.load_section('测试宠物', 'social'))
+        self.assertEqual(restored.interaction_count, 1)
+        self.assertEqual(set(restored.relationships), set(social.relationships))
+    
+    def test_delete(self):
+        """测试删除宠物时同时删除数据段"""
+        self.store.save(Pet('测试宠物', clock=self.clock))
+        self.assertTrue(self.store.delete('测试宠物'))
+        self.assertFalse(self.store.delete('测试宠物'))
+        self.assertNotIn('测试宠物', self.store)
+        count = self.store.connection.execute('SELECT COUNT(*) FROM pet_sections').fetchone()[0]
+        self.assertEqual(count, 0)
+    
+    def test_import_directory(self):
+        """测试导入 JSON 和二进制存档，已导入的宠物不重复导入"""
+        with tempfile.TemporaryDirectory() as directory:
+            Pet('普通宠物', clock=self.clock).save_to_file(os.path.join(directory, '普通宠物.json'))
+            pet = self._intelligent_pet('智能宠物')
+            pet.save_to_file(os.path.join(directory, '智能宠物.json'))
+            pet.reinforcement_learning.save_learning_data(os.path.join(directory, '智能宠物_rl.json'))
+            self._intelligent_pet('二进制宠物').save_to_file(os.path.join(directory, '二进制宠物.vpet'))
+            
+            imported = self.store.import_directory(directory)
+            self.assertEqual(sorted(imported), sorted(['普通宠物', '智能宠物', '二进制宠物']))
+            self.assertEqual(self.store.import_directory(directory), [])
+        
+        kinds = {s.name: s.kind for s in self.store.list_pets()}
+        self.assertEqual(kinds['普通宠物'], 'pet')
+        self.assertEqual(kinds['智能宠物'], KIND_INTELLIGENT)
+        self.assertEqual(kinds['二进制宠物'], KIND_INTELLIGENT)
+        with contextlib.redirect_stdout(io.StringIO()):
+            loaded = self.store.load('智能宠物')
+        self.assertEqual(loaded.reinforcement_learning.learning_steps, pet.reinforcement_learning.learning_steps)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+测试 tasks.py 模块中的 TaskSystem 类
+"""
+
+import unittest
+import os
+import sys
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pet.base import Pet
+from pet.clock import SimulationClock
+from pet.config import PetConfig
+from pet.store import SQLitePetStore
+from tasks import TaskSystem, Task, TaskType, TaskDifficulty, TaskStatus
+
+HOUR = 3600
+
+class TestTaskSystem(unittest.TestCase):
+    """测试 TaskSystem 类的功能"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        self.clock = SimulationClock(start=1_000_000.0)
+        self.pet = Pet('任务宠物', clock=self.clock)
+        self.task_system = TaskSystem(self.pet)
+        self.counter = 0
+    
+    def make_task(self, task_type=TaskType.FEED, target=1, time_limit=None):
+        """创建并添加任务"""
+        self.counter += 1
+        task = Task(f"t{self.counter}", task_type, "测试任务", TaskDifficulty.EASY, target,
+                    {"experience": 1}, time_limit=time_limit, clock=self.clock)
+        return self.task_system.add_task(task)
+    
+    def test_progress_uses_type_index(self):
+        """测试进度只推进对应类型的任务，完成后移出活跃任务"""
+        feed = self.make_task(TaskType.FEED)
+        play = self.make_task(TaskType.PLAY)
+    
+        rewards = self.task_system.update_task_progress(TaskType.FEED)
+        self.assertEqual(rewards, [feed.reward])
+        self.assertEqual(feed.status, TaskStatus.COMPLETED)
+        self.assertEqual(play.progress, 0)
+        self.assertEqual(self.task_system.tasks, [play])
+        self.assertEqual(self.task_system.get_tasks_by_type(TaskType.FEED), [])
+        self.assertEqual(self.task_system.get_completed_tasks(), [feed])
+    
+    def test_expiry_pops_only_due_tasks(self):
+        """测试过期处理按过期时间弹出任务"""
+        short = self.make_task(time_limit=HOUR)
+        short.start()
+        long = self.make_task(time_limit=3 * HOUR)
+        self.make_task()
+        self.assertEqual(self.task_system.next_expiry_time(), self.clock.time() + HOUR)
+    
+        self.clock.advance(HOUR + 1)
+        self.assertEqual(self.task_system._cleanup_expired_tasks(), [short])
+        self.assertEqual(short.status, TaskStatus.FAILED)
+        self.assertNotIn(short, self.task_system.tasks)
+        self.assertEqual(self.task_system.next_expiry_time(), long.deadline())
+    
+    def test_completed_task_leaves_expiry_heap(self):
+        """测试完成的任务不再影响最早过期时间"""
+        first = self.make_task(time_limit=HOUR)
+        second = self.make_task(TaskType.PLAY, time_limit=2 * HOUR)
+        self.task_system.update_task_progress(TaskType.FEED)
+        self.assertEqual(first.status, TaskStatus.COMPLETED)
+        self.assertEqual(self.task_system.next_expiry_time(), second.deadline())
+    
+        self.task_system.update_task_progress(TaskType.PLAY)
+        self.assertIsNone(self.task_system.next_expiry_time())
+    
+    def test_completed_history_bounded(self):
+        """测试已完成任务有上限，更早的任务进入待归档队列"""
+        limit = PetConfig.TASK_COMPLETED_HISTORY
+        for _ in range(limit + 5):
+            self.make_task()
+            self.task_system.update_task_progress(TaskType.FEED)
+    
+        self.assertEqual(len(self.task_system.completed_tasks), limit)
+        archived = self.task_system.take_archived()
+        self.assertEqual([task["task_id"] for task in archived], [f"t{i}" for i in range(1, 6)])
+        self.assertEqual(self.task_system.take_archived(), [])
+    
+    def test_round_trip(self):
+        """测试序列化后索引重新建立"""
+        self.make_task(time_limit=HOUR)
+        self.make_task(TaskType.CLEAN)
+        data = self.task_system.to_dict()
+    
+        restored = TaskSystem(self.pet)
+        restored.from_dict(data)
+        self.assertEqual(restored.to_dict(), data)
+        self.assertEqual(len(restored.get_tasks_by_type(TaskType.CLEAN)), 1)
+        self.assertEqual(restored.next_expiry_time(), self.clock.time() + HOUR)
+    
+    def test_archive_written_to_store(self):
+        """测试历史任务写入存储的归档"""
+        store = SQLitePetStore()
+        for _ in range(PetConfig.TASK_COMPLETED_HISTORY + 3):
+            self.make_task()
+            self.task_system.update_task_progress(TaskType.FEED)
+        store.save(self.pet, task_system=self.task_system)
+    
+        archived = store.load_task_archive(self.pet.name)
+        self.assertEqual(sorted(task["task_id"] for task in archived), ["t1", "t2", "t3"])
+        self.assertEqual(store.load_task_archive(self.pet.name, task_type=TaskType.PLAY.value), [])
+        self.assertEqual(Task.from_dict(archived[0], self.clock).status, TaskStatus.COMPLETED)
+    
+        # 归档已写入，之后没有修改时不再收集
+        self.assertIsNone(store.collect(self.pet, task_system=self.task_system))
+        store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+测试 training.py 模块中的多进程训练场
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+
+# 添加项目根目录到 Python 搜索路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from pet.intelligent import IntelligentPet
+from pet.systems.reinforcement import ReinforcementLearningSystem
+from pet.training import train_policy, save_trained_pet
+
+class TestTrainingFarm(unittest.TestCase):
+    """测试训练场的功能"""
+    
+    def test_train_in_process(self):
+        """测试单进程训练会更新Q表和学习统计"""
+        rl = train_policy(workers=1, rounds=2, days=2, seed=1)
+        self.assertTrue(rl.dense)
+        self.assertEqual(rl.learning_steps, 2 * 48)
+        self.assertGreater(rl.get_learning_stats()["q_table_size"], 0)
+    
+    def test_train_with_process_pool(self):
+        """测试多进程训练合并各进程的结果"""
+        rl = train_policy(workers=2, rounds=1, days=2, seed=1)
+        self.assertEqual(rl.learning_steps, 2 * 48)
+        self.assertTrue(np.any(rl.q_table))
+    
+    def test_replay_statistics_merged(self):
+        """测试合并各进程的经验回放统计"""
+        rl = train_policy(workers=2, rounds=2, days=2, seed=3)
+        stats = rl.replay_statistics
+        self.assertEqual(stats["experiences"], rl.learning_steps)
+        self.assertEqual(sum(stats["action_counts"].values()), stats["experiences"])
+        self.assertAlmostEqual(stats["reward_mean"], stats["reward_sum"] / stats["experiences"])
+        self.assertGreaterEqual(stats["reward_std"], 0.0)
+    
+    def test_save_trained_pet(self):
+        """测试训练结果可以被智能宠物加载"""
+        rl = train_policy(workers=1, rounds=1, days=2, seed=2)
+        with tempfile.TemporaryDirectory() as pets_dir:
+            pet_file, rl_file = save_trained_pet(rl, "训练结果", pets_dir)
+            self.assertTrue(os.path.exists(pet_file))
+            self.assertEqual(rl_file, pet_file.replace('.json', '_rl.json'))
+            
+            pet = IntelligentPet.load_from_file(pet_file)
+            self.assertTrue(pet.reinforcement_learning.load_learning_data(rl_file))
+            self.assertEqual(pet.reinforcement_learning.get_learning_stats()["q_table_size"],
+                             rl.get_learning_stats()["q_table_size"])
+            self.assertEqual(pet.reinforcement_learning.learning_steps, rl.learning_steps)
+            self.assertEqual(pet.reinforcement_learning.replay_statistics, rl.replay_statistics)
+
+if __name__ == '__main__':
+    unittest.main()